@@ -34,6 +34,7 @@ class QuestionRequest(BaseModel):
     question: str
     user_id: str
     context: Optional[Dict[str, Any]] = None
+    conversation_id: Optional[str] = None  # Follow-ups reuse the contexts retrieved earlier
 
 
 class QuestionResponse(BaseModel):
@@ -41,7 +42,9 @@ class QuestionResponse(BaseModel):
     answer: str
     confidence: float
     sources: List[str]
+    evidence: List[Dict[str, Any]] = Field(default_factory=list)
     follow_up_questions: List[str]
+    context_cache: Optional[Dict[str, Any]] = None
     timestamp: str
 
 
@@ -77,6 +80,7 @@ class WorkflowStatusResponse(BaseModel):
     autonomous_mode: bool
     workflows: Dict[str, str]
     scheduled_tasks: Dict[str, Any]
+    scheduler: Dict[str, Any] = {}
     decision_queue_stats: Dict[str, Any]
     recent_runs: List[Dict[str, Any]]
 
@@ -342,6 +346,7 @@ async def ask_question(
         question=request.question,
         user_id=request.user_id,
         context=request.context,
+        conversation_id=request.conversation_id,
     )
     
     return QuestionResponse(
@@ -349,7 +354,9 @@ async def ask_question(
         answer=result.get("answer", ""),
         confidence=result.get("confidence", 0.5),
         sources=result.get("sources", []),
+        evidence=result.get("evidence", []),
         follow_up_questions=result.get("follow_up_questions", []),
+        context_cache=result.get("context_cache"),
         timestamp=result.get("timestamp", datetime.utcnow().isoformat()),
     )
 
@@ -5,18 +5,22 @@ Comprehensive logging of all AI agent actions for compliance and debugging.
 Every autonomous action is recorded with full context.
 """
 
+from collections import deque
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Deque, Iterable
 from dataclasses import dataclass, field
 from enum import Enum
+import atexit
 import json
 import logging
+import os
+import threading
+import time
 import uuid
 
-from sqlalchemy.orm import Session
-from sqlalchemy import Column, String, Integer, DateTime, Text, JSON
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import func
+from sqlalchemy.orm import Session, sessionmaker
 
 logger = logging.getLogger(__name__)
 
@@ -182,6 +186,204 @@ class AuditEntry:
         }
 
 
+# =========================================================================
+# WRITE-BEHIND SINK
+# =========================================================================
+
+def _entry_to_row(entry: AuditEntry) -> Dict[str, Any]:
+    return {
+        "id": entry.id,
+        "entity_id": entry.entity_id,
+        "timestamp": entry.timestamp,
+        "action": entry.action.value,
+        "severity": entry.severity.value,
+        "snapshot_id": entry.snapshot_id,
+        "workflow_name": entry.workflow_name,
+        "agent_name": entry.agent_name,
+        "description": entry.description,
+        "details_json": json.loads(json.dumps(entry.details, default=str)),
+        "triggered_by": entry.triggered_by,
+        "user_id": entry.user_id,
+        "correlation_id": entry.correlation_id,
+        "amount_involved": str(entry.amount_involved) if entry.amount_involved is not None else None,
+        "currency": entry.currency,
+        "success": 1 if entry.success else 0,
+        "error_message": entry.error_message,
+        "duration_ms": entry.duration_ms,
+        "token_count": int(entry.details.get("token_count", 0) or 0),
+    }
+
+
+def _entry_from_row(row) -> AuditEntry:
+    return AuditEntry(
+        id=row.id,
+        timestamp=row.timestamp,
+        action=AuditAction(row.action),
+        severity=AuditSeverity(row.severity),
+        entity_id=row.entity_id,
+        snapshot_id=row.snapshot_id,
+        workflow_name=row.workflow_name,
+        agent_name=row.agent_name,
+        description=row.description or "",
+        details=row.details_json or {},
+        triggered_by=row.triggered_by or "system",
+        user_id=row.user_id,
+        correlation_id=row.correlation_id,
+        amount_involved=Decimal(row.amount_involved) if row.amount_involved is not None else None,
+        currency=row.currency,
+        success=bool(row.success),
+        error_message=row.error_message,
+        duration_ms=row.duration_ms,
+    )
+
+
+class AuditSink:
+    """
+    Batches audit entries into the agent_audit_entries table off the caller's thread.
+
+    enqueue() only appends to a pending queue. A daemon thread writes the
+    queue in one bulk insert once it holds `batch_size` entries or
+    `flush_interval` seconds have passed. Entries stay visible to readers
+    (pending_entries) until their batch is committed. If a write fails the
+    batch is kept and retried; beyond `max_pending` the oldest are dropped.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or int(os.getenv("FPA_AUDIT_BATCH_SIZE", "100"))
+        self.flush_interval = flush_interval or float(os.getenv("FPA_AUDIT_FLUSH_SECONDS", "2"))
+        self.max_pending = max_pending or int(os.getenv("FPA_AUDIT_MAX_PENDING", "10000"))
+
+        self._pending: Deque[AuditEntry] = deque()
+        self._inflight: List[AuditEntry] = []
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()  # One writer at a time
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+
+    def enqueue(self, entry: AuditEntry):
+        with self._cond:
+            self._pending.append(entry)
+            overflow = len(self._pending) - self.max_pending
+            for _ in range(max(overflow, 0)):
+                self._pending.popleft()
+                self.dropped += 1
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="fpa-audit-sink", daemon=True)
+                self._thread.start()
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def pending_entries(self, entity_id: Optional[int] = None) -> List[AuditEntry]:
+        """Entries accepted but not yet committed"""
+        with self._cond:
+            entries = self._inflight + list(self._pending)
+        if entity_id is None:
+            return entries
+        return [e for e in entries if e.entity_id == entity_id]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._pending) < self.batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def flush(self) -> int:
+        """Write everything pending now; returns the number of entries written"""
+        import models
+
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._cond:
+                    if not self._pending:
+                        return written
+                    self._inflight = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                    batch = self._inflight
+                try:
+                    db = self.session_factory()
+                    try:
+                        db.bulk_insert_mappings(models.AgentAuditEntry, [_entry_to_row(e) for e in batch])
+                        db.commit()
+                    finally:
+                        db.close()
+                except Exception:
+                    self.failed_flushes += 1
+                    logger.exception(f"Audit sink could not write {len(batch)} entries; will retry")
+                    with self._cond:
+                        self._pending.extendleft(reversed(batch))
+                        self._inflight = []
+                    return written
+                with self._cond:
+                    self._inflight = []
+                written += len(batch)
+                self.written += len(batch)
+
+    def close(self):
+        """Stop the writer thread after a final flush"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=10)
+        self.flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._cond:
+            pending = len(self._pending) + len(self._inflight)
+        return {
+            "pending": pending,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+_sinks: Dict[Any, Optional[AuditSink]] = {}
+_sinks_lock = threading.Lock()
+
+
+def get_audit_sink(db: Session) -> Optional[AuditSink]:
+    """
+    The shared sink for a session's engine (one writer thread per database).
+
+    None for SQLite engines without concurrent sessions: in-memory databases,
+    and StaticPool engines where every session shares one connection, so the
+    writer's commit or rollback would land on another session's open
+    transaction. Those logs stay in memory only.
+    """
+    from agents.executor import supports_concurrent_sessions
+
+    bind = db.get_bind()
+    with _sinks_lock:
+        if bind not in _sinks:
+            if not supports_concurrent_sessions(bind):
+                _sinks[bind] = None
+            else:
+                sink = AuditSink(sessionmaker(autocommit=False, autoflush=False, bind=bind))
+                atexit.register(sink.close)
+                _sinks[bind] = sink
+        return _sinks[bind]
+
+
 class AuditLog:
     """
     Manages audit logging for the FP&A Analyst system.
@@ -189,10 +391,20 @@ class AuditLog:
     All autonomous actions are logged for compliance and debugging.
     """
     
-    def __init__(self, db: Session, entity_id: int):
+    def __init__(
+        self,
+        db: Session,
+        entity_id: int,
+        sink: Optional[AuditSink] = None,
+        ring_size: Optional[int] = None,
+    ):
         self.db = db
         self.entity_id = entity_id
-        self._entries: List[AuditEntry] = []  # In-memory buffer
+        self._sink = sink if sink is not None else get_audit_sink(db)
+        # Most recent entries logged here, newest last
+        self._entries: Deque[AuditEntry] = deque(
+            maxlen=ring_size or int(os.getenv("FPA_AUDIT_RING_SIZE", "1000"))
+        )
         self._current_correlation_id: Optional[str] = None
     
     def start_correlation(self, workflow_name: str) -> str:
@@ -351,6 +563,10 @@ class AuditLog:
             severity=AuditSeverity.DEBUG,
         )
     
+    def get_recent(self, limit: int = 100) -> List[AuditEntry]:
+        """Newest entries logged by this instance, from the ring buffer"""
+        return list(reversed(self._entries))[:limit]
+    
     def get_entries(
         self,
         action: Optional[AuditAction] = None,
@@ -361,26 +577,18 @@ class AuditLog:
         correlation_id: Optional[str] = None,
         limit: int = 100,
     ) -> List[AuditEntry]:
-        """Query audit entries"""
-        entries = self._entries
-        
-        if action:
-            entries = [e for e in entries if e.action == action]
-        
-        if since:
-            entries = [e for e in entries if e.timestamp >= since]
-        
-        if until:
-            entries = [e for e in entries if e.timestamp <= until]
-        
-        if severity:
-            entries = [e for e in entries if e.severity == severity]
-        
-        if workflow_name:
-            entries = [e for e in entries if e.workflow_name == workflow_name]
-        
-        if correlation_id:
-            entries = [e for e in entries if e.correlation_id == correlation_id]
+        """Query audit entries (indexed query plus entries not yet written)"""
+        filters = {
+            "action": action, "since": since, "until": until, "severity": severity,
+            "workflow_name": workflow_name, "correlation_id": correlation_id,
+        }
+        if self._sink is None:
+            entries = self._matching(self._entries, **filters)
+        else:
+            entries = self._load_entries(limit=limit, **filters)
+            seen = {e.id for e in entries}
+            pending = self._sink.pending_entries(self.entity_id)
+            entries += [e for e in self._matching(pending, **filters) if e.id not in seen]
         
         # Sort by timestamp descending
         entries.sort(key=lambda e: e.timestamp, reverse=True)
@@ -389,17 +597,69 @@ class AuditLog:
     
     def get_stats(self, since: Optional[datetime] = None) -> Dict[str, Any]:
         """Get audit statistics"""
-        entries = self._entries
-        if since:
-            entries = [e for e in entries if e.timestamp >= since]
+        if self._sink is None:
+            return self._summarize(self._matching(self._entries, since=since))
+        
+        import models
+        
+        table = models.AgentAuditEntry
+        db = self._sink.session_factory()
+        try:
+            query = db.query(table.action, table.severity, table.success,
+                             func.count(table.id), func.sum(table.token_count))
+            query = query.filter(table.entity_id == self.entity_id)
+            if since:
+                query = query.filter(table.timestamp >= since)
+            groups = query.group_by(table.action, table.severity, table.success).all()
+            
+            pending = self._matching(self._sink.pending_entries(self.entity_id), since=since)
+            if pending:
+                written = {
+                    row[0] for row in db.query(table.id).filter(table.id.in_([e.id for e in pending]))
+                }
+                pending = [e for e in pending if e.id not in written]
+        finally:
+            db.close()
         
+        stats = self._summarize(pending)
+        for action, severity, success, count, tokens in groups:
+            stats["total_entries"] += count
+            stats["by_action"][action] = stats["by_action"].get(action, 0) + count
+            stats["by_severity"][severity] = stats["by_severity"].get(severity, 0) + count
+            if not success:
+                stats["errors"] += count
+            if action == AuditAction.LLM_QUERY.value:
+                stats["total_llm_tokens"] += tokens or 0
+        return stats
+    
+    @staticmethod
+    def _matching(
+        entries: Iterable[AuditEntry],
+        action: Optional[AuditAction] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        severity: Optional[AuditSeverity] = None,
+        workflow_name: Optional[str] = None,
+        correlation_id: Optional[str] = None,
+    ) -> List[AuditEntry]:
+        return [
+            e for e in entries
+            if (not action or e.action == action)
+            and (not since or e.timestamp >= since)
+            and (not until or e.timestamp <= until)
+            and (not severity or e.severity == severity)
+            and (not workflow_name or e.workflow_name == workflow_name)
+            and (not correlation_id or e.correlation_id == correlation_id)
+        ]
+    
+    @staticmethod
+    def _summarize(entries: List[AuditEntry]) -> Dict[str, Any]:
+        by_action: Dict[str, int] = {}
+        for e in entries:
+            by_action[e.action.value] = by_action.get(e.action.value, 0) + 1
         return {
             "total_entries": len(entries),
-            "by_action": {
-                action.value: len([e for e in entries if e.action == action])
-                for action in AuditAction
-                if any(e.action == action for e in entries)
-            },
+            "by_action": by_action,
             "by_severity": {
                 sev.value: len([e for e in entries if e.severity == sev])
                 for sev in AuditSeverity
@@ -413,11 +673,40 @@ class AuditLog:
         }
     
     def _persist_entry(self, entry: AuditEntry):
-        """Persist entry to database (placeholder)"""
-        # TODO: Implement actual database persistence
-        pass
-    
-    def _load_entries(self, limit: int = 1000):
-        """Load entries from database (placeholder)"""
-        # TODO: Implement actual database loading
-        pass
+        """Hand the entry to the write-behind sink (never blocks on the database)"""
+        if self._sink is not None:
+            self._sink.enqueue(entry)
+    
+    def _load_entries(
+        self,
+        limit: int = 1000,
+        action: Optional[AuditAction] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        severity: Optional[AuditSeverity] = None,
+        workflow_name: Optional[str] = None,
+        correlation_id: Optional[str] = None,
+    ) -> List[AuditEntry]:
+        """Load written entries, newest first, using the entity indexes"""
+        import models
+        
+        table = models.AgentAuditEntry
+        db = self._sink.session_factory()
+        try:
+            query = db.query(table).filter(table.entity_id == self.entity_id)
+            if correlation_id:
+                query = query.filter(table.correlation_id == correlation_id)
+            if action:
+                query = query.filter(table.action == action.value)
+            if since:
+                query = query.filter(table.timestamp >= since)
+            if until:
+                query = query.filter(table.timestamp <= until)
+            if severity:
+                query = query.filter(table.severity == severity.value)
+            if workflow_name:
+                query = query.filter(table.workflow_name == workflow_name)
+            rows = query.order_by(table.timestamp.desc()).limit(limit).all()
+            return [_entry_from_row(row) for row in rows]
+        finally:
+            db.close()
@@ -0,0 +1,313 @@
+"""
+Conversation Context Cache
+
+Follow-up questions about one snapshot keep asking for the same retrievals:
+the cash position, the forecast, the variance narrative, dispute risk, FX
+exposure. This cache keeps those results between questions so only the
+first question of a conversation pays for them.
+
+- Entries are keyed by (entity, snapshot, context type[, params]) and live
+  for a TTL with LRU eviction once full. Loads of the same key that are
+  already running (another question, or a prefetch) are joined, not repeated.
+- Entries are dropped when the entity's latest snapshot changes and on every
+  write event passed to publish_event(); a load that was running when its
+  entity was invalidated is returned to its caller but not stored.
+- prefetch() loads likely follow-up contexts on a small background pool.
+- ContextLookup records which contexts of one question were served from
+  cache, so answers can report it in their metadata.
+
+The cache is process-wide and shared by QuestionAnsweringWorkflow and the
+/ask-insights endpoint; conversations only add per-conversation counters.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MAX_ENTRIES = 500
+DEFAULT_TTL_SECONDS = 600
+DEFAULT_PREFETCH_WORKERS = 2
+MAX_CONVERSATIONS = 1000
+
+ContextKey = Tuple[Any, ...]  # (entity_id, snapshot_id, context_type, *params)
+
+
+class ContextCache:
+    """
+    TTL + LRU cache of retrieved contexts with joinable in-flight loads.
+
+    get_or_load() returns (value, source) where source is "cache",
+    "prefetched" (first use of a prefetched entry), "joined" (waited for a
+    load already running) or "loaded". Failures are never cached.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        prefetch_workers: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries or int(os.getenv("FPA_CONTEXT_CACHE_ENTRIES", str(DEFAULT_MAX_ENTRIES)))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(
+            os.getenv("FPA_CONTEXT_CACHE_TTL_SECONDS", str(DEFAULT_TTL_SECONDS))
+        )
+        self.prefetch_workers = prefetch_workers or int(
+            os.getenv("FPA_CONTEXT_PREFETCH_WORKERS", str(DEFAULT_PREFETCH_WORKERS))
+        )
+        self.clock = clock
+        # key -> [expires_at, value, prefetched_and_unused]
+        self._entries: "OrderedDict[ContextKey, List[Any]]" = OrderedDict()
+        self._inflight: Dict[ContextKey, Future] = {}
+        self._generations: Dict[int, int] = {}  # entity_id -> bumped on every invalidation
+        self._latest_snapshot: Dict[int, Optional[int]] = {}
+        self._conversations: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0, "misses": 0, "joined": 0, "prefetched": 0, "prefetch_hits": 0,
+            "invalidations": 0, "evictions": 0, "expirations": 0,
+        }
+
+    @staticmethod
+    def make_key(entity_id: int, snapshot_id: Optional[int], context_type: str, *params: Any) -> ContextKey:
+        return (entity_id, snapshot_id, context_type, *params)
+
+    # -------------------------------------------------------------------------
+    # Lookups
+    # -------------------------------------------------------------------------
+
+    def _fresh(self, key: ContextKey) -> Optional[List[Any]]:
+        """The live entry for key, dropping it if expired (lock held)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= self.clock():
+            del self._entries[key]
+            self._stats["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key: ContextKey) -> Optional[Any]:
+        with self._lock:
+            entry = self._fresh(key)
+            return entry[1] if entry is not None else None
+
+    def contains(self, key: ContextKey) -> bool:
+        """True if key is cached or being loaded"""
+        with self._lock:
+            return self._fresh(key) is not None or key in self._inflight
+
+    def get_or_load(self, key: ContextKey, loader: Callable[[], Any], prefetch: bool = False) -> Tuple[Any, str]:
+        """Serve from cache, wait for a running load of the same key, or call loader()"""
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is not None:
+                source = "prefetched" if entry[2] and not prefetch else "cache"
+                if not prefetch:
+                    entry[2] = False
+                    self._stats["prefetch_hits" if source == "prefetched" else "hits"] += 1
+                return entry[1], source
+            pending = self._inflight.get(key)
+            if pending is None:
+                future: Future = Future()
+                self._inflight[key] = future
+                generation = self._generations.get(key[0], 0)
+            elif not prefetch:
+                self._stats["joined"] += 1
+
+        if pending is not None:
+            return pending.result(), "joined"
+
+        if not prefetch:
+            self._count("misses")
+        try:
+            value = loader()
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved; joiners re-raise it from result()
+            raise
+        else:
+            self._store(key, value, generation, prefetch)
+            future.set_result(value)
+            return value, "loaded"
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def _store(self, key: ContextKey, value: Any, generation: int, prefetched: bool):
+        with self._lock:
+            if self._generations.get(key[0], 0) != generation:
+                return  # Invalidated while loading
+            self._entries[key] = [self.clock() + self.ttl_seconds, value, prefetched]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    # -------------------------------------------------------------------------
+    # Prefetch
+    # -------------------------------------------------------------------------
+
+    def prefetch(
+        self,
+        key: ContextKey,
+        load: Callable[[Session], Any],
+        session_factory: Callable[[], Session],
+    ) -> bool:
+        """Load key in the background on its own session; False if already cached or loading"""
+        if self.contains(key):
+            return False
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.prefetch_workers, thread_name_prefix="fpa-context-prefetch"
+                )
+            self._stats["prefetched"] += 1
+            pool = self._pool
+
+        def run():
+            session = session_factory()
+            try:
+                self.get_or_load(key, lambda: load(session), prefetch=True)
+            except Exception as e:
+                logger.warning(f"Context prefetch {key[2]} failed: {e}")
+            finally:
+                session.close()
+
+        pool.submit(run)
+        return True
+
+    # -------------------------------------------------------------------------
+    # Invalidation
+    # -------------------------------------------------------------------------
+
+    def invalidate(self, entity_id: int, snapshot_id: Optional[int] = None) -> int:
+        """Drop an entity's entries (only one snapshot's if snapshot_id is given); returns the count"""
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if key[0] == entity_id and (snapshot_id is None or key[1] == snapshot_id)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self._generations[entity_id] = self._generations.get(entity_id, 0) + 1
+            self._stats["invalidations"] += 1
+        if stale:
+            logger.debug(f"Invalidated {len(stale)} cached contexts for entity {entity_id}")
+        return len(stale)
+
+    def observe_snapshot(self, entity_id: int, snapshot_id: Optional[int]) -> bool:
+        """Record the entity's latest snapshot; when it changed, drop the entity's older entries"""
+        with self._lock:
+            previous = self._latest_snapshot.get(entity_id, snapshot_id)
+            self._latest_snapshot[entity_id] = snapshot_id
+        if previous == snapshot_id:
+            return False
+        self.invalidate(entity_id)
+        return True
+
+    # -------------------------------------------------------------------------
+    # Conversations and stats
+    # -------------------------------------------------------------------------
+
+    def lookup(self, conversation_id: Optional[str] = None) -> "ContextLookup":
+        """A recorder for the context lookups of one question"""
+        return ContextLookup(self, conversation_id)
+
+    def _record_conversation(self, conversation_id: str, hits: int, misses: int) -> Dict[str, int]:
+        with self._lock:
+            totals = self._conversations.pop(conversation_id, None) or {"questions": 0, "hits": 0, "misses": 0}
+            totals["questions"] += 1
+            totals["hits"] += hits
+            totals["misses"] += misses
+            self._conversations[conversation_id] = totals
+            while len(self._conversations) > MAX_CONVERSATIONS:
+                self._conversations.popitem(last=False)
+            return dict(totals)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._latest_snapshot.clear()
+            for entity_id in self._generations:
+                self._generations[entity_id] += 1
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            served = self._stats["hits"] + self._stats["prefetch_hits"] + self._stats["joined"]
+            lookups = served + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "in_flight": len(self._inflight),
+                "conversations": len(self._conversations),
+                "hit_rate": round(served / lookups, 3) if lookups else 0.0,
+            }
+
+
+class ContextLookup:
+    """Context lookups made while answering one question, for the answer's metadata"""
+
+    def __init__(self, cache: ContextCache, conversation_id: Optional[str] = None):
+        self.cache = cache
+        self.conversation_id = conversation_id
+        self.sources: Dict[str, str] = {}
+        self.prefetching: List[str] = []
+
+    def get_or_load(self, key: ContextKey, loader: Callable[[], Any]) -> Any:
+        value, source = self.cache.get_or_load(key, loader)
+        self.sources[key[2]] = source
+        return value
+
+    def prefetch(self, key: ContextKey, load: Callable[[Session], Any], session_factory: Optional[Callable[[], Session]]):
+        """Prefetch key unless there is no session factory to load it on"""
+        if session_factory is not None and self.cache.prefetch(key, load, session_factory):
+            self.prefetching.append(key[2])
+
+    def metadata(self) -> Dict[str, Any]:
+        hits = sorted(name for name, source in self.sources.items() if source != "loaded")
+        misses = sorted(name for name, source in self.sources.items() if source == "loaded")
+        result = {
+            "hits": hits,
+            "misses": misses,
+            "sources": dict(self.sources),
+            "prefetching": list(self.prefetching),
+        }
+        if self.conversation_id:
+            result["conversation_id"] = self.conversation_id
+            result["conversation"] = self.cache._record_conversation(self.conversation_id, len(hits), len(misses))
+        return result
+
+
+# =============================================================================
+# SHARED INSTANCE
+# =============================================================================
+
+_context_cache: Optional[ContextCache] = None
+_context_cache_lock = threading.Lock()
+
+
+def get_context_cache() -> ContextCache:
+    """The process-wide context cache"""
+    global _context_cache
+    if _context_cache is None:
+        with _context_cache_lock:
+            if _context_cache is None:
+                _context_cache = ContextCache()
+    return _context_cache
@@ -4,14 +4,29 @@ Decision Queue
 Human-in-the-loop system for FP&A decisions. The AI identifies decisions,
 presents options with pros/cons, makes recommendations, and waits for
 human approval on high-stakes items.
+
+Decisions are persisted in agent_decisions, which every orchestrator
+instance and worker process reads from. Each process keeps one
+DecisionIndex per (engine, entity): min-heaps on expiry and creation time,
+rebuilt from the pending rows on first use and topped up with rows inserted
+since, by any process. Expiry and escalation pop those heaps instead of
+scanning every decision.
+
+When the fpa_decisions table exists, agent decisions are mirrored there and
+resolutions flow both ways (see sync_fpa_decision), so FPADecisionQueue and
+this queue never disagree about what is pending.
 """
 
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Tuple
+import heapq
 import json
 import logging
+import threading
+import uuid
 
+from sqlalchemy import func, inspect
 from sqlalchemy.orm import Session
 
 from .models.decisions import (
@@ -22,6 +37,288 @@ from .models.decisions import (
 logger = logging.getLogger(__name__)
 
 
+PRIORITY_RANK = {
+    DecisionPriority.CRITICAL: 0,
+    DecisionPriority.HIGH: 1,
+    DecisionPriority.MEDIUM: 2,
+    DecisionPriority.LOW: 3,
+}
+
+# Agent status -> fpa_decisions.status
+FPA_STATUS = {
+    DecisionStatus.PENDING: "pending",
+    DecisionStatus.APPROVED: "approved",
+    DecisionStatus.DISMISSED: "dismissed",
+    DecisionStatus.AUTO_APPROVED: "auto_approved",
+    DecisionStatus.EXPIRED: "expired",
+    DecisionStatus.EXECUTING: "approved",
+    DecisionStatus.COMPLETED: "approved",
+    DecisionStatus.FAILED: "approved",
+}
+
+# fpa_decisions.status -> agent status
+AGENT_STATUS = {
+    "pending": DecisionStatus.PENDING,
+    "approved": DecisionStatus.APPROVED,
+    "rejected": DecisionStatus.DISMISSED,
+    "dismissed": DecisionStatus.DISMISSED,
+    "auto_approved": DecisionStatus.AUTO_APPROVED,
+    "expired": DecisionStatus.EXPIRED,
+}
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+class DecisionIndex:
+    """
+    Pending-decision heaps for one entity, shared by every DecisionQueue on
+    the same engine in this process.
+    
+    Resolving a decision does not touch the heaps; popped ids are checked
+    against the database, so a stale entry costs one pop.
+    """
+    
+    def __init__(self, entity_id: int):
+        self.entity_id = entity_id
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.watermark = 0  # Highest agent_decisions.id indexed so far
+        self.expiry: List[Tuple[datetime, str]] = []
+        self.escalation: List[Tuple[datetime, str]] = []
+        self.overdue: Set[str] = set()  # Popped from escalation, pending at last check
+    
+    def refresh(self, db: Session):
+        """Index rows inserted since the last refresh (every pending row on first use)"""
+        import models
+        
+        Row = models.AgentDecision
+        query = db.query(
+            Row.id, Row.decision_id, Row.status, Row.created_at, Row.expires_at
+        ).filter(Row.entity_id == self.entity_id)
+        
+        if self.loaded:
+            rows = query.filter(Row.id > self.watermark).all()
+        else:
+            # Rows inserted between these two queries are indexed twice; pops dedupe
+            self.watermark = db.query(func.max(Row.id)).scalar() or 0
+            rows = query.filter(Row.status == DecisionStatus.PENDING.value).all()
+            self.loaded = True
+        
+        for row in rows:
+            self.watermark = max(self.watermark, row.id)
+            if row.status != DecisionStatus.PENDING.value:
+                continue
+            if row.expires_at is not None:
+                heapq.heappush(self.expiry, (row.expires_at, row.decision_id))
+            heapq.heappush(self.escalation, (row.created_at, row.decision_id))
+    
+    @staticmethod
+    def pop_due(heap: List[Tuple[datetime, str]], cutoff: datetime) -> List[str]:
+        """Pop every entry strictly before cutoff"""
+        due = []
+        while heap and heap[0][0] < cutoff:
+            due.append(heapq.heappop(heap)[1])
+        return list(dict.fromkeys(due))
+    
+    def size(self) -> Dict[str, int]:
+        return {"expiry": len(self.expiry), "escalation": len(self.escalation), "overdue": len(self.overdue)}
+
+
+_indexes: Dict[Tuple[Any, int], DecisionIndex] = {}
+_indexes_lock = threading.Lock()
+_fpa_tables: Dict[Any, bool] = {}
+
+
+def get_decision_index(db: Session, entity_id: int) -> DecisionIndex:
+    """The process-wide index for a session's engine and entity"""
+    key = (db.get_bind(), entity_id)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = DecisionIndex(entity_id)
+        return _indexes[key]
+
+
+def _has_fpa_tables(db: Session) -> bool:
+    bind = db.get_bind()
+    if bind not in _fpa_tables:
+        _fpa_tables[bind] = inspect(bind).has_table("fpa_decisions")
+    return _fpa_tables[bind]
+
+
+# ============================================================================
+# ROW MAPPING
+# ============================================================================
+
+def _row_values(decision: Decision) -> Dict[str, Any]:
+    """agent_decisions column values for a decision"""
+    resolved_at = None
+    if decision.status != DecisionStatus.PENDING:
+        resolved_at = decision.approval.approved_at if decision.approval else datetime.utcnow()
+    return {
+        "entity_id": decision.entity_id,
+        "category": decision.category.value,
+        "priority": decision.priority.value,
+        "priority_rank": PRIORITY_RANK[decision.priority],
+        "status": decision.status.value,
+        "title": decision.title[:200],
+        "amount_at_stake": str(decision.amount_at_stake),
+        "snapshot_id": decision.snapshot_id,
+        "source_workflow": decision.source_workflow,
+        "created_at": decision.created_at,
+        "expires_at": decision.expires_at,
+        "resolved_at": resolved_at,
+        "payload_json": decision.to_dict(),
+    }
+
+
+def _mirror_to_fpa(db: Session, row, decision: Decision):
+    """Create or update the fpa_decisions row for an agent decision (no commit)"""
+    if not _has_fpa_tables(db):
+        return
+    from fpa_models import FPADecision, FPAApproval
+    
+    status = FPA_STATUS[decision.status]
+    if row.fpa_decision_id is None:
+        fpa = FPADecision(
+            entity_id=decision.entity_id,
+            severity=decision.priority.value,
+            decision_type=decision.category.value,
+            title=decision.title[:200],
+            description=decision.description,
+            options_json=[
+                {
+                    "key": o.id,
+                    "label": o.label,
+                    "description": o.description,
+                    "is_recommended": o.recommended,
+                    "impact_summary": o.impact_description,
+                }
+                for o in decision.options
+            ],
+            recommended_option=decision.recommended_option_ids[0] if decision.recommended_option_ids else None,
+            recommendation_reasoning=decision.recommendation_reasoning,
+            requires_approval=decision.status == DecisionStatus.PENDING,
+            evidence_refs_json=decision.evidence_refs,
+            status=status,
+            expires_at=decision.expires_at,
+            created_at=decision.created_at,
+            resolved_at=row.resolved_at,
+        )
+        db.add(fpa)
+        db.flush()
+        row.fpa_decision_id = fpa.id
+    else:
+        fpa = db.query(FPADecision).filter(FPADecision.id == row.fpa_decision_id).first()
+        if fpa is None or fpa.status == status:
+            return
+        fpa.status = status
+        fpa.resolved_at = row.resolved_at
+    
+    if decision.approval is not None:
+        db.add(FPAApproval(
+            decision_id=fpa.id,
+            user_id=decision.approval.approved_by,
+            option_selected=(decision.approval.selected_options or ["dismiss"])[0],
+            note=decision.approval.notes,
+            timestamp=decision.approval.approved_at,
+        ))
+
+
+def _approval_from_fpa(fpa_decision, decision_id: str, status: DecisionStatus) -> Optional[DecisionApproval]:
+    if status == DecisionStatus.PENDING or not fpa_decision.approvals:
+        return None
+    last = max(fpa_decision.approvals, key=lambda a: (a.timestamp, a.id))
+    selected = [] if last.option_selected in ("dismiss", "reject") else [last.option_selected]
+    return DecisionApproval(
+        decision_id=decision_id,
+        approved_by=last.user_id,
+        approved_at=fpa_decision.resolved_at or last.timestamp,
+        selected_options=selected,
+        notes=last.note,
+        auto_approved=status == DecisionStatus.AUTO_APPROVED,
+    )
+
+
+def _decision_from_fpa(fpa_decision, status: DecisionStatus) -> Decision:
+    categories = {c.value for c in DecisionCategory}
+    priorities = {p.value for p in DecisionPriority}
+    decision = Decision(
+        id=str(uuid.uuid4()),
+        title=fpa_decision.title,
+        description=fpa_decision.description,
+        category=(
+            DecisionCategory(fpa_decision.decision_type)
+            if fpa_decision.decision_type in categories else DecisionCategory.OTHER
+        ),
+        priority=(
+            DecisionPriority(fpa_decision.severity)
+            if fpa_decision.severity in priorities else DecisionPriority.MEDIUM
+        ),
+        status=status,
+        entity_id=fpa_decision.entity_id,
+        snapshot_id=None,
+        amount_at_stake=Decimal("0"),
+        options=[
+            DecisionOption(
+                id=o["key"],
+                label=o["label"],
+                description=o.get("description", ""),
+                risk_level="medium",
+                risk_explanation="",
+                impact_amount=Decimal("0"),
+                impact_description=o.get("impact_summary") or "",
+                recommended=o.get("is_recommended", False),
+            )
+            for o in fpa_decision.options_json or []
+        ],
+        recommended_option_ids=[fpa_decision.recommended_option] if fpa_decision.recommended_option else [],
+        recommendation_reasoning=fpa_decision.recommendation_reasoning or "",
+        created_at=fpa_decision.created_at or datetime.utcnow(),
+        expires_at=fpa_decision.expires_at,
+        source_workflow="fpa_decision_queue",
+        evidence_refs=fpa_decision.evidence_refs_json or [],
+        metadata={"fpa_decision_type": fpa_decision.decision_type},
+    )
+    decision.approval = _approval_from_fpa(fpa_decision, decision.id, status)
+    return decision
+
+
+def sync_fpa_decision(db: Session, fpa_decision) -> Optional[Decision]:
+    """
+    Bring agent_decisions in line with an fpa_decisions row after
+    FPADecisionQueue creates or resolves it.
+    
+    Decisions created there get an agent row; resolutions made there are
+    applied to the linked row. Returns the agent decision.
+    """
+    import models
+    
+    Row = models.AgentDecision
+    status = AGENT_STATUS.get(fpa_decision.status, DecisionStatus.PENDING)
+    row = db.query(Row).filter(Row.fpa_decision_id == fpa_decision.id).first()
+    
+    if row is None:
+        decision = _decision_from_fpa(fpa_decision, status)
+        db.add(Row(decision_id=decision.id, fpa_decision_id=fpa_decision.id, **_row_values(decision)))
+    else:
+        decision = Decision.from_dict(row.payload_json)
+        if decision.status == status:
+            return decision
+        decision.status = status
+        decision.approval = _approval_from_fpa(fpa_decision, decision.id, status)
+        for key, value in _row_values(decision).items():
+            setattr(row, key, value)
+    
+    db.commit()
+    return decision
+
+
+# ============================================================================
+# QUEUE
+# ============================================================================
+
 class DecisionQueue:
     """
     Manages the queue of decisions awaiting human input.
@@ -37,7 +334,7 @@ class DecisionQueue:
         self.db = db
         self.entity_id = entity_id
         self.policy = DecisionPolicy()  # Can be loaded from DB per entity
-        self._decisions: Dict[str, Decision] = {}  # In-memory cache
+        self._index = get_decision_index(db, entity_id)
     
     def add_decision(self, decision: Decision) -> Decision:
         """
@@ -65,7 +362,6 @@ class DecisionQueue:
         
         # Store in database
         self._save_decision(decision)
-        self._decisions[decision.id] = decision
         
         logger.info(f"Decision added: {decision.id} - {decision.title}")
         return decision
@@ -77,31 +373,30 @@ class DecisionQueue:
         limit: int = 50,
     ) -> List[Decision]:
         """Get all pending decisions, optionally filtered"""
-        decisions = [
-            d for d in self._decisions.values()
-            if d.status == DecisionStatus.PENDING
-        ]
+        Row = self._model()
+        query = self.db.query(Row.payload_json).filter(
+            Row.entity_id == self.entity_id,
+            Row.status == DecisionStatus.PENDING.value,
+        )
         
         if priority:
-            decisions = [d for d in decisions if d.priority == priority]
+            query = query.filter(Row.priority == priority.value)
         
         if category:
-            decisions = [d for d in decisions if d.category == category]
+            query = query.filter(Row.category == category.value)
         
-        # Sort by priority (critical first) then by created_at
-        priority_order = {
-            DecisionPriority.CRITICAL: 0,
-            DecisionPriority.HIGH: 1,
-            DecisionPriority.MEDIUM: 2,
-            DecisionPriority.LOW: 3,
-        }
-        decisions.sort(key=lambda d: (priority_order[d.priority], d.created_at))
-        
-        return decisions[:limit]
+        # Critical first, then oldest first (served by ix_agent_decisions_queue)
+        rows = query.order_by(Row.priority_rank, Row.created_at).limit(limit).all()
+        return [Decision.from_dict(r.payload_json) for r in rows]
     
     def get_decision(self, decision_id: str) -> Optional[Decision]:
         """Get a specific decision by ID"""
-        return self._decisions.get(decision_id)
+        Row = self._model()
+        row = self.db.query(Row.payload_json).filter(
+            Row.decision_id == decision_id,
+            Row.entity_id == self.entity_id,
+        ).first()
+        return Decision.from_dict(row.payload_json) if row else None
     
     def approve_decision(
         self,
@@ -113,7 +408,7 @@ class DecisionQueue:
         """
         Approve a decision with selected options.
         """
-        decision = self._decisions.get(decision_id)
+        decision = self.get_decision(decision_id)
         if not decision:
             raise ValueError(f"Decision {decision_id} not found")
         
@@ -137,7 +432,7 @@ class DecisionQueue:
         )
         decision.status = DecisionStatus.APPROVED
         
-        self._save_decision(decision)
+        self._save_decision(decision, expected_status=DecisionStatus.PENDING)
         logger.info(f"Decision {decision_id} approved by {approved_by} with options {selected_option_ids}")
         
         return decision
@@ -149,7 +444,7 @@ class DecisionQueue:
         reason: Optional[str] = None,
     ) -> Decision:
         """Dismiss a decision without taking action"""
-        decision = self._decisions.get(decision_id)
+        decision = self.get_decision(decision_id)
         if not decision:
             raise ValueError(f"Decision {decision_id} not found")
         
@@ -166,7 +461,7 @@ class DecisionQueue:
             auto_approved=False,
         )
         
-        self._save_decision(decision)
+        self._save_decision(decision, expected_status=DecisionStatus.PENDING)
         logger.info(f"Decision {decision_id} dismissed by {dismissed_by}")
         
         return decision
@@ -174,67 +469,134 @@ class DecisionQueue:
     def expire_old_decisions(self) -> List[Decision]:
         """Mark expired decisions"""
         now = datetime.utcnow()
-        expired = []
+        with self._index.lock:
+            self._load_decisions()
+            due = self._index.pop_due(self._index.expiry, now)
+        if not due:
+            return []
         
-        for decision in self._decisions.values():
-            if (
-                decision.status == DecisionStatus.PENDING and
-                decision.expires_at and
-                decision.expires_at < now
-            ):
-                decision.status = DecisionStatus.EXPIRED
-                self._save_decision(decision)
-                expired.append(decision)
-                logger.info(f"Decision {decision.id} expired")
+        Row = self._model()
+        rows = self.db.query(Row).filter(
+            Row.decision_id.in_(due),
+            Row.status == DecisionStatus.PENDING.value,
+        ).all()
         
+        expired = []
+        for row in rows:
+            decision = Decision.from_dict(row.payload_json)
+            decision.status = DecisionStatus.EXPIRED
+            for key, value in _row_values(decision).items():
+                setattr(row, key, value)
+            _mirror_to_fpa(self.db, row, decision)
+            expired.append(decision)
+            logger.info(f"Decision {decision.id} expired")
+        
+        self.db.commit()
         return expired
     
     def get_decisions_needing_escalation(self) -> List[Decision]:
         """Get decisions that have been pending too long"""
         threshold = datetime.utcnow() - timedelta(hours=self.policy.escalate_unresolved_after_hours)
         
-        return [
-            d for d in self._decisions.values()
-            if d.status == DecisionStatus.PENDING and d.created_at < threshold
-        ]
+        with self._index.lock:
+            self._load_decisions()
+            self._index.overdue.update(self._index.pop_due(self._index.escalation, threshold))
+            candidates = list(self._index.overdue)
+        if not candidates:
+            return []
+        
+        Row = self._model()
+        rows = self.db.query(Row.decision_id, Row.created_at, Row.payload_json).filter(
+            Row.decision_id.in_(candidates),
+            Row.status == DecisionStatus.PENDING.value,
+        ).order_by(Row.priority_rank, Row.created_at).all()
+        
+        # Resolved since they were popped: forget them
+        with self._index.lock:
+            self._index.overdue.difference_update(set(candidates) - {r.decision_id for r in rows})
+        
+        # Another queue on this index may escalate sooner than this policy
+        return [Decision.from_dict(r.payload_json) for r in rows if r.created_at < threshold]
     
     def get_stats(self) -> Dict[str, Any]:
         """Get queue statistics"""
-        all_decisions = list(self._decisions.values())
-        pending = [d for d in all_decisions if d.status == DecisionStatus.PENDING]
+        Row = self._model()
+        for_entity = Row.entity_id == self.entity_id
+        pending = Row.status == DecisionStatus.PENDING.value
+        today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+        
+        total = self.db.query(func.count(Row.id)).filter(for_entity).scalar()
+        by_priority = dict(
+            self.db.query(Row.priority, func.count(Row.id))
+            .filter(for_entity, pending)
+            .group_by(Row.priority)
+            .all()
+        )
+        resolved_today = dict(
+            self.db.query(Row.status, func.count(Row.id))
+            .filter(
+                for_entity,
+                Row.status.in_([DecisionStatus.APPROVED.value, DecisionStatus.AUTO_APPROVED.value]),
+                Row.resolved_at >= today,
+            )
+            .group_by(Row.status)
+            .all()
+        )
+        amounts = self.db.query(Row.amount_at_stake).filter(for_entity, pending).all()
         
         return {
-            "total_decisions": len(all_decisions),
-            "pending": len(pending),
+            "total_decisions": total,
+            "pending": sum(by_priority.values()),
             "pending_by_priority": {
-                "critical": len([d for d in pending if d.priority == DecisionPriority.CRITICAL]),
-                "high": len([d for d in pending if d.priority == DecisionPriority.HIGH]),
-                "medium": len([d for d in pending if d.priority == DecisionPriority.MEDIUM]),
-                "low": len([d for d in pending if d.priority == DecisionPriority.LOW]),
+                p.value: by_priority.get(p.value, 0)
+                for p in (DecisionPriority.CRITICAL, DecisionPriority.HIGH, DecisionPriority.MEDIUM, DecisionPriority.LOW)
             },
-            "approved_today": len([
-                d for d in all_decisions
-                if d.status == DecisionStatus.APPROVED and
-                d.approval and d.approval.approved_at.date() == datetime.utcnow().date()
-            ]),
-            "auto_approved_today": len([
-                d for d in all_decisions
-                if d.status == DecisionStatus.AUTO_APPROVED and
-                d.approval and d.approval.approved_at.date() == datetime.utcnow().date()
-            ]),
-            "total_amount_pending": str(sum(d.amount_at_stake for d in pending)),
+            "approved_today": resolved_today.get(DecisionStatus.APPROVED.value, 0),
+            "auto_approved_today": resolved_today.get(DecisionStatus.AUTO_APPROVED.value, 0),
+            "total_amount_pending": str(sum((Decimal(a) for (a,) in amounts if a), Decimal("0"))),
         }
     
-    def _save_decision(self, decision: Decision):
-        """Save decision to database (placeholder - implement with actual DB model)"""
-        # TODO: Implement actual database persistence
-        # For now, just update in-memory cache
-        self._decisions[decision.id] = decision
+    @staticmethod
+    def _model():
+        import models
+        return models.AgentDecision
+    
+    def _save_decision(self, decision: Decision, expected_status: Optional[DecisionStatus] = None):
+        """
+        Upsert the decision (and its fpa_decisions mirror) and commit.
+        
+        With expected_status the update only applies if the stored status
+        still matches, so two queues cannot both resolve the same decision.
+        """
+        Row = self._model()
+        values = _row_values(decision)
+        try:
+            row = self.db.query(Row).filter(Row.decision_id == decision.id).first()
+            if row is None:
+                row = Row(decision_id=decision.id, **values)
+                self.db.add(row)
+            elif expected_status is not None:
+                updated = self.db.query(Row).filter(
+                    Row.id == row.id,
+                    Row.status == expected_status.value,
+                ).update(values, synchronize_session=False)
+                if not updated:
+                    raise ValueError(f"Decision {decision.id} is not {expected_status.value}")
+                self.db.refresh(row)
+            else:
+                for key, value in values.items():
+                    setattr(row, key, value)
+            
+            self.db.flush()
+            _mirror_to_fpa(self.db, row, decision)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
     
     def _load_decisions(self):
-        """Load decisions from database (placeholder)"""
-        # TODO: Implement actual database loading
-        pass
+        """Bring the shared index up to date with the database (caller holds the index lock)"""
+        self._index.refresh(self.db)
     
     def _execute_decision(self, decision: Decision):
         """Execute an approved decision (placeholder)"""
@@ -0,0 +1,116 @@
+"""
+Worker Executor
+
+Runs the synchronous SQLAlchemy worker calls made by workflows on a bounded
+thread pool, so a long briefing or weekly pack never blocks the event loop.
+
+Each step gets its own session from the session factory and closes it when
+done. Independent steps are fanned out with gather() and joined; the wall
+time of every step is recorded on the WorkflowRun being executed.
+
+SQLite engines that share one connection (StaticPool or in-memory) cannot
+hand out concurrent sessions; there the executor runs steps one at a time
+on the orchestrator's own session, still off the event loop.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TYPE_CHECKING
+
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+if TYPE_CHECKING:
+    from .orchestrator import WorkflowRun
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MAX_WORKERS = 4
+
+# The WorkflowRun whose steps are being executed (set by FPAOrchestrator.run_workflow)
+current_run: contextvars.ContextVar[Optional["WorkflowRun"]] = contextvars.ContextVar(
+    "fpa_current_run", default=None
+)
+
+Step = Callable[[Session], Any]
+
+
+def supports_concurrent_sessions(bind) -> bool:
+    """False for SQLite engines where every session shares a single connection"""
+    if bind.dialect.name != "sqlite":
+        return True
+    database = bind.url.database
+    return not (isinstance(bind.pool, StaticPool) or database in (None, "", ":memory:"))
+
+
+class WorkerExecutor:
+    """
+    Bounded thread pool for worker calls, one session per step.
+
+    Usage from a workflow:
+        results = await orchestrator.executor.gather({
+            "cash_position": lambda db: DataWorker(db, entity_id).get_cash_position(),
+            "runway": lambda db: ForecastWorker(db, entity_id).get_runway(snapshot_id),
+        })
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        session_factory: Optional[Callable[[], Session]] = None,
+        max_workers: Optional[int] = None,
+    ):
+        self.db = db
+        bind = db.get_bind()
+
+        # Share the caller's session when the engine cannot run sessions side by side
+        self._shared = session_factory is None and not supports_concurrent_sessions(bind)
+        self.session_factory = session_factory or sessionmaker(autocommit=False, autoflush=False, bind=bind)
+
+        if self._shared:
+            max_workers = 1
+        elif max_workers is None:
+            max_workers = int(os.getenv("FPA_EXECUTOR_WORKERS", str(DEFAULT_MAX_WORKERS)))
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fpa-worker")
+
+    @property
+    def concurrent_sessions(self) -> bool:
+        """False when every step runs on the orchestrator's own session"""
+        return not self._shared
+
+    def _call(self, fn: Step) -> Any:
+        if self._shared:
+            return fn(self.db)
+        session = self.session_factory()
+        try:
+            return fn(session)
+        finally:
+            session.close()
+
+    async def run(self, step: str, fn: Step) -> Any:
+        """Run one worker call in the pool and record its duration"""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self._pool, self._call, fn)
+        finally:
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            run = current_run.get()
+            if run is not None:
+                run.step_timings[step] = elapsed_ms
+            logger.debug(f"Step {step} took {elapsed_ms}ms")
+
+    async def gather(self, steps: Dict[str, Step]) -> Dict[str, Any]:
+        """Run independent steps concurrently and return {step: result}"""
+        results = await asyncio.gather(*(self.run(name, fn) for name, fn in steps.items()))
+        return dict(zip(steps, results))
+
+    def shutdown(self, wait: bool = True):
+        """Release the worker threads"""
+        self._pool.shutdown(wait=wait)
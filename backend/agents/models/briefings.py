@@ -67,8 +67,9 @@ class CashPosition:
     inflows: List[CashMovement] = field(default_factory=list)
     outflows: List[CashMovement] = field(default_factory=list)
     
-    # By account
+    # By account (reporting currency) and by currency (native amounts)
     by_account: Dict[str, Decimal] = field(default_factory=dict)
+    by_currency: Dict[str, Decimal] = field(default_factory=dict)
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -83,6 +84,7 @@ class CashPosition:
             "inflows": [m.to_dict() for m in self.inflows],
             "outflows": [m.to_dict() for m in self.outflows],
             "by_account": {k: str(v) for k, v in self.by_account.items()},
+            "by_currency": {k: str(v) for k, v in self.by_currency.items()},
         }
 
 
@@ -289,10 +291,10 @@ class WeeklyPack:
     current_cash: Decimal
     min_cash_week: int  # Which week has minimum cash
     min_cash_amount: Decimal
-    runway_weeks: int
+    runway_weeks: Optional[int]  # None when no forecast could be generated
     
     # Accuracy
-    forecast_accuracy_pct: float  # e.g., 94.0
+    forecast_accuracy_pct: Optional[float]  # e.g., 94.0; None without comparable history
     accuracy_trend: str  # "improving", "stable", "declining"
     accuracy_vs_last_month: float  # e.g., +3.0 means 3% better
     
@@ -74,6 +74,21 @@ class DecisionOption:
             "auto_executable": self.auto_executable,
             "metadata": self.metadata,
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DecisionOption':
+        return cls(
+            id=data["id"],
+            label=data["label"],
+            description=data["description"],
+            risk_level=data["risk_level"],
+            risk_explanation=data["risk_explanation"],
+            impact_amount=Decimal(data["impact_amount"]),
+            impact_description=data["impact_description"],
+            recommended=data.get("recommended", False),
+            auto_executable=data.get("auto_executable", False),
+            metadata=data.get("metadata") or {},
+        )
 
 
 @dataclass
@@ -95,6 +110,17 @@ class DecisionApproval:
             "notes": self.notes,
             "auto_approved": self.auto_approved,
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DecisionApproval':
+        return cls(
+            decision_id=data["decision_id"],
+            approved_by=data["approved_by"],
+            approved_at=datetime.fromisoformat(data["approved_at"]),
+            selected_options=data["selected_options"],
+            notes=data.get("notes"),
+            auto_approved=data.get("auto_approved", False),
+        )
 
 
 @dataclass
@@ -194,6 +220,31 @@ class Decision:
             "evidence_refs": self.evidence_refs,
             "metadata": self.metadata,
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Decision':
+        """Inverse of to_dict (used when loading persisted decisions)"""
+        return cls(
+            id=data["id"],
+            title=data["title"],
+            description=data["description"],
+            category=DecisionCategory(data["category"]),
+            priority=DecisionPriority(data["priority"]),
+            status=DecisionStatus(data["status"]),
+            entity_id=data["entity_id"],
+            snapshot_id=data.get("snapshot_id"),
+            amount_at_stake=Decimal(data["amount_at_stake"]),
+            options=[DecisionOption.from_dict(o) for o in data.get("options", [])],
+            recommended_option_ids=data.get("recommended_option_ids", []),
+            recommendation_reasoning=data.get("recommendation_reasoning", ""),
+            created_at=datetime.fromisoformat(data["created_at"]),
+            expires_at=datetime.fromisoformat(data["expires_at"]) if data.get("expires_at") else None,
+            approval=DecisionApproval.from_dict(data["approval"]) if data.get("approval") else None,
+            execution_result=data.get("execution_result"),
+            source_workflow=data.get("source_workflow", ""),
+            evidence_refs=data.get("evidence_refs") or [],
+            metadata=data.get("metadata") or {},
+        )
 
 
 @dataclass
@@ -9,15 +9,19 @@ import asyncio
 import logging
 from datetime import datetime, date, timedelta
 from decimal import Decimal
-from typing import Optional, Dict, Any, List, Callable
-from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Callable, Set
+from dataclasses import dataclass, field
 from enum import Enum
 import os
 
 from sqlalchemy.orm import Session
 
+from evidence_index import invalidate_evidence_index
 from .decision_queue import DecisionQueue, Decision
 from .audit_log import AuditLog, AuditAction, AuditSeverity
+from .executor import WorkerExecutor, current_run
+from .context_cache import get_context_cache
+from .scheduler import get_scheduler
 from .models.briefings import MorningBriefing, WeeklyPack
 from .models.variance import VarianceReport
 
@@ -51,6 +55,7 @@ class WorkflowRun:
     correlation_id: str
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    step_timings: Dict[str, float] = field(default_factory=dict)  # step -> ms
 
 
 @dataclass
@@ -80,6 +85,8 @@ class FPAOrchestrator:
         db: Session,
         entity_id: int,
         autonomous_mode: bool = True,
+        session_factory: Optional[Callable[[], Session]] = None,
+        max_workers: Optional[int] = None,
     ):
         self.db = db
         self.entity_id = entity_id
@@ -88,6 +95,7 @@ class FPAOrchestrator:
         # Core components
         self.decision_queue = DecisionQueue(db, entity_id)
         self.audit_log = AuditLog(db, entity_id)
+        self.executor = WorkerExecutor(db, session_factory=session_factory, max_workers=max_workers)
         
         # State
         self.status = OrchestratorStatus.STOPPED
@@ -120,6 +128,10 @@ class FPAOrchestrator:
         
         # Event handlers
         self._event_handlers: Dict[str, List[Callable]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None  # Set by start(); target of publish_event()
+        
+        # Rolling state kept by continuous monitoring between events and ticks
+        self.monitoring_state = None
     
     def register_workflow(self, name: str, handler: Callable):
         """Register a workflow handler"""
@@ -140,6 +152,7 @@ class FPAOrchestrator:
             return
         
         self.status = OrchestratorStatus.RUNNING
+        self._loop = asyncio.get_running_loop()
         self.audit_log.log(
             action=AuditAction.WORKFLOW_STARTED,
             description="FP&A Orchestrator started",
@@ -149,13 +162,16 @@ class FPAOrchestrator:
         
         logger.info(f"FP&A Orchestrator started for entity {self.entity_id}")
         
-        # Start scheduler if autonomous mode
+        # Hand scheduled workflows to the process-wide scheduler if autonomous
         if self.autonomous_mode:
-            asyncio.create_task(self._scheduler_loop())
+            scheduler = get_scheduler()
+            scheduler.register(self)
+            scheduler.ensure_started()
     
     async def stop(self):
         """Stop the orchestrator"""
         self.status = OrchestratorStatus.STOPPED
+        get_scheduler().unregister(self.entity_id)
         self.audit_log.log(
             action=AuditAction.WORKFLOW_COMPLETED,
             description="FP&A Orchestrator stopped",
@@ -222,6 +238,7 @@ class FPAOrchestrator:
             triggered_by=triggered_by,
             correlation_id=correlation_id,
         )
+        run_token = current_run.set(run)
         
         try:
             # Execute workflow
@@ -242,7 +259,7 @@ class FPAOrchestrator:
             self.audit_log.log_workflow_complete(
                 workflow_name=workflow_name,
                 duration_ms=duration_ms,
-                details={"result_summary": str(result)[:500]},
+                details={"result_summary": str(result)[:500], "step_timings_ms": run.step_timings},
             )
             
             # Update scheduled task last run
@@ -269,6 +286,7 @@ class FPAOrchestrator:
             return {"error": str(e)}
         
         finally:
+            current_run.reset(run_token)
             self._workflow_runs.append(run)
             # Keep only last 100 runs
             if len(self._workflow_runs) > 100:
@@ -336,8 +354,9 @@ class FPAOrchestrator:
         question: str,
         user_id: str,
         context: Optional[Dict[str, Any]] = None,
+        conversation_id: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Ask the AI analyst a question"""
+        """Ask the AI analyst a question; follow-ups share conversation_id"""
         self.audit_log.log(
             action=AuditAction.QUESTION_ASKED,
             description=f"Question: {question[:100]}...",
@@ -351,6 +370,7 @@ class FPAOrchestrator:
             user_id=user_id,
             question=question,
             context=context,
+            conversation_id=conversation_id,
         )
         
         self.audit_log.log(
@@ -381,80 +401,6 @@ class FPAOrchestrator:
         """Emit an event for other components to handle"""
         await self.handle_event(event_type, event_data)
     
-    # =========================================================================
-    # SCHEDULER
-    # =========================================================================
-    
-    async def _scheduler_loop(self):
-        """Main scheduler loop"""
-        logger.info("Scheduler loop started")
-        
-        while self.status == OrchestratorStatus.RUNNING:
-            try:
-                await self._check_scheduled_tasks()
-            except Exception as e:
-                logger.exception("Scheduler error")
-            
-            # Sleep for 1 minute between checks
-            await asyncio.sleep(60)
-    
-    async def _check_scheduled_tasks(self):
-        """Check if any scheduled tasks should run"""
-        now = datetime.utcnow()
-        
-        for task_name, task in self._scheduled_tasks.items():
-            if not task.enabled:
-                continue
-            
-            if self._should_run_task(task, now):
-                logger.info(f"Running scheduled task: {task_name}")
-                await self.run_workflow(
-                    task.workflow_name,
-                    triggered_by="schedule",
-                )
-    
-    def _should_run_task(self, task: ScheduledTask, now: datetime) -> bool:
-        """Check if a task should run based on cron expression"""
-        # Simplified cron check - in production, use a proper cron library
-        # For now, just check basic patterns
-        
-        cron = task.cron_expression
-        parts = cron.split()
-        
-        if len(parts) != 5:
-            return False
-        
-        minute, hour, day, month, weekday = parts
-        
-        # Check minute
-        if minute != "*" and minute != "*/15":
-            if int(minute) != now.minute:
-                return False
-        elif minute == "*/15":
-            if now.minute % 15 != 0:
-                return False
-        
-        # Check hour
-        if hour != "*":
-            if int(hour) != now.hour:
-                return False
-        
-        # Check weekday (0 = Monday for our purposes)
-        if weekday != "*":
-            if int(weekday) != now.weekday():
-                return False
-        
-        # Don't run more than once per scheduled period
-        if task.last_run:
-            if minute == "*/15":
-                if (now - task.last_run).total_seconds() < 14 * 60:
-                    return False
-            else:
-                if task.last_run.date() == now.date() and task.last_run.hour == now.hour:
-                    return False
-        
-        return True
-    
     # =========================================================================
     # STATUS AND OUTPUTS
     # =========================================================================
@@ -473,10 +419,12 @@ class FPAOrchestrator:
                 name: {
                     "enabled": task.enabled,
                     "last_run": task.last_run.isoformat() if task.last_run else None,
+                    "next_run": task.next_run.isoformat() if task.next_run else None,
                     "cron": task.cron_expression,
                 }
                 for name, task in self._scheduled_tasks.items()
             },
+            "scheduler": get_scheduler().get_stats(),
             "decision_queue_stats": self.decision_queue.get_stats(),
             "recent_runs": [
                 {
@@ -484,6 +432,7 @@ class FPAOrchestrator:
                     "started": run.started_at.isoformat(),
                     "status": run.status.value,
                     "triggered_by": run.triggered_by,
+                    "step_timings_ms": run.step_timings,
                 }
                 for run in self._workflow_runs[-10:]
             ],
@@ -511,6 +460,7 @@ class FPAOrchestrator:
 # =========================================================================
 
 _orchestrators: Dict[int, FPAOrchestrator] = {}
+_pending_events: Set[asyncio.Task] = set()
 
 
 def get_orchestrator(db: Session, entity_id: int) -> FPAOrchestrator:
@@ -523,3 +473,46 @@ def get_orchestrator(db: Session, entity_id: int) -> FPAOrchestrator:
             autonomous_mode=autonomous,
         )
     return _orchestrators[entity_id]
+
+
+def publish_event(entity_id: int, event_type: str, event_data: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Fire-and-forget emit_event() from any thread.
+    
+    Used by the ingestion, reconciliation and forecast endpoints so the
+    entity's handlers react within seconds instead of at the next scheduled
+    tick. Sync endpoints run on a thread pool, so the event is handed to the
+    loop the orchestrator was started on. Returns False when the entity has
+    no orchestrator to deliver to.
+    
+    Every published event is a write, so the entity's cached Q&A contexts
+    and evidence indexes (all of them, or one snapshot's when the event
+    names it) are dropped first.
+    """
+    snapshot_id = (event_data or {}).get("snapshot_id")
+    get_context_cache().invalidate(entity_id, snapshot_id)
+    invalidate_evidence_index(snapshot_id=snapshot_id, entity_id=entity_id)
+    
+    orchestrator = _orchestrators.get(entity_id)
+    if orchestrator is None:
+        return False
+    
+    coro = orchestrator.emit_event(event_type, dict(event_data or {}))
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    
+    if loop is not None and (orchestrator._loop is None or loop is orchestrator._loop):
+        task = loop.create_task(coro)
+        _pending_events.add(task)  # Keep a reference until it finishes
+        task.add_done_callback(_pending_events.discard)
+        return True
+    if orchestrator._loop is not None and orchestrator._loop.is_running():
+        asyncio.run_coroutine_threadsafe(coro, orchestrator._loop)
+        return True
+    
+    coro.close()
+    if orchestrator.monitoring_state is not None:
+        orchestrator.monitoring_state.stale = True  # Rebuilt on the next tick
+    return False
@@ -8,6 +8,7 @@ GPT-4o powered reasoning for:
 """
 
 from .llm_client import FPALLMClient, LLMConfig
+from .llm_cache import LLMResponseCache, LLMLimiter
 from .variance_reasoner import VarianceReasoner
 from .recommendation_engine import RecommendationEngine
 from .narrative_generator import NarrativeGenerator
@@ -15,6 +16,8 @@ from .narrative_generator import NarrativeGenerator
 __all__ = [
     'FPALLMClient',
     'LLMConfig',
+    'LLMResponseCache',
+    'LLMLimiter',
     'VarianceReasoner',
     'RecommendationEngine',
     'NarrativeGenerator',
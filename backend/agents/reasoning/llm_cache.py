@@ -0,0 +1,291 @@
+"""
+LLM Response Cache and Limiter
+
+Process-wide pieces shared by every FPALLMClient:
+
+- LLMResponseCache: responses keyed by a hash of (model, system prompt,
+  prompt, temperature, max_tokens), with a TTL and LRU eviction once full.
+  Identical requests already in flight are coalesced onto one API call.
+- LLMLimiter: caps concurrent API calls with a semaphore and keeps a rolling
+  one-minute token budget, so a burst of narratives waits instead of
+  tripping the provider's rate limit.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CACHE_ENTRIES = 1000
+DEFAULT_CACHE_TTL_SECONDS = 3600
+DEFAULT_MAX_CONCURRENCY = 4
+
+BUDGET_WINDOW_SECONDS = 60.0
+
+
+# =============================================================================
+# RESPONSE CACHE
+# =============================================================================
+
+class LLMResponseCache:
+    """
+    TTL + LRU cache of LLM responses with in-flight request coalescing.
+
+    get_or_call() returns (response, source) where source is "network",
+    "cache" or "coalesced" (another caller's identical request was already
+    running and this one awaited it). Failures are never cached.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries or int(os.getenv("FPA_LLM_CACHE_ENTRIES", str(DEFAULT_CACHE_ENTRIES)))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(
+            os.getenv("FPA_LLM_CACHE_TTL_SECONDS", str(DEFAULT_CACHE_TTL_SECONDS))
+        )
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()  # key -> (expires_at, response)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "expirations": 0}
+
+    @staticmethod
+    def make_key(
+        model: str,
+        system_prompt: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        payload = json.dumps([model, system_prompt, prompt, temperature, max_tokens])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """The cached response, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: str, response: Any):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl_seconds, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    async def get_or_call(self, key: str, call: Callable[[], Awaitable[Any]]) -> Tuple[Any, str]:
+        """Serve from cache, join an identical in-flight call, or make the call"""
+        cached = self.get(key)
+        if cached is not None:
+            self._count("hits")
+            return cached, "cache"
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pending = self._inflight.get(key)
+            # Futures cannot be awaited from another event loop; those callers go to the network
+            joinable = pending is not None and pending.get_loop() is loop
+            if not joinable:
+                future = loop.create_future()
+                self._inflight[key] = future
+
+        if joinable:
+            self._count("coalesced")
+            return await asyncio.shield(pending), "coalesced"
+
+        self._count("misses")
+        try:
+            response = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved; followers re-raise it from their await
+            raise
+        else:
+            self.put(key, response)
+            future.set_result(response)
+            return response, "network"
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"] + self._stats["coalesced"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "in_flight": len(self._inflight),
+                "hit_rate": round((self._stats["hits"] + self._stats["coalesced"]) / lookups, 3) if lookups else 0.0,
+            }
+
+
+# =============================================================================
+# CONCURRENCY AND TOKEN BUDGET
+# =============================================================================
+
+class TokenReservation:
+    """Tokens held against the budget for one call; settle() swaps in actual usage"""
+
+    def __init__(self, entry: List[float]):
+        self._entry = entry  # [reserved_at, tokens], shared with the limiter window
+
+    def settle(self, tokens: int):
+        self._entry[1] = tokens
+
+
+class LLMLimiter:
+    """
+    Concurrency cap plus a rolling per-minute token budget.
+
+    Each call reserves an estimate (prompt size + max_tokens) before it is
+    sent and settles to the reported usage afterwards. A call that alone
+    exceeds the budget is let through once the window is empty.
+    tokens_per_minute=0 disables the budget.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_concurrency = max_concurrency or int(
+            os.getenv("FPA_LLM_MAX_CONCURRENCY", str(DEFAULT_MAX_CONCURRENCY))
+        )
+        self.tokens_per_minute = tokens_per_minute if tokens_per_minute is not None else int(
+            os.getenv("FPA_LLM_TOKENS_PER_MINUTE", "0")
+        )
+        self.clock = clock
+        # asyncio primitives belong to one loop; keep a semaphore per loop
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._window: Deque[List[float]] = deque()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiting = 0
+        self._stats = {"calls": 0, "budget_waits": 0, "tokens_reserved": 0}
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._semaphores:
+                self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+            return self._semaphores[loop]
+
+    def _tokens_in_window(self, now: float) -> float:
+        while self._window and self._window[0][0] <= now - BUDGET_WINDOW_SECONDS:
+            self._window.popleft()
+        return sum(tokens for _, tokens in self._window)
+
+    async def _reserve(self, tokens: int) -> TokenReservation:
+        entry = [0.0, tokens]
+        if self.tokens_per_minute <= 0:
+            return TokenReservation(entry)
+
+        while True:
+            with self._lock:
+                now = self.clock()
+                used = self._tokens_in_window(now)
+                if not self._window or used + tokens <= self.tokens_per_minute:
+                    entry[0] = now
+                    self._window.append(entry)
+                    self._stats["tokens_reserved"] += tokens
+                    return TokenReservation(entry)
+                wait = self._window[0][0] + BUDGET_WINDOW_SECONDS - now
+                self._stats["budget_waits"] += 1
+            logger.debug(f"LLM token budget exhausted ({used:.0f}/{self.tokens_per_minute}), waiting {wait:.1f}s")
+            await asyncio.sleep(min(max(wait, 0.01), 1.0))  # Re-check at least every second
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int):
+        """Hold a concurrency slot and a token reservation for one API call"""
+        semaphore = self._semaphore()
+        with self._lock:
+            self._waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+        try:
+            reservation = await self._reserve(estimated_tokens)
+            with self._lock:
+                self._in_flight += 1
+                self._stats["calls"] += 1
+            try:
+                yield reservation
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+        finally:
+            semaphore.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "max_concurrency": self.max_concurrency,
+                "tokens_per_minute": self.tokens_per_minute,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "tokens_in_window": int(self._tokens_in_window(self.clock())),
+            }
+
+
+_cache: Optional[LLMResponseCache] = None
+_limiter: Optional[LLMLimiter] = None
+_singletons_lock = threading.Lock()
+
+
+def get_response_cache() -> LLMResponseCache:
+    """The process-wide response cache"""
+    global _cache
+    with _singletons_lock:
+        if _cache is None:
+            _cache = LLMResponseCache()
+        return _cache
+
+
+def get_llm_limiter() -> LLMLimiter:
+    """The process-wide limiter (one API key, one rate limit)"""
+    global _limiter
+    with _singletons_lock:
+        if _limiter is None:
+            _limiter = LLMLimiter()
+        return _limiter
@@ -2,6 +2,10 @@
 LLM Client
 
 OpenAI GPT-4o wrapper with retry logic, token tracking, and structured outputs.
+
+Completions go through the shared response cache and limiter in llm_cache:
+identical requests are answered from cache or joined while in flight, and
+API calls are capped by concurrency and a per-minute token budget.
 """
 
 import os
@@ -9,10 +13,12 @@ import json
 import logging
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional, Dict, Any, List, TypeVar, Type
-from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, TypeVar, Type, Union
+from dataclasses import dataclass, field, replace
 import asyncio
 
+from .llm_cache import LLMLimiter, LLMResponseCache, get_llm_limiter, get_response_cache
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
@@ -28,10 +34,14 @@ class LLMConfig:
     timeout: int = 60
     max_retries: int = 3
     retry_delay: float = 1.0
+    base_url: Optional[str] = None  # OpenAI-compatible endpoint (proxy, gateway, local stub)
+    use_cache: bool = True
     
     def __post_init__(self):
         if not self.api_key:
             self.api_key = os.getenv("OPENAI_API_KEY")
+        if not self.base_url:
+            self.base_url = os.getenv("OPENAI_BASE_URL")
         if not self.model:
             self.model = os.getenv("OPENAI_MODEL", "gpt-4o")
 
@@ -45,6 +55,7 @@ class LLMResponse:
     finish_reason: str
     latency_ms: int
     raw_response: Optional[Dict] = None
+    cached: bool = False  # Served from cache or a coalesced call (tokens_used is then 0)
 
 
 @dataclass
@@ -68,6 +79,7 @@ class FPALLMClient:
     - Async API calls
     - Retry with exponential backoff
     - Token usage tracking
+    - Shared response cache, request coalescing and rate limiting
     - Structured output parsing
     - Financial context injection
     """
@@ -91,9 +103,17 @@ When analyzing cash flow:
 - Note currency considerations if multiple currencies involved
 """
     
-    def __init__(self, config: Optional[LLMConfig] = None):
+    def __init__(
+        self,
+        config: Optional[LLMConfig] = None,
+        cache: Optional[LLMResponseCache] = None,
+        limiter: Optional[LLMLimiter] = None,
+    ):
         self.config = config or LLMConfig()
+        self.cache = cache if cache is not None else get_response_cache()
+        self.limiter = limiter if limiter is not None else get_llm_limiter()
         self.usage = TokenUsage()
+        self.cache_hits = 0
         self._client = None
         self._initialized = False
     
@@ -109,7 +129,10 @@ When analyzing cash flow:
                 logger.warning("No OpenAI API key configured - LLM features disabled")
                 self._client = None
             else:
-                self._client = openai.AsyncOpenAI(api_key=self.config.api_key)
+                # Retries are handled in _call, outside the limiter slot
+                self._client = openai.AsyncOpenAI(
+                    api_key=self.config.api_key, base_url=self.config.base_url, max_retries=0
+                )
             
             self._initialized = True
         except ImportError:
@@ -148,27 +171,71 @@ When analyzing cash flow:
                 latency_ms=0,
             )
         
+        system_prompt = system_prompt or self.SYSTEM_PROMPT
+        temperature = self.config.temperature if temperature is None else temperature
+        max_tokens = max_tokens or self.config.max_tokens
         messages = [
-            {"role": "system", "content": system_prompt or self.SYSTEM_PROMPT},
+            {"role": "system", "content": system_prompt},
             {"role": "user", "content": prompt},
         ]
         
+        if not self.config.use_cache:
+            return await self._call(messages, temperature, max_tokens)
+        
+        key = LLMResponseCache.make_key(self.config.model, system_prompt, prompt, temperature, max_tokens)
+        response, source = await self.cache.get_or_call(
+            key, lambda: self._call(messages, temperature, max_tokens)
+        )
+        if source == "network":
+            return response
+        
+        self.cache_hits += 1
+        return replace(response, tokens_used=0, latency_ms=0, cached=True)
+    
+    async def complete_batch(
+        self,
+        requests: List[Union[str, Dict[str, Any]]],
+        return_exceptions: bool = False,
+    ) -> List[Union[LLMResponse, BaseException]]:
+        """
+        Run many completions concurrently, results in request order.
+        
+        Each request is a prompt or a dict of complete() arguments. Duplicates
+        are answered by one API call and the limiter bounds concurrency.
+        """
+        calls = [
+            self.complete(request) if isinstance(request, str) else self.complete(**request)
+            for request in requests
+        ]
+        return await asyncio.gather(*calls, return_exceptions=return_exceptions)
+    
+    async def _call(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+    ) -> LLMResponse:
+        """One API request with retry; each attempt holds a limiter slot"""
+        # Rough prompt size (4 chars per token) plus the completion ceiling
+        estimated_tokens = sum(len(m["content"]) for m in messages) // 4 + max_tokens
         start_time = datetime.utcnow()
         
         for attempt in range(self.config.max_retries):
             try:
-                response = await self._client.chat.completions.create(
-                    model=self.config.model,
-                    messages=messages,
-                    temperature=temperature or self.config.temperature,
-                    max_tokens=max_tokens or self.config.max_tokens,
-                    timeout=self.config.timeout,
-                )
+                async with self.limiter.slot(estimated_tokens) as reservation:
+                    response = await self._client.chat.completions.create(
+                        model=self.config.model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        timeout=self.config.timeout,
+                    )
+                    usage = response.usage
+                    reservation.settle(usage.total_tokens)
                 
                 latency_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
                 
                 # Track usage
-                usage = response.usage
                 self.usage.add(usage.prompt_tokens, usage.completion_tokens)
                 
                 return LLMResponse(
@@ -395,4 +462,7 @@ Format as JSON with keys: answer, sources, caveats, follow_ups"""
             "completion_tokens": self.usage.completion_tokens,
             "total_tokens": self.usage.total_tokens,
             "estimated_cost_usd": self.usage.total_tokens * 0.00001,  # Rough estimate
+            "cache_hits": self.cache_hits,
+            "cache": self.cache.get_stats(),
+            "limiter": self.limiter.get_stats(),
         }
@@ -0,0 +1,480 @@
+"""
+FP&A Scheduler
+
+One process-wide scheduler for every entity's orchestrator. Scheduled
+workflows sit in a single heap keyed by their next fire time; one asyncio
+task sleeps until the earliest entry is due instead of each orchestrator
+polling once a minute.
+
+- Full 5-field cron (lists, ranges, steps, month/day names, @daily etc.)
+  with the usual day-of-month OR day-of-week rule
+- Per-workflow jitter spreads entities that share a cron expression
+- Per-workflow concurrency caps bound how many entities run a workflow at once
+- The last tick run per (entity, workflow) is persisted; a tick missed while
+  the process was down is run once on registration (within the catch-up window)
+
+All times are UTC, matching the orchestrator's run bookkeeping.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, TYPE_CHECKING
+
+from sqlalchemy.orm import Session
+
+if TYPE_CHECKING:
+    from .orchestrator import FPAOrchestrator
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================================
+# CRON EXPRESSIONS
+# =========================================================================
+
+CRON_MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+MONTH_NAMES = {name: i + 1 for i, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+)}
+DAY_NAMES = {name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+
+# (name, min, max, names)
+CRON_FIELDS = (
+    ("minute", 0, 59, {}),
+    ("hour", 0, 23, {}),
+    ("day of month", 1, 31, {}),
+    ("month", 1, 12, MONTH_NAMES),
+    ("day of week", 0, 7, DAY_NAMES),  # 0 and 7 are Sunday
+)
+
+# Give up searching for a fire time after this long (e.g. "0 0 31 2 *")
+MAX_SEARCH = timedelta(days=366 * 5)
+
+
+def _parse_value(token: str, low: int, high: int, names: Dict[str, int], name: str) -> int:
+    value = names.get(token.lower()) if names else None
+    if value is None:
+        if not token.isdigit():
+            raise ValueError(f"Invalid {name} value: {token!r}")
+        value = int(token)
+    if not low <= value <= high:
+        raise ValueError(f"{name} value {value} outside {low}-{high}")
+    return value
+
+
+def _parse_field(spec: str, low: int, high: int, names: Dict[str, int], name: str) -> FrozenSet[int]:
+    values = set()
+    for item in spec.split(","):
+        base, _, step_text = item.partition("/")
+        step = int(step_text) if step_text.isdigit() else None
+        if step_text and not step:
+            raise ValueError(f"Invalid {name} step: {item!r}")
+
+        if base == "*":
+            start, end = low, high
+        elif "-" in base:
+            a, b = base.split("-", 1)
+            start, end = (_parse_value(a, low, high, names, name), _parse_value(b, low, high, names, name))
+            if start > end:
+                raise ValueError(f"Invalid {name} range: {item!r}")
+        else:
+            start = _parse_value(base, low, high, names, name)
+            end = high if step else start  # "5/15" means 5, 20, 35, 50
+        values.update(range(start, end + 1, step or 1))
+    return frozenset(values)
+
+
+class CronExpression:
+    """A parsed 5-field cron expression"""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        spec = CRON_MACROS.get(expression.strip().lower(), expression)
+        parts = spec.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+
+        minutes, hours, days, months, weekdays = (
+            _parse_field(part, low, high, names, name)
+            for part, (name, low, high, names) in zip(parts, CRON_FIELDS)
+        )
+        self.minutes = sorted(minutes)
+        self.hours = hours
+        self.days = days
+        self.months = months
+        self.weekdays = frozenset(d % 7 for d in weekdays)
+        # Standard cron: if both day fields are restricted, either may match
+        self._day_or = not parts[2].startswith("*") and not parts[4].startswith("*")
+
+    def __repr__(self) -> str:
+        return f"CronExpression({self.expression!r})"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        in_month = moment.day in self.days
+        in_week = (moment.weekday() + 1) % 7 in self.weekdays  # cron counts from Sunday
+        return (in_month or in_week) if self._day_or else (in_month and in_week)
+
+    def matches(self, moment: datetime) -> bool:
+        return (
+            moment.minute in self.minutes and moment.hour in self.hours
+            and moment.month in self.months and self._day_matches(moment)
+        )
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First fire time strictly after `moment`"""
+        t = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + MAX_SEARCH
+        while t <= limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            else:
+                minute = next((m for m in self.minutes if m >= t.minute), None)
+                if minute is not None:
+                    return t.replace(minute=minute)
+                t = t.replace(minute=0) + timedelta(hours=1)
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+
+# =========================================================================
+# SCHEDULER
+# =========================================================================
+
+DEFAULT_CONCURRENCY = {
+    "continuous_monitoring": 8,
+    "weekly_meeting_prep": 2,
+}
+
+DEFAULT_JITTER_SECONDS = {
+    "continuous_monitoring": 60,
+}
+
+
+@dataclass
+class ScheduledJob:
+    """One (entity, workflow) entry in the timer heap"""
+    entity_id: int
+    workflow_name: str
+    cron: CronExpression
+    tick: datetime  # Cron time this firing stands for
+    fire_at: datetime  # Tick plus jitter
+    catch_up: bool = False
+    cancelled: bool = False
+
+
+@dataclass
+class _WorkflowCounters:
+    waiting: int = 0
+    running: int = 0
+    completed: int = 0
+    skipped: int = 0
+
+
+class FPAScheduler:
+    """
+    Process-wide cron scheduler for all registered orchestrators.
+
+    Orchestrators register on start() and unregister on stop(). A paused
+    orchestrator keeps its heap entries but skips ticks until resumed.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        concurrency: Optional[Dict[str, int]] = None,
+        default_concurrency: Optional[int] = None,
+        jitter_seconds: Optional[Dict[str, float]] = None,
+        default_jitter_seconds: Optional[float] = None,
+        catch_up_window: Optional[timedelta] = None,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ):
+        self._session_factory = session_factory
+        self.concurrency = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+        self.default_concurrency = default_concurrency or int(os.getenv("FPA_SCHEDULER_MAX_CONCURRENT", "4"))
+        self.jitter_seconds = {**DEFAULT_JITTER_SECONDS, **(jitter_seconds or {})}
+        self.default_jitter_seconds = (
+            default_jitter_seconds if default_jitter_seconds is not None
+            else float(os.getenv("FPA_SCHEDULER_JITTER_SECONDS", "30"))
+        )
+        self.catch_up_window = catch_up_window or timedelta(
+            hours=float(os.getenv("FPA_SCHEDULER_CATCH_UP_HOURS", "24"))
+        )
+        self.clock = clock
+
+        self._heap: List[Tuple[datetime, int, ScheduledJob]] = []
+        self._seq = itertools.count()
+        self._jobs: Dict[Tuple[int, str], ScheduledJob] = {}
+        self._orchestrators: Dict[int, "FPAOrchestrator"] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._counters: Dict[str, _WorkflowCounters] = {}
+        self._inflight: set = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    # ---------------------------------------------------------------------
+    # Registration
+    # ---------------------------------------------------------------------
+
+    def register(self, orchestrator: "FPAOrchestrator"):
+        """Add (or refresh) all enabled scheduled tasks of an orchestrator"""
+        entity_id = orchestrator.entity_id
+        self.unregister(entity_id)
+        self._orchestrators[entity_id] = orchestrator
+
+        now = self.clock()
+        last_ticks = self._load_last_ticks(entity_id)
+        for task in orchestrator._scheduled_tasks.values():
+            if not task.enabled:
+                continue
+            try:
+                cron = CronExpression(task.cron_expression)
+            except ValueError as e:
+                logger.error(f"Skipping {task.workflow_name} for entity {entity_id}: {e}")
+                continue
+
+            missed = self._latest_missed_tick(cron, last_ticks.get(task.workflow_name), now)
+            if missed:
+                job = ScheduledJob(entity_id, task.workflow_name, cron, missed, now, catch_up=True)
+            else:
+                tick = cron.next_after(now)
+                job = ScheduledJob(entity_id, task.workflow_name, cron, tick, self._jittered(task.workflow_name, tick))
+            task.next_run = job.fire_at
+            self._push(job)
+        self._wake()
+
+    def _latest_missed_tick(self, cron: CronExpression, last_tick: Optional[datetime], now: datetime) -> Optional[datetime]:
+        """Newest tick after `last_tick` that is due and inside the catch-up window"""
+        if last_tick is None:
+            return None  # Never ran here: start from the next tick
+        tick = cron.next_after(max(last_tick, now - self.catch_up_window))
+        if tick > now:
+            return None
+        while (following := cron.next_after(tick)) <= now:
+            tick = following
+        return tick
+
+    def unregister(self, entity_id: int):
+        """Drop an entity's jobs; runs already in flight finish normally"""
+        self._orchestrators.pop(entity_id, None)
+        for key in [k for k in self._jobs if k[0] == entity_id]:
+            self._jobs.pop(key).cancelled = True
+
+    def _jittered(self, workflow_name: str, tick: datetime) -> datetime:
+        jitter = self.jitter_seconds.get(workflow_name, self.default_jitter_seconds)
+        return tick + timedelta(seconds=random.uniform(0, jitter)) if jitter > 0 else tick
+
+    def _push(self, job: ScheduledJob):
+        self._jobs[(job.entity_id, job.workflow_name)] = job
+        heapq.heappush(self._heap, (job.fire_at, next(self._seq), job))
+
+    def _pop_due(self, now: datetime) -> List[ScheduledJob]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, job = heapq.heappop(self._heap)
+            if not job.cancelled:
+                due.append(job)
+        return due
+
+    # ---------------------------------------------------------------------
+    # Dispatch
+    # ---------------------------------------------------------------------
+
+    def _semaphore(self, workflow_name: str) -> asyncio.Semaphore:
+        if workflow_name not in self._semaphores:
+            limit = self.concurrency.get(workflow_name, self.default_concurrency)
+            self._semaphores[workflow_name] = asyncio.Semaphore(limit)
+        return self._semaphores[workflow_name]
+
+    def _counter(self, workflow_name: str) -> _WorkflowCounters:
+        return self._counters.setdefault(workflow_name, _WorkflowCounters())
+
+    async def run_pending(self, now: Optional[datetime] = None) -> List[asyncio.Task]:
+        """Dispatch every due job and reschedule it; returns the started run tasks"""
+        from .orchestrator import OrchestratorStatus
+
+        now = now or self.clock()
+        started = []
+        for job in self._pop_due(now):
+            # Coalesce: after a late or catch-up run, skip straight to the next future tick
+            tick = job.cron.next_after(max(job.tick, now))
+            next_job = ScheduledJob(
+                job.entity_id, job.workflow_name, job.cron, tick, self._jittered(job.workflow_name, tick)
+            )
+            self._push(next_job)
+
+            orchestrator = self._orchestrators.get(job.entity_id)
+            task_config = orchestrator._scheduled_tasks.get(job.workflow_name) if orchestrator else None
+            if task_config is not None:
+                task_config.next_run = next_job.fire_at
+            if orchestrator is None or orchestrator.status != OrchestratorStatus.RUNNING:
+                self._counter(job.workflow_name).skipped += 1
+                continue
+
+            task = asyncio.create_task(self._run_job(orchestrator, job))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+            started.append(task)
+        return started
+
+    async def _run_job(self, orchestrator: "FPAOrchestrator", job: ScheduledJob):
+        counter = self._counter(job.workflow_name)
+        counter.waiting += 1
+        async with self._semaphore(job.workflow_name):
+            counter.waiting -= 1
+            counter.running += 1
+            try:
+                await orchestrator.run_workflow(
+                    job.workflow_name,
+                    triggered_by="schedule_catch_up" if job.catch_up else "schedule",
+                )
+            except Exception:
+                logger.exception(f"Scheduled {job.workflow_name} failed for entity {job.entity_id}")
+            finally:
+                counter.running -= 1
+                counter.completed += 1
+        self._save_last_tick(job.entity_id, job.workflow_name, job.tick)
+
+    # ---------------------------------------------------------------------
+    # Loop
+    # ---------------------------------------------------------------------
+
+    def ensure_started(self):
+        """Start the scheduler loop on the running event loop if it is not running"""
+        if self._loop_task is None or self._loop_task.done():
+            self._wakeup = asyncio.Event()
+            self._loop_task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _loop(self):
+        logger.info("FP&A scheduler started")
+        while True:
+            try:
+                await self.run_pending()
+            except Exception:
+                logger.exception("Scheduler error")
+
+            self._wakeup.clear()
+            timeout = None
+            if self._heap:
+                timeout = max((self._heap[0][0] - self.clock()).total_seconds(), 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    # ---------------------------------------------------------------------
+    # Persistence
+    # ---------------------------------------------------------------------
+
+    def _session(self) -> Session:
+        if self._session_factory is None:
+            from database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def _load_last_ticks(self, entity_id: int) -> Dict[str, datetime]:
+        import models
+        try:
+            db = self._session()
+            try:
+                rows = db.query(models.WorkflowScheduleState).filter(
+                    models.WorkflowScheduleState.entity_id == entity_id
+                ).all()
+                return {r.workflow_name: r.last_tick_at for r in rows if r.last_tick_at}
+            finally:
+                db.close()
+        except Exception:
+            logger.exception("Could not load schedule state; missed runs will not be caught up")
+            return {}
+
+    def _save_last_tick(self, entity_id: int, workflow_name: str, tick: datetime):
+        import models
+        try:
+            db = self._session()
+            try:
+                state = db.query(models.WorkflowScheduleState).filter(
+                    models.WorkflowScheduleState.entity_id == entity_id,
+                    models.WorkflowScheduleState.workflow_name == workflow_name,
+                ).first()
+                if state is None:
+                    state = models.WorkflowScheduleState(entity_id=entity_id, workflow_name=workflow_name)
+                    db.add(state)
+                if state.last_tick_at is None or tick > state.last_tick_at:
+                    state.last_tick_at = tick
+                state.last_completed_at = self.clock()
+                db.commit()
+            finally:
+                db.close()
+        except Exception:
+            logger.exception(f"Could not save schedule state for {workflow_name}")
+
+    # ---------------------------------------------------------------------
+    # Status
+    # ---------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and per-workflow run counters"""
+        next_fire = min((job.fire_at for job in self._jobs.values()), default=None)
+        by_workflow: Dict[str, Dict[str, int]] = {}
+        for job in self._jobs.values():
+            by_workflow.setdefault(job.workflow_name, {"scheduled": 0})["scheduled"] += 1
+        for name, counter in self._counters.items():
+            by_workflow.setdefault(name, {"scheduled": 0}).update(
+                waiting=counter.waiting, running=counter.running,
+                completed=counter.completed, skipped=counter.skipped,
+                max_concurrent=self.concurrency.get(name, self.default_concurrency),
+            )
+        return {
+            "running": self._loop_task is not None and not self._loop_task.done(),
+            "entities": len(self._orchestrators),
+            "queue_depth": len(self._jobs),
+            "waiting": sum(c.waiting for c in self._counters.values()),
+            "in_flight": len(self._inflight),
+            "next_fire_at": next_fire.isoformat() if next_fire else None,
+            "by_workflow": by_workflow,
+        }
+
+
+# =========================================================================
+# PROCESS-WIDE SCHEDULER
+# =========================================================================
+
+_scheduler: Optional[FPAScheduler] = None
+
+
+def get_scheduler() -> FPAScheduler:
+    """The scheduler shared by every orchestrator in this process"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FPAScheduler()
+    return _scheduler
@@ -14,6 +14,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
 
 import models
+import bank_ledger
 from ..models.briefings import CashMovement, CashPosition, ExpectedMovement, MovementType
 
 logger = logging.getLogger(__name__)
@@ -77,48 +78,92 @@ class DataWorker:
                 currency="EUR",
             )
         
-        # Calculate balances
-        total_balance = Decimal("0")
-        by_account = {}
-        
-        for account in accounts:
-            # Get latest balance
-            latest_txn = self.db.query(models.BankTransaction).filter(
-                models.BankTransaction.bank_account_id == account.id,
-                models.BankTransaction.transaction_date <= as_of,
-            ).order_by(models.BankTransaction.transaction_date.desc()).first()
-            
-            balance = Decimal(str(account.current_balance or 0))
-            total_balance += balance
-            by_account[account.account_name] = balance
+        # Balances come from the daily-close ledger: opening is yesterday's close
+        bank_ledger.ensure_bank_ledger(self.db, [a.id for a in accounts])
+        currency = self._reporting_currency()
+        snapshot = self.get_latest_snapshot()
+        opening = bank_ledger.consolidated_balances(
+            self.db, accounts, as_of.date() - timedelta(days=1), currency,
+            snapshot_id=snapshot.id if snapshot else None,
+        )
+        if opening["missing_fx_rates"]:
+            logger.warning(f"No FX rate into {currency} for {opening['missing_fx_rates']}; left out of cash position")
         
-        # Get today's movements for opening balance calculation
+        # Today's movements up to as_of, in one query
         today_start = datetime.combine(as_of.date(), datetime.min.time())
-        
-        inflows = self.get_transactions_since(today_start, as_of, "inflow")
-        outflows = self.get_transactions_since(today_start, as_of, "outflow")
-        
-        total_inflows = sum(m.amount for m in inflows)
-        total_outflows = sum(m.amount for m in outflows)
-        opening = total_balance - total_inflows + total_outflows
+        todays_txns = self.db.query(models.BankTransaction).filter(
+            models.BankTransaction.bank_account_id.in_([a.id for a in accounts]),
+            models.BankTransaction.transaction_date >= today_start,
+            models.BankTransaction.transaction_date <= as_of,
+        ).order_by(models.BankTransaction.transaction_date.desc()).all()
+        
+        rates = opening["fx_rates"]
+        account_currency = {a.id: (a.currency or currency).upper() for a in accounts}
+        by_currency = dict(opening["by_currency"])
+        by_account_id = dict(opening["by_account"])
+        inflows, outflows = [], []
+        total_inflows = total_outflows = Decimal("0")
+        
+        for txn in todays_txns:
+            movement = self._to_movement(txn)
+            native = Decimal(str(txn.amount or 0))
+            txn_currency = account_currency[txn.bank_account_id]
+            by_currency[txn_currency] = by_currency.get(txn_currency, Decimal("0")) + native
+            if txn_currency not in rates:
+                continue
+            converted = native * rates[txn_currency]
+            by_account_id[txn.bank_account_id] = by_account_id.get(txn.bank_account_id, Decimal("0")) + converted
+            if movement.movement_type == MovementType.INFLOW:
+                inflows.append(movement)
+                total_inflows += abs(converted)
+            else:
+                outflows.append(movement)
+                total_outflows += abs(converted)
+        
+        current_balance = opening["total"] + total_inflows - total_outflows
+        by_account = {
+            account.account_name: by_account_id[account.id]
+            for account in accounts if account.id in by_account_id
+        }
         
         # Get expected (from forecast if available)
         expected = self._get_expected_balance(as_of)
         
         return CashPosition(
             as_of=as_of,
-            opening_balance=opening,
+            opening_balance=opening["total"],
             total_inflows=total_inflows,
             total_outflows=total_outflows,
-            current_balance=total_balance,
+            current_balance=current_balance,
             expected_balance=expected,
-            variance_from_expected=total_balance - expected,
-            currency="EUR",  # TODO: Support multi-currency
+            variance_from_expected=current_balance - expected,
+            currency=currency,
             inflows=inflows,
             outflows=outflows,
             by_account=by_account,
+            by_currency=by_currency,
         )
     
+    def get_balance_history(self, days: int = 30, as_of: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Consolidated end-of-day balance for each of the last `days` days, oldest first"""
+        as_of = as_of or datetime.utcnow().date()
+        accounts = self.db.query(models.BankAccount).filter(
+            models.BankAccount.entity_id == self.entity_id
+        ).all()
+        bank_ledger.ensure_bank_ledger(self.db, [a.id for a in accounts])
+        currency = self._reporting_currency()
+        snapshot = self.get_latest_snapshot()
+        
+        series = bank_ledger.consolidated_series(
+            self.db, accounts, [as_of - timedelta(days=offset) for offset in range(days)], currency,
+            snapshot_id=snapshot.id if snapshot else None,
+        )
+        return [{"date": day["as_of"], "balance": str(day["total"]), "currency": currency} for day in series]
+    
+    def _reporting_currency(self) -> str:
+        entity = self.db.query(models.Entity).filter(models.Entity.id == self.entity_id).first()
+        return (entity.currency if entity and entity.currency else "EUR").upper()
+    
     def _get_expected_balance(self, as_of: datetime) -> Decimal:
         """Get expected balance from forecast"""
         # Try to get from latest forecast
@@ -131,7 +176,7 @@ class DataWorker:
         
         # For now, use a simple calculation
         # In production, this would query the forecast service
-        return Decimal(str(snapshot.forecast_total_amount or 0))
+        return Decimal(str(getattr(snapshot, "forecast_total_amount", None) or 0))
     
     # =========================================================================
     # TRANSACTIONS
@@ -171,20 +216,51 @@ class DataWorker:
         
         transactions = query.order_by(models.BankTransaction.transaction_date.desc()).all()
         
-        movements = []
-        for txn in transactions:
-            amount = Decimal(str(txn.amount))
-            movements.append(CashMovement(
-                movement_type=MovementType.INFLOW if amount > 0 else MovementType.OUTFLOW,
-                amount=abs(amount),
-                currency=txn.currency or "EUR",
-                description=txn.reference or txn.description or "",
-                counterparty=txn.counterparty_name,
-                transaction_id=txn.id,
-                timestamp=txn.transaction_date,
-            ))
+        return [self._to_movement(txn) for txn in transactions]
+    
+    def get_transactions_after(
+        self,
+        after_id: int = 0,
+        since: Optional[datetime] = None,
+    ) -> List[CashMovement]:
+        """
+        Bank transactions with an id above a watermark, oldest first.
         
-        return movements
+        Transaction ids only grow, so callers that remember the last id they
+        saw pick up new transactions without re-scanning a time window.
+        """
+        query = self.db.query(models.BankTransaction).join(
+            models.BankAccount
+        ).filter(
+            models.BankAccount.entity_id == self.entity_id,
+            models.BankTransaction.id > after_id,
+        )
+        
+        if since:
+            query = query.filter(models.BankTransaction.transaction_date >= since)
+        
+        return [self._to_movement(txn) for txn in query.order_by(models.BankTransaction.id).all()]
+    
+    def get_latest_transaction_id(self) -> int:
+        """Highest bank transaction id for this entity (0 if none)"""
+        return self.db.query(func.max(models.BankTransaction.id)).join(
+            models.BankAccount
+        ).filter(
+            models.BankAccount.entity_id == self.entity_id
+        ).scalar() or 0
+    
+    @staticmethod
+    def _to_movement(txn: models.BankTransaction) -> CashMovement:
+        amount = Decimal(str(txn.amount))
+        return CashMovement(
+            movement_type=MovementType.INFLOW if amount > 0 else MovementType.OUTFLOW,
+            amount=abs(amount),
+            currency=txn.currency or "EUR",
+            description=txn.reference or "",
+            counterparty=txn.counterparty,
+            transaction_id=txn.id,
+            timestamp=txn.transaction_date,
+        )
     
     def get_overnight_transactions(self, as_of: Optional[date] = None) -> Tuple[List[CashMovement], List[CashMovement]]:
         """
@@ -383,9 +459,9 @@ class DataWorker:
             if latest_bank_txn else None
         )
         
-        # ERP data freshness (invoices/bills)
-        latest_invoice = self.db.query(func.max(models.Invoice.created_at)).filter(
-            models.Invoice.entity_id == self.entity_id
+        # ERP data freshness (invoices arrive as snapshot uploads)
+        latest_invoice = self.db.query(func.max(models.Snapshot.created_at)).filter(
+            models.Snapshot.entity_id == self.entity_id
         ).scalar()
         
         erp_hours_old = (
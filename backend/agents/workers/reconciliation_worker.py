@@ -7,11 +7,11 @@ Provides reconciliation status, aged items, and escalation.
 
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Set
 import logging
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, or_
 
 import models
 
@@ -147,6 +147,47 @@ class ReconciliationWorker:
         
         return items
     
+    def get_unmatched_items(self, after_id: int = 0) -> List[Dict[str, Any]]:
+        """
+        Unmatched bank transactions with an id above after_id (all by default).
+        
+        Items carry the transaction datetime under "transaction_date" so
+        callers can bucket them by age.
+        """
+        txns = self.db.query(models.BankTransaction).join(
+            models.BankAccount
+        ).filter(
+            models.BankAccount.entity_id == self.entity_id,
+            models.BankTransaction.id > after_id,
+            or_(models.BankTransaction.is_reconciled == 0, models.BankTransaction.is_reconciled.is_(None)),
+        ).all()
+        
+        return [
+            {
+                "type": "bank_transaction",
+                "id": txn.id,
+                "transaction_date": txn.transaction_date,
+                "date": txn.transaction_date.isoformat() if txn.transaction_date else None,
+                "amount": str(txn.amount),
+                "currency": txn.currency or "EUR",
+                "reference": txn.reference,
+                "counterparty": txn.counterparty,
+            }
+            for txn in txns
+        ]
+    
+    def get_reconciled_ids(self, transaction_ids: Iterable[int], chunk_size: int = 500) -> Set[int]:
+        """The subset of transaction_ids that are now reconciled"""
+        ids = list(transaction_ids)
+        reconciled = set()
+        for start in range(0, len(ids), chunk_size):
+            rows = self.db.query(models.BankTransaction.id).filter(
+                models.BankTransaction.id.in_(ids[start:start + chunk_size]),
+                models.BankTransaction.is_reconciled == 1,
+            ).all()
+            reconciled.update(row.id for row in rows)
+        return reconciled
+    
     def get_unmatched_summary(self) -> Dict[str, Any]:
         """Get summary of unmatched items by age bucket"""
         now = datetime.utcnow()
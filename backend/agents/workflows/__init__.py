@@ -12,14 +12,16 @@ Core workflows that mirror real FP&A analyst routines:
 from .morning_briefing import run_morning_briefing, MorningBriefingWorkflow
 from .weekly_meeting_prep import run_weekly_meeting_prep, WeeklyMeetingPrepWorkflow
 from .month_end_close import run_month_end_close, MonthEndCloseWorkflow
-from .continuous_monitoring import run_continuous_monitoring, ContinuousMonitoringWorkflow
+from .continuous_monitoring import (
+    run_continuous_monitoring, ContinuousMonitoringWorkflow, MonitoringState, register_monitoring_events,
+)
 from .question_answering import run_question_answering, QuestionAnsweringWorkflow
 
 __all__ = [
     'run_morning_briefing', 'MorningBriefingWorkflow',
     'run_weekly_meeting_prep', 'WeeklyMeetingPrepWorkflow',
     'run_month_end_close', 'MonthEndCloseWorkflow',
-    'run_continuous_monitoring', 'ContinuousMonitoringWorkflow',
+    'run_continuous_monitoring', 'ContinuousMonitoringWorkflow', 'MonitoringState', 'register_monitoring_events',
     'run_question_answering', 'QuestionAnsweringWorkflow',
 ]
 
@@ -31,3 +33,4 @@ def register_all_workflows(orchestrator):
     orchestrator.register_workflow("month_end_close", run_month_end_close)
     orchestrator.register_workflow("continuous_monitoring", run_continuous_monitoring)
     orchestrator.register_workflow("question_answering", run_question_answering)
+    register_monitoring_events(orchestrator)
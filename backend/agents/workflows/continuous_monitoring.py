@@ -2,12 +2,27 @@
 Continuous Monitoring Workflow
 
 Background vigilance for anomalies, aging items, and forecast drift.
-Runs every 15 minutes during business hours.
+
+Monitoring is incremental. Writes that call publish_event() (reconciliation,
+forecasts, ingestion paths that write BankTransaction rows) are applied by
+the handlers registered here as just that delta to rolling state kept on
+the orchestrator (an aging histogram of unmatched items, running
+inflow/outflow sums, the freshness timestamps and the last runway),
+alerting within seconds. The 15-minute tick checks what
+moves with the clock (items crossing an aging threshold, data going stale)
+against that state. Its only query is the entity's highest transaction id:
+when that is past the state's watermark, transactions were written without
+an event and the tick applies them as the ingestion handler would. The state
+is rebuilt from scratch once a day to correct for any other missed write.
 """
 
+import asyncio
+import os
+from bisect import bisect_right, insort
+from dataclasses import dataclass, field
 from datetime import datetime, date, timedelta
 from decimal import Decimal
-from typing import Optional, Dict, Any, List, TYPE_CHECKING
+from typing import Optional, Dict, Any, List, Set, TYPE_CHECKING
 import logging
 
 if TYPE_CHECKING:
@@ -16,107 +31,420 @@ if TYPE_CHECKING:
 from ..workers.data_worker import DataWorker
 from ..workers.reconciliation_worker import ReconciliationWorker
 from ..workers.forecast_worker import ForecastWorker
+from ..models.briefings import CashMovement, MovementType
 from ..decision_queue import (
     create_cash_shortfall_decision,
     create_reconciliation_escalation_decision,
 )
-from ..audit_log import AuditAction
+from ..audit_log import AuditAction, AuditSeverity
 
 logger = logging.getLogger(__name__)
 
 
+# Events the monitoring handlers react to (event_data keys in brackets)
+EVENT_TRANSACTIONS_INGESTED = "transactions_ingested"    # [bank_account_id]
+EVENT_ERP_INGESTED = "erp_ingested"                      # [snapshot_id]
+EVENT_RECONCILIATION_UPDATED = "reconciliation_updated"  # [transaction_ids]
+EVENT_FORECAST_UPDATED = "forecast_updated"              # [snapshot_id]
+
+MONITORING_EVENTS = (
+    EVENT_TRANSACTIONS_INGESTED,
+    EVENT_ERP_INGESTED,
+    EVENT_RECONCILIATION_UPDATED,
+    EVENT_FORECAST_UPDATED,
+)
+
+REBUILD_INTERVAL = timedelta(hours=float(os.getenv("FPA_MONITORING_REBUILD_HOURS", "24")))
+
+
+# =============================================================================
+# ROLLING STATE
+# =============================================================================
+
+class AgingHistogram:
+    """
+    Unmatched items bucketed by transaction day.
+
+    Days are kept sorted so the items that crossed an aging threshold since
+    the last check are a bisect range, and band totals are running sums per
+    bucket rather than a scan of the items.
+    """
+
+    def __init__(self):
+        self.days: List[date] = []
+        self.buckets: Dict[date, Dict[str, Any]] = {}  # day -> {"ids": set, "total": Decimal}
+        self.items: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def add(self, item: Dict[str, Any]) -> bool:
+        """Add an item; False if it is already tracked or has no date"""
+        if item["id"] in self.items or not item.get("transaction_date"):
+            return False
+        day = item["transaction_date"].date()
+        bucket = self.buckets.get(day)
+        if bucket is None:
+            bucket = self.buckets[day] = {"ids": set(), "total": Decimal("0")}
+            insort(self.days, day)
+        bucket["ids"].add(item["id"])
+        bucket["total"] += abs(Decimal(item["amount"]))
+        self.items[item["id"]] = item
+        return True
+
+    def remove(self, item_id: int) -> Optional[Dict[str, Any]]:
+        item = self.items.pop(item_id, None)
+        if item is None:
+            return None
+        day = item["transaction_date"].date()
+        bucket = self.buckets[day]
+        bucket["ids"].discard(item_id)
+        bucket["total"] -= abs(Decimal(item["amount"]))
+        if not bucket["ids"]:
+            del self.buckets[day]
+            self.days.pop(bisect_right(self.days, day) - 1)
+        return item
+
+    def items_between(self, after: Optional[date], through: date) -> List[Dict[str, Any]]:
+        """Items dated after `after` (exclusive, None = no bound) up to `through`, oldest first"""
+        start = 0 if after is None else bisect_right(self.days, after)
+        end = bisect_right(self.days, through)
+        return [
+            self.items[item_id]
+            for day in self.days[start:end]
+            for item_id in sorted(self.buckets[day]["ids"])
+        ]
+
+    def band(self, after: Optional[date], through: Optional[date]) -> Dict[str, Any]:
+        """Count and total of items dated in (after, through]"""
+        start = 0 if after is None else bisect_right(self.days, after)
+        end = len(self.days) if through is None else bisect_right(self.days, through)
+        buckets = [self.buckets[day] for day in self.days[start:end]]
+        return {
+            "count": sum(len(b["ids"]) for b in buckets),
+            "total_amount": str(sum((b["total"] for b in buckets), Decimal("0"))),
+        }
+
+
+class FlowWindow:
+    """Running inflow/outflow sums over the trailing window, in hourly buckets"""
+
+    def __init__(self, hours: int = 24):
+        self.hours = hours
+        self.buckets: Dict[datetime, List[Decimal]] = {}  # hour -> [inflow, outflow]
+        self.inflow = Decimal("0")
+        self.outflow = Decimal("0")
+
+    def add(self, movement: CashMovement, now: datetime):
+        hour = movement.timestamp.replace(minute=0, second=0, microsecond=0)
+        if hour <= now - timedelta(hours=self.hours):
+            return
+        bucket = self.buckets.setdefault(hour, [Decimal("0"), Decimal("0")])
+        if movement.movement_type == MovementType.INFLOW:
+            bucket[0] += movement.amount
+            self.inflow += movement.amount
+        else:
+            bucket[1] += movement.amount
+            self.outflow += movement.amount
+
+    def expire(self, now: datetime):
+        cutoff = now - timedelta(hours=self.hours)
+        for hour in [h for h in self.buckets if h <= cutoff]:
+            inflow, outflow = self.buckets.pop(hour)
+            self.inflow -= inflow
+            self.outflow -= outflow
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "hours": self.hours,
+            "inflow": str(self.inflow),
+            "outflow": str(self.outflow),
+            "net": str(self.inflow - self.outflow),
+        }
+
+
+@dataclass
+class MonitoringState:
+    """What continuous monitoring knows between events and ticks (one per orchestrator)"""
+    built_at: Optional[datetime] = None
+    stale: bool = False  # Set when an event could not be delivered
+    last_txn_id: int = 0  # Transactions up to this id have been seen
+    aging: AgingHistogram = field(default_factory=AgingHistogram)
+    flows: FlowWindow = field(default_factory=FlowWindow)
+    # Aging thresholds are scanned up to these days; ids already alerted
+    warned_through: Optional[date] = None
+    escalated_through: Optional[date] = None
+    warned_ids: Set[int] = field(default_factory=set)
+    escalated_ids: Set[int] = field(default_factory=set)
+    bank_latest: Optional[datetime] = None
+    erp_latest: Optional[datetime] = None
+    active_freshness_alerts: Set[str] = field(default_factory=set)
+    runway: Optional[Dict[str, Any]] = None
+    shortfall_snapshot_id: Optional[int] = None
+    events_applied: int = 0
+    events_since_tick: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+# =============================================================================
+# WORKFLOW
+# =============================================================================
+
 class ContinuousMonitoringWorkflow:
     """
     Continuous background monitoring.
-    
+
     Monitors:
     - Unusual transactions (amount, counterparty, timing)
     - Reconciliation aging (7 days = warning, 30 days = escalate)
     - Forecast accuracy degradation
     - Cash runway warnings
-    - Covenant compliance
+    - Data freshness
     """
-    
+
     def __init__(self, orchestrator: 'FPAOrchestrator'):
         self.orchestrator = orchestrator
-        self.db = orchestrator.db
         self.entity_id = orchestrator.entity_id
-        
-        # Initialize workers
-        self.data_worker = DataWorker(self.db, self.entity_id)
-        self.recon_worker = ReconciliationWorker(self.db, self.entity_id)
-        self.forecast_worker = ForecastWorker(self.db, self.entity_id)
-        
+
         # Thresholds (configurable)
         self.large_txn_threshold = Decimal("100000")
+        self.unknown_counterparty_threshold = Decimal("10000")
         self.recon_warning_days = 7
         self.recon_escalate_days = 30
         self.min_runway_weeks = 8
         self.forecast_degradation_threshold = 0.10  # 10% drop in accuracy
-    
+        self.stale_bank_hours = 24
+        self.freshness_mismatch_hours = 12
+
+    @property
+    def state(self) -> MonitoringState:
+        if self.orchestrator.monitoring_state is None:
+            self.orchestrator.monitoring_state = MonitoringState()
+        return self.orchestrator.monitoring_state
+
     async def run(self) -> Dict[str, Any]:
-        """Run continuous monitoring checks"""
-        logger.info("Running continuous monitoring")
-        
-        alerts = []
-        decisions_created = []
-        
-        # 1. Check for unusual transactions
-        txn_alerts = self._check_unusual_transactions()
-        alerts.extend(txn_alerts)
-        
-        # 2. Check reconciliation aging
-        recon_alerts, recon_decisions = self._check_reconciliation_aging()
-        alerts.extend(recon_alerts)
-        decisions_created.extend(recon_decisions)
-        
-        # 3. Check cash runway
-        runway_alerts, runway_decisions = self._check_cash_runway()
-        alerts.extend(runway_alerts)
-        decisions_created.extend(runway_decisions)
-        
-        # 4. Check forecast drift
-        drift_alerts = self._check_forecast_drift()
-        alerts.extend(drift_alerts)
-        
-        # 5. Check data freshness
-        freshness_alerts = self._check_data_freshness()
-        alerts.extend(freshness_alerts)
-        
-        # Log alerts
-        for alert in alerts:
-            self.orchestrator.audit_log.log(
-                action=AuditAction.ALERT_TRIGGERED,
-                description=alert["message"],
-                details=alert,
-                severity=alert.get("audit_severity", "INFO"),
+        """
+        Scheduled tick.
+
+        Event handlers have already applied every published write since the
+        last tick, so unless the state needs (re)building this picks up
+        transactions written without an event (one max(id) probe) and
+        re-evaluates the time-based checks in memory.
+        """
+        state = self.state
+        now = datetime.utcnow()
+        alerts: List[Dict[str, Any]] = []
+        decisions_created: List[str] = []
+        entity_id = self.entity_id
+
+        async with state.lock:
+            rebuilt = (
+                state.built_at is None
+                or state.stale
+                or now - state.built_at >= REBUILD_INTERVAL
             )
-        
-        result = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "alerts": alerts,
-            "decisions_created": decisions_created,
-            "checks_run": [
-                "unusual_transactions",
-                "reconciliation_aging",
-                "cash_runway",
-                "forecast_drift",
-                "data_freshness",
-            ],
-        }
-        
+            new_transactions = False
+            if rebuilt:
+                logger.info(f"Rebuilding continuous monitoring state for entity {entity_id}")
+                await self._rebuild(state, now, alerts, decisions_created)
+            else:
+                latest_txn_id = await self.orchestrator.executor.run(
+                    "monitoring_latest_transaction",
+                    lambda db: DataWorker(db, entity_id).get_latest_transaction_id(),
+                )
+                if latest_txn_id > state.last_txn_id:
+                    new_transactions = True
+                    await self._apply_new_transactions(state, now, alerts, decisions_created)
+
+            state.flows.expire(now)
+            self._check_reconciliation_aging(state, now.date(), alerts, decisions_created)
+            self._check_data_freshness(state, now, alerts)
+
+            events = state.events_since_tick
+            state.events_since_tick = 0
+            if rebuilt:
+                checks_run = ["unusual_transactions", "reconciliation_aging", "cash_runway", "forecast_drift", "data_freshness"]
+            elif new_transactions:
+                checks_run = ["unusual_transactions", "reconciliation_aging", "data_freshness"]
+            else:
+                checks_run = ["reconciliation_aging", "data_freshness"]
+            result = {
+                "timestamp": now.isoformat(),
+                "alerts": alerts,
+                "decisions_created": decisions_created,
+                "checks_run": checks_run,
+                "rebuilt": rebuilt,
+                "events_since_last_tick": events,
+                "aging": self._aging_summary(state, now.date()),
+                "flows": state.flows.to_dict(),
+            }
+
+        self._log_alerts(alerts)
         return result
-    
-    def _check_unusual_transactions(self) -> List[Dict[str, Any]]:
-        """Check for unusual transactions"""
+
+    async def handle_event(self, event_type: str, event_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply one write to the rolling state and alert on what changed"""
+        state = self.state
+        now = datetime.utcnow()
+        alerts: List[Dict[str, Any]] = []
+        decisions_created: List[str] = []
+
+        async with state.lock:
+            if state.built_at is None:
+                # Nothing to apply a delta to yet: the build absorbs this write
+                await self._rebuild(state, now, alerts, decisions_created)
+            elif event_type == EVENT_TRANSACTIONS_INGESTED:
+                await self._apply_new_transactions(state, now, alerts, decisions_created)
+            elif event_type == EVENT_RECONCILIATION_UPDATED:
+                await self._apply_reconciliation(state, event_data.get("transaction_ids"))
+            elif event_type == EVENT_ERP_INGESTED:
+                state.erp_latest = await self.orchestrator.executor.run(
+                    "monitoring_erp_freshness",
+                    lambda db: _parse_timestamp(DataWorker(db, self.entity_id).get_data_freshness()["erp_latest"]),
+                )
+                self._check_data_freshness(state, now, alerts)
+            elif event_type == EVENT_FORECAST_UPDATED:
+                await self._check_forecast(state, event_data.get("snapshot_id"), alerts, decisions_created)
+
+            state.events_applied += 1
+            state.events_since_tick += 1
+
+        self._log_alerts(alerts)
+        return {"event": event_type, "alerts": alerts, "decisions_created": decisions_created}
+
+    # =========================================================================
+    # BUILD AND DELTAS
+    # =========================================================================
+
+    async def _rebuild(
+        self,
+        state: MonitoringState,
+        now: datetime,
+        alerts: List[Dict],
+        decisions: List[str],
+    ):
+        """Reload the rolling state from the database (alert dedupe carries over)"""
+        entity_id = self.entity_id
+
+        def load(db):
+            data_worker = DataWorker(db, entity_id)
+            last_txn_id = data_worker.get_latest_transaction_id()
+            snapshot = data_worker.get_latest_snapshot()
+            return {
+                "last_txn_id": last_txn_id,
+                "recent": data_worker.get_transactions_after(0, since=now - timedelta(hours=state.flows.hours)),
+                "unmatched": ReconciliationWorker(db, entity_id).get_unmatched_items(),
+                "freshness": data_worker.get_data_freshness(),
+                "snapshot_id": snapshot.id if snapshot else None,
+            }
+
+        loaded = await self.orchestrator.executor.run("monitoring_rebuild", load)
+
+        state.last_txn_id = loaded["last_txn_id"]
+        state.flows = FlowWindow(state.flows.hours)
+        for movement in loaded["recent"]:
+            if movement.transaction_id <= state.last_txn_id:
+                state.flows.add(movement, now)
+
+        state.aging = AgingHistogram()
+        for item in loaded["unmatched"]:
+            if item["id"] <= state.last_txn_id:
+                state.aging.add(item)
+        state.warned_ids &= set(state.aging.items)
+        state.escalated_ids &= set(state.aging.items)
+        state.warned_through = state.escalated_through = None  # Rescan every band once
+
+        state.bank_latest = _parse_timestamp(loaded["freshness"]["bank_latest"])
+        state.erp_latest = _parse_timestamp(loaded["freshness"]["erp_latest"])
+
+        await self._check_forecast(state, loaded["snapshot_id"], alerts, decisions)
+
+        state.built_at = now
+        state.stale = False
+
+    async def _apply_new_transactions(
+        self,
+        state: MonitoringState,
+        now: datetime,
+        alerts: List[Dict],
+        decisions: List[str],
+    ):
+        """Pick up transactions above the watermark"""
+        entity_id, after_id = self.entity_id, state.last_txn_id
+
+        def load(db):
+            # One session, so both lists see the same set of transactions
+            return (
+                DataWorker(db, entity_id).get_transactions_after(after_id),
+                ReconciliationWorker(db, entity_id).get_unmatched_items(after_id=after_id),
+            )
+
+        movements, unmatched = await self.orchestrator.executor.run("monitoring_new_transactions", load)
+        if not movements:
+            return
+
+        state.last_txn_id = max(m.transaction_id for m in movements)
+        for movement in movements:
+            state.flows.add(movement, now)
+            if movement.timestamp and (state.bank_latest is None or movement.timestamp > state.bank_latest):
+                state.bank_latest = movement.timestamp
+        alerts.extend(self._check_unusual_transactions(movements))
+
+        for item in unmatched:
+            if item["id"] <= state.last_txn_id:
+                state.aging.add(item)
+
+        # Back-dated items can land behind the day the aging scan has reached
+        if state.warned_through is not None and any(
+            item["transaction_date"].date() <= state.warned_through
+            for item in unmatched if item.get("transaction_date")
+        ):
+            state.warned_through = state.escalated_through = None
+        self._check_reconciliation_aging(state, now.date(), alerts, decisions)
+        self._check_data_freshness(state, now, alerts)
+
+    async def _apply_reconciliation(self, state: MonitoringState, transaction_ids: Optional[List[int]]):
+        """Drop items that are now matched"""
+        entity_id = self.entity_id
+
+        if transaction_ids is not None:
+            tracked = [i for i in transaction_ids if i in state.aging.items]
+            if not tracked:
+                return
+            matched = await self.orchestrator.executor.run(
+                "monitoring_reconciled",
+                lambda db: ReconciliationWorker(db, entity_id).get_reconciled_ids(tracked),
+            )
+        else:
+            # No ids given: diff against the current unmatched set
+            unmatched = await self.orchestrator.executor.run(
+                "monitoring_unmatched",
+                lambda db: ReconciliationWorker(db, entity_id).get_unmatched_items(),
+            )
+            still_open = {item["id"] for item in unmatched}
+            matched = set(state.aging.items) - still_open
+            for item in unmatched:
+                if item["id"] <= state.last_txn_id and state.aging.add(item):
+                    state.warned_through = state.escalated_through = None  # Un-matched again
+
+        for item_id in matched:
+            state.aging.remove(item_id)
+            state.warned_ids.discard(item_id)
+            state.escalated_ids.discard(item_id)
+
+    # =========================================================================
+    # CHECKS
+    # =========================================================================
+
+    def _check_unusual_transactions(self, movements: List[CashMovement]) -> List[Dict[str, Any]]:
+        """Check new transactions for large amounts and unknown counterparties"""
         alerts = []
-        
-        # Get recent transactions
-        since = datetime.utcnow() - timedelta(hours=1)
-        inflows = self.data_worker.get_transactions_since(since, direction="inflow")
-        outflows = self.data_worker.get_transactions_since(since, direction="outflow")
-        
-        for txn in inflows + outflows:
+
+        for txn in movements:
             # Large transaction
             if txn.amount > self.large_txn_threshold:
                 alerts.append({
@@ -130,10 +458,10 @@ class ContinuousMonitoringWorkflow:
                         "transaction_id": txn.transaction_id,
                     },
                 })
-            
+
             # Unknown counterparty (new vendor/customer)
             if not txn.counterparty or txn.counterparty.lower() == "unknown":
-                if txn.amount > Decimal("10000"):
+                if txn.amount > self.unknown_counterparty_threshold:
                     alerts.append({
                         "type": "unknown_counterparty",
                         "severity": "warning",
@@ -144,89 +472,124 @@ class ContinuousMonitoringWorkflow:
                             "transaction_id": txn.transaction_id,
                         },
                     })
-        
+
         return alerts
-    
-    def _check_reconciliation_aging(self) -> tuple[List[Dict], List[str]]:
-        """Check for aged reconciliation items"""
-        alerts = []
-        decisions = []
-        
-        # Check warning threshold (7 days)
-        warning_items = self.recon_worker.get_aged_items(days_threshold=self.recon_warning_days)
-        
-        # Check escalation threshold (30 days)
-        escalate_items = self.recon_worker.get_aged_items(days_threshold=self.recon_escalate_days)
-        
-        # Warning alert
-        if warning_items and len(warning_items) != len(escalate_items):
-            new_warnings = len(warning_items) - len(escalate_items)
-            if new_warnings > 0:
-                alerts.append({
-                    "type": "reconciliation_aging_warning",
-                    "severity": "warning",
-                    "message": f"{new_warnings} items aged {self.recon_warning_days}-{self.recon_escalate_days} days",
-                    "details": {
-                        "count": new_warnings,
-                        "total_amount": str(sum(Decimal(str(i["amount"])) for i in warning_items[:new_warnings])),
-                    },
-                })
-        
+
+    def _check_reconciliation_aging(
+        self,
+        state: MonitoringState,
+        today: date,
+        alerts: List[Dict],
+        decisions: List[str],
+    ):
+        """Alert on items that crossed an aging threshold since the last check"""
+        warn_through = today - timedelta(days=self.recon_warning_days)
+        escalate_through = today - timedelta(days=self.recon_escalate_days)
+
+        escalated = [
+            item for item in state.aging.items_between(state.escalated_through, escalate_through)
+            if item["id"] not in state.escalated_ids
+        ]
+        warned = [
+            item for item in state.aging.items_between(state.warned_through, warn_through)
+            if item["id"] not in state.warned_ids and item["transaction_date"].date() > escalate_through
+        ]
+        state.warned_through, state.escalated_through = warn_through, escalate_through
+
+        if warned:
+            state.warned_ids.update(item["id"] for item in warned)
+            alerts.append({
+                "type": "reconciliation_aging_warning",
+                "severity": "warning",
+                "message": f"{len(warned)} items aged {self.recon_warning_days}-{self.recon_escalate_days} days",
+                "details": {
+                    "count": len(warned),
+                    "total_amount": str(sum(Decimal(i["amount"]) for i in warned)),
+                },
+            })
+
         # Escalation alert + decision
-        if escalate_items:
-            total_amount = sum(abs(Decimal(str(i["amount"]))) for i in escalate_items)
-            
+        if escalated:
+            state.warned_ids.update(item["id"] for item in escalated)
+            state.escalated_ids.update(item["id"] for item in escalated)
+            items = [self._aged_item(item, today) for item in escalated]
+            total_amount = sum(abs(Decimal(i["amount"])) for i in items)
+
             alerts.append({
                 "type": "reconciliation_aging_critical",
                 "severity": "critical",
-                "message": f"{len(escalate_items)} items aged > {self.recon_escalate_days} days",
+                "message": f"{len(items)} items aged > {self.recon_escalate_days} days",
                 "details": {
-                    "count": len(escalate_items),
+                    "count": len(items),
                     "total_amount": str(total_amount),
-                    "items": escalate_items[:5],  # Top 5
+                    "items": items[:5],  # Oldest 5
                 },
             })
-            
-            # Create decision for escalation
+
             decision = create_reconciliation_escalation_decision(
                 entity_id=self.entity_id,
-                unmatched_items=escalate_items,
+                unmatched_items=items,
                 total_amount=total_amount,
                 days_aged=self.recon_escalate_days,
             )
             self.orchestrator.decision_queue.add_decision(decision)
             decisions.append(decision.id)
-        
-        return alerts, decisions
-    
-    def _check_cash_runway(self) -> tuple[List[Dict], List[str]]:
+
+    async def _check_forecast(
+        self,
+        state: MonitoringState,
+        snapshot_id: Optional[int],
+        alerts: List[Dict],
+        decisions: List[str],
+    ):
+        """Runway and forecast drift for a (new) forecast"""
+        entity_id = self.entity_id
+
+        if snapshot_id is None:
+            snapshot = await self.orchestrator.executor.run(
+                "monitoring_snapshot", lambda db: DataWorker(db, entity_id).get_latest_snapshot(),
+            )
+            if not snapshot:
+                return
+            snapshot_id = snapshot.id
+
+        results = await self.orchestrator.executor.gather({
+            "monitoring_runway": lambda db: ForecastWorker(db, entity_id).get_runway(snapshot_id),
+            "monitoring_regime": lambda db: ForecastWorker(db, entity_id).detect_regime_shift(snapshot_id),
+            "monitoring_accuracy": lambda db: ForecastWorker(db, entity_id).get_forecast_accuracy(),
+        })
+        state.runway = {"snapshot_id": snapshot_id, **results["monitoring_runway"]}
+
+        alerts.extend(self._check_cash_runway(state, snapshot_id, results["monitoring_runway"], decisions))
+        alerts.extend(self._check_forecast_drift(results["monitoring_regime"], results["monitoring_accuracy"]))
+
+    def _check_cash_runway(
+        self,
+        state: MonitoringState,
+        snapshot_id: int,
+        runway: Dict[str, Any],
+        decisions: List[str],
+    ) -> List[Dict[str, Any]]:
         """Check cash runway"""
         alerts = []
-        decisions = []
-        
-        snapshot = self.data_worker.get_latest_snapshot()
-        if not snapshot:
-            return alerts, decisions
-        
-        runway = self.forecast_worker.get_runway(snapshot.id)
         runway_weeks = runway.get("runway_weeks", 99)
-        
+
         if runway_weeks < self.min_runway_weeks:
             severity = "critical" if runway_weeks < 4 else "warning"
-            
+
             alerts.append({
                 "type": "low_runway",
                 "severity": severity,
                 "message": f"Cash runway: {runway_weeks} weeks (below {self.min_runway_weeks} week threshold)",
                 "details": runway,
             })
-            
-            # Create shortfall decision if critical
-            if runway_weeks < 4:
+
+            # Create shortfall decision if critical (once per snapshot)
+            if runway_weeks < 4 and state.shortfall_snapshot_id != snapshot_id:
                 min_cash = Decimal(str(runway.get("min_cash_amount", 0)))
                 decision = create_cash_shortfall_decision(
                     entity_id=self.entity_id,
-                    snapshot_id=snapshot.id,
+                    snapshot_id=snapshot_id,
                     shortfall_amount=abs(min_cash) if min_cash < 0 else Decimal("50000"),
                     shortfall_week=runway.get("min_cash_week", runway_weeks),
                     options=[
@@ -243,21 +606,15 @@ class ContinuousMonitoringWorkflow:
                     recommendation="Immediate management review required",
                 )
                 self.orchestrator.decision_queue.add_decision(decision)
+                state.shortfall_snapshot_id = snapshot_id
                 decisions.append(decision.id)
-        
-        return alerts, decisions
-    
-    def _check_forecast_drift(self) -> List[Dict[str, Any]]:
+
+        return alerts
+
+    def _check_forecast_drift(self, regime: Dict[str, Any], accuracy: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Check for significant forecast drift"""
         alerts = []
-        
-        snapshot = self.data_worker.get_latest_snapshot()
-        if not snapshot:
-            return alerts
-        
-        # Check for regime shift
-        regime = self.forecast_worker.detect_regime_shift(snapshot.id)
-        
+
         if regime.get("regime_shift_detected"):
             alerts.append({
                 "type": "regime_shift",
@@ -265,10 +622,7 @@ class ContinuousMonitoringWorkflow:
                 "message": f"Regime shift detected: {regime.get('description', 'Payment patterns have changed')}",
                 "details": regime,
             })
-        
-        # Check forecast accuracy trend
-        accuracy = self.forecast_worker.get_forecast_accuracy()
-        
+
         if accuracy.get("trend") == "declining":
             alerts.append({
                 "type": "forecast_degradation",
@@ -276,37 +630,73 @@ class ContinuousMonitoringWorkflow:
                 "message": f"Forecast accuracy declining: {accuracy.get('accuracy_pct', 0):.0f}%",
                 "details": accuracy,
             })
-        
-        return alerts
-    
-    def _check_data_freshness(self) -> List[Dict[str, Any]]:
-        """Check data freshness"""
-        alerts = []
-        
-        freshness = self.data_worker.get_data_freshness()
-        
-        # Bank data stale (> 24 hours)
-        bank_hours = freshness.get("bank_hours_old")
-        if bank_hours and bank_hours > 24:
-            alerts.append({
-                "type": "bank_data_stale",
-                "severity": "warning",
-                "message": f"Bank data is {bank_hours:.0f} hours old",
-                "details": freshness,
-            })
-        
-        # Large mismatch between bank and ERP freshness
-        mismatch = freshness.get("freshness_mismatch_hours", 0)
-        if mismatch > 12:
-            alerts.append({
-                "type": "freshness_mismatch",
-                "severity": "info",
-                "message": f"Bank/ERP data freshness mismatch: {mismatch:.0f} hours",
-                "details": freshness,
-            })
-        
+
         return alerts
 
+    def _check_data_freshness(self, state: MonitoringState, now: datetime, alerts: List[Dict]):
+        """Alert when data goes stale (once, until it is fresh again)"""
+        bank_hours = (now - state.bank_latest).total_seconds() / 3600 if state.bank_latest else None
+        erp_hours = (now - state.erp_latest).total_seconds() / 3600 if state.erp_latest else None
+        mismatch = abs((bank_hours or 0) - (erp_hours or 0))
+        freshness = {
+            "bank_latest": state.bank_latest.isoformat() if state.bank_latest else None,
+            "bank_hours_old": round(bank_hours, 1) if bank_hours else None,
+            "erp_latest": state.erp_latest.isoformat() if state.erp_latest else None,
+            "erp_hours_old": round(erp_hours, 1) if erp_hours else None,
+            "freshness_mismatch_hours": mismatch,
+        }
+
+        conditions = {
+            # Bank data stale (> 24 hours)
+            "bank_data_stale": (
+                bool(bank_hours and bank_hours > self.stale_bank_hours),
+                "warning",
+                f"Bank data is {bank_hours or 0:.0f} hours old",
+            ),
+            # Large mismatch between bank and ERP freshness
+            "freshness_mismatch": (
+                mismatch > self.freshness_mismatch_hours,
+                "info",
+                f"Bank/ERP data freshness mismatch: {mismatch:.0f} hours",
+            ),
+        }
+        for alert_type, (active, severity, message) in conditions.items():
+            if not active:
+                state.active_freshness_alerts.discard(alert_type)
+            elif alert_type not in state.active_freshness_alerts:
+                state.active_freshness_alerts.add(alert_type)
+                alerts.append({"type": alert_type, "severity": severity, "message": message, "details": freshness})
+
+    # =========================================================================
+    # HELPERS
+    # =========================================================================
+
+    def _aged_item(self, item: Dict[str, Any], today: date) -> Dict[str, Any]:
+        days_aged = (today - item["transaction_date"].date()).days
+        aged = {k: v for k, v in item.items() if k != "transaction_date"}
+        aged["days_aged"] = days_aged
+        aged["severity"] = "critical" if days_aged > self.recon_escalate_days else "warning"
+        return aged
+
+    def _aging_summary(self, state: MonitoringState, today: date) -> Dict[str, Any]:
+        warn_through = today - timedelta(days=self.recon_warning_days)
+        escalate_through = today - timedelta(days=self.recon_escalate_days)
+        return {
+            "unmatched": len(state.aging),
+            f"under_{self.recon_warning_days}_days": state.aging.band(warn_through, None),
+            f"{self.recon_warning_days}_{self.recon_escalate_days}_days": state.aging.band(escalate_through, warn_through),
+            f"over_{self.recon_escalate_days}_days": state.aging.band(None, escalate_through),
+        }
+
+    def _log_alerts(self, alerts: List[Dict[str, Any]]):
+        for alert in alerts:
+            self.orchestrator.audit_log.log(
+                action=AuditAction.ALERT_TRIGGERED,
+                description=alert["message"],
+                details=alert,
+                severity=AuditSeverity(alert["severity"]),
+            )
+
 
 async def run_continuous_monitoring(
     orchestrator: 'FPAOrchestrator',
@@ -315,8 +705,17 @@ async def run_continuous_monitoring(
 ) -> Dict[str, Any]:
     """
     Entry point for continuous monitoring workflow.
-    
+
     Called by the orchestrator.
     """
     workflow = ContinuousMonitoringWorkflow(orchestrator)
     return await workflow.run()
+
+
+def register_monitoring_events(orchestrator: 'FPAOrchestrator'):
+    """Route ingestion, reconciliation and forecast events to continuous monitoring"""
+    for event_type in MONITORING_EVENTS:
+        async def handler(orchestrator, event_data, event_type=event_type):
+            return await ContinuousMonitoringWorkflow(orchestrator).handle_event(event_type, event_data)
+
+        orchestrator.register_event_handler(event_type, handler)
@@ -13,6 +13,8 @@ from typing import Optional, Dict, Any, TYPE_CHECKING
 import logging
 import uuid
 
+from sqlalchemy.orm import Session
+
 if TYPE_CHECKING:
     from ..orchestrator import FPAOrchestrator
 
@@ -44,37 +46,35 @@ class MorningBriefingWorkflow:
         self.orchestrator = orchestrator
         self.db = orchestrator.db
         self.entity_id = orchestrator.entity_id
-        
-        # Initialize workers
-        self.data_worker = DataWorker(self.db, self.entity_id)
-        self.recon_worker = ReconciliationWorker(self.db, self.entity_id)
-        self.forecast_worker = ForecastWorker(self.db, self.entity_id)
     
     async def run(self) -> MorningBriefing:
         """Generate the morning briefing"""
         today = date.today()
         now = datetime.utcnow()
+        entity_id = self.entity_id
         
         logger.info(f"Generating morning briefing for {today}")
         
-        # 1. Get cash position
-        cash_position = self.data_worker.get_cash_position()
-        
-        # 2. Get overnight activity
-        overnight_inflows, overnight_outflows = self.data_worker.get_overnight_transactions()
+        # 1-4. Cash position, overnight activity, today's expected movements and
+        # attention items are independent reads; run them side by side off the loop
+        steps = await self.orchestrator.executor.gather({
+            "cash_position": lambda db: DataWorker(db, entity_id).get_cash_position(),
+            "overnight_transactions": lambda db: DataWorker(db, entity_id).get_overnight_transactions(),
+            "expected_inflows": lambda db: DataWorker(db, entity_id).get_expected_inflows(today, days_ahead=1),
+            "expected_outflows": lambda db: DataWorker(db, entity_id).get_expected_outflows(today, days_ahead=1),
+            "attention_items": self._get_attention_items,
+        })
+        cash_position = steps["cash_position"]
+        overnight_inflows, overnight_outflows = steps["overnight_transactions"]
+        expected_inflows = steps["expected_inflows"]
+        expected_outflows = steps["expected_outflows"]
+        attention_items = steps["attention_items"]
         
-        # 3. Identify surprises
+        # 5. Identify surprises
         surprises = self._identify_surprises(
             cash_position, overnight_inflows, overnight_outflows
         )
         
-        # 4. Get today's expected movements
-        expected_inflows = self.data_worker.get_expected_inflows(today, days_ahead=1)
-        expected_outflows = self.data_worker.get_expected_outflows(today, days_ahead=1)
-        
-        # 5. Get attention items
-        attention_items = self._get_attention_items()
-        
         # 6. Calculate metrics
         position_vs_forecast_pct = 0.0
         if cash_position.expected_balance != 0:
@@ -162,12 +162,15 @@ class MorningBriefingWorkflow:
         
         return surprises
     
-    def _get_attention_items(self) -> list[AttentionItem]:
-        """Get items that need attention today"""
+    def _get_attention_items(self, db: Session) -> list[AttentionItem]:
+        """Get items that need attention today (runs in the executor with its own session)"""
+        data_worker = DataWorker(db, self.entity_id)
+        recon_worker = ReconciliationWorker(db, self.entity_id)
+        forecast_worker = ForecastWorker(db, self.entity_id)
         items = []
         
         # Check for overdue invoices
-        expected_inflows = self.data_worker.get_expected_inflows(
+        expected_inflows = data_worker.get_expected_inflows(
             date.today() - timedelta(days=7),
             days_ahead=7,
         )
@@ -185,7 +188,7 @@ class MorningBriefingWorkflow:
             ))
         
         # Check for aged reconciliation items
-        aged_items = self.recon_worker.get_aged_items(days_threshold=7)
+        aged_items = recon_worker.get_aged_items(days_threshold=7)
         if aged_items:
             total_aged = sum(Decimal(str(i["amount"])) for i in aged_items)
             items.append(AttentionItem(
@@ -198,9 +201,9 @@ class MorningBriefingWorkflow:
             ))
         
         # Check runway
-        snapshot = self.data_worker.get_latest_snapshot()
+        snapshot = data_worker.get_latest_snapshot()
         if snapshot:
-            runway = self.forecast_worker.get_runway(snapshot.id)
+            runway = forecast_worker.get_runway(snapshot.id)
             if runway.get("runway_weeks", 99) < 8:
                 items.append(AttentionItem(
                     severity=AttentionSeverity.CRITICAL,
@@ -7,9 +7,13 @@ Uses LLM reasoning to provide contextual answers.
 
 from datetime import datetime, date
 from decimal import Decimal
-from typing import Optional, Dict, Any, List, TYPE_CHECKING
+from typing import Optional, Dict, Any, List, Callable, TYPE_CHECKING
 import logging
 
+from sqlalchemy.orm import Session
+
+from evidence_index import QuestionRouter, get_evidence_index
+
 if TYPE_CHECKING:
     from ..orchestrator import FPAOrchestrator
 
@@ -18,10 +22,48 @@ from ..workers.reconciliation_worker import ReconciliationWorker
 from ..workers.forecast_worker import ForecastWorker
 from ..workers.variance_worker import VarianceWorker
 from ..audit_log import AuditAction
+from ..context_cache import ContextCache, ContextLookup, get_context_cache
 
 logger = logging.getLogger(__name__)
 
 
+# Retrievals behind the answers: context name -> loader(db, entity_id, snapshot_id)
+CONTEXT_LOADERS: Dict[str, Callable[[Session, int, Optional[int]], Any]] = {
+    "cash_position": lambda db, entity_id, snapshot_id: DataWorker(db, entity_id).get_cash_position(),
+    "overnight_activity": lambda db, entity_id, snapshot_id: DataWorker(db, entity_id).get_overnight_transactions(),
+    "freshness": lambda db, entity_id, snapshot_id: DataWorker(db, entity_id).get_data_freshness(),
+    "forecast_4w": lambda db, entity_id, snapshot_id: ForecastWorker(db, entity_id).generate_forecast(snapshot_id, weeks=4),
+    "forecast": lambda db, entity_id, snapshot_id: ForecastWorker(db, entity_id).generate_forecast(snapshot_id),
+    "accuracy": lambda db, entity_id, snapshot_id: ForecastWorker(db, entity_id).get_forecast_accuracy(),
+    "runway": lambda db, entity_id, snapshot_id: ForecastWorker(db, entity_id).get_runway(snapshot_id),
+    "recon_status": lambda db, entity_id, snapshot_id: ReconciliationWorker(db, entity_id).get_reconciliation_status(),
+    "aged_items": lambda db, entity_id, snapshot_id: ReconciliationWorker(db, entity_id).get_aged_items(),
+    "unmatched_summary": lambda db, entity_id, snapshot_id: ReconciliationWorker(db, entity_id).get_unmatched_summary(),
+}
+
+# Contexts that need a snapshot; left out when the entity has none
+SNAPSHOT_CONTEXTS = {"forecast_4w", "forecast", "runway"}
+
+# Field a context is exposed under when it differs from its name
+CONTEXT_FIELDS = {"forecast_4w": "forecast"}
+
+_CASH_CONTEXTS = ["cash_position", "overnight_activity", "freshness", "forecast_4w"]
+_FORECAST_CONTEXTS = ["cash_position", "accuracy", "forecast"]
+_RECON_CONTEXTS = ["cash_position", "recon_status", "aged_items", "unmatched_summary"]
+
+QUESTION_CONTEXTS: Dict[str, List[str]] = {
+    "cash_down": _CASH_CONTEXTS,
+    "variance": _CASH_CONTEXTS,
+    "position": _CASH_CONTEXTS,
+    "forecast_accuracy": _FORECAST_CONTEXTS,
+    "forecast": _FORECAST_CONTEXTS,
+    "overdue": _RECON_CONTEXTS,
+    "reconciliation": _RECON_CONTEXTS,
+    "runway": ["cash_position", "runway", "forecast"],
+    "general": ["cash_position"],
+}
+
+
 class QuestionAnsweringWorkflow:
     """
     Answers FP&A questions using available data and LLM reasoning.
@@ -44,6 +86,7 @@ class QuestionAnsweringWorkflow:
         "reconciliation": ["reconciliation", "unmatched", "matching"],
         "position": ["cash position", "how much cash", "balance"],
     }
+    ROUTER = QuestionRouter(QUESTION_PATTERNS)
     
     def __init__(self, orchestrator: 'FPAOrchestrator'):
         self.orchestrator = orchestrator
@@ -60,19 +103,27 @@ class QuestionAnsweringWorkflow:
         self,
         question: str,
         context: Optional[Dict[str, Any]] = None,
+        conversation_id: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Answer an FP&A question"""
         logger.info(f"Answering question: {question[:100]}...")
+        lookup = get_context_cache().lookup(conversation_id)
         
         # Detect question type
         question_type = self._detect_question_type(question)
         
         # Gather relevant context
-        data_context = self._gather_context(question_type, context)
+        data_context = await self._gather_context(question_type, context, lookup)
         
         # Generate answer
         answer = self._generate_answer(question, question_type, data_context)
         
+        # Snapshot records the question names (customers, document numbers, references)
+        evidence = await self._find_evidence(question, data_context["snapshot_id"])
+        
+        # Warm the contexts the suggested follow-ups will need
+        self._prefetch_follow_ups(answer.get("follow_ups", []), data_context["snapshot_id"], lookup)
+        
         result = {
             "question": question,
             "question_type": question_type,
@@ -80,7 +131,9 @@ class QuestionAnsweringWorkflow:
             "supporting_data": answer.get("data", {}),
             "confidence": answer.get("confidence", 0.8),
             "sources": answer.get("sources", []),
+            "evidence": evidence,
             "follow_up_questions": answer.get("follow_ups", []),
+            "context_cache": lookup.metadata(),
             "timestamp": datetime.utcnow().isoformat(),
         }
         
@@ -88,48 +141,41 @@ class QuestionAnsweringWorkflow:
     
     def _detect_question_type(self, question: str) -> str:
         """Detect the type of question being asked"""
-        question_lower = question.lower()
-        
-        for q_type, patterns in self.QUESTION_PATTERNS.items():
-            if any(pattern in question_lower for pattern in patterns):
-                return q_type
-        
-        return "general"
+        return self.ROUTER.route(question, default="general")
+    
+    def _context_names(self, question_type: str, snapshot_id: Optional[int]) -> List[str]:
+        names = QUESTION_CONTEXTS.get(question_type, QUESTION_CONTEXTS["general"])
+        if snapshot_id is None:
+            names = [name for name in names if name not in SNAPSHOT_CONTEXTS]
+        return names
     
-    def _gather_context(
+    def _context_step(self, lookup: ContextLookup, snapshot_id: Optional[int], name: str) -> Callable[[Session], Any]:
+        key = ContextCache.make_key(self.entity_id, snapshot_id, name)
+        return lambda db: lookup.get_or_load(key, lambda: CONTEXT_LOADERS[name](db, self.entity_id, snapshot_id))
+    
+    async def _gather_context(
         self,
         question_type: str,
         user_context: Optional[Dict] = None,
+        lookup: Optional[ContextLookup] = None,
     ) -> Dict[str, Any]:
-        """Gather relevant data context for the question"""
-        context = {}
-        
-        # Always get current position and snapshot
-        context["cash_position"] = self.data_worker.get_cash_position()
-        snapshot = self.data_worker.get_latest_snapshot()
-        context["snapshot_id"] = snapshot.id if snapshot else None
-        
-        # Add type-specific context
-        if question_type in ["cash_down", "variance", "position"]:
-            context["overnight_activity"] = self.data_worker.get_overnight_transactions()
-            context["freshness"] = self.data_worker.get_data_freshness()
-            if snapshot:
-                context["forecast"] = self.forecast_worker.generate_forecast(snapshot.id, weeks=4)
-        
-        if question_type in ["forecast_accuracy", "forecast"]:
-            context["accuracy"] = self.forecast_worker.get_forecast_accuracy()
-            if snapshot:
-                context["forecast"] = self.forecast_worker.generate_forecast(snapshot.id)
-        
-        if question_type in ["overdue", "reconciliation"]:
-            context["recon_status"] = self.recon_worker.get_reconciliation_status()
-            context["aged_items"] = self.recon_worker.get_aged_items()
-            context["unmatched_summary"] = self.recon_worker.get_unmatched_summary()
-        
-        if question_type == "runway":
-            if snapshot:
-                context["runway"] = self.forecast_worker.get_runway(snapshot.id)
-                context["forecast"] = self.forecast_worker.generate_forecast(snapshot.id)
+        """Gather relevant data context for the question, reusing cached retrievals"""
+        lookup = lookup or get_context_cache().lookup()
+        executor = self.orchestrator.executor
+        
+        # A new latest snapshot drops everything cached for the entity
+        snapshot_id = await executor.run(
+            "latest_snapshot",
+            lambda db: getattr(DataWorker(db, self.entity_id).get_latest_snapshot(), "id", None),
+        )
+        lookup.cache.observe_snapshot(self.entity_id, snapshot_id)
+        
+        names = self._context_names(question_type, snapshot_id)
+        results = await executor.gather({name: self._context_step(lookup, snapshot_id, name) for name in names})
+        
+        context = {"snapshot_id": snapshot_id}
+        for name, value in results.items():
+            context[CONTEXT_FIELDS.get(name, name)] = value
         
         # Merge user-provided context
         if user_context:
@@ -137,6 +183,36 @@ class QuestionAnsweringWorkflow:
         
         return context
     
+    async def _find_evidence(self, question: str, snapshot_id: Optional[int], limit: int = 5) -> List[Dict[str, Any]]:
+        """Probe the snapshot's evidence index with the question, minus its routing words"""
+        if snapshot_id is None:
+            return []
+        
+        def search(db):
+            index = get_evidence_index(db, snapshot_id)
+            if index is None:
+                return []
+            hits = index.search(question, limit=limit, ignore=self.ROUTER.vocabulary)
+            return [{**doc.to_dict(), "score": score} for doc, score in hits]
+        
+        return await self.orchestrator.executor.run("evidence", search)
+    
+    def _prefetch_follow_ups(self, follow_ups: List[str], snapshot_id: Optional[int], lookup: ContextLookup):
+        """Start loading what the suggested follow-up questions need, in the background"""
+        executor = self.orchestrator.executor
+        if not executor.concurrent_sessions:
+            return  # Nothing to load on besides the orchestrator's own session
+        
+        for follow_up in follow_ups:
+            for name in self._context_names(self._detect_question_type(follow_up), snapshot_id):
+                key = ContextCache.make_key(self.entity_id, snapshot_id, name)
+                load = CONTEXT_LOADERS[name]
+                lookup.prefetch(
+                    key,
+                    lambda db, load=load: load(db, self.entity_id, snapshot_id),
+                    executor.session_factory,
+                )
+    
     def _generate_answer(
         self,
         question: str,
@@ -280,7 +356,7 @@ class QuestionAnsweringWorkflow:
         """Answer runway questions"""
         runway = context.get("runway", {})
         
-        weeks = runway.get("runway_weeks", 0)
+        weeks = runway.get("runway_weeks") or 0  # None when no forecast could be generated
         min_cash = runway.get("min_cash_amount", "0")
         min_week = runway.get("min_cash_week", 0)
         
@@ -426,6 +502,7 @@ async def run_question_answering(
     entity_id: int,
     question: str,
     context: Optional[Dict[str, Any]] = None,
+    conversation_id: Optional[str] = None,
     **kwargs,
 ) -> Dict[str, Any]:
     """
@@ -434,4 +511,4 @@ async def run_question_answering(
     Called by the orchestrator.
     """
     workflow = QuestionAnsweringWorkflow(orchestrator)
-    return await workflow.run(question=question, context=context)
+    return await workflow.run(question=question, context=context, conversation_id=conversation_id)
@@ -16,6 +16,8 @@ from typing import Optional, Dict, Any, List, TYPE_CHECKING
 import logging
 import uuid
 
+from sqlalchemy.orm import Session
+
 if TYPE_CHECKING:
     from ..orchestrator import FPAOrchestrator
 
@@ -72,19 +74,21 @@ class WeeklyMeetingPrepWorkflow:
         if not snapshot:
             raise ValueError("No snapshot available")
         
-        # 1. Generate 13-week forecast
-        forecast_result = self.forecast_worker.generate_forecast(snapshot.id, weeks=13)
-        forecast_weeks = forecast_result.get("weeks", [])
-        
-        # 2. Get previous week's forecast for comparison
-        forecast_comparisons = self._get_forecast_comparisons(snapshot.id)
-        
-        # 3. Get cash metrics
-        cash_position = self.data_worker.get_cash_position()
-        runway = self.forecast_worker.get_runway(snapshot.id)
-        
-        # 4. Get forecast accuracy
-        accuracy = self.forecast_worker.get_accuracy_metrics()
+        # 1-4. Forecast, week-over-week comparison, cash metrics and accuracy
+        # are independent reads; run them side by side off the loop
+        entity_id, current_id = self.entity_id, snapshot.id
+        steps = await self.orchestrator.executor.gather({
+            "forecast": lambda db: ForecastWorker(db, entity_id).generate_forecast(current_id, weeks=13),
+            "forecast_comparisons": lambda db: self._get_forecast_comparisons(db, current_id),
+            "cash_position": lambda db: DataWorker(db, entity_id).get_cash_position(),
+            "runway": lambda db: ForecastWorker(db, entity_id).get_runway(current_id),
+            "forecast_accuracy": lambda db: ForecastWorker(db, entity_id).get_forecast_accuracy(),
+        })
+        forecast_weeks = steps["forecast"].get("weeks", [])
+        forecast_comparisons = steps["forecast_comparisons"]
+        cash_position = steps["cash_position"]
+        runway = steps["runway"]
+        accuracy = steps["forecast_accuracy"]
         
         # 5. Generate talking points
         talking_points = self._generate_talking_points(
@@ -109,8 +113,8 @@ class WeeklyMeetingPrepWorkflow:
             current_cash=cash_position.current_balance,
             min_cash_week=runway.get("min_cash_week", 0),
             min_cash_amount=Decimal(str(runway.get("min_cash_amount", 0))),
-            runway_weeks=runway.get("runway_weeks", 0),
-            forecast_accuracy_pct=accuracy.get("accuracy_pct", 0) or 0,
+            runway_weeks=runway.get("runway_weeks"),
+            forecast_accuracy_pct=accuracy.get("accuracy_pct"),
             accuracy_trend=accuracy.get("trend", "stable"),
             accuracy_vs_last_month=0,  # Would need historical data
             talking_points=talking_points,
@@ -136,11 +140,11 @@ class WeeklyMeetingPrepWorkflow:
         
         return pack
     
-    def _get_forecast_comparisons(self, current_snapshot_id: int) -> List[ForecastComparison]:
-        """Compare current forecast to previous week's"""
+    def _get_forecast_comparisons(self, db: Session, current_snapshot_id: int) -> List[ForecastComparison]:
+        """Compare current forecast to previous week's (runs in the executor with its own session)"""
         # Get previous snapshot
         import models
-        previous_snapshot = self.db.query(models.Snapshot).filter(
+        previous_snapshot = db.query(models.Snapshot).filter(
             models.Snapshot.entity_id == self.entity_id,
             models.Snapshot.id != current_snapshot_id,
         ).order_by(models.Snapshot.created_at.desc()).first()
@@ -148,7 +152,7 @@ class WeeklyMeetingPrepWorkflow:
         if not previous_snapshot:
             return []
         
-        comparisons = self.forecast_worker.compare_forecasts(
+        comparisons = ForecastWorker(db, self.entity_id).compare_forecasts(
             current_snapshot_id, previous_snapshot.id
         )
         
@@ -214,23 +218,32 @@ class WeeklyMeetingPrepWorkflow:
             severity=AttentionSeverity.INFO,
         ))
         
-        # 2. Runway status
+        # 2. Runway status (None when no forecast could be generated)
         order += 1
-        runway_weeks = runway.get("runway_weeks", 0)
-        severity = (
-            AttentionSeverity.CRITICAL if runway_weeks < 8
-            else AttentionSeverity.WARNING if runway_weeks < 13
-            else AttentionSeverity.INFO
-        )
-        points.append(TalkingPoint(
-            order=order,
-            headline=f"Cash runway: {runway_weeks} weeks",
-            detail=f"Minimum cash of €{Decimal(str(runway.get('min_cash_amount', 0))):,.0f} "
-                   f"projected in week {runway.get('min_cash_week', 0)}",
-            supporting_data=runway,
-            severity=severity,
-            action_required=runway_weeks < 13,
-        ))
+        runway_weeks = runway.get("runway_weeks")
+        if runway_weeks is None:
+            points.append(TalkingPoint(
+                order=order,
+                headline="Cash runway: not available",
+                detail=runway.get("error") or "No forecast to project runway from",
+                supporting_data=runway,
+                severity=AttentionSeverity.WARNING,
+            ))
+        else:
+            severity = (
+                AttentionSeverity.CRITICAL if runway_weeks < 8
+                else AttentionSeverity.WARNING if runway_weeks < 13
+                else AttentionSeverity.INFO
+            )
+            points.append(TalkingPoint(
+                order=order,
+                headline=f"Cash runway: {runway_weeks} weeks",
+                detail=f"Minimum cash of €{Decimal(str(runway.get('min_cash_amount', 0))):,.0f} "
+                       f"projected in week {runway.get('min_cash_week', 0)}",
+                supporting_data=runway,
+                severity=severity,
+                action_required=runway_weeks < 13,
+            ))
         
         # 3. Key forecast changes
         material_changes = [c for c in comparisons if abs(c.variance) > Decimal("10000")]
@@ -247,13 +260,13 @@ class WeeklyMeetingPrepWorkflow:
                 severity=AttentionSeverity.WARNING if total_change < 0 else AttentionSeverity.INFO,
             ))
         
-        # 4. Forecast accuracy
+        # 4. Forecast accuracy (None until there are comparable snapshots)
         order += 1
-        acc_pct = accuracy.get("accuracy_pct", 0)
+        acc_pct = accuracy.get("accuracy_pct")
         points.append(TalkingPoint(
             order=order,
-            headline=f"Forecast accuracy: {acc_pct:.0f}%",
-            detail=f"Trend: {accuracy.get('trend', 'stable')}",
+            headline=f"Forecast accuracy: {acc_pct:.0f}%" if acc_pct is not None else "Forecast accuracy: not available",
+            detail=f"Trend: {accuracy.get('trend', 'stable')}" if acc_pct is not None else accuracy.get("error", ""),
             supporting_data=accuracy,
             severity=AttentionSeverity.INFO,
         ))
@@ -326,7 +339,8 @@ class WeeklyMeetingPrepWorkflow:
         risks = []
         
         # Runway risk
-        if runway.get("runway_weeks", 99) < 13:
+        runway_weeks = runway.get("runway_weeks")
+        if runway_weeks is not None and runway_weeks < 13:
             risks.append(f"Cash runway below 13 weeks ({runway.get('runway_weeks')} weeks)")
         
         # Concentration risk
@@ -350,8 +364,11 @@ class WeeklyMeetingPrepWorkflow:
         lines.append(f"Weekly Cash Meeting Pack - {pack.pack_date.strftime('%B %d, %Y')}")
         lines.append("")
         lines.append(f"Current cash: €{pack.current_cash:,.0f}")
-        lines.append(f"Runway: {pack.runway_weeks} weeks")
-        lines.append(f"Forecast accuracy: {pack.forecast_accuracy_pct:.0f}% ({pack.accuracy_trend})")
+        lines.append(f"Runway: {pack.runway_weeks} weeks" if pack.runway_weeks is not None else "Runway: not available")
+        if pack.forecast_accuracy_pct is not None:
+            lines.append(f"Forecast accuracy: {pack.forecast_accuracy_pct:.0f}% ({pack.accuracy_trend})")
+        else:
+            lines.append("Forecast accuracy: not available")
         
         if pack.decisions_pending:
             lines.append(f"\n{len(pack.decisions_pending)} decision(s) require approval")
@@ -365,10 +382,10 @@ class WeeklyMeetingPrepWorkflow:
         """Generate recommended actions"""
         actions = []
         
-        if pack.runway_weeks < 13:
+        if pack.runway_weeks is not None and pack.runway_weeks < 13:
             actions.append("Review cash management options to extend runway")
         
-        if pack.forecast_accuracy_pct < 85:
+        if pack.forecast_accuracy_pct is not None and pack.forecast_accuracy_pct < 85:
             actions.append("Investigate forecast accuracy drivers")
         
         if pack.decisions_pending:
@@ -1,6 +1,7 @@
 """
 Async Operations Service
-Handles long-running operations: upload parsing, reconciliation, forecast computation.
+Handles long-running operations: upload parsing, reconciliation, forecast computation,
+board pack generation.
 """
 
 from sqlalchemy.orm import Session
@@ -26,6 +27,8 @@ class AsyncTask:
         self.completed_at = None
         self.result = None
         self.error = None
+        self.progress = 0
+        self.message = None
 
 
 # In-memory task store (in production, use Redis or database)
@@ -57,6 +60,8 @@ def get_task_status(task_id: str) -> Optional[Dict[str, Any]]:
             "status": task.status,
             "created_at": task.created_at.isoformat() if task.created_at else None,
             "completed_at": task.completed_at.isoformat() if task.completed_at else None,
+            "progress": task.progress,
+            "message": task.message,
             "result": task.result,
             "error": task.error
         }
@@ -71,6 +76,18 @@ def update_task_status(task_id: str, status: str, result: Any = None, error: str
             task.completed_at = datetime.utcnow() if status in ["completed", "failed"] else None
             task.result = result
             task.error = error
+            if status == "completed":
+                task.progress = 100
+
+
+def update_task_progress(task_id: str, progress: int, message: str = None):
+    """Record progress (0-100) of a running task"""
+    with _task_lock:
+        task = _task_store.get(task_id)
+        if task:
+            task.status = "running"
+            task.progress = max(task.progress, min(int(progress), 100))
+            task.message = message
 
 
 def run_async_upload_parsing(db: Session, file_content: bytes, entity_id: int, mapping_config: dict = None):
@@ -151,5 +168,57 @@ def run_async_forecast(db: Session, snapshot_id: int):
     return task_id
 
 
-
-
+def run_async_board_pack(
+    entity_id: int,
+    snapshot_id: int,
+    plan_id: int = None,
+    previous_pack_id: int = None,
+    generated_by: str = None,
+    session_factory=None
+):
+    """
+    Run board pack generation asynchronously, reporting progress as slides render.
+    
+    Engines where every session shares one connection (SQLite with StaticPool
+    or in-memory) build the pack in the caller's thread instead: a background
+    commit or rollback would land on whatever request transaction is open.
+    """
+    from agents.executor import supports_concurrent_sessions
+    
+    if session_factory is None:
+        from database import SessionLocal
+        session_factory = SessionLocal
+    task_id = create_async_task("board_pack")
+    
+    def _generate():
+        db = session_factory()
+        try:
+            from board_pack_service import BoardPackService
+            
+            pack = BoardPackService(db).generate_board_pack(
+                entity_id=entity_id,
+                snapshot_id=snapshot_id,
+                plan_id=plan_id,
+                previous_pack_id=previous_pack_id,
+                generated_by=generated_by,
+                progress=lambda percent, message: update_task_progress(task_id, percent, message)
+            )
+            build = pack.pack_data_json.get("build", {})
+            update_task_status(task_id, "completed", {
+                "pack_id": pack.id,
+                "reused_from_pack_id": build.get("reused_from_pack_id"),
+                "reused_slides": build.get("reused_slides", []),
+                "rendered_slides": build.get("rendered_slides", [])
+            })
+        except Exception as e:
+            db.rollback()
+            update_task_status(task_id, "failed", error=str(e))
+        finally:
+            db.close()
+    
+    bind = getattr(session_factory, "kw", {}).get("bind")
+    if bind is not None and not supports_concurrent_sessions(bind):
+        _generate()
+    else:
+        executor.submit(_generate)
+    return task_id
@@ -0,0 +1,383 @@
+"""
+Bank Balance Ledger
+
+Per-account daily running balances. Each bank account holds one row per day
+with transactions: the day's net movement and the cumulative net through the
+end of that day. A point-in-time balance is one index seek on
+(bank_account_id, day) for the latest close on or before the date, anchored
+to the balance the bank reported, so cash position reads cost a fixed number
+of queries per call instead of summing every transaction. A run of days
+(balance history) reads the closes once and binary-searches them per day.
+Consolidated views convert each currency with the snapshot's FX rates.
+
+The ledger is maintained on ingest: a session listener notes the accounts
+and earliest days touched by bank transactions inserted, deleted, or moved
+(amount, date or account changed) in a flush and rewrites those accounts'
+closes from that day on, inside the same transaction. Writers that bypass
+the ORM unit of work (bulk inserts, Core statements) call
+rebuild_bank_ledger(); accounts with transactions but no closes are built
+on first read.
+"""
+
+import datetime
+import logging
+from bisect import bisect_right
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, delete, event, func, inspect, insert, select
+from sqlalchemy.orm import Session
+
+import models
+from utils import get_snapshot_fx_rate
+
+logger = logging.getLogger(__name__)
+
+
+LEDGER_FIELDS = ("amount", "transaction_date", "bank_account_id")
+
+_ledger = models.BankBalanceDay.__table__
+_txns = models.BankTransaction.__table__
+
+
+def _as_date(value) -> datetime.date:
+    return value.date() if isinstance(value, datetime.datetime) else value
+
+
+def _as_datetime(day: datetime.date) -> datetime.datetime:
+    return datetime.datetime.combine(day, datetime.time.min)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# MAINTENANCE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _rebuild_from(connection, account_id: int, from_day: Optional[datetime.date] = None) -> int:
+    """
+    Rewrite an account's closes from from_day (None = all of them); returns rows written.
+
+    Without a close before from_day there is nothing to carry forward (the
+    account may hold transactions that were never built), so all closes are
+    rewritten.
+    """
+    running = Decimal("0")
+    txn_query = select(_txns.c.transaction_date, _txns.c.amount).where(
+        _txns.c.bank_account_id == account_id,
+        _txns.c.transaction_date.isnot(None),
+    )
+    clear = delete(_ledger).where(_ledger.c.bank_account_id == account_id)
+
+    if from_day is not None:
+        start = _as_datetime(from_day)
+        previous = connection.execute(
+            select(_ledger.c.cumulative_amount)
+            .where(_ledger.c.bank_account_id == account_id, _ledger.c.day < start)
+            .order_by(_ledger.c.day.desc())
+            .limit(1)
+        ).scalar()
+        if previous is not None:
+            running = Decimal(str(previous))
+            txn_query = txn_query.where(_txns.c.transaction_date >= start)
+            clear = clear.where(_ledger.c.day >= start)
+
+    days: Dict[datetime.date, List[Any]] = {}
+    for transaction_date, amount in connection.execute(txn_query):
+        day = days.setdefault(_as_date(transaction_date), [Decimal("0"), 0])
+        day[0] += Decimal(str(amount or 0))
+        day[1] += 1
+
+    rows = []
+    for day in sorted(days):
+        net, count = days[day]
+        running += net
+        rows.append({
+            "bank_account_id": account_id,
+            "day": _as_datetime(day),
+            "net_amount": float(net),
+            "cumulative_amount": float(running),
+            "transaction_count": count,
+        })
+
+    connection.execute(clear)
+    if rows:
+        connection.execute(insert(_ledger), rows)
+    return len(rows)
+
+
+def rebuild_bank_ledger(db: Session, account_id: int, from_day: Optional[datetime.date] = None) -> int:
+    """
+    Rewrite one account's closes from from_day on (all of them by default).
+
+    For loaders that write bank transactions without the ORM unit of work.
+    Runs in the caller's transaction; the caller commits.
+    """
+    return _rebuild_from(db.connection(), account_id, from_day)
+
+
+def _history_values(obj, name: str) -> List[Any]:
+    history = inspect(obj).attrs[name].history
+    return [v for v in (*history.added, *history.unchanged, *history.deleted) if v is not None]
+
+
+def _touched_accounts(session: Session) -> Dict[int, datetime.date]:
+    """Earliest day whose close changes, per account, for the pending flush"""
+    touched: Dict[int, datetime.date] = {}
+
+    def touch(account_ids: Iterable[int], dates: Iterable[Any]):
+        dates = [_as_date(d) for d in dates]
+        if not dates:
+            return
+        for account_id in account_ids:
+            touched[account_id] = min([touched.get(account_id, dates[0]), *dates])
+
+    for obj in session.new:
+        if isinstance(obj, models.BankTransaction):
+            touch([obj.bank_account_id] if obj.bank_account_id else [], [obj.transaction_date] if obj.transaction_date else [])
+
+    for obj in session.deleted:
+        if isinstance(obj, models.BankTransaction):
+            touch(_history_values(obj, "bank_account_id"), _history_values(obj, "transaction_date"))
+
+    for obj in session.dirty:
+        if not isinstance(obj, models.BankTransaction):
+            continue
+        state = inspect(obj)
+        if any(state.attrs[name].history.has_changes() for name in LEDGER_FIELDS):
+            touch(_history_values(obj, "bank_account_id"), _history_values(obj, "transaction_date"))
+
+    return touched
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_flushed_transactions(session: Session, flush_context):
+    touched = _touched_accounts(session)
+    if not touched:
+        return
+    connection = session.connection()
+    for account_id, from_day in touched.items():
+        _rebuild_from(connection, account_id, from_day)
+
+
+def ensure_bank_ledger(db: Session, account_ids: Iterable[int]) -> List[int]:
+    """Build closes for accounts that have transactions but none yet; returns the accounts built"""
+    account_ids = list(account_ids)
+    if not account_ids:
+        return []
+
+    with_closes = {
+        row[0] for row in db.execute(
+            select(_ledger.c.bank_account_id).where(_ledger.c.bank_account_id.in_(account_ids)).distinct()
+        )
+    }
+    missing = [a for a in account_ids if a not in with_closes]
+    if not missing:
+        return []
+
+    with_txns = [
+        row[0] for row in db.execute(
+            select(_txns.c.bank_account_id).where(
+                _txns.c.bank_account_id.in_(missing),
+                _txns.c.transaction_date.isnot(None),
+            ).distinct()
+        )
+    ]
+    for account_id in with_txns:
+        _rebuild_from(db.connection(), account_id)
+    if with_txns:
+        db.commit()
+        logger.info(f"Built bank balance ledger for accounts {with_txns}")
+    return with_txns
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# READS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _closes_on_or_before(db: Session, account_ids: List[int], day: Optional[datetime.date]) -> Dict[int, Decimal]:
+    """Cumulative net through `day` (None = latest close) for each account; 0 before the first close"""
+    if not account_ids:
+        return {}
+    latest = select(_ledger.c.bank_account_id, func.max(_ledger.c.day).label("day")).where(
+        _ledger.c.bank_account_id.in_(account_ids)
+    )
+    if day is not None:
+        latest = latest.where(_ledger.c.day <= _as_datetime(day))
+    latest = latest.group_by(_ledger.c.bank_account_id).subquery()
+
+    rows = db.execute(
+        select(_ledger.c.bank_account_id, _ledger.c.cumulative_amount).join(
+            latest,
+            and_(_ledger.c.bank_account_id == latest.c.bank_account_id, _ledger.c.day == latest.c.day),
+        )
+    )
+    closes = {account_id: Decimal("0") for account_id in account_ids}
+    closes.update({account_id: Decimal(str(cumulative or 0)) for account_id, cumulative in rows})
+    return closes
+
+
+def _anchor_closes(db: Session, accounts: List[models.BankAccount]) -> Dict[int, Decimal]:
+    """Cumulative net at the point each account's reported balance refers to"""
+    anchors = _closes_on_or_before(db, [a.id for a in accounts if a.balance_as_of is None], None)
+
+    # Statement imports share a balance date, so this is usually one query
+    by_anchor_day: Dict[datetime.date, List[int]] = {}
+    for account in accounts:
+        if account.balance_as_of is not None:
+            by_anchor_day.setdefault(_as_date(account.balance_as_of), []).append(account.id)
+    for anchor_day, anchor_ids in by_anchor_day.items():
+        anchors.update(_closes_on_or_before(db, anchor_ids, anchor_day))
+    return anchors
+
+
+def account_balances(
+    db: Session,
+    accounts: Iterable[models.BankAccount],
+    as_of: datetime.date,
+) -> Dict[int, Decimal]:
+    """
+    End-of-day balance per account (account currency).
+
+    The reported balance is the anchor: balance(as_of) = account.balance +
+    movements between the anchor day and as_of. Accounts with balance_as_of
+    are anchored at the end of that day; accounts without one treat the
+    reported balance as current, i.e. after their latest transaction.
+    """
+    accounts = list(accounts)
+    at_date = _closes_on_or_before(db, [a.id for a in accounts], _as_date(as_of))
+    anchors = _anchor_closes(db, accounts)
+    return {
+        a.id: Decimal(str(a.balance or 0)) + at_date[a.id] - anchors[a.id]
+        for a in accounts
+    }
+
+
+def balance_series(
+    db: Session,
+    accounts: Iterable[models.BankAccount],
+    days: Iterable[datetime.date],
+) -> Dict[datetime.date, Dict[int, Decimal]]:
+    """
+    End-of-day balances per account for many days at once.
+
+    The closes in the requested range are read once per account; each day is
+    then a binary search over them.
+    """
+    accounts = list(accounts)
+    days = sorted({_as_date(d) for d in days})
+    if not days:
+        return {}
+    ids = [a.id for a in accounts]
+
+    base = _closes_on_or_before(db, ids, days[0] - datetime.timedelta(days=1))
+    anchors = _anchor_closes(db, accounts)
+    closes: Dict[int, Tuple[List[datetime.date], List[Decimal]]] = {account_id: ([], []) for account_id in ids}
+    if ids:
+        rows = db.execute(
+            select(_ledger.c.bank_account_id, _ledger.c.day, _ledger.c.cumulative_amount)
+            .where(
+                _ledger.c.bank_account_id.in_(ids),
+                _ledger.c.day >= _as_datetime(days[0]),
+                _ledger.c.day <= _as_datetime(days[-1]),
+            )
+            .order_by(_ledger.c.bank_account_id, _ledger.c.day)
+        )
+        for account_id, day, cumulative in rows:
+            closes[account_id][0].append(_as_date(day))
+            closes[account_id][1].append(Decimal(str(cumulative or 0)))
+
+    series = {}
+    for day in days:
+        balances = {}
+        for account in accounts:
+            close_days, cumulative = closes[account.id]
+            i = bisect_right(close_days, day)
+            through = cumulative[i - 1] if i else base[account.id]
+            balances[account.id] = Decimal(str(account.balance or 0)) + through - anchors[account.id]
+        series[day] = balances
+    return series
+
+
+def fx_rates(
+    db: Session,
+    snapshot_id: Optional[int],
+    currencies: Iterable[str],
+    to_currency: str,
+) -> Tuple[Dict[str, Decimal], Set[str]]:
+    """Snapshot-locked rates into to_currency, and the currencies that have none"""
+    rates: Dict[str, Decimal] = {}
+    missing: Set[str] = set()
+    for currency in {(c or to_currency).upper() for c in currencies}:
+        if currency == to_currency.upper():
+            rates[currency] = Decimal("1")
+            continue
+        rate = get_snapshot_fx_rate(db, snapshot_id, currency, to_currency) if snapshot_id else None
+        if rate is None:
+            missing.add(currency)
+        else:
+            rates[currency] = Decimal(str(rate))
+    return rates, missing
+
+
+def consolidated_balances(
+    db: Session,
+    accounts: Iterable[models.BankAccount],
+    as_of: datetime.date,
+    currency: str = "EUR",
+    snapshot_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Balances as of a day, per account and per currency, consolidated into
+    `currency` with the snapshot's FX rates. Currencies without a rate are
+    reported under missing_fx_rates and left out of the total.
+    """
+    accounts = list(accounts)
+    balances = account_balances(db, accounts, as_of)
+    rates, missing = fx_rates(db, snapshot_id, [a.currency for a in accounts], currency)
+    return _consolidate(accounts, balances, rates, missing, currency) | {
+        "as_of": _as_date(as_of).isoformat(),
+        "snapshot_id": snapshot_id,
+    }
+
+
+def _consolidate(
+    accounts: List[models.BankAccount],
+    balances: Dict[int, Decimal],
+    rates: Dict[str, Decimal],
+    missing: Set[str],
+    currency: str,
+) -> Dict[str, Any]:
+    by_currency: Dict[str, Decimal] = {}
+    by_account: Dict[int, Decimal] = {}
+    total = Decimal("0")
+    for account in accounts:
+        account_currency = (account.currency or currency).upper()
+        balance = balances[account.id]
+        by_currency[account_currency] = by_currency.get(account_currency, Decimal("0")) + balance
+        if account_currency in rates:
+            by_account[account.id] = balance * rates[account_currency]
+            total += by_account[account.id]
+
+    return {
+        "currency": currency,
+        "total": total,
+        "by_account": by_account,
+        "by_currency": by_currency,
+        "fx_rates": rates,
+        "missing_fx_rates": sorted(missing),
+    }
+
+
+def consolidated_series(
+    db: Session,
+    accounts: Iterable[models.BankAccount],
+    days: Iterable[datetime.date],
+    currency: str = "EUR",
+    snapshot_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """consolidated_balances() for each day, oldest first, from one read of the closes"""
+    accounts = list(accounts)
+    rates, missing = fx_rates(db, snapshot_id, [a.currency for a in accounts], currency)
+    return [
+        _consolidate(accounts, balances, rates, missing, currency) | {"as_of": day.isoformat(), "snapshot_id": snapshot_id}
+        for day, balances in balance_series(db, accounts, days).items()
+    ]
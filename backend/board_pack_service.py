@@ -3,13 +3,25 @@ Board Pack Autopilot Service
 
 Generates 10-slide board pack from snapshot + plan outputs.
 All numbers deterministically derived. Narratives describe computed results only.
+
+Build pipeline:
+- The shared metric bundle is computed once per pack and handed to every slide.
+- Each slide declares the metrics and pack fields it reads (SLIDE_SPECS); their
+  hash is stored in pack_data_json["build"], and a slide whose inputs hash the
+  same as in the previous pack version is copied instead of rendered again.
+- Remaining slides render in parallel on a small worker pool.
+- An optional progress callback reports (percent, message) while building.
 """
 
-from typing import List, Dict, Any, Optional, Tuple
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, case
 
 import models
 from board_pack_models import (
@@ -20,6 +32,45 @@ from startup_planning_models import StartupPlanningScenario, PlanningOutput
 from cash_plan_bridge_models import CashToPlanBridge
 
 
+# Bump when a slide builder changes output, so stored input hashes stop matching
+SLIDE_RENDER_VERSION = 1
+
+DEFAULT_SLIDE_WORKERS = 4
+
+# (slide_number, slide_type, builder, metric inputs, pack inputs)
+# Inputs must cover everything the builder reads: they decide when a slide is reused.
+SLIDE_SPECS: List[Tuple[int, SlideType, str, Tuple[str, ...], Tuple[str, ...]]] = [
+    (1, SlideType.COVER, "_generate_cover_slide",
+     (), ("title", "period_label", "as_of_date", "status")),
+    (2, SlideType.EXECUTIVE_SUMMARY, "_generate_executive_summary_slide",
+     ("runway_months", "ending_arr", "monthly_burn", "ending_cash", "arr_change_pct",
+      "burn_change_pct", "runway_change_months", "headcount"), ()),
+    (3, SlideType.KEY_HIGHLIGHTS, "_generate_highlights_slide",
+     ("ending_arr", "arr_change", "runway_months", "runway_change_months", "ending_cash",
+      "cash_change", "headcount", "max_hires", "period_inflows"), ()),
+    (4, SlideType.RUNWAY_ANALYSIS, "_generate_runway_slide",
+     ("runway_analysis", "ending_cash", "runway_months"), ()),
+    (5, SlideType.FORECAST_VS_ACTUAL, "_generate_forecast_comparison_slide",
+     ("monthly_pnl", "ending_arr", "arr_change", "arr_change_pct", "monthly_burn", "burn_change",
+      "ending_cash", "cash_change", "runway_months", "runway_change_months"), ("previous",)),
+    (6, SlideType.REVENUE_DRIVERS, "_generate_revenue_drivers_slide",
+     ("monthly_pnl", "ending_mrr", "ending_arr", "arr_change_pct"), ()),
+    (7, SlideType.EXPENSE_DRIVERS, "_generate_expense_drivers_slide",
+     ("monthly_pnl", "headcount"), ()),
+    (8, SlideType.RISKS_MITIGATIONS, "_generate_risks_slide", (), ()),
+    (9, SlideType.ACTION_PLAN, "_generate_action_plan_slide", (), ()),
+    (10, SlideType.APPENDIX, "_generate_appendix_slide",
+     (), ("snapshot_id", "plan_id", "as_of_date")),
+]
+
+SLIDE_CONTENT_FIELDS = (
+    "title", "headline", "narrative", "metrics_json", "charts_json",
+    "tables_json", "bullets_json", "evidence_refs_json",
+)
+
+ProgressCallback = Callable[[int, str], None]
+
+
 class BoardPackService:
     """
     Service for generating board packs.
@@ -37,8 +88,11 @@ class BoardPackService:
     10. Appendix
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, slide_workers: Optional[int] = None):
         self.db = db
+        self.slide_workers = slide_workers or int(
+            os.getenv("BOARD_PACK_SLIDE_WORKERS", str(DEFAULT_SLIDE_WORKERS))
+        )
     
     def generate_board_pack(
         self,
@@ -47,12 +101,18 @@ class BoardPackService:
         plan_id: Optional[int] = None,
         previous_pack_id: Optional[int] = None,
         generated_by: Optional[str] = None,
-        base_currency: str = "USD"
+        base_currency: str = "USD",
+        progress: Optional[ProgressCallback] = None
     ) -> BoardPack:
         """
         Generate a complete board pack from snapshot and plan data.
         All numbers are deterministically computed.
+
+        progress, if given, is called with (percent, message) as the build advances.
         """
+        report = progress or (lambda percent, message: None)
+        report(0, "Loading source data")
+        
         # Load source data
         snapshot = self.db.query(models.Snapshot).filter(
             models.Snapshot.id == snapshot_id
@@ -78,8 +138,9 @@ class BoardPackService:
                 BoardPack.id == previous_pack_id
             ).first()
         
-        # Compute all metrics from source data
-        metrics = self._compute_all_metrics(snapshot, plan_output, previous_pack)
+        # Compute all metrics from source data, once for every slide
+        metrics = self._compute_all_metrics(snapshot, plan_output, previous_pack, entity_id=entity_id)
+        report(10, "Computed metrics")
         
         # Create pack
         period_label = snapshot.created_at.strftime("%B %Y") if snapshot.created_at else "Current Period"
@@ -109,8 +170,13 @@ class BoardPackService:
         self.db.add(pack)
         self.db.flush()
         
-        # Generate all 10 slides
-        slides = self._generate_all_slides(pack, metrics, snapshot, plan_output, previous_pack)
+        # Generate all 10 slides, reusing unchanged ones from the last pack version
+        reusable = self._find_reusable_slides(entity_id, exclude_pack_id=pack.id)
+        slides, build = self._generate_all_slides(
+            pack, metrics, snapshot, plan_output, previous_pack,
+            reusable=reusable,
+            progress=lambda done, total: report(10 + 80 * done // total, f"Rendered {done}/{total} slides"),
+        )
         for slide in slides:
             self.db.add(slide)
         
@@ -127,7 +193,7 @@ class BoardPackService:
             self.db.add(action)
         
         # Store full pack data
-        pack.pack_data_json = self._build_pack_data_json(pack, metrics, slides, risks, actions)
+        pack.pack_data_json = {**self._build_pack_data_json(pack, metrics, slides, risks, actions), "build": build}
         
         # Create audit log entry
         audit = BoardPackAuditLog(
@@ -137,22 +203,28 @@ class BoardPackService:
             details_json={
                 "snapshot_id": snapshot_id,
                 "plan_id": plan_id,
-                "previous_pack_id": previous_pack_id
+                "previous_pack_id": previous_pack_id,
+                "reused_from_pack_id": build["reused_from_pack_id"],
+                "reused_slides": build["reused_slides"]
             }
         )
         self.db.add(audit)
         
+        report(95, "Saving pack")
         self.db.commit()
+        report(100, "Board pack ready")
         return pack
     
     def _compute_all_metrics(
         self,
         snapshot: models.Snapshot,
         plan_output: Optional[PlanningOutput],
-        previous_pack: Optional[BoardPack]
+        previous_pack: Optional[BoardPack],
+        entity_id: Optional[int] = None
     ) -> Dict[str, Any]:
         """Compute all metrics from source data."""
         metrics = {}
+        entity_id = entity_id or snapshot.entity_id
         
         # ═══════════════════════════════════════════════════════════════════
         # FROM SNAPSHOT (Bank Truth)
@@ -160,29 +232,35 @@ class BoardPackService:
         
         # Cash position
         cash_balance = self.db.query(func.sum(models.BankAccount.balance)).filter(
-            models.BankAccount.snapshot_id == snapshot.id
-        ).scalar() or Decimal("0")
+            models.BankAccount.entity_id == entity_id
+        ).scalar() or 0
         metrics["ending_cash"] = float(cash_balance)
         
-        # Invoices (AR)
-        invoices = self.db.query(models.Invoice).filter(
+        # Invoices (AR): everything in the snapshot, and what is still unpaid
+        total_ar, open_ar = self.db.query(
+            func.sum(models.Invoice.amount),
+            func.sum(case((models.Invoice.payment_date == None, models.Invoice.amount), else_=0))
+        ).filter(
             models.Invoice.snapshot_id == snapshot.id
-        ).all()
-        
-        total_ar = sum(float(inv.invoice_total_amount or 0) for inv in invoices)
-        open_ar = sum(float(inv.open_amount or inv.invoice_total_amount or 0) 
-                     for inv in invoices 
-                     if hasattr(inv, 'reconciliation_status') and inv.reconciliation_status != 'matched')
-        metrics["total_ar"] = total_ar
-        metrics["open_ar"] = open_ar
-        
-        # Bank transactions for the period
-        transactions = self.db.query(models.BankTransaction).filter(
-            models.BankTransaction.snapshot_id == snapshot.id
-        ).all()
-        
-        inflows = sum(float(t.transaction_amount or 0) for t in transactions if (t.transaction_amount or 0) > 0)
-        outflows = abs(sum(float(t.transaction_amount or 0) for t in transactions if (t.transaction_amount or 0) < 0))
+        ).one()
+        metrics["total_ar"] = float(total_ar or 0)
+        metrics["open_ar"] = float(open_ar or 0)
+        
+        # Bank transactions for the period (snapshot month to date)
+        as_of = snapshot.created_at or datetime.utcnow()
+        period_start = datetime(as_of.year, as_of.month, 1)
+        amount = models.BankTransaction.amount
+        inflows, outflows = self.db.query(
+            func.sum(case((amount > 0, amount), else_=0)),
+            func.sum(case((amount < 0, amount), else_=0))
+        ).join(
+            models.BankAccount, models.BankAccount.id == models.BankTransaction.bank_account_id
+        ).filter(
+            models.BankAccount.entity_id == entity_id,
+            models.BankTransaction.transaction_date >= period_start,
+            models.BankTransaction.transaction_date <= as_of
+        ).one()
+        inflows, outflows = float(inflows or 0), abs(float(outflows or 0))
         metrics["period_inflows"] = inflows
         metrics["period_outflows"] = outflows
         metrics["net_cash_flow"] = inflows - outflows
@@ -254,42 +332,129 @@ class BoardPackService:
         metrics: Dict,
         snapshot: models.Snapshot,
         plan_output: Optional[PlanningOutput],
-        previous_pack: Optional[BoardPack]
-    ) -> List[BoardPackSlide]:
-        """Generate all 10 slides."""
-        slides = []
-        
-        # Slide 1: Cover
-        slides.append(self._generate_cover_slide(pack, metrics, 1))
-        
-        # Slide 2: Executive Summary
-        slides.append(self._generate_executive_summary_slide(pack, metrics, 2))
-        
-        # Slide 3: Key Highlights
-        slides.append(self._generate_highlights_slide(pack, metrics, 3))
-        
-        # Slide 4: Runway Analysis
-        slides.append(self._generate_runway_slide(pack, metrics, 4))
-        
-        # Slide 5: Forecast vs Last Month
-        slides.append(self._generate_forecast_comparison_slide(pack, metrics, previous_pack, 5))
-        
-        # Slide 6: Revenue Drivers
-        slides.append(self._generate_revenue_drivers_slide(pack, metrics, 6))
-        
-        # Slide 7: Expense Drivers
-        slides.append(self._generate_expense_drivers_slide(pack, metrics, 7))
-        
-        # Slide 8: Risks & Mitigations
-        slides.append(self._generate_risks_slide(pack, metrics, 8))
-        
-        # Slide 9: Action Plan
-        slides.append(self._generate_action_plan_slide(pack, metrics, 9))
-        
-        # Slide 10: Appendix
-        slides.append(self._generate_appendix_slide(pack, metrics, snapshot, 10))
+        previous_pack: Optional[BoardPack],
+        reusable: Optional[Tuple[Optional[BoardPack], Dict[str, Tuple[str, BoardPackSlide]]]] = None,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Tuple[List[BoardPackSlide], Dict[str, Any]]:
+        """
+        Generate all 10 slides.
         
-        return slides
+        Slides whose input hash matches the one stored for the same slide of
+        the reuse source are copied; the rest render in parallel. Returns the
+        slides in slide order and the build record for pack_data_json.
+        """
+        source_pack, source_slides = reusable or (None, {})
+        total = len(SLIDE_SPECS)
+        slides: Dict[int, BoardPackSlide] = {}
+        hashes: Dict[str, str] = {}
+        pending = []
+        
+        for spec in SLIDE_SPECS:
+            slide_num, slide_type = spec[0], spec[1]
+            input_hash = self._slide_input_hash(spec, pack, metrics, previous_pack)
+            hashes[slide_type.value] = input_hash
+            stored = source_slides.get(slide_type.value)
+            if stored and stored[0] == input_hash:
+                slides[slide_num] = self._copy_slide(stored[1], pack, slide_num)
+            else:
+                pending.append(spec)
+        
+        done = len(slides)
+        if progress and done:
+            progress(done, total)
+        
+        extra_args = {SlideType.FORECAST_VS_ACTUAL: (previous_pack,), SlideType.APPENDIX: (snapshot,)}
+        
+        def render(spec) -> BoardPackSlide:
+            slide_num, slide_type, builder = spec[0], spec[1], getattr(self, spec[2])
+            return builder(pack, metrics, *extra_args.get(slide_type, ()), slide_num)
+        
+        # Builders only read pack attributes and the metric bundle - no session access
+        workers = min(self.slide_workers, len(pending))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="board-pack-slide") as pool:
+                futures = {pool.submit(render, spec): spec[0] for spec in pending}
+                for future in as_completed(futures):
+                    slides[futures[future]] = future.result()
+                    done += 1
+                    if progress:
+                        progress(done, total)
+        else:
+            for spec in pending:
+                slides[spec[0]] = render(spec)
+                done += 1
+                if progress:
+                    progress(done, total)
+        
+        reused = sorted(set(slides) - {spec[0] for spec in pending})
+        build = {
+            "render_version": SLIDE_RENDER_VERSION,
+            "slide_hashes": hashes,
+            "reused_from_pack_id": source_pack.id if source_pack and reused else None,
+            "reused_slides": reused,
+            "rendered_slides": sorted(spec[0] for spec in pending),
+        }
+        return [slides[number] for number in sorted(slides)], build
+    
+    def _slide_input_hash(
+        self, spec: Tuple, pack: BoardPack, metrics: Dict, previous_pack: Optional[BoardPack]
+    ) -> str:
+        """Hash of everything a slide reads: its declared metrics and pack fields."""
+        _, slide_type, _, metric_keys, pack_keys = spec
+        pack_inputs = {}
+        for key in pack_keys:
+            if key == "previous":
+                pack_inputs[key] = {
+                    "ending_arr": float(previous_pack.ending_arr or 0),
+                    "monthly_burn": float(previous_pack.monthly_burn or 0),
+                    "ending_cash": float(previous_pack.ending_cash or 0),
+                    "runway_months": previous_pack.runway_months or 0,
+                } if previous_pack else None
+            elif key == "status":
+                pack_inputs[key] = pack.status.value if pack.status else None
+            else:
+                pack_inputs[key] = getattr(pack, key)
+        payload = {
+            "version": SLIDE_RENDER_VERSION,
+            "slide_type": slide_type.value,
+            "metrics": {key: metrics.get(key) for key in metric_keys},
+            "pack": pack_inputs,
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode()).hexdigest()
+    
+    def _find_reusable_slides(
+        self,
+        entity_id: int,
+        exclude_pack_id: Optional[int] = None
+    ) -> Tuple[Optional[BoardPack], Dict[str, Tuple[str, BoardPackSlide]]]:
+        """Slides of the entity's latest pack version, with their stored input hashes, by slide type."""
+        query = self.db.query(BoardPack).filter(BoardPack.entity_id == entity_id)
+        if exclude_pack_id is not None:
+            query = query.filter(BoardPack.id != exclude_pack_id)
+        source = query.order_by(desc(BoardPack.id)).first()
+        if source is None:
+            return None, {}
+        
+        build = (source.pack_data_json or {}).get("build") or {}
+        if build.get("render_version") != SLIDE_RENDER_VERSION:
+            return source, {}
+        hashes = build.get("slide_hashes") or {}
+        reusable = {}
+        for slide in self.get_slides(source.id):
+            slide_type = slide.slide_type.value if slide.slide_type else None
+            if slide_type in hashes:
+                reusable[slide_type] = (hashes[slide_type], slide)
+        return source, reusable
+    
+    def _copy_slide(self, slide: BoardPackSlide, pack: BoardPack, slide_num: int) -> BoardPackSlide:
+        """Copy a previous version's slide into this pack."""
+        return BoardPackSlide(
+            pack_id=pack.id,
+            slide_number=slide_num,
+            slide_type=slide.slide_type,
+            **{field: getattr(slide, field) for field in SLIDE_CONTENT_FIELDS}
+        )
     
     def _generate_cover_slide(self, pack: BoardPack, metrics: Dict, slide_num: int) -> BoardPackSlide:
         """Generate cover slide."""
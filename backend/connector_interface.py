@@ -2,13 +2,15 @@
 Connector Interface for Data Lineage
 
 Defines the abstract base connector and stub implementations.
-Real connectors (Plaid, SAP, etc.) inherit from BaseConnector.
+Real connectors (Plaid, SAP, etc.) inherit from BaseConnector, or run
+through an adapter around the connectors/ package and connectors_impl.
 """
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from typing import Dict, Any, List, Optional, Generator
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from decimal import Decimal
 import hashlib
 import json
 
@@ -79,11 +81,14 @@ class SyncResult:
     rows_loaded: int
     rows_skipped: int
     rows_error: int
+    rows_deduplicated: int = 0  # Subset of rows_skipped caught by the idempotency index
     errors: List[Dict[str, Any]] = field(default_factory=list)
     warnings: List[Dict[str, Any]] = field(default_factory=list)
     schema_info: Optional[SchemaInfo] = None
     date_range_start: Optional[datetime] = None
     date_range_end: Optional[datetime] = None
+    dedup_stats: Dict[str, Any] = field(default_factory=dict)
+    watermarks: Dict[str, Dict[str, str]] = field(default_factory=dict)  # {"start": {...}, "end": {...}}
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -99,8 +104,15 @@ class BaseConnector(ABC):
     - get_schema(): Retrieve source schema for drift detection
     - extract(): Stream rows from source
     - normalize(): Transform raw rows to canonical format
+    
+    Optionally override for incremental sync:
+    - watermark_for(): Return a row's high-water value (ISO timestamp, etc.)
+    - watermarks_ordered: True if extract() yields rows in ascending
+      watermark order per source_table, allowing per-batch checkpoints
     """
     
+    watermarks_ordered: bool = False
+    
     def __init__(self, config: Dict[str, Any], secret_ref: Optional[str] = None):
         """
         Initialize connector.
@@ -111,6 +123,7 @@ class BaseConnector(ABC):
         """
         self.config = config
         self.secret_ref = secret_ref
+        self.watermarks: Dict[str, str] = {}
     
     @property
     @abstractmethod
@@ -164,6 +177,24 @@ class BaseConnector(ABC):
         """
         pass
     
+    def set_watermarks(self, watermarks: Dict[str, str]) -> None:
+        """
+        Receive committed watermarks ({source_table: watermark}) before extract().
+        
+        Connectors supporting incremental sync should only extract rows at or
+        after the watermark for each table. Re-extracting rows equal to the
+        watermark is expected; the idempotency index skips them.
+        """
+        self.watermarks = dict(watermarks)
+    
+    def watermark_for(self, raw_row: ExtractedRow) -> Optional[str]:
+        """
+        Return the row's high-water value, comparable as a string.
+        
+        Default: None (connector does not support incremental sync).
+        """
+        return None
+    
     @abstractmethod
     def normalize(self, raw_row: ExtractedRow) -> Dict[str, Any]:
         """
@@ -192,6 +223,8 @@ class StubBankConnector(BaseConnector):
     Simulates Plaid-like bank transaction extraction.
     """
     
+    watermarks_ordered = True
+    
     @property
     def connector_type(self) -> str:
         return "bank_stub"
@@ -271,13 +304,20 @@ class StubBankConnector(BaseConnector):
             },
         ]
         
+        watermark = self.watermarks.get("transactions")
         for txn in sample_txns:
+            if watermark and txn["date"] < watermark:
+                continue
             yield ExtractedRow(
                 source_table="transactions",
                 source_row_id=txn["transaction_id"],
                 raw_payload=txn
             )
     
+    def watermark_for(self, raw_row: ExtractedRow) -> Optional[str]:
+        """Transaction date is the high-water mark."""
+        return raw_row.raw_payload.get("date")
+    
     def normalize(self, raw_row: ExtractedRow) -> Dict[str, Any]:
         """Normalize bank transaction to canonical format."""
         payload = raw_row.raw_payload
@@ -322,6 +362,8 @@ class StubERPConnector(BaseConnector):
     Simulates SAP-like invoice extraction.
     """
     
+    watermarks_ordered = True
+    
     @property
     def connector_type(self) -> str:
         return "erp_stub"
@@ -396,13 +438,20 @@ class StubERPConnector(BaseConnector):
             },
         ]
         
+        watermark = self.watermarks.get("BSID")
         for inv in sample_invoices:
+            if watermark and inv["BLDAT"] < watermark:
+                continue
             yield ExtractedRow(
                 source_table="BSID",
                 source_row_id=f"{inv['BELNR']}_{inv['BUKRS']}",
                 raw_payload=inv
             )
     
+    def watermark_for(self, raw_row: ExtractedRow) -> Optional[str]:
+        """Document date is the high-water mark."""
+        return raw_row.raw_payload.get("BLDAT")
+    
     def normalize(self, raw_row: ExtractedRow) -> Dict[str, Any]:
         """Normalize invoice to canonical format."""
         payload = raw_row.raw_payload
@@ -543,6 +592,255 @@ class StubVendorBillConnector(BaseConnector):
         }
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# SDK CONNECTOR ADAPTERS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _json_safe(value: Any) -> Any:
+    """Make extracted values storable in JSON columns (dates, decimals)."""
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _first(data: Dict[str, Any], keys: List[str]) -> Any:
+    return next((data[k] for k in keys if data.get(k)), None)
+
+
+class SDKConnectorAdapter(BaseConnector):
+    """
+    Runs a connectors/ package connector (Stripe, Plaid, QuickBooks, Xero,
+    NetSuite, ...) through the lineage pipeline.
+    
+    Committed watermarks reach the connector in its SyncContext, keyed by
+    the object type it reports from object_type_for(); each row's
+    watermark comes from the connector's own watermark_for().
+    """
+    
+    # Connector object type -> canonical record type
+    RECORD_TYPES = {
+        "invoice": "Invoice",
+        "bill": "VendorBill",
+        "vendor_bill": "VendorBill",
+        "transaction": "BankTxn",
+        "bank_txn": "BankTxn",
+        "balance_txn": "BankTxn",
+        "charge": "BankTxn",
+        "payout": "BankTxn",
+        "payment": "BankTxn",
+    }
+    SOURCE_TYPES = {"bank": "bank_txn", "payments": "bank_txn", "erp": "ar_invoice"}
+    RECORD_DATE_FIELDS = ["txn_date", "value_date", "issue_date", "payment_date", "as_of"]
+    COUNTERPARTY_FIELDS = ["counterparty_name", "customer_name", "vendor_name"]
+    
+    def __init__(
+        self,
+        connector_type: str,
+        connector: Any,
+        config: Dict[str, Any],
+        secret_ref: Optional[str] = None
+    ):
+        super().__init__(config, secret_ref)
+        self._connector_type = connector_type
+        self.connector = connector
+        self._context = None
+    
+    @property
+    def connector_type(self) -> str:
+        return self._connector_type
+    
+    @property
+    def source_type(self) -> str:
+        prefix = self._connector_type.split("_", 1)[0]
+        return self.SOURCE_TYPES.get(prefix, self._connector_type)
+    
+    def test_connection(self) -> ConnectionTestResult:
+        result = self.connector.test_connection()
+        return ConnectionTestResult(success=result.success, message=result.message)
+    
+    def get_schema(self) -> SchemaInfo:
+        schema = self.connector.get_schema() or {}
+        return SchemaInfo(
+            columns=[{"name": name, "type": str(col_type)} for name, col_type in schema.items()],
+            source_table=self._connector_type
+        )
+    
+    def _sync_context(self, since: Optional[datetime] = None):
+        from connectors.base import SyncContext, SyncMode
+        return SyncContext(
+            connection_id=self.config.get("connection_id") or 0,
+            entity_id=self.config.get("entity_id"),
+            sync_run_id=0,
+            since_timestamp=since,
+            watermarks=dict(self.watermarks),
+            sync_mode=SyncMode.INCREMENTAL
+        )
+    
+    def _record(self, raw_row: ExtractedRow):
+        from connectors.base import ExtractedRecord
+        return ExtractedRecord(
+            source_id=raw_row.source_row_id or "",
+            record_type=raw_row.source_table,
+            data=raw_row.raw_payload
+        )
+    
+    def extract(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Generator[ExtractedRow, None, None]:
+        self._context = self._sync_context(since)
+        for record in self.connector.extract(self._context):
+            yield ExtractedRow(
+                source_table=self.connector.object_type_for(record),
+                source_row_id=record.source_id or None,
+                raw_payload=_json_safe(record.data)
+            )
+    
+    def watermark_for(self, raw_row: ExtractedRow) -> Optional[str]:
+        return self.connector.watermark_for(self._record(raw_row))
+    
+    def normalize(self, raw_row: ExtractedRow) -> Dict[str, Any]:
+        normalized = self.connector.normalize(self._record(raw_row), self._context or self._sync_context())
+        data = _json_safe(normalized.data)
+        return {
+            "record_type": self.RECORD_TYPES.get(normalized.record_type, normalized.record_type),
+            "canonical_id": normalized.canonical_id,
+            "amount": data.get("amount"),
+            "currency": data.get("currency"),
+            "record_date": _first(data, self.RECORD_DATE_FIELDS),
+            "due_date": data.get("due_date"),
+            "counterparty": _first(data, self.COUNTERPARTY_FIELDS),
+            "external_id": normalized.source_id or None,
+            "payload": data
+        }
+
+
+class WarehouseConnectorAdapter(BaseConnector):
+    """
+    Runs connectors_impl.WarehouseSQLConnector through the lineage pipeline.
+    
+    config["query"] is the SQL string or query dict passed to the
+    connector's extract(). With a watermark_column the connector returns
+    rows in watermark order, so watermarks checkpoint per batch.
+    """
+    
+    RECORD_TYPES = {
+        "invoices": "Invoice",
+        "vendor_bills": "VendorBill",
+        "bank_txns": "BankTxn",
+        "fx_rates": "FXRate",
+    }
+    
+    def __init__(self, connector: Any, config: Dict[str, Any], secret_ref: Optional[str] = None):
+        super().__init__(config, secret_ref)
+        self.connector = connector
+        self._normalized: Dict[str, Any] = {}
+        self._issues: Dict[str, str] = {}
+    
+    @property
+    def watermarks_ordered(self) -> bool:
+        return bool(self.connector.watermark_column)
+    
+    @property
+    def connector_type(self) -> str:
+        return self.connector.connector_type
+    
+    @property
+    def source_type(self) -> str:
+        return self.connector.source_type
+    
+    def test_connection(self) -> ConnectionTestResult:
+        result = self.connector.test()
+        return ConnectionTestResult(
+            success=result.success,
+            message=result.message,
+            latency_ms=result.latency_ms,
+            details=result.details
+        )
+    
+    def get_schema(self) -> SchemaInfo:
+        return SchemaInfo(
+            columns=[{"name": c, "type": "unknown"} for c in self.config.get("columns", [])],
+            source_table=self.connector.object_type
+        )
+    
+    def extract(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Generator[ExtractedRow, None, None]:
+        self.connector.set_watermarks(self.watermarks)
+        raw_batch = self.connector.extract(self.config.get("query", ""), since=since, until=until)
+        
+        # Normalize the delta in one pass (columnar when the batch is Arrow)
+        normalized_batch = self.connector.normalize(raw_batch)
+        by_index = {r.source_row_index: r for r in normalized_batch.get_all_records()}
+        issues = {
+            i: issue.message
+            for issue in normalized_batch.health_report.issues if issue.severity == "error"
+            for i in issue.row_indices
+        } if normalized_batch.health_report else {}
+        
+        for raw_record in raw_batch.iter_records():
+            row = ExtractedRow(
+                source_table=self.connector.object_type,
+                source_row_id=str(raw_record.raw_data.get("id", raw_record.row_index)),
+                raw_payload=_json_safe(raw_record.raw_data)
+            )
+            if raw_record.row_index in by_index:
+                self._normalized[row.raw_hash] = by_index[raw_record.row_index]
+            else:
+                self._issues[row.raw_hash] = issues.get(raw_record.row_index, "Row was not normalized")
+            yield row
+    
+    def watermark_for(self, raw_row: ExtractedRow) -> Optional[str]:
+        return self.connector.watermark_for(raw_row.raw_payload)
+    
+    def normalize(self, raw_row: ExtractedRow) -> Dict[str, Any]:
+        record = self._normalized.get(raw_row.raw_hash)
+        if record is None:
+            raise ValueError(self._issues.get(raw_row.raw_hash, "Row was not extracted by this connector"))
+        return {
+            "record_type": self.RECORD_TYPES.get(record.table.value, record.table.value),
+            "canonical_id": record.canonical_id,
+            "amount": float(record.amount) if record.amount is not None else None,
+            "currency": record.currency,
+            "record_date": _json_safe(record.record_date),
+            "due_date": _json_safe(record.due_date),
+            "counterparty": record.counterparty,
+            "external_id": record.external_id or raw_row.source_row_id,
+            "payload": _json_safe(record.data)
+        }
+
+
+def _create_adapter(
+    connector_type: str,
+    config: Dict[str, Any],
+    secret_ref: Optional[str]
+) -> Optional[BaseConnector]:
+    """Wrap an SDK connector of this type, if one exists."""
+    if connector_type == "warehouse_sql":
+        from connectors_impl import WarehouseSQLConnector
+        return WarehouseConnectorAdapter(
+            WarehouseSQLConnector(config, config.get("entity_id")), config, secret_ref
+        )
+    
+    from connectors import ConnectorRegistry as SDKConnectorRegistry
+    if not SDKConnectorRegistry.is_registered(connector_type):
+        return None
+    connector = SDKConnectorRegistry.get(connector_type, config)
+    return SDKConnectorAdapter(connector_type, connector, config, secret_ref)
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONNECTOR REGISTRY
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -578,8 +876,8 @@ class ConnectorRegistry:
         config: Dict[str, Any],
         secret_ref: Optional[str] = None
     ) -> Optional[BaseConnector]:
-        """Create connector instance."""
+        """Create connector instance, falling back to an SDK connector adapter."""
         connector_class = cls.get(connector_type)
         if not connector_class:
-            return None
+            return _create_adapter(connector_type, config, secret_ref)
         return connector_class(config, secret_ref)
@@ -85,10 +85,23 @@ class RawBatch:
     columns: List[str] = field(default_factory=list)
     column_types: Dict[str, str] = field(default_factory=dict)
     
+    # Columnar extraction: a pyarrow.Table holding the rows instead of `records`
+    arrow_table: Optional[Any] = None
+    
     @property
     def row_count(self) -> int:
+        if self.arrow_table is not None:
+            return self.arrow_table.num_rows
         return len(self.records)
     
+    def iter_records(self):
+        """Iterate RawRecords, materializing them from arrow_table if needed."""
+        if self.arrow_table is None:
+            yield from self.records
+            return
+        for row_index, row in enumerate(self.arrow_table.to_pylist()):
+            yield RawRecord(source_table=self.source_name, row_index=row_index, raw_data=row)
+    
     @property
     def schema_fingerprint(self) -> str:
         """Compute schema fingerprint."""
@@ -540,6 +553,51 @@ class NormalizationLayer:
         except InvalidOperation:
             return None
     
+    @classmethod
+    def parse_amount_column(cls, values: List[Any]) -> List[Optional[Decimal]]:
+        """parse_amount over a column, parsing each distinct value once."""
+        cache = {}
+        out = []
+        for value in values:
+            try:
+                parsed = cache[value]
+            except KeyError:
+                parsed = cache[value] = cls.parse_amount(value)
+            except TypeError:  # Unhashable
+                parsed = cls.parse_amount(value)
+            out.append(parsed)
+        return out
+    
+    @classmethod
+    def parse_date_column(cls, values: List[Any], locale: str = "ISO") -> List[Optional[date]]:
+        """parse_date over a column, parsing each distinct value once."""
+        cache = {}
+        out = []
+        for value in values:
+            try:
+                parsed = cache[value]
+            except KeyError:
+                parsed = cache[value] = cls.parse_date(value, locale)
+            except TypeError:  # Unhashable
+                parsed = cls.parse_date(value, locale)
+            out.append(parsed)
+        return out
+    
+    @classmethod
+    def normalize_currency_column(cls, values: List[Any]) -> List[Optional[str]]:
+        """normalize_currency over a column (currencies are low-cardinality)."""
+        cache = {}
+        out = []
+        for value in values:
+            try:
+                normalized = cache[value]
+            except KeyError:
+                normalized = cache[value] = cls.normalize_currency(value)
+            except TypeError:  # Unhashable
+                normalized = cls.normalize_currency(value)
+            out.append(normalized)
+        return out
+    
     @classmethod
     def normalize_currency(cls, value: Any) -> Optional[str]:
         """
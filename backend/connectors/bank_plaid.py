@@ -11,7 +11,8 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, Iterator, List, Optional
 from .base import (
     APIConnector, ConnectorType, ConnectorResult,
-    SyncContext, ExtractedRecord, NormalizedRecord
+    SyncContext, ExtractedRecord, NormalizedRecord,
+    Page, RateLimitError
 )
 
 # Official SDK
@@ -41,6 +42,7 @@ class PlaidConnector(APIConnector):
     connector_type = ConnectorType.BANK_API
     display_name = "Plaid"
     description = "US/Canada bank aggregation via Plaid API"
+    watermark_field = 'date'
     
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
@@ -161,38 +163,31 @@ class PlaidConnector(APIConnector):
             end_date = datetime.now().date()
             start_date = end_date - timedelta(days=30)
             
-            if context.since_timestamp:
-                start_date = context.since_timestamp.date()
+            since = self.since_for(context, 'transaction')
+            if since:
+                start_date = since.date()
             
-            request = TransactionsGetRequest(
-                access_token=self.access_token,
-                start_date=start_date,
-                end_date=end_date,
-                options=TransactionsGetRequestOptions(count=500, offset=0)
-            )
-            
-            response = self.client.transactions_get(request)
-            transactions = response['transactions']
-            total = response['total_transactions']
-            
-            for txn in transactions:
-                yield self._transaction_to_dict(txn)
-            
-            # Paginate if more transactions
-            offset = len(transactions)
-            while offset < total:
+            def fetch_page(offset: Optional[int], page_size: int) -> Page:
+                offset = offset or 0
                 request = TransactionsGetRequest(
                     access_token=self.access_token,
                     start_date=start_date,
                     end_date=end_date,
-                    options=TransactionsGetRequestOptions(count=500, offset=offset)
+                    options=TransactionsGetRequestOptions(count=min(page_size, 500), offset=offset)
                 )
-                response = self.client.transactions_get(request)
-                
-                for txn in response['transactions']:
-                    yield self._transaction_to_dict(txn)
-                
-                offset += len(response['transactions'])
+                try:
+                    response = self.client.transactions_get(request)
+                except plaid.ApiException as e:
+                    if e.status == 429:
+                        raise RateLimitError(str(e))
+                    raise
+                transactions = response['transactions']
+                next_offset = offset + len(transactions)
+                has_more = transactions and next_offset < response['total_transactions']
+                return Page(records=transactions, next_cursor=next_offset if has_more else None)
+            
+            for txn in self.paginate(fetch_page):
+                yield self._transaction_to_dict(txn)
                 
         except Exception as e:
             print(f"Error fetching transactions: {e}")
@@ -6,12 +6,20 @@ Connectors handle: test → extract → normalize → load
 """
 
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Iterator
-from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Iterator, Tuple
+from datetime import datetime, timezone
 from enum import Enum
 import hashlib
 import json
+import queue
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
 
 
 class ConnectorType(Enum):
@@ -70,6 +78,7 @@ class SyncContext:
     # Incremental sync support
     cursor: Optional[str] = None  # Last sync position
     since_timestamp: Optional[datetime] = None
+    watermarks: Dict[str, str] = field(default_factory=dict)  # {object_type: ISO high-water mark}
     
     # Configuration
     sync_mode: SyncMode = SyncMode.SNAPSHOT
@@ -135,6 +144,285 @@ class ConnectorResult:
     warnings: List[str] = field(default_factory=list)
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# PAGINATED FETCHING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class Page:
+    """One page of records returned by a source API."""
+    records: List[Dict[str, Any]]
+    next_cursor: Optional[Any] = None  # None means this was the last page
+
+
+class RateLimitError(Exception):
+    """Raised by a page fetcher when the source API throttles the request."""
+    
+    def __init__(self, message: str = "Rate limited", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class PaginationConfig:
+    """
+    Tuning knobs for PaginatedFetcher.
+    
+    Page size adapts between min_page_size and max_page_size so that each
+    request takes roughly target_page_seconds.
+    """
+    page_size: int = 100
+    min_page_size: int = 25
+    max_page_size: int = 1000
+    adaptive: bool = True
+    target_page_seconds: float = 1.0
+    
+    # Rate-limit / transient error handling
+    max_retries: int = 5
+    backoff_base_seconds: float = 0.5
+    backoff_max_seconds: float = 30.0
+    
+    # Concurrency
+    prefetch: bool = True
+    max_partitions: int = 4
+    
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "PaginationConfig":
+        """Build from a connector config's 'pagination' dict, ignoring unknown keys."""
+        config = config or {}
+        return cls(**{k: v for k, v in config.items() if k in cls.__dataclass_fields__})
+
+
+# fetch_page(cursor, page_size) -> Page
+PageFetcher = Callable[[Optional[Any], int], Page]
+
+
+class PaginatedFetcher:
+    """
+    Iterates a paginated source, fetching page N+1 while page N is consumed.
+    
+    The caller supplies fetch_page(cursor, page_size); the first call gets
+    cursor=None. Records are yielded in source order. Throttled requests
+    (RateLimitError) are retried after the server's Retry-After or an
+    exponential backoff with jitter, and shrink the page size.
+    """
+    
+    def __init__(
+        self,
+        fetch_page: PageFetcher,
+        config: Optional[PaginationConfig] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.fetch_page = fetch_page
+        self.config = config or PaginationConfig()
+        self.page_size = self.config.page_size
+        self._sleep = sleep
+        
+        # Metrics
+        self.pages_fetched = 0
+        self.records_fetched = 0
+        self.retries = 0
+    
+    def _fetch_with_retry(self, cursor: Optional[Any]) -> Tuple[Page, int, float]:
+        attempt = 0
+        while True:
+            page_size = self.page_size
+            started = time.monotonic()
+            try:
+                page = self.fetch_page(cursor, page_size)
+                return page, page_size, time.monotonic() - started
+            except RateLimitError as e:
+                attempt += 1
+                self.retries += 1
+                if attempt > self.config.max_retries:
+                    raise
+                self.page_size = max(self.config.min_page_size, self.page_size // 2)
+                self._sleep(self._backoff_delay(attempt, e.retry_after))
+    
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.config.backoff_max_seconds)
+        delay = self.config.backoff_base_seconds * (2 ** (attempt - 1))
+        return min(delay, self.config.backoff_max_seconds) * random.uniform(0.5, 1.0)
+    
+    def _adapt_page_size(self, page: Page, requested: int, elapsed: float) -> None:
+        if not self.config.adaptive:
+            return
+        target = self.config.target_page_seconds
+        if elapsed > target * 2:
+            self.page_size = max(self.config.min_page_size, requested // 2)
+        elif elapsed < target / 2 and len(page.records) >= requested:
+            self.page_size = min(self.config.max_page_size, requested * 2)
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if not self.config.prefetch:
+            cursor = None
+            while True:
+                page, requested, elapsed = self._fetch_with_retry(cursor)
+                self._record_page(page, requested, elapsed)
+                yield from page.records
+                if page.next_cursor is None:
+                    return
+                cursor = page.next_cursor
+        
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-prefetch") as executor:
+            future = executor.submit(self._fetch_with_retry, None)
+            while future is not None:
+                page, requested, elapsed = future.result()
+                self._record_page(page, requested, elapsed)
+                future = (
+                    executor.submit(self._fetch_with_retry, page.next_cursor)
+                    if page.next_cursor is not None else None
+                )
+                yield from page.records
+    
+    def _record_page(self, page: Page, requested: int, elapsed: float) -> None:
+        self.pages_fetched += 1
+        self.records_fetched += len(page.records)
+        self._adapt_page_size(page, requested, elapsed)
+
+
+def partition_date_range(
+    start: datetime,
+    end: datetime,
+    partitions: int
+) -> List[Tuple[datetime, datetime]]:
+    """Split [start, end) into up to `partitions` contiguous, equal windows."""
+    if end <= start or partitions <= 1:
+        return [(start, end)]
+    step = (end - start) / partitions
+    bounds = [start + step * i for i in range(partitions)] + [end]
+    return [(bounds[i], bounds[i + 1]) for i in range(partitions) if bounds[i] < bounds[i + 1]]
+
+
+def fetch_partitioned(
+    fetcher_for_range: Callable[[datetime, datetime], PageFetcher],
+    start: datetime,
+    end: datetime,
+    config: Optional[PaginationConfig] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Backfill a date range by paginating each partition in parallel.
+    
+    Records from different partitions interleave; within a partition they
+    keep source order. Errors in any partition are re-raised to the caller.
+    """
+    config = config or PaginationConfig()
+    windows = partition_date_range(start, end, config.max_partitions)
+    if len(windows) == 1:
+        yield from PaginatedFetcher(fetcher_for_range(*windows[0]), config)
+        return
+    
+    done = object()
+    results: "queue.Queue[Any]" = queue.Queue(maxsize=config.max_page_size * len(windows))
+    stop = threading.Event()
+    
+    def run(window: Tuple[datetime, datetime]) -> None:
+        try:
+            for record in PaginatedFetcher(fetcher_for_range(*window), config):
+                if stop.is_set():
+                    return
+                results.put(record)
+        except BaseException as e:
+            results.put(e)
+        finally:
+            results.put(done)
+    
+    with ThreadPoolExecutor(max_workers=len(windows), thread_name_prefix="page-partition") as executor:
+        for window in windows:
+            executor.submit(run, window)
+        remaining = len(windows)
+        try:
+            while remaining:
+                item = results.get()
+                if item is done:
+                    remaining -= 1
+                elif isinstance(item, BaseException):
+                    raise item
+                else:
+                    yield item
+        finally:
+            stop.set()
+            # Unblock producers waiting on a full queue
+            while remaining:
+                try:
+                    if results.get(timeout=0.1) is done:
+                        remaining -= 1
+                except queue.Empty:
+                    pass
+
+
+def create_http_session(pool_size: int = 10) -> requests.Session:
+    """HTTP session with a connection pool sized for concurrent page fetches."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def http_cursor_page_fetcher(
+    session: requests.Session,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    items_key: str = "data",
+    limit_param: str = "limit",
+    cursor_param: str = "starting_after",
+    has_more_key: str = "has_more",
+    id_key: str = "id",
+    timeout: float = 30.0
+) -> PageFetcher:
+    """
+    PageFetcher for Stripe-style JSON list APIs.
+    
+    Requests `url?limit=N&starting_after=<last id>` and expects
+    {"data": [...], "has_more": bool}. HTTP 429 becomes RateLimitError.
+    """
+    def fetch_page(cursor: Optional[Any], page_size: int) -> Page:
+        query = dict(params or {})
+        query[limit_param] = page_size
+        if cursor is not None:
+            query[cursor_param] = cursor
+        
+        response = session.get(url, params=query, headers=headers, timeout=timeout)
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After")
+            raise RateLimitError(
+                f"Rate limited by {url}",
+                retry_after=float(retry_after) if retry_after else None
+            )
+        response.raise_for_status()
+        
+        body = response.json()
+        records = body.get(items_key) or []
+        has_more = body.get(has_more_key, False)
+        next_cursor = records[-1].get(id_key) if has_more and records else None
+        return Page(records=records, next_cursor=next_cursor)
+    
+    return fetch_page
+
+
+def iso_watermark(value: Any) -> Optional[str]:
+    """
+    Normalize a timestamp (datetime or ISO string) to a watermark string.
+    
+    Timezone-aware values are converted to UTC so watermarks of one object
+    type compare correctly as strings. Unparseable strings (partition IDs)
+    are returned unchanged.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return value
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.isoformat()
+
+
 class BaseConnector(ABC):
     """
     Base class for all Gitto connectors.
@@ -147,12 +435,16 @@ class BaseConnector(ABC):
     Optionally override:
     - get_schema(): Return expected source schema
     - get_sync_cursor(): Get current sync position
+    - watermark_for(): Return a record's high-water value for incremental sync
     """
     
     connector_type: ConnectorType
     display_name: str
     description: str
     
+    # Payload field holding each record's high-water value (e.g. 'created')
+    watermark_field: Optional[str] = None
+    
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize connector with configuration.
@@ -214,6 +506,41 @@ class BaseConnector(ABC):
         """
         return {}
     
+    def since_for(self, context: SyncContext, object_type: str) -> Optional[datetime]:
+        """
+        Lower bound for extracting one object type.
+        
+        The later of context.since_timestamp and the object's committed
+        watermark, so incremental syncs only move the delta.
+        """
+        since = context.since_timestamp
+        watermark = context.watermarks.get(object_type)
+        if watermark:
+            try:
+                watermark_dt = datetime.fromisoformat(watermark.replace("Z", "+00:00"))
+            except ValueError:
+                return since
+            if since is None:
+                return watermark_dt
+            if (since.tzinfo is None) == (watermark_dt.tzinfo is None):
+                return max(since, watermark_dt)
+        return since
+    
+    def object_type_for(self, record: ExtractedRecord) -> str:
+        """Object type a record's watermark is tracked under (see since_for)."""
+        return record.data.get('_record_type') or record.record_type
+    
+    def watermark_for(self, record: ExtractedRecord) -> Optional[str]:
+        """
+        The record's high-water value, comparable as a string.
+        
+        Default: the payload's watermark_field, or None when the connector
+        does not support incremental sync.
+        """
+        if not self.watermark_field:
+            return None
+        return iso_watermark(record.data.get(self.watermark_field))
+    
     def get_sync_cursor(self) -> Optional[str]:
         """
         Get current sync position for incremental sync.
@@ -336,4 +663,28 @@ class APIConnector(BaseConnector):
     def _get_record_type(self) -> str:
         """Return the record type this connector extracts."""
         pass
+    
+    def pagination_config(self) -> PaginationConfig:
+        """Pagination settings, overridable per connection via config['pagination']."""
+        return PaginationConfig.from_config(self.config.get('pagination'))
+    
+    def paginate(self, fetch_page: PageFetcher) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate all records from a paginated endpoint.
+        
+        The next page is prefetched while the caller processes the current
+        one; page size and throttling follow pagination_config().
+        """
+        return iter(PaginatedFetcher(fetch_page, self.pagination_config()))
+    
+    def paginate_date_range(
+        self,
+        fetcher_for_range: Callable[[datetime, datetime], PageFetcher],
+        start: datetime,
+        end: Optional[datetime] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Backfill [start, end) with date partitions paginated in parallel."""
+        return fetch_partitioned(
+            fetcher_for_range, start, end or datetime.now(start.tzinfo), self.pagination_config()
+        )
 
@@ -11,7 +11,8 @@ from datetime import datetime
 from typing import Any, Dict, Iterator, List, Optional
 from .base import (
     APIConnector, ConnectorType, ConnectorResult,
-    SyncContext, ExtractedRecord, NormalizedRecord
+    SyncContext, ExtractedRecord, NormalizedRecord,
+    Page, PageFetcher, iso_watermark
 )
 
 # Official SDK
@@ -37,6 +38,7 @@ class NetSuiteConnector(APIConnector):
     connector_type = ConnectorType.ERP_NETSUITE
     display_name = "NetSuite"
     description = "Oracle NetSuite ERP via SuiteTalk API"
+    watermark_field = 'lastModifiedDate'
     
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
@@ -100,12 +102,47 @@ class NetSuiteConnector(APIConnector):
         # Customer Payments
         yield from self._fetch_payments(context)
     
+    def _page_fetcher(self, record_api: Any) -> PageFetcher:
+        """
+        PageFetcher over a netsuitesdk paginated search.
+        
+        The SDK search is stateful (searchMoreWithId), so pages are pulled
+        from its generator in order; the cursor only signals "not done yet".
+        """
+        pages = record_api.get_all_generator(page_size=self.pagination_config().page_size)
+        
+        def fetch_page(page_number: Optional[int], _suggested_size: int) -> Page:
+            records = next(pages, None)
+            if not records:
+                return Page(records=[])
+            return Page(records=list(records), next_cursor=(page_number or 0) + 1)
+        
+        return fetch_page
+    
+    def _modified_since(
+        self,
+        records: Iterator[Dict[str, Any]],
+        context: SyncContext,
+        object_type: str
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Drop records last modified before the object type's since/watermark.
+        
+        get_all_generator cannot filter server-side, so this saves the
+        normalize and load work rather than the transfer.
+        """
+        since = iso_watermark(self.since_for(context, object_type))
+        for record in records:
+            modified = iso_watermark(record.get('lastModifiedDate'))
+            if since and modified and modified < since:
+                continue
+            yield record
+    
     def _fetch_invoices(self, context: SyncContext) -> Iterator[Dict[str, Any]]:
         """Fetch AR invoices."""
         try:
-            invoices = self.connection.invoices.get_all()
-            
-            for inv in invoices:
+            invoices = self.paginate(self._page_fetcher(self.connection.invoices))
+            for inv in self._modified_since(invoices, context, 'invoice'):
                 yield {
                     '_record_type': 'invoice',
                     'internalId': inv.get('internalId'),
@@ -127,9 +164,8 @@ class NetSuiteConnector(APIConnector):
     def _fetch_vendor_bills(self, context: SyncContext) -> Iterator[Dict[str, Any]]:
         """Fetch AP vendor bills."""
         try:
-            bills = self.connection.vendor_bills.get_all()
-            
-            for bill in bills:
+            bills = self.paginate(self._page_fetcher(self.connection.vendor_bills))
+            for bill in self._modified_since(bills, context, 'vendor_bill'):
                 yield {
                     '_record_type': 'vendor_bill',
                     'internalId': bill.get('internalId'),
@@ -151,9 +187,8 @@ class NetSuiteConnector(APIConnector):
     def _fetch_payments(self, context: SyncContext) -> Iterator[Dict[str, Any]]:
         """Fetch customer payments."""
         try:
-            payments = self.connection.customer_payments.get_all()
-            
-            for pmt in payments:
+            payments = self.paginate(self._page_fetcher(self.connection.customer_payments))
+            for pmt in self._modified_since(payments, context, 'payment'):
                 yield {
                     '_record_type': 'payment',
                     'internalId': pmt.get('internalId'),
@@ -7,10 +7,10 @@ QuickBooks API: https://developer.intuit.com/app/developer/qbo/docs/api/accounti
 """
 
 from datetime import datetime
-from typing import Any, Dict, Iterator, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from .base import (
     APIConnector, ConnectorType, ConnectorResult,
-    SyncContext, ExtractedRecord, NormalizedRecord
+    SyncContext, ExtractedRecord, NormalizedRecord, iso_watermark
 )
 
 # Official SDK imports
@@ -131,10 +131,24 @@ class QuickBooksConnector(APIConnector):
         # Fetch Payments
         yield from self._fetch_payments(context)
     
+    def _query(self, model: Any, context: SyncContext, object_type: str) -> List[Any]:
+        """List an entity, only rows updated at or after its since/watermark."""
+        since = self.since_for(context, object_type)
+        if not since:
+            return model.all(qb=self.qb_client, max_results=1000)
+        return model.where(
+            f"MetaData.LastUpdatedTime >= '{since.isoformat()}'",
+            qb=self.qb_client, max_results=1000
+        )
+    
+    def watermark_for(self, record: ExtractedRecord) -> Optional[str]:
+        """MetaData.LastUpdatedTime is the high-water mark."""
+        return iso_watermark((record.data.get('MetaData') or {}).get('LastUpdatedTime'))
+    
     def _fetch_invoices(self, context: SyncContext) -> Iterator[Dict[str, Any]]:
         """Fetch AR invoices using SDK."""
         try:
-            invoices = QBInvoice.all(qb=self.qb_client, max_results=1000)
+            invoices = self._query(QBInvoice, context, 'invoice')
             
             for inv in invoices:
                 yield {
@@ -162,7 +176,7 @@ class QuickBooksConnector(APIConnector):
     def _fetch_bills(self, context: SyncContext) -> Iterator[Dict[str, Any]]:
         """Fetch AP bills using SDK."""
         try:
-            bills = QBBill.all(qb=self.qb_client, max_results=1000)
+            bills = self._query(QBBill, context, 'bill')
             
             for bill in bills:
                 yield {
@@ -189,7 +203,7 @@ class QuickBooksConnector(APIConnector):
     def _fetch_payments(self, context: SyncContext) -> Iterator[Dict[str, Any]]:
         """Fetch payments using SDK."""
         try:
-            payments = QBPayment.all(qb=self.qb_client, max_results=1000)
+            payments = self._query(QBPayment, context, 'payment')
             
             for pmt in payments:
                 yield {
@@ -10,7 +10,8 @@ from datetime import datetime
 from typing import Any, Dict, Iterator, Optional
 from .base import (
     APIConnector, ConnectorType, ConnectorResult,
-    SyncContext, ExtractedRecord, NormalizedRecord
+    SyncContext, ExtractedRecord, NormalizedRecord,
+    Page, PageFetcher, RateLimitError
 )
 
 # Official SDK imports
@@ -20,6 +21,7 @@ try:
     from xero_python.api_client.oauth2 import OAuth2Token
     from xero_python.accounting import AccountingApi
     from xero_python.identity import IdentityApi
+    from xero_python.exceptions import RateLimitException
     HAS_SDK = True
 except ImportError:
     HAS_SDK = False
@@ -39,6 +41,7 @@ class XeroConnector(APIConnector):
     connector_type = ConnectorType.ERP_XERO
     display_name = "Xero"
     description = "Xero Accounting software via Official SDK"
+    watermark_field = 'UpdatedDateUTC'
     
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
@@ -128,19 +131,51 @@ class XeroConnector(APIConnector):
         yield from self._fetch_bills(context)
         yield from self._fetch_bank_transactions(context)
     
+    def _page_fetcher(self, list_method: Any, items_attr: str, **kwargs) -> PageFetcher:
+        """
+        PageFetcher over a Xero list endpoint using 1-based page numbers.
+        
+        Page numbers only line up with a constant page size, so the adaptive
+        size suggested by PaginatedFetcher is ignored here.
+        """
+        page_size = min(self.pagination_config().page_size, 1000)
+        
+        def fetch_page(page_number: Optional[int], _suggested_size: int) -> Page:
+            page_number = page_number or 1
+            try:
+                response = list_method(
+                    self.tenant_id, page=page_number, page_size=page_size, **kwargs
+                )
+            except RateLimitException as e:
+                retry_after = (getattr(e, 'headers', None) or {}).get('Retry-After')
+                raise RateLimitError(str(e), retry_after=float(retry_after) if retry_after else None)
+            
+            records = getattr(response, items_attr, None) or []
+            has_more = len(records) >= page_size
+            return Page(records=records, next_cursor=page_number + 1 if has_more else None)
+        
+        return fetch_page
+    
+    def _where(self, context: SyncContext, object_type: str, *conditions: str) -> Optional[str]:
+        """
+        Where clause for one object type, limited to its since/watermark day.
+        
+        Xero filters by whole days, so the watermark day itself is re-read;
+        the lineage idempotency index skips rows already loaded.
+        """
+        since = self.since_for(context, object_type)
+        if since:
+            conditions += (f'UpdatedDateUTC>=DateTime({since.year},{since.month},{since.day})',)
+        return ' AND '.join(conditions) or None
+    
     def _fetch_invoices(self, context: SyncContext) -> Iterator[Dict[str, Any]]:
         """Fetch AR invoices (Type=ACCREC)."""
         try:
-            where_clause = 'Type=="ACCREC"'
-            if context.since_timestamp:
-                where_clause += f' AND UpdatedDateUTC>DateTime({context.since_timestamp.year},{context.since_timestamp.month},{context.since_timestamp.day})'
-            
-            api_response = self.accounting_api.get_invoices(
-                self.tenant_id,
-                where=where_clause
-            )
+            where_clause = self._where(context, 'invoice', 'Type=="ACCREC"')
             
-            for inv in (api_response.invoices or []):
+            for inv in self.paginate(self._page_fetcher(
+                self.accounting_api.get_invoices, 'invoices', where=where_clause
+            )):
                 yield {
                     '_record_type': 'invoice',
                     'InvoiceID': inv.invoice_id,
@@ -164,16 +199,11 @@ class XeroConnector(APIConnector):
     def _fetch_bills(self, context: SyncContext) -> Iterator[Dict[str, Any]]:
         """Fetch AP bills (Type=ACCPAY)."""
         try:
-            where_clause = 'Type=="ACCPAY"'
-            if context.since_timestamp:
-                where_clause += f' AND UpdatedDateUTC>DateTime({context.since_timestamp.year},{context.since_timestamp.month},{context.since_timestamp.day})'
-            
-            api_response = self.accounting_api.get_invoices(
-                self.tenant_id,
-                where=where_clause
-            )
+            where_clause = self._where(context, 'bill', 'Type=="ACCPAY"')
             
-            for bill in (api_response.invoices or []):
+            for bill in self.paginate(self._page_fetcher(
+                self.accounting_api.get_invoices, 'invoices', where=where_clause
+            )):
                 yield {
                     '_record_type': 'bill',
                     'InvoiceID': bill.invoice_id,
@@ -197,9 +227,12 @@ class XeroConnector(APIConnector):
     def _fetch_bank_transactions(self, context: SyncContext) -> Iterator[Dict[str, Any]]:
         """Fetch bank transactions."""
         try:
-            api_response = self.accounting_api.get_bank_transactions(self.tenant_id)
+            where_clause = self._where(context, 'bank_txn')
+            kwargs = {'where': where_clause} if where_clause else {}
             
-            for txn in (api_response.bank_transactions or []):
+            for txn in self.paginate(self._page_fetcher(
+                self.accounting_api.get_bank_transactions, 'bank_transactions', **kwargs
+            )):
                 yield {
                     '_record_type': 'bank_txn',
                     'BankTransactionID': txn.bank_transaction_id,
@@ -14,7 +14,8 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, Iterator, List, Optional
 from .base import (
     APIConnector, ConnectorType, ConnectorResult,
-    SyncContext, ExtractedRecord, NormalizedRecord
+    SyncContext, ExtractedRecord, NormalizedRecord,
+    Page, PageFetcher, RateLimitError
 )
 
 # Official SDK
@@ -37,6 +38,7 @@ class StripeConnector(APIConnector):
     connector_type = ConnectorType.PAYMENTS
     display_name = "Stripe"
     description = "Payment processing data via Stripe API"
+    watermark_field = 'created'
     
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
@@ -96,6 +98,41 @@ class StripeConnector(APIConnector):
         # Charges (incoming payments)
         yield from self._fetch_charges(context)
     
+    def _list_fetcher(self, resource: Any, params: Dict[str, Any]) -> PageFetcher:
+        """PageFetcher over a Stripe list endpoint using starting_after cursors."""
+        def fetch_page(cursor: Optional[str], page_size: int) -> Page:
+            query = dict(params, limit=min(page_size, 100))  # Stripe caps limit at 100
+            if cursor:
+                query['starting_after'] = cursor
+            try:
+                result = resource.list(**query)
+            except stripe.error.RateLimitError as e:
+                retry_after = (e.headers or {}).get('Retry-After')
+                raise RateLimitError(str(e), retry_after=float(retry_after) if retry_after else None)
+            
+            records = list(result.data)
+            next_cursor = records[-1]['id'] if result.has_more and records else None
+            return Page(records=records, next_cursor=next_cursor)
+        
+        return fetch_page
+    
+    def _iter_list(self, resource: Any, context: SyncContext, object_type: str) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate a Stripe list endpoint.
+        
+        Bounded ranges (since_timestamp or a `created` watermark) are split
+        into created-date windows paginated in parallel.
+        """
+        since = self.since_for(context, object_type)
+        if not since:
+            return self.paginate(self._list_fetcher(resource, {}))
+        
+        def fetcher_for_range(start: datetime, end: datetime) -> PageFetcher:
+            created = {'gte': int(start.timestamp()), 'lt': int(end.timestamp())}
+            return self._list_fetcher(resource, {'created': created})
+        
+        return self.paginate_date_range(fetcher_for_range, since)
+    
     def _fetch_balance(self) -> Iterator[Dict[str, Any]]:
         """Fetch current Stripe balance."""
         try:
@@ -126,14 +163,7 @@ class StripeConnector(APIConnector):
     def _fetch_balance_transactions(self, context: SyncContext) -> Iterator[Dict[str, Any]]:
         """Fetch balance transactions with pagination."""
         try:
-            params = {'limit': 100}
-            
-            if context.since_timestamp:
-                params['created'] = {'gte': int(context.since_timestamp.timestamp())}
-            
-            transactions = stripe.BalanceTransaction.list(**params)
-            
-            for txn in transactions.auto_paging_iter():
+            for txn in self._iter_list(stripe.BalanceTransaction, context, 'balance_txn'):
                 yield {
                     '_record_type': 'balance_txn',
                     'id': txn['id'],
@@ -155,14 +185,7 @@ class StripeConnector(APIConnector):
     def _fetch_payouts(self, context: SyncContext) -> Iterator[Dict[str, Any]]:
         """Fetch payouts to bank account."""
         try:
-            params = {'limit': 100}
-            
-            if context.since_timestamp:
-                params['created'] = {'gte': int(context.since_timestamp.timestamp())}
-            
-            payouts = stripe.Payout.list(**params)
-            
-            for payout in payouts.auto_paging_iter():
+            for payout in self._iter_list(stripe.Payout, context, 'payout'):
                 yield {
                     '_record_type': 'payout',
                     'id': payout['id'],
@@ -184,14 +207,7 @@ class StripeConnector(APIConnector):
     def _fetch_charges(self, context: SyncContext) -> Iterator[Dict[str, Any]]:
         """Fetch charges (incoming payments)."""
         try:
-            params = {'limit': 100}
-            
-            if context.since_timestamp:
-                params['created'] = {'gte': int(context.since_timestamp.timestamp())}
-            
-            charges = stripe.Charge.list(**params)
-            
-            for charge in charges.auto_paging_iter():
+            for charge in self._iter_list(stripe.Charge, context, 'charge'):
                 yield {
                     '_record_type': 'charge',
                     'id': charge['id'],
@@ -11,8 +11,9 @@ from datetime import datetime
 from typing import Any, Dict, Iterator, List, Optional
 from .base import (
     APIConnector, ConnectorType, ConnectorResult,
-    SyncContext, ExtractedRecord, NormalizedRecord
+    SyncContext, ExtractedRecord, NormalizedRecord, iso_watermark
 )
+from .warehouse_arrow import ArrowWarehouseMixin, DuckDBWarehouse
 
 # Official SDK
 try:
@@ -23,7 +24,7 @@ except ImportError:
     HAS_SDK = False
 
 
-class BigQueryConnector(APIConnector):
+class BigQueryConnector(ArrowWarehouseMixin, APIConnector):
     """
     Connector for Google BigQuery.
     
@@ -35,17 +36,25 @@ class BigQueryConnector(APIConnector):
         
     Or use application default credentials:
         use_default_credentials: true
+        
+    Bulk extraction:
+        arrow: Fetch results as Arrow batches (default true when pyarrow is installed)
+        local_duckdb: Path to a DuckDB file used instead of BigQuery (offline tests)
     """
     
     connector_type = ConnectorType.WAREHOUSE_BIGQUERY
     display_name = "BigQuery"
     description = "Google BigQuery for analytics and bi-directional sync"
     
+    arrow_isoformat_temporal = True
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.client = None
     
     def _validate_config(self) -> None:
+        if self.config.get('local_duckdb'):
+            return
         if not HAS_SDK:
             raise ImportError("BigQuery SDK not installed. Run: pip install google-cloud-bigquery")
         if 'project_id' not in self.config:
@@ -53,6 +62,11 @@ class BigQueryConnector(APIConnector):
     
     def authenticate(self) -> bool:
         """Connect to BigQuery."""
+        if self.config.get('local_duckdb'):
+            if not self.client:
+                self.client = DuckDBWarehouse(self.config['local_duckdb'])
+            return True
+        
         if not HAS_SDK:
             return False
             
@@ -114,22 +128,38 @@ class BigQueryConnector(APIConnector):
         for query_config in queries:
             yield from self._execute_query(query_config, context)
     
+    def _build_query(self, query_config: Dict, context: SyncContext) -> str:
+        """Configured SQL with the incremental filter applied."""
+        query = query_config.get('sql')
+        
+        # Add incremental filter if supported (since_timestamp or the query's watermark)
+        since = self.since_for(context, query_config.get('record_type', 'generic'))
+        if since and query_config.get('timestamp_column'):
+            ts_col = query_config.get('timestamp_column')
+            timestamp_str = since.strftime('%Y-%m-%d %H:%M:%S')
+            
+            if 'WHERE' in query.upper():
+                query = f"{query} AND {ts_col} >= TIMESTAMP('{timestamp_str}')"
+            else:
+                query = f"{query} WHERE {ts_col} >= TIMESTAMP('{timestamp_str}')"
+        
+        return query
+    
+    def watermark_for(self, record: ExtractedRecord) -> Optional[str]:
+        """The record's timestamp_column value (updated-at or partition time) from its query."""
+        record_type = self.object_type_for(record)
+        for query_config in self.config.get('queries', []):
+            if query_config.get('record_type', 'generic') == record_type:
+                ts_col = query_config.get('timestamp_column')
+                return iso_watermark(record.data.get(ts_col)) if ts_col else None
+        return None
+    
     def _execute_query(self, query_config: Dict, context: SyncContext) -> Iterator[Dict[str, Any]]:
         """Execute a configured query and yield records."""
         try:
-            query = query_config.get('sql')
+            query = self._build_query(query_config, context)
             record_type = query_config.get('record_type', 'generic')
             
-            # Add incremental filter if supported
-            if context.since_timestamp and query_config.get('timestamp_column'):
-                ts_col = query_config.get('timestamp_column')
-                timestamp_str = context.since_timestamp.strftime('%Y-%m-%d %H:%M:%S')
-                
-                if 'WHERE' in query.upper():
-                    query = f"{query} AND {ts_col} > TIMESTAMP('{timestamp_str}')"
-                else:
-                    query = f"{query} WHERE {ts_col} > TIMESTAMP('{timestamp_str}')"
-            
             query_job = self.client.query(query)
             results = query_job.result()
             
@@ -141,6 +171,12 @@ class BigQueryConnector(APIConnector):
         except Exception as e:
             print(f"Error executing query: {e}")
     
+    def _execute_query_arrow(self, query_config: Dict, context: SyncContext):
+        """Execute a configured query and yield Arrow record batches."""
+        query_job = self.client.query(self._build_query(query_config, context))
+        results = query_job.result(page_size=self._arrow_batch_rows())
+        yield from results.to_arrow_iterable()
+    
     def execute_sql(self, sql: str) -> List[Dict[str, Any]]:
         """Execute arbitrary SQL and return results."""
         if not self.client:
@@ -256,12 +292,15 @@ class BigQueryConnector(APIConnector):
             record_type=record_type,
             data=normalized,
             source_id=record.source_id,
-            source_system=f"BigQuery:{self.config.get('project_id')}",
+            source_system=self._source_system(),
             source_checksum=record.compute_checksum(),
             quality_issues=[],
             is_complete=True
         )
     
+    def _source_system(self) -> str:
+        return f"BigQuery:{self.config.get('project_id')}"
+    
     def _generate_canonical_id(self, data: Dict, record_type: str) -> str:
         """Generate canonical ID from primary key or hash."""
         import hashlib
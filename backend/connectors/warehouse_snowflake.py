@@ -11,8 +11,9 @@ from datetime import datetime
 from typing import Any, Dict, Iterator, List, Optional
 from .base import (
     APIConnector, ConnectorType, ConnectorResult,
-    SyncContext, ExtractedRecord, NormalizedRecord
+    SyncContext, ExtractedRecord, NormalizedRecord, iso_watermark
 )
+from .warehouse_arrow import ArrowWarehouseMixin, DuckDBWarehouse, to_record_batches
 
 # Official SDK
 try:
@@ -22,7 +23,7 @@ except ImportError:
     HAS_SDK = False
 
 
-class SnowflakeConnector(APIConnector):
+class SnowflakeConnector(ArrowWarehouseMixin, APIConnector):
     """
     Connector for Snowflake Data Warehouse.
     
@@ -38,6 +39,10 @@ class SnowflakeConnector(APIConnector):
     For key pair auth:
         private_key_path: Path to private key file
         private_key_passphrase: Passphrase for private key
+        
+    Bulk extraction:
+        arrow: Fetch results as Arrow batches (default true when pyarrow is installed)
+        local_duckdb: Path to a DuckDB file used instead of Snowflake (offline tests)
     """
     
     connector_type = ConnectorType.WAREHOUSE_SNOWFLAKE
@@ -49,6 +54,8 @@ class SnowflakeConnector(APIConnector):
         self.connection = None
     
     def _validate_config(self) -> None:
+        if self.config.get('local_duckdb'):
+            return
         if not HAS_SDK:
             raise ImportError("Snowflake SDK not installed. Run: pip install snowflake-connector-python")
         required = ['account', 'user', 'warehouse', 'database']
@@ -58,6 +65,11 @@ class SnowflakeConnector(APIConnector):
     
     def authenticate(self) -> bool:
         """Connect to Snowflake."""
+        if self.config.get('local_duckdb'):
+            if not self.connection:
+                self.connection = DuckDBWarehouse(self.config['local_duckdb'])
+            return True
+        
         if not HAS_SDK:
             return False
             
@@ -130,20 +142,36 @@ class SnowflakeConnector(APIConnector):
         for query_config in queries:
             yield from self._execute_query(query_config, context)
     
+    def _build_query(self, query_config: Dict, context: SyncContext) -> str:
+        """Configured SQL with the incremental filter applied."""
+        query = query_config.get('sql')
+        
+        # Add incremental filter if supported (since_timestamp or the query's watermark)
+        since = self.since_for(context, query_config.get('record_type', 'generic'))
+        if since and query_config.get('timestamp_column'):
+            ts_col = query_config.get('timestamp_column')
+            timestamp_str = since.strftime('%Y-%m-%d %H:%M:%S')
+            query = f"{query} WHERE {ts_col} >= '{timestamp_str}'"
+        
+        return query
+    
+    def watermark_for(self, record: ExtractedRecord) -> Optional[str]:
+        """The record's timestamp_column value (updated-at or partition time) from its query."""
+        record_type = self.object_type_for(record)
+        for query_config in self.config.get('queries', []):
+            if query_config.get('record_type', 'generic') == record_type:
+                ts_col = query_config.get('timestamp_column')
+                return iso_watermark(record.data.get(ts_col)) if ts_col else None
+        return None
+    
     def _execute_query(self, query_config: Dict, context: SyncContext) -> Iterator[Dict[str, Any]]:
         """Execute a configured query and yield records."""
         try:
             cursor = self.connection.cursor()
             
-            query = query_config.get('sql')
+            query = self._build_query(query_config, context)
             record_type = query_config.get('record_type', 'generic')
             
-            # Add incremental filter if supported
-            if context.since_timestamp and query_config.get('timestamp_column'):
-                ts_col = query_config.get('timestamp_column')
-                timestamp_str = context.since_timestamp.strftime('%Y-%m-%d %H:%M:%S')
-                query = f"{query} WHERE {ts_col} > '{timestamp_str}'"
-            
             cursor.execute(query)
             columns = [desc[0] for desc in cursor.description]
             
@@ -157,6 +185,16 @@ class SnowflakeConnector(APIConnector):
         except Exception as e:
             print(f"Error executing query: {e}")
     
+    def _execute_query_arrow(self, query_config: Dict, context: SyncContext):
+        """Execute a configured query and yield Arrow record batches."""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(self._build_query(query_config, context))
+            for chunk in cursor.fetch_arrow_batches():
+                yield from to_record_batches(chunk)
+        finally:
+            cursor.close()
+    
     def execute_sql(self, sql: str) -> List[Dict[str, Any]]:
         """Execute arbitrary SQL and return results."""
         if not self.connection:
@@ -225,12 +263,15 @@ class SnowflakeConnector(APIConnector):
             record_type=record_type,
             data=normalized,
             source_id=record.source_id,
-            source_system=f"Snowflake:{self.config.get('database')}",
+            source_system=self._source_system(),
             source_checksum=record.compute_checksum(),
             quality_issues=[],
             is_complete=True
         )
     
+    def _source_system(self) -> str:
+        return f"Snowflake:{self.config.get('database')}"
+    
     def _generate_canonical_id(self, data: Dict, record_type: str) -> str:
         """Generate canonical ID from primary key or hash."""
         import hashlib
@@ -4,7 +4,7 @@ Concrete Connector Implementations
 Provides:
 - CSVStatementConnector: Bank CSV upload
 - ExcelERPConnector: AR/AP Excel upload
-- WarehouseSQLConnector: Snowflake/BigQuery stub
+- WarehouseSQLConnector: Snowflake/BigQuery stub, executable against a local DuckDB
 """
 
 from typing import Dict, Any, List, Optional, Union
@@ -18,6 +18,7 @@ from connector_sdk import (
     BaseConnector, TestResult, RawBatch, RawRecord, NormalizedBatch, NormalizedRecord,
     DataHealthIssue, DataHealthReport, CanonicalTable, NormalizationLayer
 )
+from connectors.warehouse_arrow import HAS_ARROW, DuckDBWarehouse
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -654,14 +655,47 @@ class WarehouseSQLConnector(BaseConnector):
     """
     Stub connector for data warehouses (Snowflake, BigQuery).
     
-    Structure only - no real authentication or execution.
-    Shows the interface for future implementation.
+    No real authentication. With config["local_duckdb"] set, queries run
+    against a local DuckDB file instead, fetched as one Arrow table
+    (RawBatch.arrow_table) and normalized column by column. The list-of-
+    dicts path remains when pyarrow is missing or config["arrow"] is false.
+    
+    Incremental sync: config["watermark_column"] (an updated-at timestamp or
+    a partition ID such as BigQuery's _PARTITIONTIME) names each row's
+    high-water value. Local queries then return rows in that order, starting
+    at the committed watermark for the output table.
     """
     
+    def __init__(self, config: Dict[str, Any], entity_id: Optional[int] = None):
+        super().__init__(config, entity_id)
+        self.watermarks: Dict[str, str] = {}
+    
     @property
     def connector_type(self) -> str:
         return "warehouse_sql"
     
+    @property
+    def watermark_column(self) -> Optional[str]:
+        return self.config.get("watermark_column")
+    
+    @property
+    def object_type(self) -> str:
+        """Watermarks are tracked per output table."""
+        return self.config.get("output_table", "invoices")
+    
+    def set_watermarks(self, watermarks: Dict[str, str]) -> None:
+        """Receive committed watermarks ({object_type: watermark}) before extract()."""
+        self.watermarks = dict(watermarks)
+    
+    def watermark_for(self, raw_data: Dict[str, Any]) -> Optional[str]:
+        """The row's watermark_column value, comparable as a string."""
+        if not self.watermark_column:
+            return None
+        value = raw_data.get(self.watermark_column)
+        if value is None:
+            return None
+        return value.isoformat() if isinstance(value, (datetime, date)) else str(value)
+    
     @property
     def source_type(self) -> str:
         warehouse_type = self.config.get("warehouse_type", "snowflake")
@@ -741,6 +775,9 @@ class WarehouseSQLConnector(BaseConnector):
         """
         query = data if isinstance(data, str) else data.get("query", "")
         
+        if self.config.get("local_duckdb"):
+            return self._extract_local(query, data, since, until)
+        
         # Stub: return empty batch with structure
         return RawBatch(
             records=[],
@@ -763,6 +800,73 @@ class WarehouseSQLConnector(BaseConnector):
             }
         )
     
+    def _extract_local(
+        self,
+        query: str,
+        data: Any,
+        since: Optional[datetime],
+        until: Optional[datetime]
+    ) -> RawBatch:
+        """Run the query against the local DuckDB stand-in."""
+        date_column = data.get("date_column") if isinstance(data, dict) else None
+        conditions = []
+        params = []
+        if date_column and since:
+            conditions.append(f"{date_column} >= ?")
+            params.append(since)
+        if date_column and until:
+            conditions.append(f"{date_column} < ?")
+            params.append(until)
+        watermark = self.watermarks.get(self.object_type) if since is None else None
+        if self.watermark_column and watermark is not None:
+            # Rows at the watermark are re-read; the idempotency index skips them
+            conditions.append(f"{self.watermark_column} >= ?")
+            params.append(watermark)
+        if conditions:
+            query = f"SELECT * FROM ({query}) AS q WHERE {' AND '.join(conditions)}"
+        if self.watermark_column:
+            query = f"SELECT * FROM ({query}) AS w ORDER BY {self.watermark_column}"
+        
+        warehouse = DuckDBWarehouse(self.config["local_duckdb"])
+        try:
+            cursor = warehouse.cursor().execute(query, params)
+            metadata = {
+                "warehouse_type": self.config.get("warehouse_type", "snowflake"),
+                "query": query[:100] + "..." if len(query) > 100 else query,
+                "local_duckdb": True
+            }
+            
+            if HAS_ARROW and self.config.get("arrow", True):
+                table = cursor.fetch_arrow_all()
+                metadata["format"] = "arrow"
+                return RawBatch(
+                    records=[],
+                    source_type=self.source_type,
+                    source_name=self.config.get("source_name", "Warehouse Query"),
+                    columns=table.schema.names,
+                    column_types={f.name: str(f.type) for f in table.schema},
+                    metadata=metadata,
+                    arrow_table=table
+                )
+            
+            columns = [d[0] for d in cursor.description]
+            column_types = {d[0]: str(d[1]) for d in cursor.description}
+            records = [
+                RawRecord(source_table=query, row_index=i, raw_data=dict(zip(columns, row)))
+                for i, row in enumerate(cursor)
+            ]
+            metadata["format"] = "rows"
+            return RawBatch(
+                records=records,
+                source_type=self.source_type,
+                source_name=self.config.get("source_name", "Warehouse Query"),
+                columns=columns,
+                column_types=column_types,
+                metadata=metadata
+            )
+        finally:
+            warehouse.close()
+    
     def normalize(self, raw_batch: RawBatch) -> NormalizedBatch:
         """
         Normalize warehouse query results (stub).
@@ -777,6 +881,9 @@ class WarehouseSQLConnector(BaseConnector):
         locale = self.config.get("locale", "ISO")
         output_table = self.output_tables[0]
         
+        if raw_batch.arrow_table is not None:
+            records, issues = self._normalize_columns(raw_batch, column_mapping, locale, output_table)
+        
         for raw_record in raw_batch.records:
             try:
                 mapped = {
@@ -844,6 +951,79 @@ class WarehouseSQLConnector(BaseConnector):
             result.fx_rates = records
         
         return result
+    
+    def _normalize_columns(
+        self,
+        raw_batch: RawBatch,
+        column_mapping: Dict[str, str],
+        locale: str,
+        output_table: CanonicalTable
+    ):
+        """
+        Columnar equivalent of the row loop in normalize().
+        
+        Amounts, currencies and dates are parsed per column (each distinct
+        value once); IDs and hashes match the row path exactly.
+        """
+        table = raw_batch.arrow_table
+        mapped_names = [column_mapping.get(c, c) for c in table.schema.names]
+        columns = {}
+        for name, column in zip(mapped_names, table.columns):
+            columns[name] = column.to_pylist()
+        
+        n = table.num_rows
+        nulls = [None] * n
+        amounts = NormalizationLayer.parse_amount_column(columns.get("amount", nulls))
+        currencies = NormalizationLayer.normalize_currency_column(columns.get("currency", nulls))
+        record_dates = NormalizationLayer.parse_date_column(columns.get("date", nulls), locale)
+        doc_numbers = columns.get("id")
+        counterparties = columns.get("counterparty", nulls)
+        doc_type = output_table.value.upper()
+        
+        records = []
+        issues = []
+        for row_index, raw_data in enumerate(table.to_pylist()):
+            try:
+                mapped = dict(zip(mapped_names, raw_data.values()))
+                amount = amounts[row_index]
+                currency = currencies[row_index]
+                record_date = record_dates[row_index]
+                
+                canonical_id = NormalizationLayer.generate_canonical_id(
+                    source=self.source_type,
+                    entity_id=self.entity_id,
+                    doc_type=doc_type,
+                    doc_number=doc_numbers[row_index] if doc_numbers is not None else str(row_index),
+                    counterparty=counterparties[row_index] if "counterparty" in columns else "Unknown",
+                    currency=currency or "EUR",
+                    amount=amount or Decimal('0'),
+                    doc_date=record_date,
+                    due_date=None
+                )
+                
+                records.append(NormalizedRecord(
+                    table=output_table,
+                    canonical_id=canonical_id,
+                    data=mapped,
+                    source_row_index=row_index,
+                    source_raw_hash=RawRecord(
+                        source_table=raw_batch.source_name, row_index=row_index, raw_data=raw_data
+                    ).raw_hash,
+                    amount=amount,
+                    currency=currency,
+                    record_date=record_date,
+                    counterparty=counterparties[row_index]
+                ))
+                
+            except Exception as e:
+                issues.append(DataHealthIssue(
+                    issue_type="parse_error",
+                    severity="error",
+                    row_indices=[row_index],
+                    message=str(e)
+                ))
+        
+        return records, issues
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
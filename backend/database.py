@@ -82,6 +82,10 @@ def init_db():
     import trust_report_models
     trust_report_models.Base.metadata.create_all(bind=engine)
     
+    # FP&A models (separate Base whose tables reference entities)
+    import fpa_models
+    fpa_models.create_fpa_tables(engine)
+    
     # External certification models use models.Base, so they're created with models above
     # Just import to ensure they're registered
     import external_certification_models
@@ -95,6 +99,9 @@ def init_db():
     # Board Pack models also use models.Base
     import board_pack_models
     
+    # Keeps bank_balance_days in step with bank transaction writes
+    import bank_ledger
+    
     # Create database constraints for immutable snapshots
     from db_constraints import create_snapshot_immutability_constraints
     try:
@@ -102,3 +109,10 @@ def init_db():
     except Exception as e:
         # Constraints might already exist, which is fine
         pass
+    
+    # Composite/partial indexes for hot snapshot and entity queries
+    from migrations.add_performance_indexes import add_performance_indexes
+    try:
+        add_performance_indexes(engine)
+    except Exception as e:
+        pass
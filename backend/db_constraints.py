@@ -4,8 +4,7 @@ Database Constraints for Immutable Snapshots
 Enforces snapshot immutability at database level (triggers/constraints).
 """
 
-from sqlalchemy import event, DDL
-from sqlalchemy.engine import Engine
+from sqlalchemy import DDL
 import models
 
 
@@ -88,13 +87,3 @@ def create_snapshot_immutability_constraints(engine):
         with engine.connect() as conn:
             conn.execute(DDL(constraint_sql))
             conn.commit()
-
-
-# Register event listener to create constraints on engine creation
-@event.listens_for(Engine, "connect")
-def create_constraints(dbapi_conn, connection_record):
-    """Create constraints when database connection is established."""
-    engine = connection_record.engine
-    create_snapshot_immutability_constraints(engine)
-
-
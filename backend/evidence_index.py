@@ -0,0 +1,532 @@
+"""
+Snapshot Evidence Index
+
+Per-snapshot retrieval index behind grounded Q&A (/ask-insights and the
+agent Q&A workflow). One build reads the snapshot's invoices, the entity's
+recent and unmatched bank transactions, their reconciliation exceptions and
+the invoice-level variance against the previous snapshot, and keeps:
+
+- a BM25 inverted index over customers, references, descriptions and notes
+- numeric facets: documents pre-sorted by amount (all, and late only),
+  currency totals and lateness buckets per kind
+- a citation map (document number / reference -> documents)
+
+so evidence retrieval and citation lookup are dictionary probes and list
+slices instead of table scans. Indexes live in a small in-process LRU; they
+are built at upload, rebuilt lazily after invalidation (publish_event write
+events) and when the day changes, since lateness is measured at build time.
+
+QuestionRouter replaces substring keyword checks with phrase probes on the
+question's tokens.
+"""
+
+import datetime
+import heapq
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+import models
+
+logger = logging.getLogger(__name__)
+
+
+KINDS = ("invoice", "bank_transaction", "exception", "variance")
+
+BANK_LOOKBACK_DAYS = 90
+DEFAULT_MAX_SNAPSHOTS = 16
+
+# Variance categories that carry the invoice amount but leave open AR unchanged
+DATE_ONLY_VARIANCE = {"Timing Shift"}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+LATENESS_BUCKETS = [
+    {"label": "1-30", "min": 1, "max": 30},
+    {"label": "31-60", "min": 31, "max": 60},
+    {"label": "61-90", "min": 61, "max": 90},
+    {"label": "90+", "min": 91, "max": None},
+]
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "do", "doe", "for", "from", "how", "i", "in", "is",
+    "it", "me", "my", "of", "on", "or", "our", "s", "show", "that", "the", "there", "this", "to", "us",
+    "was", "we", "what", "when", "where", "which", "who", "why", "will", "with",
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TOKENIZING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _stem(token: str) -> str:
+    """Light suffix stripping so 'payments', 'predicted' and 'prediction' meet their stems"""
+    if len(token) <= 3:
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith("es") and token[:-2].endswith(("ss", "x", "ch", "sh")):
+        return token[:-2]
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        token = token[:-1]
+    for suffix in ("ing", "ion", "ed"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[: -len(suffix)]
+    return token
+
+
+def tokenize(text: Optional[str], keep_stopwords: bool = False) -> List[str]:
+    if not text:
+        return []
+    tokens = [_stem(t) for t in _TOKEN.findall(text.lower())]
+    return tokens if keep_stopwords else [t for t in tokens if t not in STOPWORDS]
+
+
+class QuestionRouter:
+    """
+    Routes a question to the first intent (in declaration order) with a
+    phrase among the question's tokens. Phrases are indexed by their first
+    token, so routing costs one dict probe per question token.
+    """
+
+    def __init__(self, patterns: Dict[str, Sequence[str]]):
+        self._phrases: Dict[str, List[Tuple[Tuple[str, ...], int, str]]] = {}
+        self.vocabulary = set()
+        for priority, (intent, phrases) in enumerate(patterns.items()):
+            for phrase in phrases:
+                tokens = tuple(tokenize(phrase, keep_stopwords=True))
+                if tokens:
+                    self._phrases.setdefault(tokens[0], []).append((tokens, priority, intent))
+                    self.vocabulary.update(tokens)
+
+    def route(self, question: str, default: Optional[str] = None) -> Optional[str]:
+        tokens = tokenize(question, keep_stopwords=True)
+        best = None
+        for i, token in enumerate(tokens):
+            for phrase, priority, intent in self._phrases.get(token, ()):
+                if (best is None or priority < best[0]) and tuple(tokens[i:i + len(phrase)]) == phrase:
+                    best = (priority, intent)
+        return best[1] if best else default
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# INDEX
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class EvidenceDoc:
+    """One retrievable piece of evidence"""
+    kind: str
+    source_id: int
+    citation: str
+    text: str
+    amount: float = 0.0
+    currency: Optional[str] = None
+    days_late: int = 0
+    customer: Optional[str] = None
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "id": self.source_id,
+            "citation": self.citation,
+            "text": self.text,
+            "amount": self.amount,
+            "currency": self.currency,
+            "days_late": self.days_late,
+            "customer": self.customer,
+            **self.details,
+        }
+
+
+class EvidenceIndex:
+    """BM25 postings, facet orderings and citations over one snapshot's evidence"""
+
+    def __init__(self, snapshot_id: int, entity_id: Optional[int], as_of: datetime.datetime, docs: List[EvidenceDoc]):
+        started = time.perf_counter()
+        self.snapshot_id = snapshot_id
+        self.entity_id = entity_id
+        self.as_of = as_of
+        self.docs = docs
+
+        self._citations: Dict[str, List[int]] = {}
+        self._by_kind: Dict[str, List[int]] = {kind: [] for kind in KINDS}
+
+        term_counts: List[Dict[str, int]] = []
+        for doc_id, doc in enumerate(docs):
+            counts: Dict[str, int] = {}
+            for term in tokenize(doc.text):
+                counts[term] = counts.get(term, 0) + 1
+            term_counts.append(counts)
+            if doc.citation:
+                self._citations.setdefault(doc.citation.lower(), []).append(doc_id)
+            self._by_kind.setdefault(doc.kind, []).append(doc_id)
+        self._postings = self._bm25_postings(term_counts)
+
+        # Facet orderings: largest first, so top-N is a slice
+        by_amount = lambda ids: sorted(ids, key=lambda i: abs(docs[i].amount), reverse=True)
+        self._largest = {kind: by_amount(ids) for kind, ids in self._by_kind.items()}
+        self._largest_late = {kind: [i for i in ids if docs[i].days_late > 0] for kind, ids in self._largest.items()}
+        self._currencies = self._currency_facet()
+        self._lateness = self._lateness_facet()
+        self._variance = self._variance_facet()
+        self.build_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    @staticmethod
+    def _bm25_postings(term_counts: List[Dict[str, int]]) -> Dict[str, List[Tuple[int, float]]]:
+        """term -> [(doc, BM25 weight)]; the whole score is precomputed, so a query only adds"""
+        n = len(term_counts)
+        lengths = [sum(counts.values()) for counts in term_counts]
+        avg_length = (sum(lengths) / n) if n else 0.0
+        frequencies: Dict[str, List[Tuple[int, int]]] = {}
+        for doc_id, counts in enumerate(term_counts):
+            for term, tf in counts.items():
+                frequencies.setdefault(term, []).append((doc_id, tf))
+
+        postings = {}
+        for term, docs in frequencies.items():
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            postings[term] = [
+                (doc_id, idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * lengths[doc_id] / (avg_length or 1))))
+                for doc_id, tf in docs
+            ]
+        return postings
+
+    def _currency_facet(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        facet: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for kind, ids in self._by_kind.items():
+            totals = facet.setdefault(kind, {})
+            for i in ids:
+                currency = self.docs[i].currency or "EUR"
+                bucket = totals.setdefault(currency, {"count": 0, "total_amount": 0.0})
+                bucket["count"] += 1
+                bucket["total_amount"] += self.docs[i].amount
+        return facet
+
+    def _lateness_facet(self) -> Dict[str, List[Dict[str, Any]]]:
+        facet = {}
+        for kind, ids in self._largest_late.items():
+            buckets = [{"label": b["label"], "count": 0, "total_amount": 0.0} for b in LATENESS_BUCKETS]
+            for i in ids:
+                days = self.docs[i].days_late
+                for spec, bucket in zip(LATENESS_BUCKETS, buckets):
+                    if days >= spec["min"] and (spec["max"] is None or days <= spec["max"]):
+                        bucket["count"] += 1
+                        bucket["total_amount"] += self.docs[i].amount
+                        break
+            facet[kind] = buckets
+        return facet
+
+    def _variance_facet(self) -> Dict[str, Dict[str, float]]:
+        facet: Dict[str, Dict[str, float]] = {}
+        for i in self._largest.get("variance", []):
+            bucket = facet.setdefault(self.docs[i].details["category"], {"count": 0, "total_amount": 0.0})
+            bucket["count"] += 1
+            bucket["total_amount"] += self.docs[i].amount
+        return facet
+
+    # -------------------------------------------------------------------------
+    # Probes
+    # -------------------------------------------------------------------------
+
+    def search(
+        self,
+        query: str,
+        kinds: Optional[Iterable[str]] = None,
+        limit: int = 5,
+        ignore: Iterable[str] = (),
+    ) -> List[Tuple[EvidenceDoc, float]]:
+        """BM25-ranked documents for the query terms (minus `ignore`), optionally of some kinds only"""
+        wanted = set(kinds) if kinds else None
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)) - set(ignore):
+            for doc_id, weight in self._postings.get(term, ()):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+        if wanted is not None:
+            scores = {doc_id: score for doc_id, score in scores.items() if self.docs[doc_id].kind in wanted}
+        ranked = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], abs(self.docs[item[0]].amount)))
+        return [(self.docs[doc_id], round(score, 4)) for doc_id, score in ranked]
+
+    def top(self, kind: str, limit: int = 5, late_only: bool = False, currency: Optional[str] = None) -> List[EvidenceDoc]:
+        """Largest documents of a kind, optionally late ones or one currency only"""
+        ids = (self._largest_late if late_only else self._largest).get(kind, [])
+        if currency is None:
+            return [self.docs[i] for i in ids[:limit]]
+        currency = currency.upper()
+        return [self.docs[i] for i in ids if (self.docs[i].currency or "EUR") == currency][:limit]
+
+    def lookup(self, citation: str) -> List[EvidenceDoc]:
+        """Documents cited by a document number or bank reference"""
+        return [self.docs[i] for i in self._citations.get((citation or "").lower(), [])]
+
+    def currency_totals(self, kind: str) -> Dict[str, Dict[str, float]]:
+        return self._currencies.get(kind, {})
+
+    def lateness(self, kind: str) -> List[Dict[str, Any]]:
+        return self._lateness.get(kind, [])
+
+    def variance_by_category(self) -> Dict[str, Dict[str, float]]:
+        """Invoice-level variance against the previous snapshot, totalled by category"""
+        return self._variance
+
+    def net_variance(self) -> float:
+        """Change in open AR since the previous snapshot; timing shifts move dates, not amounts"""
+        return sum(
+            bucket["total_amount"] for category, bucket in self._variance.items()
+            if category not in DATE_ONLY_VARIANCE
+        )
+
+    def count(self, kind: Optional[str] = None) -> int:
+        return len(self.docs) if kind is None else len(self._by_kind.get(kind, []))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "snapshot_id": self.snapshot_id,
+            "as_of": self.as_of.isoformat(),
+            "documents": {kind: len(ids) for kind, ids in self._by_kind.items()},
+            "terms": len(self._postings),
+            "build_ms": self.build_ms,
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BUILDING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _days_between(later: datetime.datetime, earlier: Optional[datetime.datetime]) -> int:
+    return max((later - earlier).days, 0) if earlier else 0
+
+
+def _join(*parts: Optional[str]) -> str:
+    return " ".join(str(p) for p in parts if p)
+
+
+INVOICE_COLUMNS = (
+    models.Invoice.id, models.Invoice.canonical_id, models.Invoice.document_number, models.Invoice.customer,
+    models.Invoice.project, models.Invoice.project_desc, models.Invoice.country, models.Invoice.amount,
+    models.Invoice.currency, models.Invoice.expected_due_date, models.Invoice.predicted_payment_date,
+    models.Invoice.payment_date, models.Invoice.blocked_reason, models.Invoice.prediction_segment,
+)
+
+
+def _invoice_rows(db: Session, snapshot_id: int):
+    return db.execute(select(*INVOICE_COLUMNS).where(models.Invoice.snapshot_id == snapshot_id)).all()
+
+
+def _invoice_docs(rows, as_of: datetime.datetime) -> List[EvidenceDoc]:
+    docs = []
+    for row in rows:
+        expected = row.predicted_payment_date or row.expected_due_date
+        days_late = _days_between(as_of, expected) if row.payment_date is None else 0
+        docs.append(EvidenceDoc(
+            kind="invoice",
+            source_id=row.id,
+            citation=row.document_number or "",
+            text=_join(row.customer, row.document_number, row.project, row.project_desc, row.country,
+                       row.blocked_reason, row.prediction_segment),
+            amount=row.amount or 0.0,
+            currency=(row.currency or "EUR").upper(),
+            days_late=days_late,
+            customer=row.customer,
+            details={
+                "due_date": row.expected_due_date.date().isoformat() if row.expected_due_date else None,
+                "predicted_date": row.predicted_payment_date.date().isoformat() if row.predicted_payment_date else None,
+                "paid": row.payment_date is not None,
+            },
+        ))
+    return docs
+
+
+def _variance_docs(current_rows, previous_rows, previous_snapshot_id: int) -> List[EvidenceDoc]:
+    """Invoice-level moves between the previous snapshot and this one"""
+    previous = {row.canonical_id: row for row in previous_rows}
+    current_ids = set()
+    docs = []
+
+    def add(row, category, amount, text, **details):
+        docs.append(EvidenceDoc(
+            kind="variance",
+            source_id=row.id,
+            citation=row.document_number or "",
+            text=_join(category, row.customer, row.document_number, text),
+            amount=amount,
+            currency=(row.currency or "EUR").upper(),
+            customer=row.customer,
+            details={"category": category, "previous_snapshot_id": previous_snapshot_id, **details},
+        ))
+
+    for row in current_rows:
+        current_ids.add(row.canonical_id)
+        before = previous.get(row.canonical_id)
+        if before is None:
+            add(row, "New Item", row.amount or 0.0, f"New invoice {row.document_number} from {row.customer}")
+        elif before.payment_date is None and row.payment_date is not None:
+            # Paid invoices leave open AR
+            add(row, "Cash Recognition", -(row.amount or 0.0), f"Invoice {row.document_number} paid by {row.customer}")
+        elif row.predicted_payment_date and before.predicted_payment_date \
+                and row.predicted_payment_date != before.predicted_payment_date:
+            shift = (row.predicted_payment_date - before.predicted_payment_date).days
+            add(row, "Timing Shift", row.amount or 0.0,
+                f"Predicted payment of {row.document_number} moved {shift:+d} days",
+                shift_days=shift)
+    for canonical_id, row in previous.items():
+        if canonical_id not in current_ids:
+            add(row, "Removed Item", -(row.amount or 0.0), f"Invoice {row.document_number} no longer open")
+    return docs
+
+
+def _bank_docs(db: Session, entity_id: int, as_of: datetime.datetime) -> Tuple[List[EvidenceDoc], List[EvidenceDoc]]:
+    """Unmatched and recent bank transactions of the entity, and their open exceptions"""
+    txn = models.BankTransaction
+    rows = db.execute(
+        select(txn.id, txn.transaction_date, txn.amount, txn.currency, txn.reference, txn.counterparty,
+               txn.transaction_type, txn.is_reconciled, txn.lifecycle_status)
+        .join(models.BankAccount, models.BankAccount.id == txn.bank_account_id)
+        .where(
+            models.BankAccount.entity_id == entity_id,
+            or_(
+                txn.is_reconciled == 0, txn.is_reconciled.is_(None),
+                txn.transaction_date >= as_of - datetime.timedelta(days=BANK_LOOKBACK_DAYS),
+            ),
+        )
+    ).all()
+
+    txn_docs, by_id = [], {}
+    for row in rows:
+        unmatched = not row.is_reconciled
+        doc = EvidenceDoc(
+            kind="bank_transaction",
+            source_id=row.id,
+            citation=row.reference or "",
+            text=_join(row.counterparty, row.reference, row.transaction_type),
+            amount=row.amount or 0.0,
+            currency=(row.currency or "EUR").upper(),
+            days_late=_days_between(as_of, row.transaction_date) if unmatched else 0,
+            customer=row.counterparty,
+            details={
+                "date": row.transaction_date.date().isoformat() if row.transaction_date else None,
+                "reconciled": not unmatched,
+                "lifecycle_status": row.lifecycle_status,
+            },
+        )
+        txn_docs.append(doc)
+        by_id[row.id] = doc
+
+    exc = models.ReconciliationException
+    exception_docs = []
+    if by_id:
+        for row in db.execute(
+            select(exc.id, exc.bank_transaction_id, exc.status, exc.assignee_id, exc.resolution_notes,
+                   exc.escalation_reason, exc.created_at)
+            .where(exc.bank_transaction_id.in_(list(by_id)), or_(exc.status.is_(None), exc.status != "resolved"))
+        ).all():
+            txn_doc = by_id[row.bank_transaction_id]
+            exception_docs.append(EvidenceDoc(
+                kind="exception",
+                source_id=row.id,
+                citation=txn_doc.citation,
+                text=_join(txn_doc.text, row.status, row.escalation_reason, row.resolution_notes),
+                amount=txn_doc.amount,
+                currency=txn_doc.currency,
+                days_late=_days_between(as_of, row.created_at),
+                customer=txn_doc.customer,
+                details={"status": row.status, "assignee": row.assignee_id, "bank_transaction_id": row.bank_transaction_id},
+            ))
+    return txn_docs, exception_docs
+
+
+def _previous_snapshot_id(db: Session, snapshot: models.Snapshot) -> Optional[int]:
+    query = db.query(models.Snapshot.id).filter(models.Snapshot.id < snapshot.id)
+    if snapshot.entity_id is not None:
+        query = query.filter(models.Snapshot.entity_id == snapshot.entity_id)
+    row = query.order_by(models.Snapshot.id.desc()).first()
+    return row[0] if row else None
+
+
+def build_evidence_index(db: Session, snapshot_id: int, as_of: Optional[datetime.datetime] = None) -> Optional[EvidenceIndex]:
+    """Build (and register) the evidence index of a snapshot; None if the snapshot does not exist"""
+    snapshot = db.query(models.Snapshot).filter(models.Snapshot.id == snapshot_id).first()
+    if snapshot is None:
+        return None
+    as_of = as_of or datetime.datetime.now()
+
+    current_rows = _invoice_rows(db, snapshot_id)
+    docs = _invoice_docs(current_rows, as_of)
+    previous_id = _previous_snapshot_id(db, snapshot)
+    if previous_id is not None:
+        docs += _variance_docs(current_rows, _invoice_rows(db, previous_id), previous_id)
+    if snapshot.entity_id is not None:
+        txn_docs, exception_docs = _bank_docs(db, snapshot.entity_id, as_of)
+        docs += txn_docs + exception_docs
+
+    index = EvidenceIndex(snapshot_id, snapshot.entity_id, as_of, docs)
+    _registry.put(index)
+    logger.info(f"Evidence index for snapshot {snapshot_id}: {len(docs)} documents in {index.build_ms}ms")
+    return index
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REGISTRY
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class _IndexRegistry:
+    """LRU of built indexes by snapshot"""
+
+    def __init__(self):
+        self.max_snapshots = int(os.getenv("FPA_EVIDENCE_INDEX_SNAPSHOTS", str(DEFAULT_MAX_SNAPSHOTS)))
+        self._indexes: "OrderedDict[int, EvidenceIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, snapshot_id: int) -> Optional[EvidenceIndex]:
+        with self._lock:
+            index = self._indexes.get(snapshot_id)
+            if index is not None:
+                self._indexes.move_to_end(snapshot_id)
+            return index
+
+    def put(self, index: EvidenceIndex):
+        with self._lock:
+            self._indexes[index.snapshot_id] = index
+            self._indexes.move_to_end(index.snapshot_id)
+            while len(self._indexes) > self.max_snapshots:
+                self._indexes.popitem(last=False)
+
+    def discard(self, snapshot_id: Optional[int] = None, entity_id: Optional[int] = None) -> int:
+        with self._lock:
+            stale = [
+                sid for sid, index in self._indexes.items()
+                if (snapshot_id is None or sid == snapshot_id) and (entity_id is None or index.entity_id == entity_id)
+            ]
+            for sid in stale:
+                del self._indexes[sid]
+            return len(stale)
+
+
+_registry = _IndexRegistry()
+
+
+def get_evidence_index(db: Session, snapshot_id: int) -> Optional[EvidenceIndex]:
+    """The snapshot's index, built on first use and again once its day has passed"""
+    index = _registry.get(snapshot_id)
+    if index is not None and index.as_of.date() == datetime.date.today():
+        return index
+    return build_evidence_index(db, snapshot_id)
+
+
+def invalidate_evidence_index(snapshot_id: Optional[int] = None, entity_id: Optional[int] = None) -> int:
+    """Drop built indexes for a snapshot, an entity's snapshots, or (no arguments) all of them"""
+    return _registry.discard(snapshot_id, entity_id)
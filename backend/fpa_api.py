@@ -8,6 +8,7 @@ from datetime import datetime, date
 from decimal import Decimal
 from typing import Optional, List, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
@@ -74,6 +75,13 @@ class LockActualsRequest(BaseModel):
     lock_reason: Optional[str] = None
 
 
+class CompareForecastRunsRequest(BaseModel):
+    forecast_run_ids: List[int] = Field(..., min_length=2, max_length=50)
+    base_forecast_run_id: Optional[int] = None
+    materiality: float = Field(10000, ge=0)
+    stream: bool = False
+
+
 class RunForecastRequest(BaseModel):
     assumption_set_id: int
     actuals_snapshot_id: Optional[int] = None
@@ -477,6 +485,30 @@ async def list_forecast_runs(
     return {"forecast_runs": [r.to_dict() for r in runs]}
 
 
+@router.post("/forecast-runs/compare")
+async def compare_forecast_runs(
+    request: CompareForecastRunsRequest,
+    db: Session = Depends(get_db),
+):
+    """
+    Compare N forecast runs in one pass: all pairwise deltas, ranked drivers
+    and talking points. With stream=true the result is NDJSON events.
+    """
+    from scenario_matrix import base_index_for, compare_matrix, load_forecast_matrix, ndjson_lines
+    
+    try:
+        matrix = load_forecast_matrix(db, request.forecast_run_ids)
+        comparison = compare_matrix(
+            matrix, base_index_for(matrix, request.base_forecast_run_id), request.materiality
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    if request.stream:
+        return StreamingResponse(ndjson_lines(comparison), media_type="application/x-ndjson")
+    return comparison.to_dict()
+
+
 # =============================================================================
 # SCENARIO ENDPOINTS
 # =============================================================================
@@ -8,7 +8,7 @@ Key invariant: same inputs = same outputs (reproducible).
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, TYPE_CHECKING
 from dataclasses import dataclass, field, asdict
 import hashlib
 import json
@@ -20,6 +20,11 @@ from fpa_models import (
     Plan, AssumptionSet, Driver, ActualsSnapshot, ForecastRun
 )
 
+from fpa_forecast_cache import ForecastCache, compute_inputs_hash, forecast_cache
+
+if TYPE_CHECKING:
+    from fpa_runway_simulation import RunwaySimulationConfig
+
 logger = logging.getLogger(__name__)
 
 
@@ -46,6 +51,17 @@ class PLLineItem:
             "total": str(self.total),
             "evidence_refs": self.evidence_refs,
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PLLineItem":
+        return cls(
+            category=data["category"],
+            subcategory=data["subcategory"],
+            label=data["label"],
+            monthly_values=_decimal_map(data["monthly_values"]),
+            total=Decimal(data["total"]),
+            evidence_refs=data.get("evidence_refs", []),
+        )
 
 
 @dataclass
@@ -85,6 +101,22 @@ class PLOutput:
             "total_gross_profit": str(self.total_gross_profit),
             "total_ebitda": str(self.total_ebitda),
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PLOutput":
+        return cls(
+            period_start=date.fromisoformat(data["period_start"]),
+            period_end=date.fromisoformat(data["period_end"]),
+            line_items=[PLLineItem.from_dict(li) for li in data["line_items"]],
+            **{k: _decimal_map(data[k]) for k in (
+                "revenue_by_month", "cogs_by_month", "opex_by_month",
+                "gross_profit_by_month", "ebitda_by_month",
+            )},
+            **{k: Decimal(data[k]) for k in (
+                "total_revenue", "total_cogs", "total_opex",
+                "total_gross_profit", "total_ebitda",
+            )},
+        )
 
 
 @dataclass
@@ -106,6 +138,17 @@ class CashBridgeItem:
             "total": str(self.total),
             "evidence_refs": self.evidence_refs,
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CashBridgeItem":
+        return cls(
+            category=data["category"],
+            label=data["label"],
+            monthly_values=_decimal_map(data["monthly_values"]),
+            weekly_values=_decimal_map(data["weekly_values"]) if data.get("weekly_values") else None,
+            total=Decimal(data["total"]),
+            evidence_refs=data.get("evidence_refs", []),
+        )
 
 
 @dataclass
@@ -141,6 +184,21 @@ class CashBridgeOutput:
             "starting_cash": str(self.starting_cash),
             "ending_cash": str(self.ending_cash),
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CashBridgeOutput":
+        return cls(
+            period_start=date.fromisoformat(data["period_start"]),
+            period_end=date.fromisoformat(data["period_end"]),
+            items=[CashBridgeItem.from_dict(i) for i in data["items"]],
+            **{k: _decimal_map(data[k]) for k in (
+                "ebitda_by_month", "working_capital_change_by_month",
+                "operating_cash_flow_by_month", "ending_cash_by_month",
+                "ending_cash_by_week",
+            )},
+            starting_cash=Decimal(data["starting_cash"]),
+            ending_cash=Decimal(data["ending_cash"]),
+        )
 
 
 @dataclass
@@ -157,8 +215,11 @@ class RunwayOutput:
     # Monthly cash positions
     projected_cash_by_month: Dict[str, Decimal] = field(default_factory=dict)
     
+    # Monte Carlo distribution (only when a simulation was requested)
+    simulation: Optional[Dict[str, Any]] = None
+    
     def to_dict(self) -> Dict:
-        return {
+        result = {
             "runway_months": self.runway_months,
             "runway_date": self.runway_date.isoformat() if self.runway_date else None,
             "min_cash_threshold": str(self.min_cash_threshold),
@@ -168,6 +229,23 @@ class RunwayOutput:
             "confidence": self.confidence,
             "projected_cash_by_month": {k: str(v) for k, v in self.projected_cash_by_month.items()},
         }
+        if self.simulation is not None:
+            result["simulation"] = self.simulation
+        return result
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RunwayOutput":
+        return cls(
+            runway_months=data["runway_months"],
+            runway_date=date.fromisoformat(data["runway_date"]) if data.get("runway_date") else None,
+            min_cash_threshold=Decimal(data["min_cash_threshold"]),
+            current_cash=Decimal(data["current_cash"]),
+            average_monthly_burn=Decimal(data["average_monthly_burn"]),
+            burn_trend=data["burn_trend"],
+            confidence=data["confidence"],
+            projected_cash_by_month=_decimal_map(data["projected_cash_by_month"]),
+            simulation=data.get("simulation"),
+        )
 
 
 @dataclass
@@ -211,6 +289,19 @@ class KPIOutput:
             if value is not None:
                 result[field_name] = str(value) if isinstance(value, Decimal) else value
         return result
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "KPIOutput":
+        kpi = cls(
+            gross_margin_pct=Decimal(data["gross_margin_pct"]),
+            ebitda_margin_pct=Decimal(data["ebitda_margin_pct"]),
+            kpi_by_month=data.get("kpi_by_month", {}),
+        )
+        for field_name, value in data.items():
+            if field_name in ("gross_margin_pct", "ebitda_margin_pct", "kpi_by_month"):
+                continue
+            setattr(kpi, field_name, value if field_name == "payback_months" else Decimal(value))
+        return kpi
 
 
 @dataclass
@@ -236,6 +327,23 @@ class ForecastOutput:
             "compute_time_ms": self.compute_time_ms,
             "output_hash": self.output_hash,
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ForecastOutput":
+        """Rebuild a stored forecast (outputs_json) without recomputing it"""
+        return cls(
+            pl=PLOutput.from_dict(data["pl"]),
+            cash_bridge=CashBridgeOutput.from_dict(data["cash_bridge"]),
+            runway=RunwayOutput.from_dict(data["runway"]),
+            kpis=KPIOutput.from_dict(data["kpis"]),
+            computed_at=datetime.fromisoformat(data["computed_at"]),
+            compute_time_ms=data["compute_time_ms"],
+            output_hash=data["output_hash"],
+        )
+
+
+def _decimal_map(values: Dict[str, Any]) -> Dict[str, Decimal]:
+    return {k: Decimal(v) for k, v in values.items()}
 
 
 # =============================================================================
@@ -249,49 +357,47 @@ class FPAComputeEngine:
     Produces reproducible forecasts from actuals + assumptions.
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, cache: Optional[ForecastCache] = None):
         self.db = db
+        self.cache = cache if cache is not None else forecast_cache
     
-    def run_forecast(self, forecast_run_id: int) -> ForecastOutput:
+    def run_forecast(
+        self,
+        forecast_run_id: int,
+        simulation: Optional["RunwaySimulationConfig"] = None,
+        use_cache: bool = True,
+    ) -> ForecastOutput:
         """
         Run a complete forecast computation.
         
         This is the main entry point. It:
         1. Loads the inputs (actuals + assumptions)
-        2. Computes P&L
-        3. Computes cash bridge
-        4. Computes runway
-        5. Computes KPIs
-        6. Stores results
+        2. Serves stored outputs if the same inputs were already computed
+        3. Computes P&L
+        4. Computes cash bridge
+        5. Computes runway (plus a Monte Carlo distribution if simulation is given)
+        6. Computes KPIs
+        7. Stores results
         """
         start_time = datetime.utcnow()
         
-        # Load forecast run
-        forecast_run = self.db.query(ForecastRun).filter(
-            ForecastRun.id == forecast_run_id
-        ).first()
-        
-        if not forecast_run:
-            raise ValueError(f"Forecast run {forecast_run_id} not found")
-        
-        # Load plan
-        plan = self.db.query(Plan).filter(Plan.id == forecast_run.plan_id).first()
-        
-        # Load assumptions
-        assumption_set = self.db.query(AssumptionSet).filter(
-            AssumptionSet.id == forecast_run.assumption_set_id
-        ).first()
-        
-        # Load actuals (if provided)
-        actuals = None
-        if forecast_run.actuals_snapshot_id:
-            actuals = self.db.query(ActualsSnapshot).filter(
-                ActualsSnapshot.id == forecast_run.actuals_snapshot_id
-            ).first()
+        forecast_run, plan, assumption_set, actuals = self._load_run_inputs(forecast_run_id)
         
         # Get drivers as dict
         drivers = self._get_drivers_dict(assumption_set)
         
+        # Content-addressed cache: identical inputs give identical outputs
+        inputs_hash = compute_inputs_hash(plan, drivers, actuals, simulation)
+        forecast_run.inputs_hash = inputs_hash
+        if use_cache:
+            cached = self.cache.get(self.db, inputs_hash)
+            if cached is not None:
+                output = ForecastOutput.from_dict(cached)
+                compute_time_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+                self._store_results(forecast_run, output, compute_time_ms)
+                logger.info(f"Forecast {forecast_run_id} served from cache in {compute_time_ms}ms")
+                return output
+        
         # Determine forecast period
         period_start = plan.period_start
         period_end = plan.period_end
@@ -310,7 +416,8 @@ class FPAComputeEngine:
         
         # Compute runway
         runway_output = self.compute_runway(
-            cash_bridge_output, drivers
+            cash_bridge_output, drivers,
+            simulation=simulation, actuals=actuals
         )
         
         # Compute KPIs
@@ -334,25 +441,95 @@ class FPAComputeEngine:
         output.output_hash = self._compute_output_hash(output)
         
         # Store results
+        self._store_results(forecast_run, output, compute_time_ms)
+        self.cache.put(inputs_hash, forecast_run.outputs_json)
+        
+        logger.info(f"Forecast {forecast_run_id} computed in {compute_time_ms}ms")
+        
+        return output
+    
+    def _store_results(
+        self,
+        forecast_run: ForecastRun,
+        output: ForecastOutput,
+        compute_time_ms: int,
+    ) -> None:
+        """Persist outputs and summary metrics on the forecast run"""
         forecast_run.outputs_json = output.to_dict()
         forecast_run.metrics_json = {
-            "total_revenue": str(pl_output.total_revenue),
-            "total_ebitda": str(pl_output.total_ebitda),
-            "ending_cash": str(cash_bridge_output.ending_cash),
-            "runway_months": runway_output.runway_months,
+            "total_revenue": str(output.pl.total_revenue),
+            "total_ebitda": str(output.pl.total_ebitda),
+            "ending_cash": str(output.cash_bridge.ending_cash),
+            "runway_months": output.runway.runway_months,
         }
-        forecast_run.total_revenue = pl_output.total_revenue
-        forecast_run.total_ebitda = pl_output.total_ebitda
-        forecast_run.ending_cash = cash_bridge_output.ending_cash
-        forecast_run.runway_months = runway_output.runway_months
+        if output.runway.simulation:
+            forecast_run.metrics_json["runway_percentiles"] = output.runway.simulation["runway_percentiles"]
+            forecast_run.metrics_json["probability_of_breach"] = output.runway.simulation["probability_of_breach"]
+        forecast_run.total_revenue = output.pl.total_revenue
+        forecast_run.total_ebitda = output.pl.total_ebitda
+        forecast_run.ending_cash = output.cash_bridge.ending_cash
+        forecast_run.runway_months = output.runway.runway_months
         forecast_run.outputs_hash = output.output_hash
         forecast_run.compute_time_ms = compute_time_ms
         
         self.db.commit()
+    
+    def _load_run_inputs(
+        self,
+        forecast_run_id: int,
+    ) -> Tuple[ForecastRun, Plan, AssumptionSet, Optional[ActualsSnapshot]]:
+        """Load a forecast run with its plan, assumptions and (optional) actuals"""
+        # Load forecast run
+        forecast_run = self.db.query(ForecastRun).filter(
+            ForecastRun.id == forecast_run_id
+        ).first()
         
-        logger.info(f"Forecast {forecast_run_id} computed in {compute_time_ms}ms")
+        if not forecast_run:
+            raise ValueError(f"Forecast run {forecast_run_id} not found")
         
-        return output
+        # Load plan
+        plan = self.db.query(Plan).filter(Plan.id == forecast_run.plan_id).first()
+        
+        # Load assumptions
+        assumption_set = self.db.query(AssumptionSet).filter(
+            AssumptionSet.id == forecast_run.assumption_set_id
+        ).first()
+        
+        # Load actuals (if provided)
+        actuals = None
+        if forecast_run.actuals_snapshot_id:
+            actuals = self.db.query(ActualsSnapshot).filter(
+                ActualsSnapshot.id == forecast_run.actuals_snapshot_id
+            ).first()
+        
+        return forecast_run, plan, assumption_set, actuals
+    
+    def run_forecast_variants(
+        self,
+        forecast_run_id: int,
+        variants: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Evaluate many assumption variants of a forecast run in one call.
+        
+        Each variant is a dict of driver overrides applied on top of the run's
+        assumption set (e.g. {"revenue_growth_pct": 7}). All variants are
+        computed together by the vectorized driver engine; nothing is stored.
+        Returns one summary per variant: totals, ending cash and runway.
+        """
+        from fpa_driver_engine import VectorizedDriverEngine
+        
+        forecast_run, plan, assumption_set, actuals = self._load_run_inputs(forecast_run_id)
+        base_drivers = self._get_drivers_dict(assumption_set)
+        
+        months = self._get_months_in_range(plan.period_start, plan.period_end)
+        result = VectorizedDriverEngine(months).compute(
+            [{**base_drivers, **variant} for variant in variants], actuals
+        )
+        return [
+            {"variant": variant, **result.summary(i)}
+            for i, variant in enumerate(variants)
+        ]
     
     def compute_pl(
         self,
@@ -370,46 +547,44 @@ class FPAComputeEngine:
         line_items = []
         
         # === REVENUE ===
-        revenue_items = self._compute_revenue(months, drivers, actuals)
+        run_rate = self._revenue_run_rate(months, drivers, actuals)
+        revenue_items = self._compute_revenue(months, drivers, actuals, run_rate)
         line_items.extend(revenue_items)
         
         # === COGS ===
-        cogs_items = self._compute_cogs(months, drivers, actuals)
+        cogs_items = self._compute_cogs(months, drivers, actuals, run_rate)
         line_items.extend(cogs_items)
         
         # === OPEX ===
         opex_items = self._compute_opex(months, drivers, actuals)
         line_items.extend(opex_items)
         
-        # Calculate totals
-        revenue_by_month = {}
-        cogs_by_month = {}
-        opex_by_month = {}
-        
-        for month in months:
-            month_key = month.strftime("%Y-%m")
-            revenue_by_month[month_key] = sum(
-                li.monthly_values.get(month_key, Decimal("0"))
-                for li in line_items if li.category == "revenue"
-            )
-            cogs_by_month[month_key] = sum(
-                li.monthly_values.get(month_key, Decimal("0"))
-                for li in line_items if li.category == "cogs"
-            )
-            opex_by_month[month_key] = sum(
-                li.monthly_values.get(month_key, Decimal("0"))
-                for li in line_items if li.category == "opex"
-            )
-        
-        # Gross profit = Revenue - COGS
+        # Calculate totals in one pass over the line items
+        month_key_list = months_keys(months)
+        totals_by_category = {
+            category: {m: 0 for m in month_key_list}
+            for category in ("revenue", "cogs", "opex")
+        }
+        for li in line_items:
+            by_month = totals_by_category.get(li.category)
+            if by_month is None:
+                continue
+            for month_key in month_key_list:
+                by_month[month_key] = by_month[month_key] + li.monthly_values.get(month_key, Decimal("0"))
+        
+        revenue_by_month = totals_by_category["revenue"]
+        cogs_by_month = totals_by_category["cogs"]
+        opex_by_month = totals_by_category["opex"]
+        
+        # Gross profit = Revenue - COGS (COGS lines carry negative signs)
         gross_profit_by_month = {
-            m: revenue_by_month[m] - cogs_by_month[m]
+            m: revenue_by_month[m] + cogs_by_month[m]
             for m in months_keys(months)
         }
         
-        # EBITDA = Gross Profit - Opex
+        # EBITDA = Gross Profit - Opex (opex lines carry negative signs)
         ebitda_by_month = {
-            m: gross_profit_by_month[m] - opex_by_month[m]
+            m: gross_profit_by_month[m] + opex_by_month[m]
             for m in months_keys(months)
         }
         
@@ -429,16 +604,13 @@ class FPAComputeEngine:
             total_ebitda=sum(ebitda_by_month.values()),
         )
     
-    def _compute_revenue(
+    def _revenue_run_rate(
         self,
         months: List[date],
         drivers: Dict[str, Any],
         actuals: Optional[ActualsSnapshot],
-    ) -> List[PLLineItem]:
-        """Compute revenue line items"""
-        items = []
-        
-        # Starting revenue (from actuals or driver)
+    ) -> List[Decimal]:
+        """Unquantized monthly revenue under growth and churn (shared by revenue and COGS)"""
         base_revenue = Decimal(str(drivers.get("base_monthly_revenue", 100000)))
         growth_rate = Decimal(str(drivers.get("revenue_growth_pct", 0))) / 100
         churn_rate = Decimal(str(drivers.get("churn_rate_pct", 0))) / 100
@@ -446,21 +618,34 @@ class FPAComputeEngine:
         if actuals and actuals.revenue_total:
             base_revenue = actuals.revenue_total
         
-        # Compute monthly revenue with growth
-        monthly_values = {}
+        run_rate = []
         current_revenue = base_revenue
-        
-        for i, month in enumerate(months):
-            month_key = month.strftime("%Y-%m")
-            
-            if i == 0:
-                monthly_values[month_key] = current_revenue
-            else:
+        for i in range(len(months)):
+            if i > 0:
                 # Apply growth and churn
                 gross_new = current_revenue * growth_rate
                 churned = current_revenue * churn_rate
                 current_revenue = current_revenue + gross_new - churned
-                monthly_values[month_key] = current_revenue.quantize(Decimal("0.01"))
+            run_rate.append(current_revenue)
+        return run_rate
+    
+    def _compute_revenue(
+        self,
+        months: List[date],
+        drivers: Dict[str, Any],
+        actuals: Optional[ActualsSnapshot],
+        run_rate: Optional[List[Decimal]] = None,
+    ) -> List[PLLineItem]:
+        """Compute revenue line items"""
+        items = []
+        if run_rate is None:
+            run_rate = self._revenue_run_rate(months, drivers, actuals)
+        
+        # Month 0 is the unquantized base; later months are quantized run-rates
+        monthly_values = {}
+        for i, (month, current_revenue) in enumerate(zip(months, run_rate)):
+            month_key = month.strftime("%Y-%m")
+            monthly_values[month_key] = current_revenue if i == 0 else current_revenue.quantize(Decimal("0.01"))
         
         items.append(PLLineItem(
             category="revenue",
@@ -492,34 +677,20 @@ class FPAComputeEngine:
         months: List[date],
         drivers: Dict[str, Any],
         actuals: Optional[ActualsSnapshot],
+        run_rate: Optional[List[Decimal]] = None,
     ) -> List[PLLineItem]:
         """Compute COGS line items"""
         items = []
+        if run_rate is None:
+            run_rate = self._revenue_run_rate(months, drivers, actuals)
         
         # COGS as percentage of revenue
         cogs_pct = Decimal(str(drivers.get("cogs_pct", 20))) / 100
         
-        # Get revenue to calculate COGS
-        base_revenue = Decimal(str(drivers.get("base_monthly_revenue", 100000)))
-        growth_rate = Decimal(str(drivers.get("revenue_growth_pct", 0))) / 100
-        churn_rate = Decimal(str(drivers.get("churn_rate_pct", 0))) / 100
-        
-        if actuals and actuals.revenue_total:
-            base_revenue = actuals.revenue_total
-        
         monthly_values = {}
-        current_revenue = base_revenue
-        
-        for i, month in enumerate(months):
-            month_key = month.strftime("%Y-%m")
-            
-            if i > 0:
-                gross_new = current_revenue * growth_rate
-                churned = current_revenue * churn_rate
-                current_revenue = current_revenue + gross_new - churned
-            
+        for month, current_revenue in zip(months, run_rate):
             # COGS is negative (expense)
-            monthly_values[month_key] = -(current_revenue * cogs_pct).quantize(Decimal("0.01"))
+            monthly_values[month.strftime("%Y-%m")] = -(current_revenue * cogs_pct).quantize(Decimal("0.01"))
         
         items.append(PLLineItem(
             category="cogs",
@@ -819,11 +990,15 @@ class FPAComputeEngine:
         self,
         cash_bridge: CashBridgeOutput,
         drivers: Dict[str, Any],
+        simulation: Optional["RunwaySimulationConfig"] = None,
+        actuals: Optional[ActualsSnapshot] = None,
     ) -> RunwayOutput:
         """
         Compute cash runway.
         
-        Months until cash falls below minimum threshold.
+        Months until cash falls below minimum threshold. With a simulation
+        config, also samples drivers across Monte Carlo paths and attaches
+        runway percentiles and a per-month probability of breach.
         """
         min_cash = Decimal(str(drivers.get("min_cash_threshold", 100000)))
         
@@ -878,6 +1053,15 @@ class FPAComputeEngine:
         # Confidence based on data quality
         confidence = "high" if len(months_sorted) >= 12 else "medium" if len(months_sorted) >= 6 else "low"
         
+        simulation_output = None
+        if simulation is not None:
+            from fpa_runway_simulation import simulate_runway
+            months = [date.fromisoformat(f"{m}-01") for m in months_sorted]
+            simulation_output = simulate_runway(
+                months, drivers, simulation,
+                actuals=actuals, starting_cash=cash_bridge.starting_cash
+            )
+        
         return RunwayOutput(
             runway_months=runway_months,
             runway_date=runway_date,
@@ -887,6 +1071,7 @@ class FPAComputeEngine:
             burn_trend=burn_trend,
             confidence=confidence,
             projected_cash_by_month=dict(cash_bridge.ending_cash_by_month),
+            simulation=simulation_output,
         )
     
     def compute_kpis(
@@ -244,6 +244,7 @@ class FPADecisionQueue:
             },
         )
         
+        self._sync_agent_queue(decision)
         logger.info(f"Created decision {decision.id}: {title}")
         
         return decision
@@ -292,6 +293,7 @@ class FPADecisionQueue:
             resource_type="decision",
             resource_id=decision.id,
         )
+        self._sync_agent_queue(decision)
         
         return decision
     
@@ -367,6 +369,7 @@ class FPADecisionQueue:
             },
         )
         
+        self._sync_agent_queue(decision)
         logger.info(f"Approval processed for decision {decision_id} by {user_id}: {option_selected}")
         
         return decision
@@ -412,6 +415,7 @@ class FPADecisionQueue:
             user_id=user_id,
             details={"reason": reason},
         )
+        self._sync_agent_queue(decision)
         
         return decision
     
@@ -517,6 +521,15 @@ class FPADecisionQueue:
         else:
             return 1
     
+    def _sync_agent_queue(self, decision: FPADecision):
+        """Mirror the decision into the agent decision queue (agents/decision_queue.py)"""
+        try:
+            from agents.decision_queue import sync_fpa_decision
+            sync_fpa_decision(self.db, decision)
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"Agent decision queue sync failed for decision {decision.id}: {e}")
+    
     def _log_action(
         self,
         entity_id: int,
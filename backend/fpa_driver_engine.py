@@ -0,0 +1,455 @@
+"""
+Vectorized FP&A Driver Engine
+
+Computes the driver-based monthly series of FPAComputeEngine (revenue,
+COGS, people and fixed opex, EBITDA, ending cash, runway) for many
+assumption sets at once as (scenarios × months) arrays.
+
+Exactness: every quantized value is held as integer cents, so P&L sums
+are exact. The growth/churn and headcount recurrences are evaluated in
+float64 and rounded half-even to cents like Decimal.quantize(); a series
+with any value near a half-cent boundary is recomputed for that scenario
+with FPAComputeEngine's Decimal helpers. Running cash is exact integer
+arithmetic (cents × 30); rows where Decimal's 28-digit division could
+round a half cent either way are replayed in Decimal. Scenarios with
+sub-cent inputs are recomputed in full, so results match
+FPAComputeEngine exactly.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, ROUND_CEILING
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from fpa_compute_engine import FPAComputeEngine
+from fpa_models import ActualsSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+# Defaults mirror FPAComputeEngine's drivers.get(...) fallbacks
+DRIVER_DEFAULTS = {
+    "base_monthly_revenue": 100000,
+    "revenue_growth_pct": 0,
+    "churn_rate_pct": 0,
+    "one_time_revenue_monthly": 0,
+    "cogs_pct": 20,
+    "headcount_engineering": 10,
+    "headcount_sales": 5,
+    "headcount_gna": 5,
+    "salary_engineering_annual": 100000,
+    "salary_sales_annual": 80000,
+    "salary_gna_annual": 70000,
+    "burden_rate_pct": 25,
+    "headcount_growth_pct": 0,
+    "software_spend_monthly": 5000,
+    "facilities_spend_monthly": 0,
+    "marketing_spend_monthly": 0,
+    "other_opex_monthly": 0,
+    "starting_cash": 1000000,
+    "dso_days": 45,
+    "dpo_days": 30,
+    "capex_monthly": 0,
+    "min_cash_threshold": 100000,
+}
+
+PEOPLE_DEPARTMENTS = [
+    ("engineering", "Engineering"),
+    ("sales", "Sales & Marketing"),
+    ("gna", "G&A"),
+]
+
+FIXED_OPEX = [
+    ("software_spend_monthly", "software", "Software & Tools"),
+    ("facilities_spend_monthly", "facilities", "Facilities & Office"),
+    ("marketing_spend_monthly", "marketing", "Marketing & Advertising"),
+    ("other_opex_monthly", "other", "Other Operating Expenses"),
+]
+
+# Relative guard band around half-cent boundaries; float64 recurrences over a
+# few hundred months stay within ~1e-14 relative error
+ROUNDING_GUARD = 1e-12
+
+
+# =============================================================================
+# RESULT
+# =============================================================================
+
+@dataclass
+class DriverBatchResult:
+    """Monthly series for a batch of assumption sets, in integer cents."""
+    month_keys: List[str]
+    line_items: List[Tuple[str, str, str, np.ndarray]]  # (category, subcategory, label, S×M cents)
+    revenue: np.ndarray
+    cogs: np.ndarray
+    opex: np.ndarray
+    gross_profit: np.ndarray
+    ebitda: np.ndarray
+    ending_cash: np.ndarray
+    runway_months: np.ndarray
+    exact_series_rows: int = 0  # Series rows resolved with Decimal near half cents
+    exact_fallbacks: List[int] = field(default_factory=list)  # Scenarios recomputed in full
+    exact_totals: Dict[int, Dict[str, Decimal]] = field(default_factory=dict)
+
+    @property
+    def scenario_count(self) -> int:
+        return self.revenue.shape[0]
+
+    def totals(self, series: str) -> np.ndarray:
+        """Period total per scenario for a P&L series, in cents."""
+        return getattr(self, series).sum(axis=1)
+
+    def summary(self, index: int) -> Dict[str, Any]:
+        """Headline metrics for one scenario, as Decimals like ForecastRun's columns."""
+        if index in self.exact_totals:
+            return dict(self.exact_totals[index])
+        return {
+            "total_revenue": _to_decimal(self.totals("revenue")[index]),
+            "total_cogs": _to_decimal(self.totals("cogs")[index]),
+            "total_opex": _to_decimal(self.totals("opex")[index]),
+            "total_ebitda": _to_decimal(self.totals("ebitda")[index]),
+            "ending_cash": _to_decimal(self.ending_cash[index, -1]) if self.month_keys else None,
+            "runway_months": int(self.runway_months[index]),
+        }
+
+    def monthly(self, series: str, index: int) -> Dict[str, Decimal]:
+        """{YYYY-MM: Decimal} for one scenario's series."""
+        values = getattr(self, series)[index]
+        return {k: _to_decimal(v) for k, v in zip(self.month_keys, values)}
+
+
+def _to_decimal(cents) -> Decimal:
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def _is_whole_cents(value: Decimal) -> bool:
+    return value == value.quantize(Decimal("0.01"))
+
+
+def _decimal_ending_cash(
+    revenue: np.ndarray,
+    cogs: np.ndarray,
+    ebitda: np.ndarray,
+    starting_cash: Decimal,
+    dso_days: int,
+    dpo_days: int,
+    capex_cents: int,
+) -> List[int]:
+    """Replay FPAComputeEngine.compute_cash_bridge's running cash in Decimal (cents out)."""
+    dso, dpo = Decimal(str(dso_days)), Decimal(str(dpo_days))
+    capex = -_to_decimal(capex_cents) if capex_cents > 0 else Decimal("0")
+    running_cash = starting_cash
+    prev_revenue = prev_cogs = None
+    ending = []
+    for rev_cents, cogs_cents, ebitda_cents in zip(revenue, cogs, ebitda):
+        month_revenue = _to_decimal(rev_cents)
+        month_cogs = abs(_to_decimal(cogs_cents))
+        ar_change = Decimal("0") if prev_revenue is None else month_revenue * dso / 30 - prev_revenue * dso / 30
+        ap_change = Decimal("0") if prev_cogs is None else month_cogs * dpo / 30 - prev_cogs * dpo / 30
+        wc_change = -ar_change + ap_change
+        running_cash = running_cash + (_to_decimal(ebitda_cents) + wc_change) + capex
+        ending.append(int(running_cash.quantize(Decimal("0.01")) * 100))
+        prev_revenue, prev_cogs = month_revenue, month_cogs
+    return ending
+
+
+# =============================================================================
+# ENGINE
+# =============================================================================
+
+class VectorizedDriverEngine:
+    """
+    Array-based driver engine over a fixed month range.
+
+    Usage:
+        engine = VectorizedDriverEngine(months)
+        result = engine.compute([drivers_a, drivers_b, ...], actuals)
+        result.summary(0)["total_ebitda"]
+    """
+
+    def __init__(self, months: Sequence[date]):
+        self.months = list(months)
+        self.month_keys = [m.strftime("%Y-%m") for m in self.months]
+        self.steps = np.arange(len(self.months), dtype=np.float64)
+
+    def compute(
+        self,
+        driver_sets: Sequence[Dict[str, Any]],
+        actuals: Optional[ActualsSnapshot] = None,
+    ) -> DriverBatchResult:
+        """Evaluate every driver set; ambiguous roundings are resolved with Decimal."""
+        S, M = len(driver_sets), len(self.months)
+        ambiguous = np.zeros(S, dtype=bool)
+        exact_rows = [0]
+        reference = FPAComputeEngine(db=None)
+        run_rates: Dict[int, List[Decimal]] = {}
+
+        def decimal_run_rate(s: int) -> List[Decimal]:
+            if s not in run_rates:
+                run_rates[s] = reference._revenue_run_rate(self.months, driver_sets[s], actuals)
+            return run_rates[s]
+
+        def column(key: str) -> np.ndarray:
+            return np.array([float(d.get(key, DRIVER_DEFAULTS[key])) for d in driver_sets], dtype=np.float64)
+
+        def decimals(key: str) -> List[Decimal]:
+            return [Decimal(str(d.get(key, DRIVER_DEFAULTS[key]))) for d in driver_sets]
+
+        def to_cents(values: np.ndarray, exact_series: Callable[[int], List[Decimal]]) -> np.ndarray:
+            """
+            Round float series to cents like Decimal.quantize (half-even). Rows
+            with a value near a half cent (exact ties are common, e.g. 5% of
+            x.x5) are replaced by exact_series(row), the quantized Decimal series.
+            """
+            scaled = values * 100
+            distance = np.abs(scaled - np.floor(scaled) - 0.5)
+            unsafe = (distance <= ROUNDING_GUARD * np.maximum(np.abs(scaled), 1.0)).any(axis=1)
+            cents = np.rint(scaled).astype(np.int64)
+            for s in np.flatnonzero(unsafe):
+                cents[s] = [int(v * 100) for v in exact_series(int(s))]
+            exact_rows[0] += int(unsafe.sum())
+            return cents
+
+        def fixed_cents(key: str) -> np.ndarray:
+            values = decimals(key)
+            for s, v in enumerate(values):
+                if not _is_whole_cents(v):
+                    ambiguous[s] = True
+            return np.array([int((v * 100).to_integral_value()) for v in values], dtype=np.int64)
+
+        # === REVENUE ===
+        if actuals and actuals.revenue_total:
+            base_revenue = np.full(S, float(actuals.revenue_total))
+            base_decimals = [Decimal(actuals.revenue_total)] * S
+        else:
+            base_revenue = column("base_monthly_revenue")
+            base_decimals = decimals("base_monthly_revenue")
+        for s, v in enumerate(base_decimals):
+            if not _is_whole_cents(v):
+                ambiguous[s] = True  # Month 0 is reported unquantized
+
+        net_growth = 1 + column("revenue_growth_pct") / 100 - column("churn_rate_pct") / 100
+        run_rate = base_revenue[:, None] * np.power(net_growth[:, None], self.steps[None, :])
+
+        recurring = to_cents(run_rate, lambda s: [
+            v.quantize(Decimal("0.01")) for v in decimal_run_rate(s)
+        ])
+        if M:
+            recurring[:, 0] = np.array([int((v * 100).to_integral_value()) for v in base_decimals], dtype=np.int64)
+        line_items = [("revenue", "subscription", "Recurring Revenue", recurring)]
+
+        one_time = fixed_cents("one_time_revenue_monthly")
+        if (one_time > 0).any():
+            line_items.append(("revenue", "one_time", "One-Time Revenue",
+                               np.repeat(np.maximum(one_time, 0)[:, None], M, axis=1)))
+
+        # === COGS ===
+        cogs_line = -to_cents(run_rate * (column("cogs_pct") / 100)[:, None], lambda s: [
+            -v for v in reference._compute_cogs(
+                self.months, driver_sets[s], actuals, decimal_run_rate(s)
+            )[0].monthly_values.values()
+        ])
+        line_items.append(("cogs", "direct", "Cost of Revenue", cogs_line))
+
+        # === OPEX ===
+        burden = 1 + column("burden_rate_pct") / 100
+        headcount_growth = np.power(
+            (1 + column("headcount_growth_pct") / 100 / 12)[:, None], self.steps[None, :]
+        )
+        people_lines: Dict[int, Dict[str, List[Decimal]]] = {}
+
+        def decimal_people_cost(s: int, label: str) -> List[Decimal]:
+            if s not in people_lines:
+                people_lines[s] = {
+                    li.label: [-v for v in li.monthly_values.values()]
+                    for li in reference._compute_opex(self.months, driver_sets[s], actuals)
+                    if li.subcategory == "people"
+                }
+            return people_lines[s][label]
+
+        for dept, label in PEOPLE_DEPARTMENTS:
+            count = np.trunc(column(f"headcount_{dept}"))
+            monthly_salary = column(f"salary_{dept}_annual") / 12
+            cost = (count * monthly_salary * burden)[:, None] * headcount_growth
+            line_label = f"People - {label}"
+            line_items.append(("opex", "people", line_label, -to_cents(
+                cost, lambda s, line_label=line_label: decimal_people_cost(s, line_label)
+            )))
+
+        for key, subcategory, label in FIXED_OPEX:
+            spend = fixed_cents(key)
+            if (spend > 0).any():
+                line_items.append(("opex", subcategory, label,
+                                   np.repeat(-np.maximum(spend, 0)[:, None], M, axis=1)))
+
+        revenue = sum(li[3] for li in line_items if li[0] == "revenue")
+        cogs = sum(li[3] for li in line_items if li[0] == "cogs")
+        opex = sum(li[3] for li in line_items if li[0] == "opex")
+        # Same identities as FPAComputeEngine.compute_pl (cost lines carry negative signs)
+        gross_profit = revenue + cogs
+        ebitda = gross_profit + opex
+
+        # === CASH ===
+        # Working-capital terms are (cents × days / 30), so running cash is
+        # held exactly as integer cents scaled by 30
+        if actuals and actuals.cash_ending:
+            starting_decimals = [Decimal(actuals.cash_ending)] * S
+        else:
+            starting_decimals = decimals("starting_cash")
+        for s, v in enumerate(starting_decimals):
+            if not _is_whole_cents(v):
+                ambiguous[s] = True
+        starting_cash = np.array([int((v * 100).to_integral_value()) for v in starting_decimals], dtype=np.int64)
+        dso = column("dso_days").astype(np.int64)
+        dpo = column("dpo_days").astype(np.int64)
+        capex = np.maximum(fixed_cents("capex_monthly"), 0)
+
+        ar_change = -(revenue - revenue[:, :1]) * dso[:, None]
+        ap_change = (np.abs(cogs) - np.abs(cogs[:, :1])) * dpo[:, None]
+        running_30 = (
+            30 * starting_cash[:, None]
+            + 30 * np.cumsum(ebitda, axis=1)
+            + ar_change + ap_change
+            - 30 * capex[:, None] * np.arange(1, M + 1, dtype=np.int64)[None, :]
+        )
+        quotient, remainder = np.divmod(running_30, 30)
+        # Half-even rounding of quotient + remainder / 30
+        round_up = (remainder > 15) | ((remainder == 15) & (quotient % 2 == 1))
+        ending_cash = quotient + round_up
+        # Decimal divides by 30 at 28 digits when days are not a multiple of 3,
+        # so an exact half cent may round either way: replay those rows in Decimal
+        inexact_days = ((dso % 3) != 0) | ((dpo % 3) != 0)
+        cash_ties = ((remainder == 15) & inexact_days[:, None]).any(axis=1)
+        for s in np.flatnonzero(cash_ties & ~ambiguous):
+            ending_cash[s] = _decimal_ending_cash(
+                revenue[s], cogs[s], ebitda[s], starting_decimals[s],
+                int(dso[s]), int(dpo[s]), capex[s]
+            )
+        exact_rows[0] += int((cash_ties & ~ambiguous).sum())
+
+        # === RUNWAY ===
+        thresholds = np.array([
+            int((v * 100).to_integral_value(rounding=ROUND_CEILING)) for v in decimals("min_cash_threshold")
+        ], dtype=np.int64)
+        below = ending_cash < thresholds[:, None]
+        runway = np.where(below.any(axis=1), below.argmax(axis=1), M)
+
+        result = DriverBatchResult(
+            month_keys=list(self.month_keys),
+            line_items=line_items,
+            revenue=revenue,
+            cogs=cogs,
+            opex=opex,
+            gross_profit=gross_profit,
+            ebitda=ebitda,
+            ending_cash=ending_cash,
+            runway_months=runway,
+            exact_series_rows=exact_rows[0],
+        )
+        for s in np.flatnonzero(ambiguous):
+            self._recompute_exact(result, int(s), driver_sets[s], actuals)
+        return result
+
+    def simulate(
+        self,
+        columns: Dict[str, Any],
+        paths: int,
+        actuals: Optional[ActualsSnapshot] = None,
+        starting_cash: Optional[Decimal] = None,
+    ) -> np.ndarray:
+        """
+        Ending cash (paths × months, float64) for sampled drivers.
+
+        Float mirror of compute() without cent rounding, for Monte Carlo use.
+        Each column is a per-path array or a scalar. Also supports
+        hiring_slippage_months: headcount growth starts that many months late.
+        """
+        M = len(self.months)
+
+        def column(key: str) -> np.ndarray:
+            value = columns.get(key, DRIVER_DEFAULTS.get(key, 0))
+            return np.broadcast_to(np.asarray(value, dtype=np.float64), (paths,))
+
+        if actuals and actuals.revenue_total:
+            base_revenue = np.full(paths, float(actuals.revenue_total))
+        else:
+            base_revenue = column("base_monthly_revenue")
+        net_growth = 1 + column("revenue_growth_pct") / 100 - column("churn_rate_pct") / 100
+        run_rate = base_revenue[:, None] * np.power(net_growth[:, None], self.steps[None, :])
+
+        revenue = run_rate + np.maximum(column("one_time_revenue_monthly"), 0)[:, None]
+        cogs = -run_rate * (column("cogs_pct") / 100)[:, None]
+
+        growth_months = np.maximum(self.steps[None, :] - column("hiring_slippage_months")[:, None], 0)
+        headcount_growth = np.power((1 + column("headcount_growth_pct") / 100 / 12)[:, None], growth_months)
+        monthly_people = sum(
+            np.trunc(column(f"headcount_{dept}")) * column(f"salary_{dept}_annual") / 12
+            for dept, _ in PEOPLE_DEPARTMENTS
+        ) * (1 + column("burden_rate_pct") / 100)
+        fixed_opex = sum(np.maximum(column(key), 0) for key, _, _ in FIXED_OPEX)
+        opex = -(monthly_people[:, None] * headcount_growth + fixed_opex[:, None])
+
+        # Same identities as FPAComputeEngine.compute_pl (COGS and opex carry negative signs)
+        ebitda = (revenue + cogs) + opex
+
+        if starting_cash is not None:
+            start = np.full(paths, float(starting_cash))
+        elif actuals and actuals.cash_ending:
+            start = np.full(paths, float(actuals.cash_ending))
+        else:
+            start = column("starting_cash")
+        dso = np.trunc(column("dso_days"))
+        dpo = np.trunc(column("dpo_days"))
+        capex = np.maximum(column("capex_monthly"), 0)
+
+        return (
+            start[:, None]
+            + np.cumsum(ebitda, axis=1)
+            - (revenue - revenue[:, :1]) * (dso / 30)[:, None]
+            - (cogs - cogs[:, :1]) * (dpo / 30)[:, None]
+            - capex[:, None] * np.arange(1, M + 1, dtype=np.float64)[None, :]
+        )
+
+    def _recompute_exact(
+        self,
+        result: DriverBatchResult,
+        index: int,
+        drivers: Dict[str, Any],
+        actuals: Optional[ActualsSnapshot],
+    ) -> None:
+        """Overwrite one scenario's row with the Decimal reference computation."""
+        if not self.months:
+            return
+        reference = FPAComputeEngine(db=None)
+        pl = reference.compute_pl(self.months[0], self.months[-1], drivers, actuals)
+        bridge = reference.compute_cash_bridge(self.months[0], self.months[-1], pl, drivers, actuals)
+        runway = reference.compute_runway(bridge, drivers)
+
+        def cents(values: Dict[str, Decimal]) -> List[int]:
+            # Month 0 revenue may carry sub-cent digits; the matrices round
+            # it, while exact_totals keeps the reference Decimals
+            return [int((values[k] * 100).to_integral_value()) for k in self.month_keys]
+
+        by_label = {li.label: li for li in pl.line_items}
+        for category, subcategory, label, values in result.line_items:
+            line = by_label.get(label)
+            values[index] = cents(line.monthly_values) if line else 0
+        result.revenue[index] = cents(pl.revenue_by_month)
+        result.cogs[index] = cents(pl.cogs_by_month)
+        result.opex[index] = cents(pl.opex_by_month)
+        result.gross_profit[index] = cents(pl.gross_profit_by_month)
+        result.ebitda[index] = cents(pl.ebitda_by_month)
+        result.ending_cash[index] = cents(bridge.ending_cash_by_month)
+        result.runway_months[index] = runway.runway_months
+        result.exact_fallbacks.append(index)
+        result.exact_totals[index] = {
+            "total_revenue": pl.total_revenue,
+            "total_cogs": pl.total_cogs,
+            "total_opex": pl.total_opex,
+            "total_ebitda": pl.total_ebitda,
+            "ending_cash": bridge.ending_cash,
+            "runway_months": runway.runway_months,
+        }
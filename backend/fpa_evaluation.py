@@ -151,8 +151,8 @@ class FPAEvaluationHarness:
         hashes = [original_hash]
         
         for i in range(num_runs):
-            # Re-compute
-            output = self.compute_engine.run_forecast(forecast_run_id)
+            # Re-compute (bypassing the cache, which would trivially match)
+            output = self.compute_engine.run_forecast(forecast_run_id, use_cache=False)
             hashes.append(output.output_hash)
         
         all_match = len(set(hashes)) == 1
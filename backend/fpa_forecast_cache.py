@@ -0,0 +1,156 @@
+"""
+Content-Addressed FP&A Forecast Cache
+
+FPAComputeEngine.run_forecast is deterministic: the same drivers, plan
+period and actuals always produce the same outputs. The cache keys each
+computation by a SHA256 of those canonical inputs (inputs_hash) and serves
+stored outputs_json instead of recomputing.
+
+Two tiers:
+- In-process LRU of outputs dicts (shared by every engine in the process)
+- Previously computed ForecastRun rows with the same inputs_hash
+
+Hit/miss counts are kept globally and per tracking scope, so a workflow
+run can report exactly how many of its forecasts were served from cache.
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, is_dataclass
+from typing import Any, Dict, Iterator, List, Optional
+import hashlib
+import json
+import threading
+
+from sqlalchemy.orm import Session
+
+from fpa_models import ActualsSnapshot, ForecastRun, Plan
+
+
+# Bump when compute logic changes so stale outputs are never served
+ENGINE_VERSION = "2"
+
+
+@dataclass
+class ForecastCacheStats:
+    """Hit/miss counters for one scope"""
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return round(self.hits / total, 4) if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
+
+
+def compute_inputs_hash(
+    plan: Plan,
+    drivers: Dict[str, Any],
+    actuals: Optional[ActualsSnapshot] = None,
+    simulation: Any = None,
+) -> str:
+    """
+    Canonical SHA256 of everything run_forecast reads.
+
+    Actuals are identified by id plus the values the engine consumes, so an
+    unlocked snapshot that is edited in place gets a new key.
+    """
+    payload = {
+        "engine_version": ENGINE_VERSION,
+        "period_start": plan.period_start.isoformat(),
+        "period_end": plan.period_end.isoformat(),
+        "drivers": drivers,
+        "actuals": {
+            "id": actuals.id,
+            "revenue_total": str(actuals.revenue_total) if actuals.revenue_total is not None else None,
+            "cash_ending": str(actuals.cash_ending) if actuals.cash_ending is not None else None,
+        } if actuals else None,
+        "simulation": asdict(simulation) if is_dataclass(simulation) else simulation,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ForecastCache:
+    """
+    Shared compute cache for forecast outputs.
+
+    Thread-safe; entries are immutable JSON dicts so callers get a copy-free
+    read and must not mutate what they receive.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = ForecastCacheStats()
+
+    def get(
+        self,
+        db: Session,
+        inputs_hash: str,
+    ) -> Optional[Dict[str, Any]]:
+        """Look up outputs by inputs hash (memory first, then stored runs). Records a hit or miss."""
+        with self._lock:
+            outputs = self._entries.get(inputs_hash)
+            if outputs is not None:
+                self._entries.move_to_end(inputs_hash)
+
+        if outputs is None and db is not None:
+            stored = db.query(ForecastRun).filter(
+                ForecastRun.inputs_hash == inputs_hash,
+                ForecastRun.outputs_json.isnot(None),
+            ).first()
+            if stored is not None:
+                outputs = stored.outputs_json
+                self.put(inputs_hash, outputs)
+
+        self._record(outputs is not None)
+        return outputs
+
+    def put(self, inputs_hash: str, outputs: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[inputs_hash] = outputs
+            self._entries.move_to_end(inputs_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.stats = ForecastCacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @contextmanager
+    def track(self) -> Iterator[ForecastCacheStats]:
+        """Count hits and misses recorded on this thread inside the block"""
+        scope = ForecastCacheStats()
+        scopes = self._scopes()
+        scopes.append(scope)
+        try:
+            yield scope
+        finally:
+            scopes.remove(scope)
+
+    def _scopes(self) -> List[ForecastCacheStats]:
+        if not hasattr(self._local, "scopes"):
+            self._local.scopes = []
+        return self._local.scopes
+
+    def _record(self, hit: bool) -> None:
+        with self._lock:
+            for stats in [self.stats, *self._scopes()]:
+                if hit:
+                    stats.hits += 1
+                else:
+                    stats.misses += 1
+
+
+# Process-wide cache shared by workflows, the variance engine and the API
+forecast_cache = ForecastCache()
@@ -328,6 +328,7 @@ class ForecastRun(Base):
     
     # Validation
     outputs_hash = Column(String(64), nullable=True)  # SHA256 of outputs for integrity
+    inputs_hash = Column(String(64), nullable=True, index=True)  # SHA256 of canonical inputs (compute cache key)
     
     # Audit
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -359,6 +360,7 @@ class ForecastRun(Base):
             "ending_cash": str(self.ending_cash) if self.ending_cash else None,
             "runway_months": self.runway_months,
             "outputs_hash": self.outputs_hash,
+            "inputs_hash": self.inputs_hash,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "created_by": self.created_by,
             "compute_time_ms": self.compute_time_ms,
@@ -724,3 +726,17 @@ def log_fpa_change(mapper, connection, target, action):
 for model_class in [Plan, AssumptionSet, Driver, ActualsSnapshot, ForecastRun, Scenario, ScenarioDiff]:
     event.listen(model_class, 'after_insert', lambda m, c, t: log_fpa_change(m, c, t, 'create'))
     event.listen(model_class, 'after_update', lambda m, c, t: log_fpa_change(m, c, t, 'update'))
+
+
+def create_fpa_tables(engine):
+    """
+    Create the FP&A tables.
+    
+    They reference entities.id from models.Base, so the existing entities
+    table is reflected into this metadata first.
+    """
+    from sqlalchemy import Table
+    
+    if "entities" not in Base.metadata.tables:
+        Table("entities", Base.metadata, autoload_with=engine)
+    Base.metadata.create_all(bind=engine)
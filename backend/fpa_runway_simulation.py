@@ -0,0 +1,132 @@
+"""
+Monte Carlo Runway Simulation
+
+Samples uncertain drivers (growth, churn, DSO/DPO, hiring slippage) from
+configured distributions and propagates every path through the P&L and
+cash bridge with VectorizedDriverEngine.simulate(). Returns runway
+percentiles and the probability of breaching the minimum cash threshold
+by each month.
+
+Deterministic under a seed: the same drivers, config and seed always
+give the same distribution.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fpa_driver_engine import DRIVER_DEFAULTS, VectorizedDriverEngine
+from fpa_models import ActualsSnapshot
+
+
+# Spreads around the plan's own driver values
+DEFAULT_DISTRIBUTIONS: Dict[str, Dict[str, Any]] = {
+    "revenue_growth_pct": {"dist": "normal", "std": 1.5},
+    "churn_rate_pct": {"dist": "normal", "std": 0.75, "min": 0},
+    "dso_days": {"dist": "normal", "std": 7, "min": 0},
+    "dpo_days": {"dist": "normal", "std": 5, "min": 0},
+    "hiring_slippage_months": {"dist": "poisson", "lam": 1.0},
+}
+
+# Drivers the compute engine truncates to whole units
+INTEGER_DRIVERS = {"dso_days", "dpo_days", "hiring_slippage_months"}
+
+
+@dataclass
+class RunwaySimulationConfig:
+    """How many paths to run and which drivers to sample."""
+    paths: int = 10000
+    seed: int = 0
+    distributions: Dict[str, Dict[str, Any]] = field(default_factory=lambda: dict(DEFAULT_DISTRIBUTIONS))
+    percentiles: Tuple[int, ...] = (10, 25, 50, 75, 90)
+
+
+def sample_drivers(
+    drivers: Dict[str, Any],
+    config: RunwaySimulationConfig,
+    rng: np.random.Generator,
+) -> Dict[str, np.ndarray]:
+    """
+    Draw config.paths values per configured driver.
+
+    Supported distributions (center defaults to the driver's plan value):
+        normal:     std, mean, min, max
+        uniform:    low, high
+        triangular: low, mode, high
+        poisson:    lam (non-negative integers, e.g. months of slippage)
+    """
+    samples = {}
+    for key in sorted(config.distributions):
+        spec = config.distributions[key]
+        center = float(drivers.get(key, DRIVER_DEFAULTS.get(key, 0)))
+        kind = spec.get("dist", "normal")
+        n = config.paths
+
+        if kind == "normal":
+            values = rng.normal(spec.get("mean", center), spec.get("std", 0.0), n)
+        elif kind == "uniform":
+            values = rng.uniform(spec["low"], spec["high"], n)
+        elif kind == "triangular":
+            values = rng.triangular(spec["low"], spec.get("mode", center), spec["high"], n)
+        elif kind == "poisson":
+            values = rng.poisson(spec["lam"], n).astype(np.float64)
+        else:
+            raise ValueError(f"Unsupported distribution '{kind}' for driver {key}")
+
+        if "min" in spec or "max" in spec:
+            values = np.clip(values, spec.get("min", -np.inf), spec.get("max", np.inf))
+        if key in INTEGER_DRIVERS:
+            values = np.rint(values)
+        samples[key] = values
+    return samples
+
+
+def simulate_runway(
+    months: Sequence[date],
+    drivers: Dict[str, Any],
+    config: Optional[RunwaySimulationConfig] = None,
+    actuals: Optional[ActualsSnapshot] = None,
+    starting_cash: Optional[Decimal] = None,
+) -> Dict[str, Any]:
+    """
+    Run the simulation and summarize runway.
+
+    Returns:
+        {
+            "paths", "seed",
+            "runway_percentiles": {"p10": months, ...},
+            "breach_probability_by_month": [{"month": "YYYY-MM", "probability": p}, ...],
+            "probability_of_breach": p over the whole horizon,
+        }
+    """
+    config = config or RunwaySimulationConfig()
+    engine = VectorizedDriverEngine(months)
+    M = len(engine.months)
+
+    rng = np.random.default_rng(config.seed)
+    columns = {**{k: v for k, v in drivers.items() if not isinstance(v, str)},
+               **sample_drivers(drivers, config, rng)}
+    ending_cash = engine.simulate(columns, config.paths, actuals, starting_cash)
+
+    min_cash = float(drivers.get("min_cash_threshold", DRIVER_DEFAULTS["min_cash_threshold"]))
+    breached = np.maximum.accumulate(ending_cash < min_cash, axis=1)
+    runway = np.where(breached.any(axis=1), breached.argmax(axis=1), M) if M else np.zeros(config.paths, dtype=int)
+
+    percentile_values = np.percentile(runway, config.percentiles, method="inverted_cdf") if M else [0] * len(config.percentiles)
+    breach_curve = breached.mean(axis=0) if M else np.zeros(0)
+
+    return {
+        "paths": config.paths,
+        "seed": config.seed,
+        "runway_percentiles": {
+            f"p{p}": int(v) for p, v in zip(config.percentiles, percentile_values)
+        },
+        "breach_probability_by_month": [
+            {"month": key, "probability": round(float(prob), 4)}
+            for key, prob in zip(engine.month_keys, breach_curve)
+        ],
+        "probability_of_breach": round(float(breach_curve[-1]), 4) if M else 0.0,
+    }
@@ -599,7 +599,18 @@ class FPAVarianceEngine:
     def _extract_forecast_data(self, forecast: ForecastRun) -> Dict:
         """
         Extract structured data from forecast run.
+        
+        Runs that were never computed are filled through the compute
+        engine, which serves them from the shared forecast cache when the
+        same inputs were already computed.
         """
+        if not forecast.outputs_json and forecast.id is not None:
+            from fpa_compute_engine import FPAComputeEngine
+            try:
+                FPAComputeEngine(self.db).run_forecast(forecast.id)
+            except ValueError as e:
+                logger.warning(f"Could not compute forecast {forecast.id}: {e}")
+        
         if not forecast.outputs_json:
             return {}
         
@@ -10,7 +10,7 @@ Automated workflows for:
 
 from datetime import datetime, date, timedelta
 from decimal import Decimal
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import logging
@@ -23,6 +23,7 @@ from fpa_models import (
     FPAArtifact, FPADecision, VarianceReport, FPAAuditLog
 )
 from fpa_compute_engine import FPAComputeEngine
+from fpa_forecast_cache import ForecastCacheStats
 from fpa_variance_engine import FPAVarianceEngine, VarianceAnalysis
 
 logger = logging.getLogger(__name__)
@@ -106,6 +107,9 @@ class WeeklyForecastOutput:
     # Recommendations
     decisions_required: List[Dict]
     
+    # Forecast cache hits/misses during this run
+    cache_metrics: Dict[str, Any] = field(default_factory=dict)
+    
     def to_dict(self) -> Dict:
         return {
             "entity_id": self.entity_id,
@@ -117,6 +121,7 @@ class WeeklyForecastOutput:
             "driver_changes": self.driver_changes,
             "talking_points": self.talking_points,
             "decisions_required": self.decisions_required,
+            "cache_metrics": self.cache_metrics,
         }
 
 
@@ -386,7 +391,20 @@ class FPAWorkflowOrchestrator:
         - Compares to prior week's forecast
         - Identifies material changes
         - Generates CFO talking points
+        
+        Unchanged inputs are served from the shared forecast cache; the
+        output reports this run's cache hits and misses.
         """
+        with self.compute_engine.cache.track() as cache_stats:
+            return self._run_weekly_forecast_update(entity_id, plan_id, week_ending, cache_stats)
+    
+    def _run_weekly_forecast_update(
+        self,
+        entity_id: int,
+        plan_id: int,
+        week_ending: Optional[date],
+        cache_stats: ForecastCacheStats,
+    ) -> WeeklyForecastOutput:
         week_ending = week_ending or (date.today() + timedelta(days=(6 - date.today().weekday())))
         
         # Get plan and latest assumption set
@@ -460,6 +478,7 @@ class FPAWorkflowOrchestrator:
             driver_changes=[],  # Would track driver changes in production
             talking_points=talking_points,
             decisions_required=decisions,
+            cache_metrics=cache_stats.to_dict(),
         )
         
         # Save as artifact
@@ -89,10 +89,19 @@ class SyncRunResponse(BaseModel):
     rows_loaded: int
     rows_skipped: int
     rows_error: int
+    skip_rate: float
     warning_count: int
     triggered_by: Optional[str]
 
 
+class WatermarkResponse(BaseModel):
+    """Incremental-sync watermark response."""
+    object_type: str
+    watermark: str
+    sync_run_id: Optional[int]
+    updated_at: Optional[datetime]
+
+
 class DatasetResponse(BaseModel):
     """Dataset response."""
     id: int
@@ -293,6 +302,62 @@ def start_sync(
     )
 
 
+@router.post("/connections/{connection_id}/resume", response_model=StartSyncResponse)
+def resume_sync(
+    connection_id: int,
+    background: bool = Query(True),
+    db: Session = Depends(get_db)
+):
+    """
+    Resume after an interrupted sync.
+    
+    Marks stale running syncs as failed and starts a new sync from the
+    last committed watermarks.
+    """
+    service = LineageService(db)
+    
+    sync_run_id, error = service.resume_sync(connection_id, background=background)
+    
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    
+    return StartSyncResponse(
+        sync_run_id=sync_run_id,
+        status="pending" if background else "running",
+        message=f"Sync resumed. Monitor progress at GET /lineage/sync-runs/{sync_run_id}"
+    )
+
+
+@router.get("/connections/{connection_id}/watermarks", response_model=List[WatermarkResponse])
+def get_watermarks(
+    connection_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get incremental-sync watermarks per object type."""
+    service = LineageService(db)
+    return [
+        WatermarkResponse(
+            object_type=w.object_type,
+            watermark=w.watermark,
+            sync_run_id=w.sync_run_id,
+            updated_at=w.updated_at
+        )
+        for w in service.get_watermarks(connection_id)
+    ]
+
+
+@router.delete("/connections/{connection_id}/watermarks")
+def reset_watermarks(
+    connection_id: int,
+    object_type: Optional[str] = Query(None, description="Reset one object type only"),
+    db: Session = Depends(get_db)
+):
+    """Reset watermarks so the next sync re-extracts full history."""
+    service = LineageService(db)
+    deleted = service.reset_watermarks(connection_id, object_type)
+    return {"connection_id": connection_id, "watermarks_reset": deleted}
+
+
 @router.get("/connections/{connection_id}/runs", response_model=List[SyncRunResponse])
 def get_connection_runs(
     connection_id: int,
@@ -315,6 +380,7 @@ def get_connection_runs(
             rows_loaded=r.rows_loaded,
             rows_skipped=r.rows_skipped,
             rows_error=r.rows_error,
+            skip_rate=r.skip_rate,
             warning_count=r.warning_count,
             triggered_by=r.triggered_by
         )
@@ -349,6 +415,7 @@ def get_sync_run(
         rows_loaded=run.rows_loaded,
         rows_skipped=run.rows_skipped,
         rows_error=run.rows_error,
+        skip_rate=run.skip_rate,
         warning_count=run.warning_count,
         triggered_by=run.triggered_by
     )
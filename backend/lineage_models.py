@@ -8,10 +8,12 @@ Provides full traceability from raw source data to canonical records:
 - RawRecord: Extracted raw data
 - CanonicalRecord: Normalized records
 - EvidenceRef: Links to evidence for audit
+- SyncDedupIndex/SyncDedupEntry: Per-connection idempotency index
+- SyncWatermark: Per-object high-water marks for incremental sync
 """
 
 from sqlalchemy import (
-    Column, Integer, String, Float, DateTime, ForeignKey, JSON, Text,
+    Column, Integer, String, Float, DateTime, ForeignKey, JSON, Text, LargeBinary,
     UniqueConstraint, CheckConstraint, Index, Enum as SQLEnum
 )
 from sqlalchemy.ext.declarative import declarative_base
@@ -191,6 +193,13 @@ class SyncRun(Base):
         Index("ix_sync_run_connection_status", "connection_id", "status"),
     )
 
+    @property
+    def skip_rate(self) -> float:
+        """Fraction of extracted rows skipped as already-loaded duplicates."""
+        if not self.rows_extracted:
+            return 0.0
+        return (self.rows_skipped or 0) / self.rows_extracted
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # DATASET MODEL
@@ -480,3 +489,86 @@ class SchemaDriftEvent(Base):
     detected_at = Column(DateTime, default=datetime.datetime.utcnow)
     acknowledged_at = Column(DateTime, nullable=True)
     acknowledged_by = Column(String(100), nullable=True)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SYNC IDEMPOTENCY INDEX
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class SyncDedupIndex(Base):
+    """
+    Persisted bloom filter for a connection's idempotency index.
+    
+    One row per connection. The filter answers "definitely never seen" for
+    a raw_hash without touching SyncDedupEntry; positives are confirmed
+    against the exact entry set.
+    """
+    __tablename__ = "sync_dedup_indexes"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    connection_id = Column(Integer, ForeignKey("lineage_connections.id"), nullable=False, unique=True)
+    
+    # Bloom filter state
+    bloom_bits = Column(LargeBinary, nullable=False)
+    bloom_num_bits = Column(Integer, nullable=False)
+    bloom_num_hashes = Column(Integer, nullable=False)
+    capacity = Column(Integer, nullable=False)
+    
+    # Number of entries folded into the filter (compared against the exact set on load)
+    entry_count = Column(Integer, default=0, nullable=False)
+    
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+
+class SyncDedupEntry(Base):
+    """
+    Exact membership set for a connection's idempotency index.
+    
+    Every raw row loaded by any SyncRun of the connection is recorded here,
+    so later syncs can skip byte-identical rows before normalization.
+    """
+    __tablename__ = "sync_dedup_entries"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    connection_id = Column(Integer, ForeignKey("lineage_connections.id"), nullable=False)
+    
+    raw_hash = Column(String(64), nullable=False)
+    canonical_id = Column(String(100), nullable=True)
+    
+    first_sync_run_id = Column(Integer, ForeignKey("sync_runs.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint('connection_id', 'raw_hash', name='uix_sync_dedup_entry_connection_hash'),
+        Index("ix_sync_dedup_entry_connection_canonical", "connection_id", "canonical_id"),
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# INCREMENTAL SYNC WATERMARKS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class SyncWatermark(Base):
+    """
+    High-water mark per (connection, object type).
+    
+    Examples: Stripe charge `created`, QuickBooks `MetaData.LastUpdatedTime`,
+    BigQuery partition ID. Values are stored as strings and compared
+    lexicographically, so connectors emit ISO-8601 timestamps or zero-padded
+    numbers. Advanced in the same transaction as the batch that reached it,
+    so a crashed sync resumes from its last committed batch.
+    """
+    __tablename__ = "sync_watermarks"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    connection_id = Column(Integer, ForeignKey("lineage_connections.id"), nullable=False)
+    object_type = Column(String(200), nullable=False)  # source_table, e.g. "charges", "Invoice"
+    
+    watermark = Column(String(100), nullable=False)
+    
+    sync_run_id = Column(Integer, ForeignKey("sync_runs.id"), nullable=True)  # Run that last advanced it
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint('connection_id', 'object_type', name='uix_sync_watermark_connection_object'),
+    )
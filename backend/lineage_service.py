@@ -10,20 +10,33 @@ Orchestrates sync operations and manages data lineage:
 
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timezone
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
+from itertools import islice
 import threading
 import uuid
 
 from lineage_models import (
     LineageConnection, SyncRun, LineageDataset, RawRecord, CanonicalRecord,
-    LineageEvidenceRef, SchemaDriftEvent,
+    LineageEvidenceRef, SchemaDriftEvent, SyncWatermark,
     ConnectionStatus, SyncStatus, RecordType, generate_dataset_id
 )
 from connector_interface import (
     BaseConnector, ConnectorRegistry, ExtractedRow, SchemaInfo,
     SyncResult, SyncProgress, ConnectionTestResult
 )
+from sync_dedup_index import ConnectionDedupIndex
+from sync_watermarks import WatermarkStore
+
+
+def _batched(iterable, size: int):
+    """Yield lists of up to `size` items from an iterable."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -35,6 +48,9 @@ class LineageService:
     Manages data lineage and sync operations.
     """
     
+    # Rows probed against the idempotency index (and committed) together
+    DEDUP_BATCH_SIZE = 500
+    
     def __init__(self, db: Session):
         self.db = db
         self._running_syncs: Dict[int, threading.Thread] = {}
@@ -290,15 +306,22 @@ class LineageService:
                 dataset.date_range_end = result.date_range_end
             
             # Calculate total amount
-            total_amount = db.query(CanonicalRecord).filter(
+            total_amount = db.query(func.sum(CanonicalRecord.amount)).filter(
                 CanonicalRecord.dataset_id == dataset.id
-            ).with_entities(
-                db.query(CanonicalRecord.amount).filter(
-                    CanonicalRecord.dataset_id == dataset.id
-                ).scalar_subquery()
             ).scalar() or 0.0
             dataset.amount_total_base = total_amount
             
+            # Record idempotency index effectiveness for this run
+            dataset.source_summary_json = {
+                **(dataset.source_summary_json or {}),
+                "dedup": {
+                    **result.dedup_stats,
+                    "rows_deduplicated": result.rows_deduplicated,
+                    "skip_rate": sync_run.skip_rate,
+                },
+                "watermarks": result.watermarks,
+            }
+            
             # Update connection last_sync_at
             connection.last_sync_at = datetime.now(timezone.utc)
             
@@ -330,108 +353,142 @@ class LineageService:
         since: Optional[datetime],
         until: Optional[datetime]
     ) -> SyncResult:
-        """Extract data from connector and load into database."""
+        """
+        Extract data from connector and load into database.
+        
+        Rows are processed in batches. Each batch is probed against the
+        connection's idempotency index first, so rows loaded by an earlier
+        SyncRun are skipped before normalization.
+        
+        Unless an explicit `since` is given, the connector only extracts from
+        its committed watermarks. Watermarks advance with each committed
+        batch (ordered connectors) or with the final commit (unordered).
+        """
         rows_extracted = 0
         rows_normalized = 0
         rows_loaded = 0
         rows_skipped = 0
+        rows_deduplicated = 0
         rows_error = 0
         errors = []
         warnings = []
         min_date = None
         max_date = None
         
+        dedup_index = ConnectionDedupIndex.load(db, sync_run.connection_id)
+        dataset_canonical_ids = set()
+        
+        watermark_store = WatermarkStore(db, sync_run.connection_id)
+        starting_watermarks = watermark_store.load()
+        if since is None:
+            connector.set_watermarks(starting_watermarks)
+        
         try:
-            for raw_row in connector.extract(since=since, until=until):
-                rows_extracted += 1
+            for batch in _batched(connector.extract(since=since, until=until), self.DEDUP_BATCH_SIZE):
+                hashed_batch = [(raw_row, raw_row.raw_hash) for raw_row in batch]
+                seen_hashes = dedup_index.filter_seen([raw_hash for _, raw_hash in hashed_batch])
                 
-                try:
-                    # Store raw record
-                    raw_record = RawRecord(
-                        dataset_id=dataset.id,
-                        source_table=raw_row.source_table,
-                        source_row_id=raw_row.source_row_id,
-                        raw_payload_json=raw_row.raw_payload,
-                        raw_hash=raw_row.raw_hash
-                    )
-                    db.add(raw_record)
-                    db.flush()  # Get ID
-                    
-                    # Normalize
-                    normalized = connector.normalize(raw_row)
-                    rows_normalized += 1
-                    
-                    # Track date range
-                    record_date_str = normalized.get("record_date")
-                    if record_date_str:
-                        try:
-                            if isinstance(record_date_str, str):
-                                record_date = datetime.fromisoformat(record_date_str.replace("Z", "+00:00"))
-                            else:
-                                record_date = record_date_str
-                            if min_date is None or record_date < min_date:
-                                min_date = record_date
-                            if max_date is None or record_date > max_date:
-                                max_date = record_date
-                        except:
-                            pass
+                for raw_row, raw_hash in hashed_batch:
+                    rows_extracted += 1
                     
-                    # Create canonical record
-                    canonical_record = CanonicalRecord(
-                        dataset_id=dataset.id,
-                        raw_record_id=raw_record.id,
-                        record_type=normalized["record_type"],
-                        canonical_id=normalized["canonical_id"],
-                        payload_json=normalized.get("payload", {}),
-                        amount=normalized.get("amount"),
-                        currency=normalized.get("currency"),
-                        record_date=datetime.fromisoformat(normalized["record_date"]) if normalized.get("record_date") and isinstance(normalized["record_date"], str) else normalized.get("record_date"),
-                        due_date=datetime.fromisoformat(normalized["due_date"]) if normalized.get("due_date") and isinstance(normalized["due_date"], str) else normalized.get("due_date"),
-                        counterparty=normalized.get("counterparty"),
-                        external_id=normalized.get("external_id")
-                    )
+                    if raw_hash in seen_hashes:
+                        # Already loaded by a previous sync (or earlier in this one)
+                        rows_skipped += 1
+                        rows_deduplicated += 1
+                        watermark_store.observe(raw_row.source_table, connector.watermark_for(raw_row))
+                        continue
+                    seen_hashes.add(raw_hash)
                     
                     try:
-                        db.add(canonical_record)
-                        db.flush()
+                        # Savepoint per row: a failed flush rolls back only this row
+                        # and leaves the session usable for the rest of the batch
+                        with db.begin_nested():
+                            # Store raw record
+                            raw_record = RawRecord(
+                                dataset_id=dataset.id,
+                                source_table=raw_row.source_table,
+                                source_row_id=raw_row.source_row_id,
+                                raw_payload_json=raw_row.raw_payload,
+                                raw_hash=raw_hash
+                            )
+                            db.add(raw_record)
+                            db.flush()  # Get ID
+                        
+                            # Normalize
+                            normalized = connector.normalize(raw_row)
+                            rows_normalized += 1
+                        
+                            if normalized["canonical_id"] in dataset_canonical_ids:
+                                # Duplicate canonical_id within this dataset - idempotency working!
+                                rows_skipped += 1
+                                warnings.append({
+                                    "row_idx": rows_extracted,
+                                    "warning_type": "duplicate",
+                                    "message": f"Duplicate canonical_id: {normalized['canonical_id'][:20]}...",
+                                    "canonical_id": normalized["canonical_id"]
+                                })
+                                raw_record.is_processed = 1
+                                raw_record.processing_error = "Duplicate canonical_id (idempotency)"
+                                dedup_index.add(raw_hash, normalized["canonical_id"], sync_run.id)
+                                watermark_store.observe(raw_row.source_table, connector.watermark_for(raw_row))
+                                continue
+                        
+                            # Track date range
+                            record_date_str = normalized.get("record_date")
+                            if record_date_str:
+                                try:
+                                    if isinstance(record_date_str, str):
+                                        record_date = datetime.fromisoformat(record_date_str.replace("Z", "+00:00"))
+                                    else:
+                                        record_date = record_date_str
+                                    if min_date is None or record_date < min_date:
+                                        min_date = record_date
+                                    if max_date is None or record_date > max_date:
+                                        max_date = record_date
+                                except:
+                                    pass
+                        
+                            # Create canonical record
+                            canonical_record = CanonicalRecord(
+                                dataset_id=dataset.id,
+                                raw_record_id=raw_record.id,
+                                record_type=normalized["record_type"],
+                                canonical_id=normalized["canonical_id"],
+                                payload_json=normalized.get("payload", {}),
+                                amount=normalized.get("amount"),
+                                currency=normalized.get("currency"),
+                                record_date=datetime.fromisoformat(normalized["record_date"]) if normalized.get("record_date") and isinstance(normalized["record_date"], str) else normalized.get("record_date"),
+                                due_date=datetime.fromisoformat(normalized["due_date"]) if normalized.get("due_date") and isinstance(normalized["due_date"], str) else normalized.get("due_date"),
+                                counterparty=normalized.get("counterparty"),
+                                external_id=normalized.get("external_id")
+                            )
+                        
+                            db.add(canonical_record)
+                            db.flush()
                         rows_loaded += 1
                         raw_record.is_processed = 1
-                    except IntegrityError:
-                        # Duplicate canonical_id - idempotency working!
-                        db.rollback()
-                        rows_skipped += 1
-                        warnings.append({
+                        dataset_canonical_ids.add(normalized["canonical_id"])
+                        dedup_index.add(raw_hash, normalized["canonical_id"], sync_run.id)
+                        watermark_store.observe(raw_row.source_table, connector.watermark_for(raw_row))
+                        
+                    except Exception as e:
+                        rows_error += 1
+                        watermark_store.block(raw_row.source_table)
+                        errors.append({
                             "row_idx": rows_extracted,
-                            "warning_type": "duplicate",
-                            "message": f"Duplicate canonical_id: {normalized['canonical_id'][:20]}...",
-                            "canonical_id": normalized["canonical_id"]
+                            "error_type": type(e).__name__,
+                            "message": str(e),
+                            "source_row_id": raw_row.source_row_id
                         })
-                        # Re-add raw record without canonical
-                        raw_record = RawRecord(
-                            dataset_id=dataset.id,
-                            source_table=raw_row.source_table,
-                            source_row_id=raw_row.source_row_id,
-                            raw_payload_json=raw_row.raw_payload,
-                            raw_hash=raw_row.raw_hash,
-                            is_processed=1,
-                            processing_error="Duplicate canonical_id (idempotency)"
-                        )
-                        db.add(raw_record)
-                    
-                except Exception as e:
-                    rows_error += 1
-                    errors.append({
-                        "row_idx": rows_extracted,
-                        "error_type": type(e).__name__,
-                        "message": str(e),
-                        "source_row_id": raw_row.source_row_id
-                    })
                 
-                # Commit in batches
-                if rows_extracted % 100 == 0:
-                    db.commit()
+                # Commit per batch (checkpointing watermarks if the source is ordered)
+                if connector.watermarks_ordered:
+                    watermark_store.advance(sync_run.id)
+                db.commit()
             
             # Final commit
+            watermark_store.advance(sync_run.id)
+            dedup_index.save()
             db.commit()
             
         except Exception as e:
@@ -448,10 +505,16 @@ class LineageService:
             rows_loaded=rows_loaded,
             rows_skipped=rows_skipped,
             rows_error=rows_error,
+            rows_deduplicated=rows_deduplicated,
             errors=errors,
             warnings=warnings,
             date_range_start=min_date,
-            date_range_end=max_date
+            date_range_end=max_date,
+            dedup_stats=dedup_index.stats(),
+            watermarks={
+                "start": starting_watermarks if since is None else {},
+                "end": watermark_store.current()
+            }
         )
     
     def _check_schema_drift(
@@ -510,6 +573,51 @@ class LineageService:
         db.add(drift_event)
         db.commit()
     
+    def resume_sync(
+        self,
+        connection_id: int,
+        background: bool = True
+    ) -> Tuple[int, Optional[str]]:
+        """
+        Resume a connection after a sync was interrupted mid-run.
+        
+        Runs left in RUNNING/PENDING by a crashed process are marked FAILED,
+        then a new sync starts from the watermarks the interrupted run
+        committed batch by batch.
+        
+        Returns:
+            Tuple of (sync_run_id, error_message if any)
+        """
+        if connection_id in self._running_syncs and self._running_syncs[connection_id].is_alive():
+            return (0, "Sync already in progress for this connection")
+        
+        interrupted = self.db.query(SyncRun).filter(
+            SyncRun.connection_id == connection_id,
+            SyncRun.status.in_([SyncStatus.RUNNING.value, SyncStatus.PENDING.value])
+        ).all()
+        for run in interrupted:
+            run.status = SyncStatus.FAILED.value
+            run.finished_at = datetime.now(timezone.utc)
+            run.errors_json = (run.errors_json or []) + [{
+                "error": "Sync interrupted; resumed from last committed watermark"
+            }]
+        self.db.commit()
+        
+        triggered_by = "resume"
+        if interrupted:
+            triggered_by = f"resume:{interrupted[-1].id}"
+        return self.start_sync(connection_id, triggered_by=triggered_by, background=background)
+    
+    def get_watermarks(self, connection_id: int) -> List[SyncWatermark]:
+        """Get committed incremental-sync watermarks for a connection."""
+        return self.db.query(SyncWatermark).filter(
+            SyncWatermark.connection_id == connection_id
+        ).order_by(SyncWatermark.object_type).all()
+    
+    def reset_watermarks(self, connection_id: int, object_type: Optional[str] = None) -> int:
+        """Clear watermarks so the next sync re-extracts full history."""
+        return WatermarkStore(self.db, connection_id).reset(object_type)
+    
     def get_sync_run(self, sync_run_id: int) -> Optional[SyncRun]:
         """Get sync run by ID."""
         return self.db.query(SyncRun).filter(SyncRun.id == sync_run_id).first()
@@ -1,5 +1,5 @@
 import os
-from fastapi import FastAPI, UploadFile, File, Form, Depends, HTTPException, Body, Query
+from fastapi import FastAPI, UploadFile, File, Form, Depends, HTTPException, Body, Query, Response
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Optional
@@ -10,6 +10,9 @@ import models
 import pandas as pd
 import io
 import datetime
+import time
+import snapshot_aggregates
+import evidence_index
 from utils import (
     parse_excel_to_df, 
     run_forecast_model, 
@@ -321,6 +324,7 @@ async def upload_file(file: UploadFile = File(...), entity_id: int = None, db: S
     
     db.bulk_save_objects(invoices)
     db.commit()
+    snapshot_aggregates.build_snapshot_dimensions(db, snapshot.id)
     
     print(f"INGESTION COMPLETE: Saved {len(invoices)} invoices, skipped {skipped_duplicates} duplicates")
     
@@ -338,6 +342,17 @@ async def upload_file(file: UploadFile = File(...), entity_id: int = None, db: S
         except Exception as e2:
             print(f"WARNING: Fallback forecast model also failed: {e2}")
 
+    if entity_id:
+        from agents.orchestrator import publish_event
+        publish_event(entity_id, "erp_ingested", {"snapshot_id": snapshot.id})
+        publish_event(entity_id, "forecast_updated", {"snapshot_id": snapshot.id})
+
+    # Q&A evidence for the new snapshot, with forecast dates in place
+    try:
+        evidence_index.build_evidence_index(db, snapshot.id)
+    except Exception as e:
+        print(f"WARNING: Evidence index build failed: {e}")
+
     return {
         "snapshot_id": snapshot.id, 
         "health": health,
@@ -415,6 +430,12 @@ async def upload_ap_file(file: UploadFile = File(...), entity_id: int = None, db
     db.bulk_save_objects(bills)
     db.commit()
     
+    from outflow_cube import build_outflow_cube
+    try:
+        build_outflow_cube(db, snapshot.id)
+    except ValueError:
+        pass  # Missing FX rates; the cube is built on first read once rates are set
+    
     return {"snapshot_id": snapshot.id, "bills_count": len(bills)}
 
 @app.get("/snapshots")
@@ -427,6 +448,7 @@ def reset_database(db: Session = Depends(get_db)):
         # Delete in order of dependencies
         db.query(models.AuditLog).delete()
         db.query(models.WeeklyFXRate).delete()
+        db.query(models.WeeklyOutflowCube).delete()
         db.query(models.VendorBill).delete()
         db.query(models.OutflowItem).delete()
         db.query(models.SegmentDelay).delete()
@@ -455,6 +477,8 @@ def delete_snapshot(snapshot_id: int, db: Session = Depends(get_db)):
         if invoice_ids:
             print(f"DEBUG: Deleting reconciliation records for {len(invoice_ids)} invoices")
             db.query(models.ReconciliationTable).filter(models.ReconciliationTable.invoice_id.in_(invoice_ids)).delete(synchronize_session=False)
+        db.query(models.SnapshotDimension).filter(models.SnapshotDimension.snapshot_id == snapshot_id).delete(synchronize_session=False)
+        db.query(models.WeeklyOutflowCube).filter(models.WeeklyOutflowCube.snapshot_id == snapshot_id).delete(synchronize_session=False)
         
         # 2. Delete the snapshot (cascade will handle Invoices, Delays, and DisputeLogs)
         print(f"DEBUG: Deleting snapshot object {snapshot_id}")
@@ -493,6 +517,10 @@ def set_fx_rates(snapshot_id: int, rates: list[dict], db: Session = Depends(get_
         db.add(db_rate)
     
     db.commit()
+    
+    # Cube amounts are EUR at the old rates
+    from outflow_cube import invalidate_outflow_cube
+    invalidate_outflow_cube(db, snapshot_id)
     return {"status": "success", "rates_count": len(rates)}
 
 @app.get("/entities/{entity_id}/washes")
@@ -503,97 +531,50 @@ def get_washes(entity_id: int, db: Session = Depends(get_db)):
 @app.post("/bank/approve-wash")
 def approve_wash(tx1_id: int, tx2_id: int, db: Session = Depends(get_db)):
     from bank_service import approve_wash_service
-    return approve_wash_service(db, tx1_id, tx2_id)
+    from agents.orchestrator import publish_event
+    result = approve_wash_service(db, tx1_id, tx2_id)
+    tx1 = db.query(models.BankTransaction).filter(models.BankTransaction.id == tx1_id).first()
+    if tx1 is not None and tx1.bank_account is not None:
+        publish_event(tx1.bank_account.entity_id, "reconciliation_updated", {"transaction_ids": [tx1_id, tx2_id]})
+    return result
 
 @app.get("/snapshots/{snapshot_id}/kpis")
-def get_snapshot_kpis(snapshot_id: int, db: Session = Depends(get_db)):
+def get_snapshot_kpis(snapshot_id: int, response: Response, db: Session = Depends(get_db)):
+    started = time.perf_counter()
     snapshot = db.query(models.Snapshot).filter(models.Snapshot.id == snapshot_id).first()
     if not snapshot:
         raise HTTPException(status_code=404, detail="Snapshot not found")
     
-    # Calculate adaptive next 4 weeks
-    today = datetime.datetime.now()
-    # If the snapshot is old, use its creation date as reference
-    reference_date = snapshot.created_at if (today - snapshot.created_at).days > 7 else today
-    four_weeks_later = reference_date + datetime.timedelta(weeks=4)
-    
-    invoices = db.query(models.Invoice).filter(models.Invoice.snapshot_id == snapshot_id).all()
-    open_invoices = [inv for inv in invoices if inv.payment_date is None]
-    
-    total_val = sum(inv.amount for inv in invoices)
-    next_4w_inflow = sum(inv.amount for inv in open_invoices if inv.predicted_payment_date and inv.predicted_payment_date <= four_weeks_later)
-    
-    return {
-        "total_portfolio_value": total_val,
-        "total_invoices": snapshot.total_rows,
-        "open_receivables": sum(inv.amount for inv in open_invoices),
-        "next_4w_expected_inflow": next_4w_inflow,
-        "data_health_score": snapshot.data_health.get('total_invoices', 0) if snapshot.data_health else 0
-    }
+    kpis, rows_scanned = snapshot_aggregates.get_snapshot_kpis(db, snapshot)
+    snapshot_aggregates.set_query_headers(response, started, rows_scanned)
+    return kpis
 
 @app.get("/snapshots/{snapshot_id}/stats")
 def get_snapshot_stats(
     snapshot_id: int, 
+    response: Response,
     country: str = None, 
     customer: str = None, 
     project: str = None,
     db: Session = Depends(get_db)
 ):
-    query = db.query(models.Invoice).filter(models.Invoice.snapshot_id == snapshot_id)
-    if country:
-        query = query.filter(models.Invoice.country == country)
-    if customer:
-        query = query.filter(models.Invoice.customer == customer)
-    if project:
-        query = query.filter(models.Invoice.project == project)
-    
-    invoices = query.all()
-    df = pd.DataFrame([inv.__dict__ for inv in invoices])
-    
-    if df.empty:
-        return {
-            "cash_flow_by_year": [],
-            "overdue_chart_data": []
-        }
-    
-    # 1. Cash Flow by Year
-    df['year'] = pd.to_datetime(df['expected_due_date']).dt.year
-    cash_by_year = df.groupby('year')['amount'].sum().reset_index()
-    cash_by_year = cash_by_year.rename(columns={'amount': 'cash'})
-    cash_flow_by_year = cash_by_year.to_dict('records')
-    
-    # 2. Overdue Chart Data
-    today = datetime.datetime.now()
-    open_df = df[df['payment_date'].isna()].copy()
-    open_df['due_date'] = pd.to_datetime(open_df['expected_due_date'])
-    open_df['days_overdue'] = (today - open_df['due_date']).dt.days
-    
-    buckets = [
-        {"label": "Current", "min": -99999, "max": 0},
-        {"label": "1-30", "min": 1, "max": 30},
-        {"label": "31-60", "min": 31, "max": 60},
-        {"label": "61-90", "min": 61, "max": 90},
-        {"label": "90+", "min": 91, "max": 99999},
-    ]
-    
-    overdue_chart_data = []
-    for b in buckets:
-        mask = (open_df['days_overdue'] >= b['min']) & (open_df['days_overdue'] <= b['max'])
-        overdue_chart_data.append({
-            "label": b['label'],
-            "amount": float(open_df.loc[mask, 'amount'].sum())
-        })
-    
-    return {
-        "cash_flow_by_year": cash_flow_by_year,
-        "overdue_chart_data": overdue_chart_data
-    }
+    started = time.perf_counter()
+    stats, rows_scanned = snapshot_aggregates.get_snapshot_stats(db, snapshot_id, country, customer, project)
+    snapshot_aggregates.set_query_headers(response, started, rows_scanned)
+    return stats
 
 @app.post("/snapshots/{snapshot_id}/scenario")
 def apply_scenario(snapshot_id: int, config: dict, db: Session = Depends(get_db)):
     from utils import apply_scenario_to_forecast
     return apply_scenario_to_forecast(db, snapshot_id, config)
 
+@app.post("/snapshots/{snapshot_id}/scenario/batch")
+def apply_scenario_batch(snapshot_id: int, payload: dict, db: Session = Depends(get_db)):
+    """Evaluate a grid of scenarios in one call: {"scenarios": [config, ...]}"""
+    from utils import apply_scenarios_to_forecast
+    scenarios = payload.get("scenarios", [])
+    return {"scenarios": scenarios, "results": apply_scenarios_to_forecast(db, snapshot_id, scenarios)}
+
 @app.get("/snapshots/{snapshot_id}/accuracy")
 def get_accuracy(snapshot_id: int, db: Session = Depends(get_db)):
     from backtesting_service import get_forecast_accuracy
@@ -616,13 +597,16 @@ def run_reconciliation(
     Set use_v2=true to use the new reconciliation service with blocking indexes,
     embedding similarity, and constrained solver.
     """
+    from agents.orchestrator import publish_event
     if use_v2:
         from reconciliation_service_v2 import ReconciliationServiceV2
         service = ReconciliationServiceV2(db)
-        return service.reconcile_entity(entity_id)
+        result = service.reconcile_entity(entity_id)
     else:
         from bank_service import reconcile_transactions
-        return reconcile_transactions(db, entity_id)
+        result = reconcile_transactions(db, entity_id)
+    publish_event(entity_id, "reconciliation_updated", {})
+    return result
 
 @app.get("/entities/{entity_id}/cash-ledger")
 def get_cash_ledger(entity_id: int, db: Session = Depends(get_db)):
@@ -705,45 +689,16 @@ def get_invoices(
 @app.get("/snapshots/{snapshot_id}/filters")
 def get_snapshot_filters(
     snapshot_id: int, 
+    response: Response,
     country: str = None, 
     customer: str = None, 
     project: str = None,
     db: Session = Depends(get_db)
 ):
-    # 1. Countries
-    all_countries = db.query(models.Invoice.country).filter(
-        models.Invoice.snapshot_id == snapshot_id,
-        models.Invoice.country != None,
-        models.Invoice.country != ''
-    ).distinct().all()
-    
-    # 2. Customers
-    customer_query = db.query(models.Invoice.customer).filter(
-        models.Invoice.snapshot_id == snapshot_id,
-        models.Invoice.customer != None,
-        models.Invoice.customer != ''
-    )
-    if country:
-        customer_query = customer_query.filter(models.Invoice.country == country)
-    all_customers = customer_query.distinct().all()
-    
-    # 3. Projects
-    project_query = db.query(models.Invoice.project).filter(
-        models.Invoice.snapshot_id == snapshot_id,
-        models.Invoice.project != None,
-        models.Invoice.project != ''
-    )
-    if country:
-        project_query = project_query.filter(models.Invoice.country == country)
-    if customer:
-        project_query = project_query.filter(models.Invoice.customer == customer)
-    all_projects = project_query.distinct().all()
-    
-    return {
-        "countries": sorted([c[0] for c in all_countries]),
-        "customers": sorted([c[0] for c in all_customers]),
-        "projects": sorted([p[0] for p in all_projects])
-    }
+    started = time.perf_counter()
+    filters, rows_scanned = snapshot_aggregates.get_snapshot_filters(db, snapshot_id, country, customer, project)
+    snapshot_aggregates.set_query_headers(response, started, rows_scanned)
+    return filters
 
 @app.get("/snapshots/{snapshot_id}/top-movers")
 def get_top_movers(snapshot_id: int, compare_id: int, db: Session = Depends(get_db)):
@@ -788,67 +743,121 @@ def get_entities(db: Session = Depends(get_db)):
 def get_audit_logs(db: Session = Depends(get_db)):
     return db.query(models.AuditLog).order_by(models.AuditLog.timestamp.desc()).limit(100).all()
 
+INSIGHT_ROUTER = evidence_index.QuestionRouter({
+    "variance": ['why', 'variance', 'shortfall', 'surplus', 'difference', 'swing'],
+    "risk": ['risk', 'dispute', 'blockage', 'late', 'payment'],
+    "fx": ['fx', 'currency', 'eur', 'usd', 'exchange'],
+})
+
+VARIANCE_SENTENCES = {
+    "New Item": "Found {count} new invoices totaling €{total:,.0f}.",
+    "Cash Recognition": "Reconciled €{total:,.0f} of previously open AR against bank truth ({count} invoices).",
+    "Timing Shift": "{count} invoices worth €{total:,.0f} had their predicted payment date moved.",
+    "Removed Item": "{count} invoices worth €{total:,.0f} dropped out of the open book.",
+}
+
 @app.post("/snapshots/{snapshot_id}/ask-insights")
-def ask_insights(snapshot_id: int, entity_id: int, query: str, db: Session = Depends(get_db)):
-    from bank_service import generate_cash_variance_narrative
+def ask_insights(snapshot_id: int, entity_id: int, query: str, conversation_id: Optional[str] = None, db: Session = Depends(get_db)):
+    from sqlalchemy.orm import sessionmaker
     from utils import get_fx_exposure, predict_dispute_risk
+    from agents.context_cache import ContextCache, get_context_cache
+    from agents.executor import supports_concurrent_sessions
+    
+    index = evidence_index.get_evidence_index(db, snapshot_id)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
     
-    q = query.lower()
+    # Model outputs are memoized per (entity, snapshot, context) so follow-up questions reuse them
+    loaders = {
+        "dispute_risk": lambda session: predict_dispute_risk(session, snapshot_id),
+        "fx_exposure": lambda session: get_fx_exposure(session, snapshot_id),
+    }
+    lookup = get_context_cache().lookup(conversation_id)
+    key = lambda name: ContextCache.make_key(entity_id, snapshot_id, name)
+    retrieve = lambda name: lookup.get_or_load(key(name), lambda: loaders[name](db))
+    bind = db.get_bind()
+    prefetch_sessions = sessionmaker(bind=bind) if supports_concurrent_sessions(bind) else None
+    
+    def respond(payload, follow_ups):
+        # Load what the other question types need while the user reads this answer
+        for name in follow_ups:
+            lookup.prefetch(key(name), loaders[name], prefetch_sessions)
+        return {**payload, "context_cache": lookup.metadata()}
+    
+    # Anything the question names (customer, document number, reference) beyond the routing words
+    focus = [doc for doc, _ in index.search(query, kinds=("invoice",), ignore=INSIGHT_ROUTER.vocabulary)]
+    route = INSIGHT_ROUTER.route(query)
     
     # 1. Variance Analysis (RAG-Grounded)
-    if any(k in q for k in ['why', 'variance', 'shortfall', 'surplus', 'difference', 'swing']):
-        var_data = generate_cash_variance_narrative(db, entity_id, snapshot_id)
+    if route == "variance":
+        by_category = index.variance_by_category()
+        variance = index.net_variance()
+        main_answer = " ".join(
+            VARIANCE_SENTENCES[category].format(count=bucket["count"], total=abs(bucket["total_amount"]))
+            for category, bucket in by_category.items()
+        ) or "No invoice-level changes against the previous snapshot."
         
-        # Retrieval: Find specific large late invoices (Context)
-        today = datetime.datetime.now()
-        late_invoices = db.query(models.Invoice).filter(
-            models.Invoice.snapshot_id == snapshot_id,
-            models.Invoice.payment_date == None,
-            models.Invoice.predicted_payment_date < today
-        ).order_by(models.Invoice.amount.desc()).limit(5).all()
-        
-        # Context Augmentation
-        context_snippets = [f"Inv #{inv.document_number} from {inv.customer}: €{inv.amount:,.0f} (Due: {inv.expected_due_date.date() if inv.expected_due_date else 'N/A'}, Predicted: {inv.predicted_payment_date.date() if inv.predicted_payment_date else 'N/A'})" for inv in late_invoices]
+        # Retrieval: the named invoices, else the largest late ones (Context)
+        evidence = sorted(focus, key=lambda doc: doc.days_late == 0) if focus else index.top("invoice", limit=5, late_only=True)
+        context_snippets = [
+            f"Inv #{doc.citation} from {doc.customer}: €{doc.amount:,.0f} (Due: {doc.details['due_date'] or 'N/A'}, Predicted: {doc.details['predicted_date'] or 'N/A'})"
+            for doc in evidence
+        ]
         
         # Narrative Generation (Grounded)
-        main_answer = " ".join(var_data['narrative'])
         grounding = "\n\n**Retrieved Evidence:**\n" + "\n".join([f"- {s}" for s in context_snippets]) if context_snippets else "\n\nNo specific overdue invoices found for this period."
         
-        return {
-            "answer": f"Analysis of the last 7 days shows a €{abs(var_data['variance']):,.0f} variance. {main_answer}{grounding}",
-            "citations": [inv.document_number for inv in late_invoices]
-        }
+        return respond({
+            "answer": f"Since the previous snapshot open AR has a net €{abs(variance):,.0f} variance. {main_answer}{grounding}",
+            "citations": [doc.citation for doc in evidence]
+        }, ["dispute_risk", "fx_exposure"])
     
     # 2. Risk Detection (RAG-Grounded)
-    if any(k in q for k in ['risk', 'dispute', 'blockage', 'late', 'payment']):
-        risks = predict_dispute_risk(db, snapshot_id)
+    if route == "risk":
+        risks = retrieve("dispute_risk")
+        follow_ups = ["fx_exposure"]
+        if focus:
+            named = {doc.citation for doc in focus}
+            risks = [r for r in risks if r['invoice_number'] in named] or risks
         if not risks:
-            return {"answer": "The retrieval engine found no significant blockage or dispute risks in the current snapshot context."}
+            return respond({"answer": "The retrieval engine found no significant blockage or dispute risks in the current snapshot context."}, follow_ups)
         
         top_risks = risks[:3]
         grounding = "\n\n**Identified Risk Invoices:**\n" + "\n".join([f"- {r['customer']} (Inv #{r['invoice_number']}): €{r['amount']:,.0f} - {r['potential_blockage_reasons'][0]}" for r in top_risks])
         
-        return {
+        return respond({
             "answer": f"I've identified {len(risks)} risk items based on historical behavioral segments.{grounding}",
             "citations": [r['invoice_number'] for r in top_risks]
-        }
+        }, follow_ups)
         
     # 3. FX Exposure (RAG-Grounded)
-    if any(k in q for k in ['fx', 'currency', 'eur', 'usd', 'exchange']):
-        fx = get_fx_exposure(db, snapshot_id)
+    if route == "fx":
+        fx = retrieve("fx_exposure")
+        follow_ups = ["dispute_risk"]
         non_eur = [f for f in fx if f['currency'] != 'EUR']
         if not non_eur:
-            return {"answer": "Retrieval confirmed that 100% of the current portfolio is in EUR."}
+            return respond({"answer": "Retrieval confirmed that 100% of the current portfolio is in EUR."}, follow_ups)
         
         risk_sum = sum(f['implied_fx_risk'] for f in non_eur)
         grounding = "\n\n**Currency Breakdown:**\n" + "\n".join([f"- {f['currency']}: {f['invoice_count']} items, Total €{f['total_amount']:,.0f} (Implied Risk: €{f['implied_fx_risk']:,.0f})" for f in non_eur])
         
-        return {
+        return respond({
             "answer": f"Total FX-impacted value is €{sum(f['total_amount'] for f in non_eur):,.0f} across {len(non_eur)} currencies.{grounding}",
             "citations": [f['currency'] for f in non_eur]
-        }
+        }, follow_ups)
+
+    # 4. Direct retrieval: the question names invoices, customers or references
+    if focus:
+        grounding = "\n".join(
+            f"- Inv #{doc.citation} from {doc.customer}: €{doc.amount:,.0f}" + (f" ({doc.days_late} days late)" if doc.days_late else "")
+            for doc in focus
+        )
+        return respond({
+            "answer": f"Found {len(focus)} matching items in this snapshot:\n{grounding}",
+            "citations": [doc.citation for doc in focus]
+        }, ["dispute_risk"])
 
-    return {"answer": "I can help you understand variances, predict dispute risks, or analyze your FX exposure. Try asking 'Why is there a shortfall?'"}
+    return respond({"answer": "I can help you understand variances, predict dispute risks, or analyze your FX exposure. Try asking 'Why is there a shortfall?'"}, ["dispute_risk"])
 
 @app.post("/contact")
 def handle_contact(data: dict):
@@ -1706,11 +1715,16 @@ def get_variance_drilldown(
 # ═══════════════════════════════════════════════════════════════════════════════
 
 @app.get("/snapshots/{snapshot_id}/red-weeks")
-def get_red_weeks(snapshot_id: int, threshold: Optional[float] = Query(None), db: Session = Depends(get_db)):
-    """Flag weeks where cash falls below threshold."""
+def get_red_weeks(
+    snapshot_id: int,
+    threshold: Optional[float] = Query(None),
+    top_k: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Flag weeks where cash falls below threshold, with top-K contributors per week."""
     from red_weeks_service import flag_red_weeks
     
-    return flag_red_weeks(db, snapshot_id, threshold)
+    return flag_red_weeks(db, snapshot_id, threshold, top_k)
 
 
 @app.get("/snapshots/{snapshot_id}/red-weeks/{week_index}/drilldown")
@@ -2241,6 +2255,21 @@ def start_async_forecast(snapshot_id: int = Body(..., embed=True), db: Session =
     return {"task_id": task_id, "status": "pending"}
 
 
+@app.post("/async/board-pack")
+def start_async_board_pack(
+    entity_id: int = Body(...),
+    snapshot_id: int = Body(...),
+    plan_id: Optional[int] = Body(None),
+    previous_pack_id: Optional[int] = Body(None),
+    generated_by: Optional[str] = Body(None)
+):
+    """Start async board pack generation; poll /async/tasks/{task_id} for progress."""
+    from async_operations import run_async_board_pack
+
+    task_id = run_async_board_pack(entity_id, snapshot_id, plan_id, previous_pack_id, generated_by)
+    return {"task_id": task_id, "status": "pending"}
+
+
 @app.get("/async/tasks/{task_id}")
 def get_async_task_status(task_id: str, db: Session = Depends(get_db)):
     """Get status of async task."""
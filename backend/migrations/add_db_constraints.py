@@ -6,6 +6,8 @@ Finance systems should not rely on "developer discipline" - enforce at DB level.
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
+from migrations.add_performance_indexes import add_performance_indexes, verify_performance_indexes
+
 
 def add_finance_constraints(engine: Engine):
     """
@@ -34,19 +36,8 @@ def add_finance_constraints(engine: Engine):
         # CHECK (NOT EXISTS (SELECT 1 FROM snapshots WHERE id = snapshot_id AND is_locked = 1))
         
         # 3. Referential integrity: Reconciliation allocations must reference valid invoices/transactions
-        # SQLAlchemy handles this with ForeignKey, but we can add explicit constraints
-        try:
-            conn.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_reconciliation_invoice 
-                ON reconciliation_table(invoice_id)
-            """))
-            conn.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_reconciliation_transaction 
-                ON reconciliation_table(bank_transaction_id)
-            """))
-            conn.commit()
-        except Exception as e:
-            print(f"Note: Indexes might already exist: {e}")
+        # SQLAlchemy handles this with ForeignKey; the join-side indexes are created
+        # with the other hot-path indexes below.
         
         # 4. Check constraint: Amount allocations cannot exceed transaction amount
         # (Would require triggers for complex validation)
@@ -113,7 +104,10 @@ def add_finance_constraints(engine: Engine):
         except Exception as e:
             print(f"Note: Trigger might not be supported or already exists: {e}")
         
-        print("Database constraints added successfully")
+    # 6. Composite and partial indexes for hot snapshot/entity access paths
+    add_performance_indexes(engine)
+    
+    print("Database constraints added successfully")
 
 
 def verify_constraints(engine: Engine) -> dict:
@@ -124,7 +118,8 @@ def verify_constraints(engine: Engine) -> dict:
     status = {
         'unique_canonical_id': False,
         'referential_integrity': False,
-        'amount_positive': False
+        'amount_positive': False,
+        'performance_indexes': False
     }
     
     with engine.connect() as conn:
@@ -160,6 +155,7 @@ def verify_constraints(engine: Engine) -> dict:
         except:
             pass
     
+    status['performance_indexes'] = all(verify_performance_indexes(engine).values())
     return status
 
 
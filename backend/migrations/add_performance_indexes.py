@@ -0,0 +1,132 @@
+"""
+Performance Indexes for Hot Snapshot/Entity Access Paths
+
+Nearly every service filters invoices by snapshot or entity and open status,
+bank transactions by account and reconciliation status, and FX rates by
+snapshot and currency pair. The models only index primary keys and
+canonical IDs, so these indexes are added here as composite and partial
+indexes. The statements are valid on both SQLite and PostgreSQL and are
+idempotent (CREATE INDEX IF NOT EXISTS).
+
+HOT_QUERIES pairs each access path with the index it must use;
+explain_hot_queries() reports the planner's choice for regression tests.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+
+# (index name, table, columns, partial-index predicate)
+PERFORMANCE_INDEXES: List[Tuple[str, str, Tuple[str, ...], Optional[str]]] = [
+    # Invoices: per-snapshot scans, open-item lookups, customer drill-downs
+    ("idx_invoices_snapshot_payment", "invoices", ("snapshot_id", "payment_date"), None),
+    ("idx_invoices_open_entity", "invoices", ("entity_id", "payment_date"), "payment_date IS NULL"),
+    ("idx_invoices_open_snapshot_predicted", "invoices", ("snapshot_id", "predicted_payment_date"), "payment_date IS NULL"),
+    ("idx_invoices_snapshot_customer", "invoices", ("snapshot_id", "customer"), None),
+    # Bank transactions: reconciliation queues and statement date ranges
+    ("idx_bank_txn_account_reconciled", "bank_transactions", ("bank_account_id", "is_reconciled"), None),
+    ("idx_bank_txn_account_date", "bank_transactions", ("bank_account_id", "transaction_date"), None),
+    ("idx_bank_txn_unreconciled_date", "bank_transactions", ("transaction_date",), "is_reconciled = 0"),
+    # Reconciliation allocations: both sides of the join
+    ("idx_reconciliation_invoice", "reconciliation_table", ("invoice_id",), None),
+    ("idx_reconciliation_transaction", "reconciliation_table", ("bank_transaction_id",), None),
+    # Vendor bills and locked FX rates per snapshot
+    ("idx_vendor_bills_snapshot_due", "vendor_bills", ("snapshot_id", "due_date"), None),
+    ("idx_weekly_fx_snapshot_pair", "weekly_fx_rates", ("snapshot_id", "from_currency", "to_currency"), None),
+]
+
+
+# name -> (SQL, params, index the planner must choose)
+HOT_QUERIES: Dict[str, Tuple[str, Dict[str, Any], str]] = {
+    "snapshot_open_invoices": (
+        "SELECT id, amount FROM invoices WHERE snapshot_id = :sid AND payment_date IS NULL",
+        {"sid": 1},
+        "idx_invoices_snapshot_payment",
+    ),
+    "entity_open_invoices": (
+        "SELECT id, amount FROM invoices WHERE entity_id = :eid AND payment_date IS NULL",
+        {"eid": 1},
+        "idx_invoices_open_entity",
+    ),
+    "snapshot_customer_invoices": (
+        "SELECT id, amount FROM invoices WHERE snapshot_id = :sid AND customer = :customer",
+        {"sid": 1, "customer": "Acme"},
+        "idx_invoices_snapshot_customer",
+    ),
+    "unreconciled_by_account": (
+        "SELECT id, amount FROM bank_transactions WHERE bank_account_id = :aid AND is_reconciled = 0",
+        {"aid": 1},
+        "idx_bank_txn_account_reconciled",
+    ),
+    "allocations_for_invoice": (
+        "SELECT amount_allocated FROM reconciliation_table WHERE invoice_id = :iid",
+        {"iid": 1},
+        "idx_reconciliation_invoice",
+    ),
+    "snapshot_fx_rate": (
+        "SELECT rate FROM weekly_fx_rates WHERE snapshot_id = :sid AND from_currency = :src AND to_currency = :dst",
+        {"sid": 1, "src": "USD", "dst": "EUR"},
+        "idx_weekly_fx_snapshot_pair",
+    ),
+}
+
+
+def add_performance_indexes(engine: Engine) -> List[str]:
+    """
+    Create the composite and partial indexes. Tables that do not exist yet
+    are skipped. Returns the names of indexes present afterwards.
+    """
+    tables = set(inspect(engine).get_table_names())
+    created = []
+    with engine.connect() as conn:
+        for name, table, columns, where in PERFORMANCE_INDEXES:
+            if table not in tables:
+                continue
+            statement = f"CREATE INDEX IF NOT EXISTS {name} ON {table}({', '.join(columns)})"
+            if where:
+                statement += f" WHERE {where}"
+            try:
+                conn.execute(text(statement))
+                conn.commit()
+                created.append(name)
+            except Exception as e:
+                conn.rollback()
+                print(f"Note: Could not create index {name}: {e}")
+    return created
+
+
+def verify_performance_indexes(engine: Engine) -> Dict[str, bool]:
+    """Report which performance indexes exist."""
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    existing = {
+        table: {index["name"] for index in inspector.get_indexes(table)}
+        for table in {t for _, t, _, _ in PERFORMANCE_INDEXES} & tables
+    }
+    return {name: name in existing.get(table, set()) for name, table, _, _ in PERFORMANCE_INDEXES}
+
+
+def explain(conn: Connection, sql: str, params: Dict[str, Any]) -> str:
+    """Query plan as text (EXPLAIN QUERY PLAN on SQLite, EXPLAIN on PostgreSQL)."""
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+        return "\n".join(str(row[-1]) for row in rows)
+    rows = conn.execute(text(f"EXPLAIN {sql}"), params).fetchall()
+    return "\n".join(str(row[0]) for row in rows)
+
+
+def explain_hot_queries(conn: Connection) -> Dict[str, Dict[str, Any]]:
+    """
+    Plan every hot query and check it uses its index.
+
+    On PostgreSQL, tiny test tables make sequential scans cheapest, so
+    callers should SET enable_seqscan = off to ask whether the index is
+    usable rather than whether it is worth it.
+    """
+    report = {}
+    for name, (sql, params, index) in HOT_QUERIES.items():
+        plan = explain(conn, sql, params)
+        report[name] = {"index": index, "plan": plan, "uses_index": index in plan}
+    return report
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, UniqueConstraint, CheckConstraint
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, UniqueConstraint, CheckConstraint, Index, Text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import datetime
@@ -116,6 +116,23 @@ class BankTransaction(Base):
     bank_account = relationship("BankAccount", back_populates="transactions")
     reconciled_invoices = relationship("Invoice", secondary="reconciliation_table", back_populates="bank_transactions")
 
+class BankBalanceDay(Base):
+    """
+    Daily close of a bank account: the day's net movement and the running
+    total of all movements through the end of that day (see bank_ledger.py).
+    """
+    __tablename__ = "bank_balance_days"
+    id = Column(Integer, primary_key=True, index=True)
+    bank_account_id = Column(Integer, ForeignKey("bank_accounts.id"), nullable=False)
+    day = Column(DateTime, nullable=False)  # Midnight of the transaction date
+    net_amount = Column(Float, default=0.0)  # Account currency
+    cumulative_amount = Column(Float, default=0.0)  # Account currency
+    transaction_count = Column(Integer, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('bank_account_id', 'day', name='uix_bank_balance_day'),
+    )
+
 class ReconciliationTable(Base):
     __tablename__ = "reconciliation_table"
     id = Column(Integer, primary_key=True, index=True)
@@ -311,6 +328,42 @@ class Scenario(Base):
     config = Column(JSON) # Store scenario knobs
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
+class SnapshotDimension(Base):
+    """
+    Distinct (country, customer, project) combinations of a snapshot's invoices.
+    Built once at upload so dashboard filter dropdowns never scan invoices.
+    """
+    __tablename__ = "snapshot_dimensions"
+    id = Column(Integer, primary_key=True, index=True)
+    snapshot_id = Column(Integer, ForeignKey("snapshots.id"), index=True)
+    country = Column(String, nullable=True)
+    customer = Column(String, nullable=True)
+    project = Column(String, nullable=True)
+    invoice_count = Column(Integer, default=0)
+    amount_total = Column(Float, default=0.0)
+
+class WeeklyOutflowCube(Base):
+    """
+    Pre-aggregated outflows per (week, category, commitment tier) of a snapshot.
+    Bill and template amounts are kept apart so 'bills before templates'
+    precedence is applied per (week, category) when the cube is read.
+    """
+    __tablename__ = "weekly_outflow_cube"
+    id = Column(Integer, primary_key=True, index=True)
+    snapshot_id = Column(Integer, ForeignKey("snapshots.id"), index=True)
+    week_start = Column(DateTime)
+    category = Column(String, nullable=True)  # Raw category; None for uncategorised bills
+    commitment = Column(String)  # committed, discretionary
+    bill_amount = Column(Float, default=0.0)  # EUR
+    bill_count = Column(Integer, default=0)
+    template_amount = Column(Float, default=0.0)  # EUR
+    template_count = Column(Integer, default=0)
+    as_of_date = Column(DateTime)  # Day un-scheduled bills were timed against
+
+    __table_args__ = (
+        UniqueConstraint('snapshot_id', 'week_start', 'category', 'commitment', name='uix_outflow_cube_cell'),
+    )
+
 class SnowflakeConfig(Base):
     __tablename__ = "snowflake_configs"
     id = Column(Integer, primary_key=True, index=True)
@@ -1408,3 +1461,92 @@ class TrustInvariantResult(Base):
     details_json = Column(JSON, nullable=True)
     
     checked_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FP&A AGENT MODELS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class WorkflowScheduleState(Base):
+    """
+    Last cron tick run per (entity, scheduled workflow).
+    Lets the scheduler catch up on ticks missed while the process was down.
+    """
+    __tablename__ = "workflow_schedule_state"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity_id = Column(Integer, ForeignKey("entities.id"), nullable=False)
+    workflow_name = Column(String(100), nullable=False)
+    last_tick_at = Column(DateTime, nullable=True)  # Cron time of the last run (UTC)
+    last_completed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint('entity_id', 'workflow_name', name='uix_workflow_schedule_state'),
+    )
+
+
+class AgentAuditEntry(Base):
+    """
+    Persisted FP&A agent audit entry (agents/audit_log.AuditEntry).
+    Written in batches by the audit sink; token_count is lifted out of
+    details so LLM cost stats aggregate without reading JSON.
+    """
+    __tablename__ = "agent_audit_entries"
+
+    id = Column(String(36), primary_key=True)  # AuditEntry.id (uuid)
+    entity_id = Column(Integer, nullable=False)
+    timestamp = Column(DateTime, nullable=False)
+    action = Column(String(50), nullable=False)
+    severity = Column(String(20), nullable=False)
+    snapshot_id = Column(Integer, nullable=True)
+    workflow_name = Column(String(100), nullable=True)
+    agent_name = Column(String(100), nullable=True)
+    description = Column(Text, nullable=True)
+    details_json = Column(JSON, nullable=True)
+    triggered_by = Column(String(50), nullable=True)
+    user_id = Column(String(100), nullable=True)
+    correlation_id = Column(String(36), nullable=True)
+    amount_involved = Column(String(40), nullable=True)  # Decimal as text
+    currency = Column(String(3), nullable=True)
+    success = Column(Integer, default=1)  # 0 or 1
+    error_message = Column(Text, nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+    token_count = Column(Integer, default=0)
+
+    __table_args__ = (
+        Index('ix_agent_audit_entity_time', 'entity_id', 'timestamp'),
+        Index('ix_agent_audit_entity_correlation', 'entity_id', 'correlation_id'),
+        Index('ix_agent_audit_entity_action_time', 'entity_id', 'action', 'timestamp'),
+    )
+
+
+class AgentDecision(Base):
+    """
+    Persisted FP&A agent decision (agents/models/decisions.Decision).
+    The full decision lives in payload_json; the columns are what the queue
+    filters and orders on. The integer id only grows, so agent processes
+    poll for rows newer than the last one they indexed.
+    """
+    __tablename__ = "agent_decisions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    decision_id = Column(String(36), nullable=False, unique=True, index=True)  # Decision.id (uuid)
+    entity_id = Column(Integer, nullable=False)
+    category = Column(String(50), nullable=False)
+    priority = Column(String(20), nullable=False)
+    priority_rank = Column(Integer, nullable=False)  # 0 = critical ... 3 = low
+    status = Column(String(20), nullable=False)
+    title = Column(String(200), nullable=False)
+    amount_at_stake = Column(String(40), nullable=True)  # Decimal as text
+    snapshot_id = Column(Integer, nullable=True)
+    source_workflow = Column(String(100), nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=True)
+    resolved_at = Column(DateTime, nullable=True)
+    payload_json = Column(JSON, nullable=False)
+    fpa_decision_id = Column(Integer, nullable=True, index=True)  # Mirrored fpa_decisions row
+
+    __table_args__ = (
+        Index('ix_agent_decisions_queue', 'entity_id', 'status', 'priority_rank', 'created_at'),
+        Index('ix_agent_decisions_expiry', 'status', 'expires_at'),
+    )
@@ -0,0 +1,293 @@
+"""
+Weekly Outflow Cube
+
+Materialized outflow aggregates for the 13-week cash calendar. Each snapshot
+holds one row per (week, category, commitment tier) with bill and recurring
+template amounts kept apart, so the workspace reads a handful of rows instead
+of re-timing, converting and grouping every VendorBill and OutflowItem on
+every request.
+
+The cube is built when outflows are projected or bills are uploaded and
+backfilled on first read for older snapshots. Un-scheduled bills are timed
+from today's date, so a cube built on an earlier day is rebuilt on read.
+A single bill edit is applied incrementally with apply_bill_change().
+"""
+
+import datetime
+from collections import namedtuple
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+import models
+from utils import convert_currency
+
+
+COMMITTED = "committed"
+DISCRETIONARY = "discretionary"
+DEFAULT_BILL_CATEGORY = "General Vendor"
+DEFAULT_PAYMENT_RUN_DAY = 3  # Thursday
+
+# One bill's or template's contribution to the cube
+OutflowCell = namedtuple("OutflowCell", ["week_start", "category", "commitment", "amount"])
+
+CellKey = Tuple[datetime.date, Optional[str], str]
+
+
+def week_start_of(day: datetime.date) -> datetime.date:
+    return day - datetime.timedelta(days=day.weekday())
+
+
+def _as_datetime(day: datetime.date) -> datetime.datetime:
+    return datetime.datetime.combine(day, datetime.time.min)
+
+
+def _as_date(value) -> datetime.date:
+    return value.date() if isinstance(value, datetime.datetime) else value
+
+
+def _commitment(is_discretionary) -> str:
+    return DISCRETIONARY if is_discretionary == 1 else COMMITTED
+
+
+def _payment_run_day(db: Session, snapshot_id: int) -> int:
+    snapshot = db.query(models.Snapshot).filter(models.Snapshot.id == snapshot_id).first()
+    entity = snapshot.entity if snapshot else None
+    return entity.payment_run_day if entity else DEFAULT_PAYMENT_RUN_DAY
+
+
+def bill_cash_out_date(bill: models.VendorBill, payment_run_day: int, today: datetime.date) -> datetime.date:
+    """Scheduled date if set, else the next payment run on or after max(due, approval, today)."""
+    if bill.scheduled_payment_date:
+        return _as_date(bill.scheduled_payment_date)
+    due = _as_date(bill.due_date) if bill.due_date else today
+    approved = _as_date(bill.approval_date) if bill.approval_date else today
+    base_date = max(due, approved, today)
+    return base_date + datetime.timedelta(days=(payment_run_day - base_date.weekday()) % 7)
+
+
+class EurConverter:
+    """convert_currency with one FX lookup per currency instead of per row."""
+
+    def __init__(self, db: Session, snapshot_id: int):
+        self.db = db
+        self.snapshot_id = snapshot_id
+        self._rates: Dict[Optional[str], float] = {}
+
+    def __call__(self, amount: Optional[float], currency: Optional[str]) -> float:
+        if amount is None:
+            return 0.0
+        if currency not in self._rates:
+            self._rates[currency] = convert_currency(self.db, self.snapshot_id, 1.0, currency, "EUR")
+        return amount * self._rates[currency]
+
+
+def _bill_cell(bill: models.VendorBill, payment_run_day: int, today: datetime.date, to_eur) -> Optional[OutflowCell]:
+    if bill.hold_status:
+        return None  # CFO manual hold overrides all
+    return OutflowCell(
+        week_start_of(bill_cash_out_date(bill, payment_run_day, today)),
+        bill.category,
+        _commitment(bill.is_discretionary),
+        to_eur(bill.amount, bill.currency),
+    )
+
+
+def bill_cell(db: Session, bill: models.VendorBill, today: Optional[datetime.date] = None) -> Optional[OutflowCell]:
+    """Where a bill currently lands in the cube (None while on hold)."""
+    today = today or datetime.datetime.now().date()
+    return _bill_cell(
+        bill, _payment_run_day(db, bill.snapshot_id), today, EurConverter(db, bill.snapshot_id)
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BUILD
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def iter_outflow_cells(
+    db: Session, snapshot_id: int, today: datetime.date
+) -> Iterator[Tuple[str, Any, OutflowCell]]:
+    """
+    ("bill" | "template", row, cell) for every outflow row of a snapshot.
+
+    Held bills are skipped. Template precedence is not applied here; it
+    depends on which bills share the template's (week, category).
+    """
+    payment_run_day = _payment_run_day(db, snapshot_id)
+    to_eur = EurConverter(db, snapshot_id)
+
+    bills = db.query(models.VendorBill).filter(models.VendorBill.snapshot_id == snapshot_id).all()
+    for bill in bills:
+        cell = _bill_cell(bill, payment_run_day, today, to_eur)
+        if cell:
+            yield "bill", bill, cell
+
+    items = db.query(models.OutflowItem).filter(models.OutflowItem.snapshot_id == snapshot_id).all()
+    for item in items:
+        yield "template", item, OutflowCell(
+            week_start_of(_as_date(item.expected_date)),
+            item.category,
+            _commitment(item.is_discretionary),
+            to_eur(item.amount, item.currency),
+        )
+
+
+def build_outflow_cube(db: Session, snapshot_id: int, today: Optional[datetime.date] = None) -> int:
+    """(Re)build a snapshot's cube from its bills and projected outflows."""
+    today = today or datetime.datetime.now().date()
+    cells: Dict[CellKey, Dict[str, float]] = {}
+    for source, _, cell in iter_outflow_cells(db, snapshot_id, today):
+        values = cells.setdefault(
+            (cell.week_start, cell.category, cell.commitment),
+            {"bill_amount": 0.0, "bill_count": 0, "template_amount": 0.0, "template_count": 0}
+        )
+        values[f"{source}_amount"] += cell.amount
+        values[f"{source}_count"] += 1
+
+    db.query(models.WeeklyOutflowCube).filter(
+        models.WeeklyOutflowCube.snapshot_id == snapshot_id
+    ).delete(synchronize_session=False)
+    db.bulk_save_objects([
+        models.WeeklyOutflowCube(
+            snapshot_id=snapshot_id,
+            week_start=_as_datetime(week_start),
+            category=category,
+            commitment=commitment,
+            as_of_date=_as_datetime(today),
+            **values
+        )
+        for (week_start, category, commitment), values in cells.items()
+    ])
+    db.commit()
+    return len(cells)
+
+
+def invalidate_outflow_cube(db: Session, snapshot_id: int) -> None:
+    """Drop a snapshot's cube (e.g. after FX rates change); the next read rebuilds it."""
+    db.query(models.WeeklyOutflowCube).filter(
+        models.WeeklyOutflowCube.snapshot_id == snapshot_id
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
+def _cube_is_current(db: Session, snapshot_id: int, today: datetime.date) -> Optional[bool]:
+    """None when no cube exists, else whether it was timed against `today`."""
+    row = db.query(models.WeeklyOutflowCube.as_of_date).filter(
+        models.WeeklyOutflowCube.snapshot_id == snapshot_id
+    ).first()
+    if row is None:
+        return None
+    return _as_date(row[0]) == today
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# INCREMENTAL UPDATE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _cell_row(db: Session, snapshot_id: int, cell: OutflowCell) -> Optional[models.WeeklyOutflowCube]:
+    category = models.WeeklyOutflowCube.category
+    return db.query(models.WeeklyOutflowCube).filter(
+        models.WeeklyOutflowCube.snapshot_id == snapshot_id,
+        models.WeeklyOutflowCube.week_start == _as_datetime(cell.week_start),
+        category.is_(None) if cell.category is None else category == cell.category,
+        models.WeeklyOutflowCube.commitment == cell.commitment
+    ).first()
+
+
+def apply_bill_change(
+    db: Session,
+    bill: models.VendorBill,
+    before: Optional[OutflowCell] = None,
+    today: Optional[datetime.date] = None
+) -> Optional[OutflowCell]:
+    """
+    Move one bill's amount from its old cell to its new one.
+
+    `before` is bill_cell() captured before the edit (None for a new bill).
+    A missing or stale cube is left alone; the next read rebuilds it.
+    Returns the bill's new cell.
+    """
+    today = today or datetime.datetime.now().date()
+    after = bill_cell(db, bill, today)
+    if not _cube_is_current(db, bill.snapshot_id, today):
+        return after
+
+    for cell, sign in ((before, -1), (after, 1)):
+        if cell is None:
+            continue
+        row = _cell_row(db, bill.snapshot_id, cell)
+        if row is None:
+            row = models.WeeklyOutflowCube(
+                snapshot_id=bill.snapshot_id,
+                week_start=_as_datetime(cell.week_start),
+                category=cell.category,
+                commitment=cell.commitment,
+                bill_amount=0.0, bill_count=0, template_amount=0.0, template_count=0,
+                as_of_date=_as_datetime(today)
+            )
+            db.add(row)
+        row.bill_amount += sign * cell.amount
+        row.bill_count += sign
+        if row.bill_count <= 0 and row.template_count == 0:
+            db.delete(row)
+        elif row.bill_count <= 0:
+            row.bill_amount = 0.0
+        db.flush()
+    db.commit()
+    return after
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# READ
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def read_outflow_cube(
+    db: Session,
+    snapshot_id: int,
+    weeks: Optional[Iterable[datetime.date]] = None,
+    today: Optional[datetime.date] = None
+) -> Dict[datetime.date, Dict[str, Dict[str, float]]]:
+    """
+    {week_start: {category: {total, committed, discretionary}}} from the cube.
+
+    Actual bills take precedence over templates: a (week, category) with any
+    bill ignores its template amounts. Pass `weeks` to read only those weeks.
+    """
+    today = today or datetime.datetime.now().date()
+    current = _cube_is_current(db, snapshot_id, today)
+    if current is False or (current is None and _has_outflow_sources(db, snapshot_id)):
+        build_outflow_cube(db, snapshot_id, today)
+
+    query = db.query(models.WeeklyOutflowCube).filter(models.WeeklyOutflowCube.snapshot_id == snapshot_id)
+    if weeks is not None:
+        query = query.filter(models.WeeklyOutflowCube.week_start.in_([_as_datetime(w) for w in weeks]))
+
+    by_key: Dict[Tuple[datetime.date, Optional[str]], list] = {}
+    for row in query.all():
+        by_key.setdefault((_as_date(row.week_start), row.category), []).append(row)
+
+    summary: Dict[datetime.date, Dict[str, Dict[str, float]]] = {}
+    for (week_start, category), rows in by_key.items():
+        if any(r.bill_count > 0 for r in rows):
+            label, field = category or DEFAULT_BILL_CATEGORY, "bill_amount"
+        elif category is not None:
+            label, field = category, "template_amount"
+        else:
+            continue  # Uncategorised templates were never grouped
+
+        slot = summary.setdefault(week_start, {}).setdefault(
+            label, {"total": 0.0, "committed": 0.0, "discretionary": 0.0}
+        )
+        for r in rows:
+            amount = getattr(r, field) or 0.0
+            slot[r.commitment] += amount
+            slot["total"] += amount
+    return summary
+
+
+def _has_outflow_sources(db: Session, snapshot_id: int) -> bool:
+    return bool(
+        db.query(models.VendorBill.id).filter(models.VendorBill.snapshot_id == snapshot_id).first()
+        or db.query(models.OutflowItem.id).filter(models.OutflowItem.snapshot_id == snapshot_id).first()
+    )
@@ -0,0 +1,279 @@
+"""
+Red-Week Contribution Engine
+
+Attributes each week's closing-cash shortfall to individual invoices,
+customers, bills and vendors. Every open invoice, bill and recurring
+template becomes one row of a (rows × 13 weeks) net-flow matrix, filled with
+a single scatter-add: invoices land 20/50/30% in their P25/P50/P75 weeks
+exactly as in the 13-week workspace, outflows land in their cash-out week
+with the outflow cube's "bills before templates" precedence.
+
+Cumulative sums along the week axis give every row's effect on each week's
+closing cash. Per-customer and per-vendor matrices are one grouped add over
+those rows. For a red week w:
+
+- an outflow's contribution is the cash it consumed up to and including w
+- an inflow's contribution is the part of its expected receipt that lands
+  after w but inside the horizon (collections that would cure the week)
+
+Closing balances and contribution matrices are cached per snapshot, so
+changing the threshold is a vector comparison plus a top-K partition.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+import models
+from outflow_cube import COMMITTED, DEFAULT_BILL_CATEGORY, iter_outflow_cells
+from utils import convert_currency, forecast_window_start
+
+
+WEEKS = 13
+DEFAULT_TOP_K = 5
+
+# Share of an open invoice expected in its P25, P50 and P75 week
+INFLOW_WEIGHTS = (("confidence_p25", 0.2), ("predicted_payment_date", 0.5), ("confidence_p75", 0.3))
+
+INFLOW_LEVELS = ("customer", "invoice")
+OUTFLOW_LEVELS = ("vendor", "bill")
+LEVELS = INFLOW_LEVELS + OUTFLOW_LEVELS
+
+
+class SnapshotContributions:
+    """Net-flow rows, cumulative balances and grouped contributions for one snapshot."""
+
+    def __init__(
+        self,
+        week_starts: List[datetime],
+        opening_cash: float,
+        flows: np.ndarray,
+        is_inflow: np.ndarray,
+        committed_out: np.ndarray,
+        members: Dict[str, Tuple[np.ndarray, List[Dict[str, Any]]]],
+        fingerprint: Tuple = ()
+    ):
+        self.week_starts = week_starts
+        self.opening_cash = opening_cash
+        self.fingerprint = fingerprint
+
+        cumulative = np.cumsum(flows, axis=1)
+        self.inflows = flows[is_inflow].sum(axis=0)
+        self.outflows = -flows[~is_inflow].sum(axis=0)
+        self.committed_outflows = committed_out
+        self.closing_cash = opening_cash + np.cumsum(self.inflows - self.outflows)
+        self.opening_by_week = np.concatenate(([opening_cash], self.closing_cash[:-1]))
+
+        # Per row: inflow still to land after week w, or outflow paid by week w
+        scores = np.where(is_inflow[:, None], cumulative[:, -1:] - cumulative, -cumulative)
+
+        # level -> (group × week) contribution matrix and group descriptors
+        self.scores: Dict[str, np.ndarray] = {}
+        self.groups: Dict[str, List[Dict[str, Any]]] = {}
+        for level, (row_groups, descriptors) in members.items():
+            grouped = np.zeros((len(descriptors), WEEKS))
+            selected = row_groups >= 0
+            np.add.at(grouped, row_groups[selected], scores[selected])
+            self.scores[level] = grouped
+            self.groups[level] = descriptors
+
+    @classmethod
+    def build(
+        cls,
+        db: Session,
+        snapshot: models.Snapshot,
+        now: Optional[datetime] = None,
+        fingerprint: Tuple = ()
+    ) -> "SnapshotContributions":
+        now = now or datetime.now()
+        rows: List[Tuple[int, int, float]] = []  # (row, week, signed amount)
+        is_inflow: List[bool] = []
+        committed_out = np.zeros(WEEKS)
+        members: Dict[str, Tuple[List[int], Dict[Any, int], List[Dict[str, Any]]]] = {
+            level: ([], {}, []) for level in LEVELS
+        }
+
+        def assign(level: str, key: Any, descriptor: Dict[str, Any]) -> None:
+            row_groups, index, descriptors = members[level]
+            if key not in index:
+                index[key] = len(descriptors)
+                descriptors.append(descriptor)
+            row_groups.append(index[key])
+
+        def skip(level: str) -> None:
+            members[level][0].append(-1)
+
+        # Open invoices, skipping those without an FX rate like the forecast does
+        invoices = db.query(models.Invoice).filter(
+            models.Invoice.snapshot_id == snapshot.id,
+            models.Invoice.payment_date.is_(None)
+        ).all()
+        rates: Dict[Optional[str], Optional[float]] = {}
+        open_invoices = []
+        for inv in invoices:
+            if inv.currency not in rates:
+                try:
+                    rates[inv.currency] = convert_currency(db, snapshot.id, 1.0, inv.currency, "EUR")
+                except ValueError:
+                    rates[inv.currency] = None
+            if rates[inv.currency] is not None:
+                open_invoices.append((inv, (inv.amount or 0.0) * rates[inv.currency]))
+
+        dates = [getattr(inv, field) for inv, _ in open_invoices for field, _ in INFLOW_WEIGHTS]
+        dates = [d for d in dates if d is not None]
+        if open_invoices:
+            start = forecast_window_start(min(dates) if dates else None, now)
+        else:
+            start = datetime.combine((now - timedelta(days=now.weekday())).date(), datetime.min.time())
+        week_starts = [start + timedelta(weeks=i) for i in range(WEEKS)]
+
+        for inv, amount in open_invoices:
+            row = len(is_inflow)
+            is_inflow.append(True)
+            for field, weight in INFLOW_WEIGHTS:
+                day = getattr(inv, field)
+                if day is None or day < start:
+                    continue
+                week = (day - start) // timedelta(weeks=1)
+                if week < WEEKS:
+                    rows.append((row, week, amount * weight))
+            assign("customer", inv.customer, {"customer": inv.customer})
+            assign("invoice", inv.id, {
+                "invoice_id": inv.id, "customer": inv.customer,
+                "document_number": inv.document_number, "amount": amount
+            })
+            skip("vendor")
+            skip("bill")
+
+        # Outflows in cash-out weeks; templates only where no bill shares (week, category)
+        first_week = week_starts[0].date()
+        cells = list(iter_outflow_cells(db, snapshot.id, now.date()))
+        billed = {(c.week_start, c.category) for source, _, c in cells if source == "bill"}
+        for source, item, cell in cells:
+            if source == "template" and ((cell.week_start, cell.category) in billed or cell.category is None):
+                continue
+            week = (cell.week_start - first_week).days // 7
+            if not 0 <= week < WEEKS:
+                continue
+            row = len(is_inflow)
+            is_inflow.append(False)
+            rows.append((row, week, -cell.amount))
+            if cell.commitment == COMMITTED:
+                committed_out[week] += cell.amount
+
+            skip("customer")
+            skip("invoice")
+            if source == "bill":
+                vendor = item.vendor_name or cell.category or DEFAULT_BILL_CATEGORY
+                assign("bill", item.id, {
+                    "bill_id": item.id, "vendor": vendor,
+                    "document_number": item.document_number, "amount": cell.amount
+                })
+            else:
+                vendor = item.description or cell.category
+                skip("bill")
+            assign("vendor", vendor, {"vendor": vendor, "recurring": source == "template"})
+
+        flows = np.zeros((len(is_inflow), WEEKS))
+        if rows:
+            r, w, a = (np.array(col) for col in zip(*rows))
+            np.add.at(flows, (r.astype(int), w.astype(int)), a)
+
+        return cls(
+            week_starts,
+            snapshot.opening_bank_balance or 0.0,
+            flows,
+            np.array(is_inflow, dtype=bool),
+            committed_out,
+            {level: (np.array(m[0], dtype=int), m[2]) for level, m in members.items()},
+            fingerprint
+        )
+
+    def red_week_indices(self, threshold: float) -> np.ndarray:
+        return np.flatnonzero(self.closing_cash < threshold)
+
+    def top_drivers(self, week_index: int, shortfall: float, top_k: int = DEFAULT_TOP_K) -> Dict[str, List[Dict[str, Any]]]:
+        """Top-K contributors per level to one week's shortfall."""
+        drivers = {}
+        for level in LEVELS:
+            column = self.scores[level][:, week_index] if len(self.groups[level]) else np.zeros(0)
+            k = min(top_k, len(column))
+            if k == 0:
+                drivers[level] = []
+                continue
+            top = np.argpartition(-column, k - 1)[:k]
+            top = top[np.argsort(-column[top], kind="stable")]
+            drivers[level] = [
+                {
+                    **self.groups[level][i],
+                    "contribution": float(column[i]),
+                    "share_of_shortfall_pct": round(float(column[i]) / shortfall * 100, 1) if shortfall > 0 else 0.0
+                }
+                for i in top if column[i] > 0
+            ]
+        return drivers
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PER-SNAPSHOT CACHE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_contributions: Dict[int, SnapshotContributions] = {}
+_lock = threading.Lock()
+
+
+# Every column that places a row's cash in the grid or names it as a contributor
+FINGERPRINT_COLUMNS = {
+    models.Invoice: (
+        "id", "amount", "currency", "payment_date", "predicted_payment_date",
+        "confidence_p25", "confidence_p75", "customer", "document_number",
+    ),
+    models.VendorBill: (
+        "id", "amount", "currency", "hold_status", "is_discretionary", "scheduled_payment_date",
+        "due_date", "approval_date", "category", "vendor_name", "document_number",
+    ),
+    models.OutflowItem: (
+        "id", "amount", "currency", "is_discretionary", "expected_date", "category", "description",
+    ),
+    models.WeeklyFXRate: ("id", "from_currency", "to_currency", "rate"),
+}
+
+
+def _snapshot_fingerprint(db: Session, snapshot: models.Snapshot, now: datetime) -> Tuple:
+    """Digest of the flow columns feeding the grid; column-only reads, no ORM objects."""
+    digests = []
+    for model, columns in FINGERPRINT_COLUMNS.items():
+        rows = db.query(*(getattr(model, c) for c in columns)).filter(
+            model.snapshot_id == snapshot.id
+        ).order_by(model.id).all()
+        digests.append(hash(tuple(tuple(row) for row in rows)))
+    entity = snapshot.entity
+    return (
+        now.date(), snapshot.opening_bank_balance, entity.payment_run_day if entity else None, *digests
+    )
+
+
+def get_contributions(db: Session, snapshot: models.Snapshot, now: Optional[datetime] = None) -> SnapshotContributions:
+    """Return the cached contributions for a snapshot, rebuilding them if its flows changed."""
+    now = now or datetime.now()
+    fingerprint = _snapshot_fingerprint(db, snapshot, now)
+    with _lock:
+        cached = _contributions.get(snapshot.id)
+    if cached is not None and cached.fingerprint == fingerprint:
+        return cached
+    contributions = SnapshotContributions.build(db, snapshot, now, fingerprint)
+    with _lock:
+        _contributions[snapshot.id] = contributions
+    return contributions
+
+
+def invalidate_contributions(snapshot_id: Optional[int] = None) -> None:
+    """Drop cached contributions (one snapshot or all), e.g. after re-running predictions."""
+    with _lock:
+        if snapshot_id is None:
+            _contributions.clear()
+        else:
+            _contributions.pop(snapshot_id, None)
@@ -8,12 +8,14 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import models
 from cash_calendar_service import get_13_week_workspace
+from red_week_contributions import DEFAULT_TOP_K, get_contributions
 
 
 def flag_red_weeks(
     db: Session,
     snapshot_id: int,
-    threshold: Optional[float] = None
+    threshold: Optional[float] = None,
+    top_k: int = DEFAULT_TOP_K
 ) -> Dict[str, Any]:
     """
     Flag weeks where closing cash falls below threshold.
@@ -21,6 +23,7 @@ def flag_red_weeks(
     
     Args:
         threshold: Cash threshold (defaults to snapshot.min_cash_threshold)
+        top_k: Customers, invoices, vendors and bills listed per red week
     """
     snapshot = db.query(models.Snapshot).filter(models.Snapshot.id == snapshot_id).first()
     if not snapshot:
@@ -28,62 +31,61 @@ def flag_red_weeks(
     
     threshold = threshold or snapshot.min_cash_threshold or 0.0
     
-    workspace = get_13_week_workspace(db, snapshot_id)
-    if not workspace or 'grid' not in workspace:
-        return {"red_weeks": [], "threshold": threshold}
+    # Cached per snapshot; a new threshold only re-compares closing balances
+    contributions = get_contributions(db, snapshot)
     
     red_weeks = []
     
-    for week in workspace['grid']:
-        closing_cash = week.get('closing_cash', 0)
+    for week_index in contributions.red_week_indices(threshold):
+        week_index = int(week_index)
+        closing_cash = float(contributions.closing_cash[week_index])
+        inflows = float(contributions.inflows[week_index])
+        outflows = float(contributions.committed_outflows[week_index])
+        opening = float(contributions.opening_by_week[week_index])
+        shortfall = threshold - closing_cash
+        
+        # Identify largest drivers
+        drivers = []
+        
+        # Check if low opening cash is the issue
+        if opening < threshold:
+            drivers.append({
+                "type": "low_opening_cash",
+                "amount": opening,
+                "impact": opening - threshold
+            })
+        
+        # Check if high outflows are the issue
+        if outflows > inflows:
+            drivers.append({
+                "type": "high_outflows",
+                "amount": outflows,
+                "impact": outflows - inflows
+            })
         
-        if closing_cash < threshold:
-            # Calculate cause attribution
-            inflows = week.get('inflow_p50', 0)
-            outflows = week.get('outflow_committed', 0)
-            opening = week.get('opening_cash', 0)
-            
-            # Identify largest drivers
-            drivers = []
-            
-            # Check if low opening cash is the issue
-            if opening < threshold:
-                drivers.append({
-                    "type": "low_opening_cash",
-                    "amount": opening,
-                    "impact": opening - threshold
-                })
-            
-            # Check if high outflows are the issue
-            if outflows > inflows:
-                drivers.append({
-                    "type": "high_outflows",
-                    "amount": outflows,
-                    "impact": outflows - inflows
-                })
-            
-            # Check if low inflows are the issue
-            if inflows < outflows:
-                drivers.append({
-                    "type": "low_inflows",
-                    "amount": inflows,
-                    "impact": inflows - outflows
-                })
-            
-            # Sort by absolute impact
-            drivers.sort(key=lambda x: abs(x['impact']), reverse=True)
-            
-            red_weeks.append({
-                "week_label": week.get('week_label', 'Unknown'),
-                "week_index": workspace['grid'].index(week),
-                "closing_cash": closing_cash,
-                "threshold": threshold,
-                "shortfall": threshold - closing_cash,
-                "largest_drivers": drivers[:3],  # Top 3 drivers
-                "opening_cash": opening,
-                "inflows": inflows,
-                "outflows": outflows
+        # Check if low inflows are the issue
+        if inflows < outflows:
+            drivers.append({
+                "type": "low_inflows",
+                "amount": inflows,
+                "impact": inflows - outflows
             })
+        
+        # Sort by absolute impact
+        drivers.sort(key=lambda x: abs(x['impact']), reverse=True)
+        
+        red_weeks.append({
+            "week_label": f"W{week_index + 1}",
+            "week_index": week_index,
+            "closing_cash": closing_cash,
+            "threshold": threshold,
+            "shortfall": shortfall,
+            "largest_drivers": drivers[:3],  # Top 3 drivers
+            "top_contributors": contributions.top_drivers(week_index, shortfall, top_k),
+            "opening_cash": opening,
+            "inflows": inflows,
+            "outflows": outflows
+        })
     
     return {
         "red_weeks": red_weeks,
@@ -104,27 +106,33 @@ def get_red_weeks_drilldown(
     """
     from cash_calendar_service import get_week_drilldown_data
     
-    # Get week details
-    inflows_data = get_week_drilldown_data(db, snapshot_id, week_index, "inflow")
-    outflows_data = get_week_drilldown_data(db, snapshot_id, week_index, "outflow")
-    
-    # Get workspace to find threshold
+    # Week totals come from the workspace grid, which reads the outflow cube
     workspace = get_13_week_workspace(db, snapshot_id)
-    if workspace and 'grid' and week_index < len(workspace['grid']):
+    if workspace and 0 <= week_index < len(workspace['grid']):
         week = workspace['grid'][week_index]
-        threshold = workspace.get('min_cash_threshold', 0.0)
+        threshold = workspace['summary'].get('min_threshold') or 0.0
         closing_cash = week.get('closing_cash', 0)
         
+        shortfall = max(0, threshold - closing_cash)
+        snapshot = db.query(models.Snapshot).filter(models.Snapshot.id == snapshot_id).first()
+        contributions = get_contributions(db, snapshot)
+        
+        # Item-level detail for the week
+        inflow_items = get_week_drilldown_data(db, snapshot_id, week_index, "inflow")
+        outflow_items = get_week_drilldown_data(db, snapshot_id, week_index, "outflow")
+        
         return {
             "week_index": week_index,
             "week_label": week.get('week_label', 'Unknown'),
             "closing_cash": closing_cash,
             "threshold": threshold,
-            "shortfall": max(0, threshold - closing_cash),
-            "inflow_items": inflows_data.get('items', []),
-            "outflow_items": outflows_data.get('items', []),
-            "total_inflow": sum(item.get('amount', 0) for item in inflows_data.get('items', [])),
-            "total_outflow": sum(item.get('amount', 0) for item in outflows_data.get('items', []))
+            "shortfall": shortfall,
+            "inflow_items": inflow_items,
+            "outflow_items": outflow_items,
+            "outflow_by_category": week.get('outflow_details', {}),
+            "top_contributors": contributions.top_drivers(week_index, shortfall),
+            "total_inflow": sum(item.get('amount', 0) for item in inflow_items),
+            "total_outflow": week.get('outflow_total', 0)
         }
     
     return {"error": "Week not found"}
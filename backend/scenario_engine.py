@@ -0,0 +1,237 @@
+"""
+Delta-Shift Scenario Engine
+
+Meeting-mode what-ifs shift expected receipts by whole days (a global
+shock, per-customer shocks, a collections improvement). Instead of
+reloading invoices and rescanning a DataFrame per scenario, each snapshot
+is indexed once:
+
+- For each quantile (P25/P50/P75) the open invoices are sorted by
+  (customer, payment day) with a running cumulative amount
+- A shift of s days moves every week boundary by -s, so a week's total is
+  two searchsorted lookups into the cumulative sums
+- Customers without their own shock are answered from an "all customers"
+  series minus the shocked customers
+
+A scenario therefore costs O(shocked customers × weeks × log n), and
+evaluate_batch() answers an N-scenario grid with one vectorized lookup.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+import models
+
+
+WEEKS = 13
+QUANTILES = ("p25", "p50", "p75")
+
+# Composite sort key: customer index in the high bits, day ordinal in the low bits
+_DAY_BITS = 32
+
+
+class SnapshotScenarioIndex:
+    """Cumulative per-day, per-customer receipt amounts for one snapshot."""
+
+    def __init__(
+        self,
+        customers: List[Optional[str]],
+        rows: List[Tuple[Optional[str], float, Optional[datetime], Optional[datetime], Optional[datetime]]],
+        fingerprint: Tuple = ()
+    ):
+        """
+        Args:
+            customers: Distinct customer names (index = position)
+            rows: (customer, amount, p25_date, p50_date, p75_date) per open invoice
+            fingerprint: Snapshot state the index was built from
+        """
+        self.fingerprint = fingerprint
+        self.customer_index = {c: i for i, c in enumerate(customers)}
+        self.all_customers = len(customers)  # Virtual customer holding every row
+        self.row_count = len(rows)
+
+        self.keys = {}
+        self.cumulative = {}
+        for q_pos, quantile in enumerate(QUANTILES):
+            cust, days, amounts = [], [], []
+            for row in rows:
+                when = row[2 + q_pos]
+                if when is None:
+                    continue
+                cust.append(self.customer_index[row[0]])
+                days.append(when.toordinal())
+                amounts.append(row[1] or 0.0)
+
+            cust = np.asarray(cust, dtype=np.int64)
+            days = np.asarray(days, dtype=np.int64)
+            amounts = np.asarray(amounts, dtype=np.float64)
+
+            keys = np.concatenate([
+                (cust << _DAY_BITS) | days,
+                (np.int64(self.all_customers) << _DAY_BITS) | days
+            ])
+            amounts = np.concatenate([amounts, amounts])
+            order = np.argsort(keys, kind="stable")
+            self.keys[quantile] = keys[order]
+            self.cumulative[quantile] = np.concatenate([[0.0], np.cumsum(amounts[order])])
+
+    @classmethod
+    def build(cls, db: Session, snapshot_id: int, fingerprint: Tuple = ()) -> "SnapshotScenarioIndex":
+        """Index a snapshot's open invoices with a single column query."""
+        rows = db.query(
+            models.Invoice.customer,
+            models.Invoice.amount,
+            models.Invoice.confidence_p25,
+            models.Invoice.predicted_payment_date,
+            models.Invoice.confidence_p75,
+        ).filter(
+            models.Invoice.snapshot_id == snapshot_id,
+            models.Invoice.payment_date.is_(None),
+            models.Invoice.predicted_payment_date.isnot(None)
+        ).all()
+        customers = sorted({r[0] for r in rows}, key=lambda c: (c is None, c or ""))
+        return cls(customers, [tuple(r) for r in rows], fingerprint)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Evaluation
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def _terms(self, scenario: Dict[str, Any]) -> List[Tuple[int, int, float]]:
+        """
+        Decompose a scenario into (customer_index, shift_days, sign) terms.
+
+        Everyone gets the base shift; shocked customers are removed from the
+        all-customers series at the base shift and re-added at their own.
+        """
+        base_shift = int(scenario.get("global_shock", 0)) - int(scenario.get("collections_improvement", 0))
+        terms = [(self.all_customers, base_shift, 1.0)]
+        for customer, shock in (scenario.get("customer_shocks") or {}).items():
+            idx = self.customer_index.get(customer)
+            if idx is None or not shock:
+                continue
+            terms.append((idx, base_shift, -1.0))
+            terms.append((idx, base_shift + int(shock), 1.0))
+        return terms
+
+    def evaluate_batch(self, scenarios: List[Dict[str, Any]], anchor_day: int) -> np.ndarray:
+        """
+        Weekly totals for many scenarios at once.
+
+        Args:
+            scenarios: Scenario configs (global_shock, customer_shocks, collections_improvement)
+            anchor_day: Ordinal of the first week's start day
+
+        Returns:
+            Array of shape (len(scenarios), len(QUANTILES), WEEKS)
+        """
+        term_scenario, term_customer, term_shift, term_sign = [], [], [], []
+        for s_idx, scenario in enumerate(scenarios):
+            for customer, shift, sign in self._terms(scenario):
+                term_scenario.append(s_idx)
+                term_customer.append(customer)
+                term_shift.append(shift)
+                term_sign.append(sign)
+
+        term_customer = np.asarray(term_customer, dtype=np.int64)
+        term_shift = np.asarray(term_shift, dtype=np.int64)
+        term_sign = np.asarray(term_sign, dtype=np.float64)
+
+        # Receipt on day d lands in week i when anchor + 7i <= d + shift < anchor + 7(i+1)
+        boundaries = anchor_day + 7 * np.arange(WEEKS + 1, dtype=np.int64)
+        query_keys = (term_customer[:, None] << _DAY_BITS) | (boundaries[None, :] - term_shift[:, None])
+
+        out = np.zeros((len(scenarios), len(QUANTILES), WEEKS))
+        for q_pos, quantile in enumerate(QUANTILES):
+            positions = np.searchsorted(self.keys[quantile], query_keys, side="left")
+            at_boundaries = self.cumulative[quantile][positions]
+            weekly = np.diff(at_boundaries, axis=1) * term_sign[:, None]
+            np.add.at(out[:, q_pos, :], np.asarray(term_scenario), weekly)
+        return out
+
+    def evaluate(self, scenario: Dict[str, Any], anchor_day: int) -> np.ndarray:
+        """Weekly totals for one scenario, shape (len(QUANTILES), WEEKS)."""
+        return self.evaluate_batch([scenario], anchor_day)[0]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PER-SNAPSHOT CACHE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_indexes: Dict[int, SnapshotScenarioIndex] = {}
+_lock = threading.Lock()
+
+
+def _snapshot_fingerprint(db: Session, snapshot_id: int) -> Tuple:
+    """Cheap aggregate that changes when invoices, payments or predictions change."""
+    row = db.query(
+        func.count(models.Invoice.id),
+        func.max(models.Invoice.id),
+        func.sum(models.Invoice.amount),
+        func.count(models.Invoice.payment_date),
+        func.sum(models.Invoice.predicted_delay),
+        func.count(models.Invoice.predicted_payment_date),
+    ).filter(models.Invoice.snapshot_id == snapshot_id).one()
+    return tuple(row)
+
+
+def get_scenario_index(db: Session, snapshot_id: int) -> SnapshotScenarioIndex:
+    """Return the cached index for a snapshot, rebuilding it if the snapshot changed."""
+    fingerprint = _snapshot_fingerprint(db, snapshot_id)
+    with _lock:
+        index = _indexes.get(snapshot_id)
+    if index is not None and index.fingerprint == fingerprint:
+        return index
+    index = SnapshotScenarioIndex.build(db, snapshot_id, fingerprint)
+    with _lock:
+        _indexes[snapshot_id] = index
+    return index
+
+
+def invalidate_scenario_index(snapshot_id: Optional[int] = None) -> None:
+    """Drop cached indexes (one snapshot or all), e.g. after re-running predictions."""
+    with _lock:
+        if snapshot_id is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(snapshot_id, None)
+
+
+def current_week_start(now: Optional[datetime] = None) -> datetime:
+    """Monday 00:00 of the current week."""
+    now = now or datetime.now()
+    monday = now - timedelta(days=now.weekday())
+    return monday.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def format_weekly_scenario(totals: np.ndarray, week_start: datetime) -> List[Dict[str, Any]]:
+    """Render (quantile × week) totals in the /scenario response shape."""
+    p25, p50, p75 = (totals[QUANTILES.index(q)] for q in QUANTILES)
+    return [
+        {
+            "label": f"W{i+1} ({(week_start + timedelta(weeks=i)).strftime('%m/%d')})",
+            "base": float(p50[i]),
+            "downside": float(p75[i]),
+            "upside": float(p25[i])
+        }
+        for i in range(WEEKS)
+    ]
+
+
+def run_scenarios(
+    db: Session,
+    snapshot_id: int,
+    scenarios: List[Dict[str, Any]],
+    now: Optional[datetime] = None
+) -> List[List[Dict[str, Any]]]:
+    """Evaluate an N-scenario grid against one snapshot in a single call."""
+    index = get_scenario_index(db, snapshot_id)
+    if index.row_count == 0:
+        return [[] for _ in scenarios]
+    week_start = current_week_start(now)
+    totals = index.evaluate_batch(scenarios, week_start.toordinal())
+    return [format_weekly_scenario(t, week_start) for t in totals]
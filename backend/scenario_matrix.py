@@ -0,0 +1,368 @@
+"""
+N-Way Scenario Comparison
+
+Loads the outputs of many scenarios (startup planning scenarios or FP&A
+forecast runs) once into an aligned scenario x month x line array and
+compares them all in one pass:
+- every pairwise delta of line totals
+- drivers ranked by how much they move each scenario against the base
+  and by their spread across all scenarios
+- talking points for board prep
+
+iter_comparison_events() turns a comparison into a sequence of small JSON
+events so the API can stream a 20-scenario matrix as NDJSON.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import json
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LINE DEFINITIONS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Startup planning: (line, source, key); costs are positive amounts
+PLANNING_LINES: Tuple[Tuple[str, str, str], ...] = (
+    ("revenue", "pnl", "revenue"),
+    ("cogs", "pnl", "cogs"),
+    ("payroll", "pnl", "payroll"),
+    ("other_opex", "pnl", "other_opex"),
+    ("total_expenses", "pnl", "total_expenses"),
+    ("ebitda", "pnl", "ebitda"),
+    ("net_income", "pnl", "net_income"),
+    ("operating_cash_flow", "cashflow", "operating_cash_flow"),
+    ("ending_cash", "cashflow", "ending_cash"),
+)
+PLANNING_DRIVERS = ("revenue", "cogs", "payroll", "other_opex")
+# +1: an increase is favorable, -1: an increase is unfavorable
+PLANNING_FAVORABLE = {
+    "revenue": 1, "cogs": -1, "payroll": -1, "other_opex": -1, "total_expenses": -1,
+    "ebitda": 1, "net_income": 1, "operating_cash_flow": 1, "ending_cash": 1,
+}
+
+# FP&A forecast runs: (line, outputs section, key); costs carry negative signs
+FORECAST_LINES: Tuple[Tuple[str, str, str], ...] = (
+    ("revenue", "pl", "revenue_by_month"),
+    ("cogs", "pl", "cogs_by_month"),
+    ("opex", "pl", "opex_by_month"),
+    ("ebitda", "pl", "ebitda_by_month"),
+    ("ending_cash", "cash_bridge", "ending_cash_by_month"),
+)
+FORECAST_DRIVERS = ("revenue", "cogs", "opex")
+FORECAST_FAVORABLE = {line: 1 for line, _, _ in FORECAST_LINES}
+
+# Balances compare at the last month rather than summed over the horizon
+BALANCE_LINES = {"ending_cash"}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# MATRIX
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class ScenarioMatrix:
+    """Aligned outputs: values[s, m, l] for scenario s, month m, line l."""
+    scenario_ids: List[int]
+    labels: List[str]
+    months: List[str]
+    lines: List[str]
+    values: np.ndarray
+    present: np.ndarray  # (S, M) bool: scenario has that month
+    driver_lines: Tuple[str, ...] = ()
+    favorable: Dict[str, int] = field(default_factory=dict)
+
+    def line_index(self, line: str) -> int:
+        return self.lines.index(line)
+
+    def totals(self) -> np.ndarray:
+        """(S, L): flows summed over months, balances at each scenario's last month."""
+        totals = self.values.sum(axis=1)
+        if self.months:
+            last = np.where(self.present.any(axis=1), self.present.shape[1] - 1 - np.argmax(self.present[:, ::-1], axis=1), 0)
+            for line in BALANCE_LINES & set(self.lines):
+                l = self.line_index(line)
+                totals[:, l] = self.values[np.arange(len(self.scenario_ids)), last, l]
+        return totals
+
+
+def build_matrix(
+    scenario_ids: Sequence[int],
+    labels: Sequence[str],
+    series: Sequence[Dict[str, Dict[str, float]]],
+    lines: Sequence[str],
+    driver_lines: Sequence[str] = (),
+    favorable: Optional[Dict[str, int]] = None,
+) -> ScenarioMatrix:
+    """
+    Align per-scenario {line: {month: value}} series on the union of months.
+    Months a scenario does not cover are zero and marked absent.
+    """
+    months = sorted({m for s in series for values in s.values() for m in values})
+    month_index = {m: i for i, m in enumerate(months)}
+    values = np.zeros((len(series), len(months), len(lines)))
+    present = np.zeros((len(series), len(months)), dtype=bool)
+
+    for s, by_line in enumerate(series):
+        for l, line in enumerate(lines):
+            for month, value in by_line.get(line, {}).items():
+                values[s, month_index[month], l] = float(value)
+                present[s, month_index[month]] = True
+
+    return ScenarioMatrix(
+        scenario_ids=list(scenario_ids),
+        labels=list(labels),
+        months=months,
+        lines=list(lines),
+        values=values,
+        present=present,
+        driver_lines=tuple(driver_lines),
+        favorable=dict(favorable or {}),
+    )
+
+
+def load_planning_matrix(db: Session, scenario_ids: Sequence[int]) -> ScenarioMatrix:
+    """Load startup planning outputs for all scenarios (generating missing ones)."""
+    from startup_planning_models import PlanningOutput, StartupPlanningScenario
+    from startup_planning_service import StartupPlanningService
+
+    scenarios = {
+        s.id: s for s in db.query(StartupPlanningScenario).filter(
+            StartupPlanningScenario.id.in_(scenario_ids)
+        ).all()
+    }
+    missing = [sid for sid in scenario_ids if sid not in scenarios]
+    if missing:
+        raise ValueError(f"Scenarios not found: {missing}")
+
+    outputs = {
+        o.scenario_id: o for o in db.query(PlanningOutput).filter(
+            PlanningOutput.scenario_id.in_(scenario_ids)
+        ).all()
+    }
+    service = StartupPlanningService(db)
+
+    series = []
+    for sid in scenario_ids:
+        output = outputs.get(sid) or service.generate_outputs(sid)
+        rows = {"pnl": output.monthly_pnl_json or [], "cashflow": output.monthly_cashflow_json or []}
+        series.append({
+            line: {row["month"][:7]: row.get(key, 0) for row in rows[source]}
+            for line, source, key in PLANNING_LINES
+        })
+
+    return build_matrix(
+        scenario_ids, [scenarios[sid].name for sid in scenario_ids], series,
+        [line for line, _, _ in PLANNING_LINES], PLANNING_DRIVERS, PLANNING_FAVORABLE,
+    )
+
+
+def load_forecast_matrix(db: Session, forecast_run_ids: Sequence[int]) -> ScenarioMatrix:
+    """Load FP&A forecast run outputs (computing, via the forecast cache, any not yet run)."""
+    from fpa_models import ForecastRun
+
+    runs = {
+        r.id: r for r in db.query(ForecastRun).filter(
+            ForecastRun.id.in_(forecast_run_ids)
+        ).all()
+    }
+    missing = [rid for rid in forecast_run_ids if rid not in runs]
+    if missing:
+        raise ValueError(f"Forecast runs not found: {missing}")
+
+    series = []
+    for rid in forecast_run_ids:
+        run = runs[rid]
+        if not run.outputs_json:
+            from fpa_compute_engine import FPAComputeEngine
+            FPAComputeEngine(db).run_forecast(rid)
+        outputs = run.outputs_json
+        series.append({
+            line: outputs.get(section, {}).get(key, {})
+            for line, section, key in FORECAST_LINES
+        })
+
+    return build_matrix(
+        forecast_run_ids, [runs[rid].run_label or f"Run {rid}" for rid in forecast_run_ids], series,
+        [line for line, _, _ in FORECAST_LINES], FORECAST_DRIVERS, FORECAST_FAVORABLE,
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# COMPARISON
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class MatrixComparison:
+    """All pairwise deltas, driver rankings and talking points for a matrix."""
+    matrix: ScenarioMatrix
+    base_index: int
+    totals: np.ndarray          # (S, L)
+    deltas: np.ndarray          # (S, S, L): deltas[i, j] = totals[j] - totals[i]
+    monthly_vs_base: np.ndarray  # (S, M, L)
+    driver_ranking: List[Dict[str, Any]]
+    talking_points: List[Dict[str, Any]]
+
+    def scenario_summary(self, s: int) -> Dict[str, Any]:
+        m = self.matrix
+        return {
+            "scenario_id": m.scenario_ids[s],
+            "label": m.labels[s],
+            "is_base": s == self.base_index,
+            "totals": dict(zip(m.lines, _rounded(self.totals[s]))),
+            "delta_vs_base": dict(zip(m.lines, _rounded(self.deltas[self.base_index, s]))),
+        }
+
+    def pair(self, i: int, j: int) -> Dict[str, Any]:
+        m = self.matrix
+        return {
+            "base_scenario_id": m.scenario_ids[i],
+            "compare_scenario_id": m.scenario_ids[j],
+            "deltas": dict(zip(m.lines, _rounded(self.deltas[i, j]))),
+            "top_drivers": _top_drivers(m, self.deltas[i, j]),
+        }
+
+    def iter_pairs(self) -> Iterator[Dict[str, Any]]:
+        S = len(self.matrix.scenario_ids)
+        for i in range(S):
+            for j in range(i + 1, S):
+                yield self.pair(i, j)
+
+    def to_dict(self) -> Dict[str, Any]:
+        m = self.matrix
+        return {
+            "base_scenario_id": m.scenario_ids[self.base_index],
+            "months": m.months,
+            "lines": m.lines,
+            "scenarios": [self.scenario_summary(s) for s in range(len(m.scenario_ids))],
+            "pairs": list(self.iter_pairs()),
+            "driver_ranking": self.driver_ranking,
+            "talking_points": self.talking_points,
+        }
+
+
+def _rounded(values: np.ndarray) -> List[float]:
+    return [round(float(v), 2) for v in values]
+
+
+def _top_drivers(matrix: ScenarioMatrix, delta: np.ndarray, limit: int = 3) -> List[Dict[str, Any]]:
+    """Driver lines ranked by absolute delta."""
+    drivers = [(line, float(delta[matrix.line_index(line)])) for line in matrix.driver_lines]
+    drivers.sort(key=lambda d: -abs(d[1]))
+    return [
+        {
+            "line": line,
+            "delta": round(value, 2),
+            "is_favorable": value * matrix.favorable.get(line, 1) > 0,
+        }
+        for line, value in drivers[:limit] if value != 0
+    ]
+
+
+def compare_matrix(
+    matrix: ScenarioMatrix,
+    base_index: int = 0,
+    materiality: float = 10000.0,
+    headline_line: str = "ending_cash",
+) -> MatrixComparison:
+    """Compare every scenario against every other in one pass."""
+    if not 0 <= base_index < len(matrix.scenario_ids):
+        raise ValueError(f"Base index {base_index} out of range")
+    totals = matrix.totals()
+    deltas = totals[np.newaxis, :, :] - totals[:, np.newaxis, :]
+    monthly_vs_base = matrix.values - matrix.values[base_index][np.newaxis, :, :]
+
+    # Drivers ranked by spread across all scenarios
+    spread = totals.max(axis=0) - totals.min(axis=0) if len(totals) else np.zeros(len(matrix.lines))
+    driver_ranking = []
+    for line in sorted(matrix.driver_lines, key=lambda line: -spread[matrix.line_index(line)]):
+        l = matrix.line_index(line)
+        driver_ranking.append({
+            "line": line,
+            "spread": round(float(spread[l]), 2),
+            "max_scenario_id": matrix.scenario_ids[int(totals[:, l].argmax())],
+            "min_scenario_id": matrix.scenario_ids[int(totals[:, l].argmin())],
+        })
+
+    # Talking points: material headline deltas vs base, largest first
+    talking_points = []
+    h = matrix.line_index(headline_line)
+    base_label = matrix.labels[base_index]
+    order = np.argsort(-np.abs(deltas[base_index, :, h]), kind="stable")
+    for s in order:
+        delta = float(deltas[base_index, s, h])
+        if s == base_index or abs(delta) < materiality:
+            continue
+        drivers = _top_drivers(matrix, deltas[base_index, s])
+        direction = "higher" if delta > 0 else "lower"
+        detail = ", ".join(
+            f"{d['line']} {'+' if d['delta'] > 0 else '-'}${abs(d['delta']):,.0f}" for d in drivers
+        )
+        talking_points.append({
+            "priority": len(talking_points),
+            "scenario_id": matrix.scenario_ids[s],
+            "headline": f"{matrix.labels[s]}: {headline_line.replace('_', ' ')} ${abs(delta):,.0f} {direction} than {base_label}",
+            "detail": f"Largest drivers: {detail}" if detail else "No driver-level differences",
+            "delta": round(delta, 2),
+            "is_favorable": delta * matrix.favorable.get(headline_line, 1) > 0,
+        })
+
+    if driver_ranking and driver_ranking[0]["spread"] >= materiality:
+        top = driver_ranking[0]
+        labels = dict(zip(matrix.scenario_ids, matrix.labels))
+        talking_points.append({
+            "priority": len(talking_points),
+            "scenario_id": None,
+            "headline": f"{top['line'].replace('_', ' ').capitalize()} varies most across scenarios (${top['spread']:,.0f})",
+            "detail": f"Highest in {labels[top['max_scenario_id']]}, lowest in {labels[top['min_scenario_id']]}",
+            "delta": top["spread"],
+            "is_favorable": None,
+        })
+
+    return MatrixComparison(
+        matrix=matrix,
+        base_index=base_index,
+        totals=totals,
+        deltas=deltas,
+        monthly_vs_base=monthly_vs_base,
+        driver_ranking=driver_ranking,
+        talking_points=talking_points,
+    )
+
+
+def iter_comparison_events(comparison: MatrixComparison) -> Iterator[Dict[str, Any]]:
+    """Stream a comparison as small events: header, scenarios, pairs, drivers, talking points."""
+    m = comparison.matrix
+    yield {
+        "event": "matrix",
+        "base_scenario_id": m.scenario_ids[comparison.base_index],
+        "scenario_ids": m.scenario_ids,
+        "months": m.months,
+        "lines": m.lines,
+    }
+    for s in range(len(m.scenario_ids)):
+        yield {"event": "scenario", **comparison.scenario_summary(s)}
+    for pair in comparison.iter_pairs():
+        yield {"event": "pair", **pair}
+    yield {"event": "drivers", "ranking": comparison.driver_ranking}
+    for point in comparison.talking_points:
+        yield {"event": "talking_point", **point}
+    yield {"event": "done", "pairs": len(m.scenario_ids) * (len(m.scenario_ids) - 1) // 2}
+
+
+def base_index_for(matrix: ScenarioMatrix, base_scenario_id: Optional[int]) -> int:
+    """Position of the base scenario (the first scenario when not given)."""
+    if base_scenario_id is None:
+        return 0
+    if base_scenario_id not in matrix.scenario_ids:
+        raise ValueError(f"Base scenario {base_scenario_id} is not in the comparison")
+    return matrix.scenario_ids.index(base_scenario_id)
+
+
+def ndjson_lines(comparison: MatrixComparison) -> Iterator[str]:
+    """Comparison events as newline-delimited JSON for StreamingResponse."""
+    for event in iter_comparison_events(comparison):
+        yield json.dumps(event) + "\n"
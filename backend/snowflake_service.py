@@ -1,112 +1,143 @@
 from sqlalchemy.orm import Session
 import models
 import json
+import os
+import tempfile
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, Optional
 from secrets_manager import resolve_snowflake_password
 
-# Mock implementation of Snowflake SDK interaction
-# In a real environment, this would use snowflake.connector
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
 
-class SnowflakeSyncEngine:
-    def __init__(self, config: models.SnowflakeConfig):
-        self.config = config
-        # P1 Fix: Resolve password from environment variable
-        self.password = resolve_snowflake_password(
-            config.id, 
-            config.password_env_var
-        )
-        if not self.password:
-            raise ValueError(
-                f"Snowflake password not found. Please set environment variable "
-                f"GITTO_SNOWFLAKE_PASSWORD_{config.id} or configure password_env_var."
-            )
+# Write-back runs through a bulk export stage: each snapshot's rows are written
+# to one compressed Parquet file per table and loaded with a single COPY INTO.
+# Loads replace the snapshot's rows, so re-pushing a snapshot is idempotent.
 
-    def pull_invoices(self, db: Session):
-        """Fetches raw invoice data from Snowflake tables."""
-        print(f"PULLING FROM SNOWFLAKE: {self.config.database}.{self.config.schema_name}")
-        # Logic to execute SQL query based on self.config.invoice_mapping
-        return []
+MATCHES_TABLE = "GITTO_WRITEBACK_MATCHES"
+FORECAST_TABLE = "GITTO_WRITEBACK_FORECAST"
 
-    def push_match_decisions(self, db: Session, match_ids: List[int]):
-        """
-        Writes Gitto's reconciliation decisions back to a Snowflake sidecar table.
-        This is critical for Enterprise 'Warehouse Mode'.
-        """
-        matches = db.query(models.ReconciliationTable).filter(models.ReconciliationTable.id.in_(match_ids)).all()
-        
-        writeback_payload = []
-        for m in matches:
-            writeback_payload.append({
-                "canonical_id": m.invoice.canonical_id,
-                "bank_txn_id": m.bank_transaction_id,
-                "amount_reconciled": m.amount_allocated,
-                "match_type": m.bank_transaction.reconciliation_type,
-                "gitto_sync_at": datetime.utcnow().isoformat()
-            })
-            
-        # SQL Implementation:
-        # INSERT INTO GITTO_WRITEBACK_MATCHES (canonical_id, ...) VALUES (...)
-        print(f"PUSHING {len(writeback_payload)} MATCH DECISIONS TO SNOWFLAKE.")
-        return True
+WRITEBACK_SCHEMAS = {
+    MATCHES_TABLE: [
+        ("snapshot_id", "int64"),
+        ("match_id", "int64"),
+        ("canonical_id", "string"),
+        ("bank_txn_id", "int64"),
+        ("amount_reconciled", "float64"),
+        ("match_type", "string"),
+        ("gitto_sync_at", "string"),
+    ],
+    FORECAST_TABLE: [
+        ("snapshot_id", "int64"),
+        ("week_label", "string"),
+        ("start_date", "string"),
+        ("projected_cash", "float64"),
+        ("p50_inflow", "float64"),
+        ("committed_outflow", "float64"),
+        ("gitto_sync_at", "string"),
+    ],
+}
 
-    def push_forecast_snapshot(self, db: Session, snapshot_id: int):
-        """
-        Pushes a flattened version of the 13-week forecast back to Snowflake.
-        Allows BI teams to build dashboards on top of Gitto's intelligence.
-        """
-        from cash_calendar_service import get_13_week_workspace
-        workspace = get_13_week_workspace(db, snapshot_id)
-        
-        if not workspace: return False
-        
-        writeback_payload = []
-        for week in workspace['grid']:
-            writeback_payload.append({
-                "snapshot_id": snapshot_id,
-                "week_label": week['week_label'],
-                "start_date": week['start_date'],
-                "projected_cash": week['closing_cash'],
-                "p50_inflow": week['inflow_p50'],
-                "committed_outflow": week['outflow_committed'],
-                "gitto_sync_at": datetime.utcnow().isoformat()
-            })
-            
-        print(f"PUSHING {len(writeback_payload)} FORECAST ROWS TO SNOWFLAKE.")
-        return True
 
-def sync_snowflake_bi_directional(db: Session, config_id: int):
-    config = db.query(models.SnowflakeConfig).filter(models.SnowflakeConfig.id == config_id).first()
-    if not config: return False
-    
-    engine = SnowflakeSyncEngine(config)
-    
-    # 1. Pull New Data
-    new_data = engine.pull_invoices(db)
-    
-    # 2. Push Recent Decisions (Warehouse Mode)
-    engine.push_match_decisions(db, []) # Pass recent match IDs
-    
-    # 3. Update Last Sync
-    config.last_sync_at = datetime.utcnow()
-    db.commit()
-    
-    return True
+def stage_parquet(stage_dir: str, table: str, snapshot_id: int, rows: List[Dict[str, Any]]) -> str:
+    """Write one snapshot's rows for a table to a zstd-compressed Parquet file."""
+    if not HAS_ARROW:
+        raise ImportError("pyarrow not installed. Run: pip install pyarrow")
+    schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in WRITEBACK_SCHEMAS[table]])
+    arrow_table = pa.Table.from_pylist(rows, schema=schema)
+    os.makedirs(stage_dir, exist_ok=True)
+    path = os.path.join(stage_dir, f"{table.lower()}_snapshot_{snapshot_id}.parquet")
+    pq.write_table(arrow_table, path, compression="zstd")
+    return path
 
-import json
-from datetime import datetime
-from typing import List
-from secrets_manager import resolve_snowflake_password
 
-# Mock implementation of Snowflake SDK interaction
-# In a real environment, this would use snowflake.connector
+class LocalFileWarehouse:
+    """
+    File-based warehouse stand-in for offline tests.
+    Each table is a directory holding one Parquet file per snapshot; a load
+    atomically replaces the snapshot's file, mirroring DELETE + COPY INTO.
+    """
+    def __init__(self, root: str):
+        self.root = root
+
+    def copy_into(self, table: str, staged_path: str, snapshot_id: int) -> int:
+        table_dir = os.path.join(self.root, table)
+        os.makedirs(table_dir, exist_ok=True)
+        rows = pq.read_metadata(staged_path).num_rows
+        os.replace(staged_path, os.path.join(table_dir, f"snapshot_id={snapshot_id}.parquet"))
+        return rows
+
+    def read_table(self, table: str) -> List[Dict[str, Any]]:
+        table_dir = os.path.join(self.root, table)
+        if not os.path.isdir(table_dir):
+            return []
+        rows = []
+        for name in sorted(os.listdir(table_dir)):
+            rows.extend(pq.read_table(os.path.join(table_dir, name)).to_pylist())
+        return rows
+
+
+class SnowflakeWarehouse:
+    """Loads staged Parquet files into Snowflake with PUT + COPY INTO."""
+    STAGE = "@~/gitto_writeback"
+
+    def __init__(self, config: models.SnowflakeConfig, password: str):
+        self.config = config
+        self.password = password
+        self.connection = None
+
+    def _connect(self):
+        if self.connection is None:
+            import snowflake.connector
+            params = {
+                "account": self.config.account,
+                "user": self.config.user,
+                "password": self.password,
+                "warehouse": self.config.warehouse,
+                "database": self.config.database,
+                "schema": self.config.schema_name,
+            }
+            if self.config.role:
+                params["role"] = self.config.role
+            self.connection = snowflake.connector.connect(**params)
+        return self.connection
+
+    def copy_into(self, table: str, staged_path: str, snapshot_id: int) -> int:
+        cursor = self._connect().cursor()
+        stage = f"{self.STAGE}/{table}"
+        try:
+            cursor.execute(f"PUT file://{staged_path} {stage}/ AUTO_COMPRESS=FALSE OVERWRITE=TRUE")
+            cursor.execute("BEGIN")
+            cursor.execute(f"DELETE FROM {table} WHERE SNAPSHOT_ID = %s", (snapshot_id,))
+            cursor.execute(
+                f"COPY INTO {table} FROM {stage}/{os.path.basename(staged_path)} "
+                f"FILE_FORMAT = (TYPE = PARQUET) MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE PURGE = TRUE"
+            )
+            rows = sum(result[3] for result in cursor.fetchall())  # rows_loaded per file
+            cursor.execute("COMMIT")
+            return rows
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        finally:
+            cursor.close()
+            os.remove(staged_path)
+
 
 class SnowflakeSyncEngine:
-    def __init__(self, config: models.SnowflakeConfig):
+    def __init__(self, config: models.SnowflakeConfig, target=None, stage_dir: Optional[str] = None):
         self.config = config
+        self.stage_dir = stage_dir or os.path.join(tempfile.gettempdir(), "gitto_writeback")
+        self.target = target
+        if self.target is not None:
+            return
         # P1 Fix: Resolve password from environment variable
         self.password = resolve_snowflake_password(
-            config.id, 
+            config.id,
             config.password_env_var
         )
         if not self.password:
@@ -114,6 +145,7 @@ class SnowflakeSyncEngine:
                 f"Snowflake password not found. Please set environment variable "
                 f"GITTO_SNOWFLAKE_PASSWORD_{config.id} or configure password_env_var."
             )
+        self.target = SnowflakeWarehouse(config, self.password)
 
     def pull_invoices(self, db: Session):
         """Fetches raw invoice data from Snowflake tables."""
@@ -121,27 +153,58 @@ class SnowflakeSyncEngine:
         # Logic to execute SQL query based on self.config.invoice_mapping
         return []
 
-    def push_match_decisions(self, db: Session, match_ids: List[int]):
+    def _load_snapshot(self, table: str, snapshot_id: int, rows: List[Dict[str, Any]]) -> int:
+        staged = stage_parquet(self.stage_dir, table, snapshot_id, rows)
+        return self.target.copy_into(table, staged, snapshot_id)
+
+    def push_match_decisions(self, db: Session, match_ids: List[int]) -> Dict[int, int]:
         """
         Writes Gitto's reconciliation decisions back to a Snowflake sidecar table.
         This is critical for Enterprise 'Warehouse Mode'.
+
+        Every snapshot touched by match_ids is re-exported in full, so the
+        load can replace that snapshot's rows. Returns {snapshot_id: rows}.
         """
-        matches = db.query(models.ReconciliationTable).filter(models.ReconciliationTable.id.in_(match_ids)).all()
-        
-        writeback_payload = []
-        for m in matches:
-            writeback_payload.append({
-                "canonical_id": m.invoice.canonical_id,
-                "bank_txn_id": m.bank_transaction_id,
-                "amount_reconciled": m.amount_allocated,
-                "match_type": m.bank_transaction.reconciliation_type,
-                "gitto_sync_at": datetime.utcnow().isoformat()
-            })
-            
-        # SQL Implementation:
-        # INSERT INTO GITTO_WRITEBACK_MATCHES (canonical_id, ...) VALUES (...)
-        print(f"PUSHING {len(writeback_payload)} MATCH DECISIONS TO SNOWFLAKE.")
-        return True
+        if not match_ids:
+            return {}
+        snapshot_ids = [
+            sid for (sid,) in db.query(models.Invoice.snapshot_id).join(
+                models.ReconciliationTable, models.ReconciliationTable.invoice_id == models.Invoice.id
+            ).filter(models.ReconciliationTable.id.in_(match_ids)).distinct()
+        ]
+        return {sid: self.push_snapshot_match_decisions(db, sid) for sid in snapshot_ids}
+
+    def push_snapshot_match_decisions(self, db: Session, snapshot_id: int) -> int:
+        """Exports all match decisions of a snapshot in one bulk load."""
+        matches = db.query(
+            models.ReconciliationTable.id,
+            models.Invoice.canonical_id,
+            models.ReconciliationTable.bank_transaction_id,
+            models.ReconciliationTable.amount_allocated,
+            models.ReconciliationTable.match_type,
+            models.BankTransaction.reconciliation_type,
+        ).join(
+            models.Invoice, models.ReconciliationTable.invoice_id == models.Invoice.id
+        ).outerjoin(
+            models.BankTransaction, models.ReconciliationTable.bank_transaction_id == models.BankTransaction.id
+        ).filter(
+            models.Invoice.snapshot_id == snapshot_id
+        ).order_by(models.ReconciliationTable.id).all()
+
+        sync_at = datetime.utcnow().isoformat()
+        writeback_payload = [{
+            "snapshot_id": snapshot_id,
+            "match_id": m.id,
+            "canonical_id": m.canonical_id,
+            "bank_txn_id": m.bank_transaction_id,
+            "amount_reconciled": m.amount_allocated,
+            "match_type": m.match_type or m.reconciliation_type,
+            "gitto_sync_at": sync_at
+        } for m in matches]
+
+        rows = self._load_snapshot(MATCHES_TABLE, snapshot_id, writeback_payload)
+        print(f"PUSHED {rows} MATCH DECISIONS TO SNOWFLAKE (snapshot {snapshot_id}).")
+        return rows
 
     def push_forecast_snapshot(self, db: Session, snapshot_id: int):
         """
@@ -150,9 +213,10 @@ class SnowflakeSyncEngine:
         """
         from cash_calendar_service import get_13_week_workspace
         workspace = get_13_week_workspace(db, snapshot_id)
-        
+
         if not workspace: return False
-        
+
+        sync_at = datetime.utcnow().isoformat()
         writeback_payload = []
         for week in workspace['grid']:
             writeback_payload.append({
@@ -162,26 +226,27 @@ class SnowflakeSyncEngine:
                 "projected_cash": week['closing_cash'],
                 "p50_inflow": week['inflow_p50'],
                 "committed_outflow": week['outflow_committed'],
-                "gitto_sync_at": datetime.utcnow().isoformat()
+                "gitto_sync_at": sync_at
             })
-            
-        print(f"PUSHING {len(writeback_payload)} FORECAST ROWS TO SNOWFLAKE.")
+
+        rows = self._load_snapshot(FORECAST_TABLE, snapshot_id, writeback_payload)
+        print(f"PUSHED {rows} FORECAST ROWS TO SNOWFLAKE (snapshot {snapshot_id}).")
         return True
 
 def sync_snowflake_bi_directional(db: Session, config_id: int):
     config = db.query(models.SnowflakeConfig).filter(models.SnowflakeConfig.id == config_id).first()
     if not config: return False
-    
+
     engine = SnowflakeSyncEngine(config)
-    
+
     # 1. Pull New Data
     new_data = engine.pull_invoices(db)
-    
+
     # 2. Push Recent Decisions (Warehouse Mode)
     engine.push_match_decisions(db, []) # Pass recent match IDs
-    
+
     # 3. Update Last Sync
     config.last_sync_at = datetime.utcnow()
     db.commit()
-    
+
     return True
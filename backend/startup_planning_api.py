@@ -7,6 +7,7 @@ Opinionated planning endpoints for startups:
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
@@ -14,6 +15,7 @@ from pydantic import BaseModel, Field
 from decimal import Decimal
 
 from database import get_db
+from scenario_matrix import base_index_for, compare_matrix, load_planning_matrix, ndjson_lines
 from startup_planning_service import StartupPlanningService
 from startup_planning_models import (
     StartupPlanningScenario, PlanningAssumptions, HeadcountPlan,
@@ -110,6 +112,14 @@ class BranchCreate(BaseModel):
     branch_reason: str
 
 
+class MatrixCompareRequest(BaseModel):
+    """Compare many scenarios at once."""
+    scenario_ids: List[int] = Field(..., min_length=2, max_length=50)
+    base_scenario_id: Optional[int] = None
+    materiality: float = Field(10000, ge=0)
+    stream: bool = False
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # SCENARIO ENDPOINTS
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -595,6 +605,25 @@ def compare_scenarios(
         raise HTTPException(status_code=404, detail=str(e))
 
 
+@router.post("/compare/matrix")
+def compare_scenarios_matrix(data: MatrixCompareRequest, db: Session = Depends(get_db)):
+    """
+    Compare N scenarios in one pass: all pairwise deltas, ranked drivers and
+    talking points. With stream=true the result is NDJSON events.
+    """
+    try:
+        matrix = load_planning_matrix(db, data.scenario_ids)
+        comparison = compare_matrix(
+            matrix, base_index_for(matrix, data.base_scenario_id), data.materiality
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    if data.stream:
+        return StreamingResponse(ndjson_lines(comparison), media_type="application/x-ndjson")
+    return comparison.to_dict()
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # HELPER FUNCTIONS
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -0,0 +1,264 @@
+"""
+Dependency-Graph Planning Engine
+
+StartupPlanningService.generate_outputs is a chain of pure steps (revenue,
+headcount, payroll, opex, P&L, cashflow, runway, hiring capacity). Each step
+is a node here that declares the assumption fields and upstream nodes it
+reads. Changing one input (e.g. dso_days) marks only its downstream nodes
+dirty, so an edit recomputes cashflow, runway and hiring instead of the
+whole plan.
+
+Branches are copy-on-write: a branch starts with the parent's inputs and
+node results by reference and only replaces the nodes its own edits touch.
+Node results are never mutated in place, so sharing them is safe.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import threading
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# INPUTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Row attributes each step reads; snapshots compare by value, so copied branch
+# rows with the same values do not invalidate anything
+ROW_FIELDS = {
+    "revenue_drivers": (
+        "period_month", "starting_mrr", "new_mrr", "expansion_mrr", "churned_mrr",
+        "ending_mrr", "starting_customers", "new_customers", "churned_customers",
+        "ending_customers", "cac_spend",
+    ),
+    "headcount_plan": ("department", "annual_salary", "start_month", "end_month", "headcount"),
+    "vendor_commitments": ("monthly_amount", "start_date", "end_date"),
+}
+
+ASSUMPTION_FIELDS = (
+    "starting_mrr", "mrr_growth_rate_pct", "monthly_churn_rate_pct",
+    "average_contract_value", "customer_acquisition_cost",
+    "benefits_pct_of_salary", "payroll_tax_pct", "avg_salaries_by_dept_json",
+    "dso_days", "dpo_days", "annual_prepay_pct",
+    "saas_cost_per_employee", "infra_pct_of_revenue", "marketing_pct_of_new_arr",
+    "office_cost_per_employee", "starting_cash", "min_cash_buffer",
+)
+
+
+def planning_inputs(scenario, assumptions) -> Dict[str, Any]:
+    """Snapshot everything the planning steps read from a scenario"""
+    inputs = {
+        "start_month": scenario.start_month,
+        "end_month": scenario.end_month,
+    }
+    for field_name in ASSUMPTION_FIELDS:
+        inputs[field_name] = getattr(assumptions, field_name)
+    for collection, fields in ROW_FIELDS.items():
+        inputs[collection] = tuple(
+            SimpleNamespace(**{f: getattr(row, f) for f in fields})
+            for row in getattr(scenario, collection)
+        )
+    return inputs
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# NODES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass(frozen=True)
+class PlanningNode:
+    """One output step: its input keys, upstream nodes and compute function."""
+    name: str
+    inputs: Tuple[str, ...]
+    depends_on: Tuple[str, ...]
+    compute: Callable[[Any, SimpleNamespace, Dict[str, Any]], Any]
+
+
+def _months(service, view, results):
+    return service._get_month_range(view.start_month, view.end_month)
+
+
+def _revenue(service, view, results):
+    return service._compute_revenue(view, view, results["months"])
+
+
+def _headcount(service, view, results):
+    return service._compute_headcount(view, results["months"])
+
+
+def _payroll(service, view, results):
+    return service._compute_payroll(view, view, results["headcount"])
+
+
+def _opex(service, view, results):
+    return service._compute_opex(
+        view, view, results["revenue"], results["headcount"], results["months"]
+    )
+
+
+def _pnl(service, view, results):
+    return service._generate_pnl(
+        results["revenue"], results["payroll"], results["opex"], results["months"]
+    )
+
+
+def _cashflow(service, view, results):
+    return service._generate_cashflow_bridge(
+        results["pnl"], view, Decimal(str(view.starting_cash or 0))
+    )
+
+
+def _runway(service, view, results):
+    return service._compute_runway(results["cashflow"], view)
+
+
+def _hiring(service, view, results):
+    return service._compute_hiring_capacity(results["cashflow"], view, results["headcount"])
+
+
+# Topological order
+PLANNING_NODES: List[PlanningNode] = [
+    PlanningNode("months", ("start_month", "end_month"), (), _months),
+    PlanningNode(
+        "revenue",
+        ("starting_mrr", "average_contract_value", "mrr_growth_rate_pct",
+         "monthly_churn_rate_pct", "customer_acquisition_cost", "revenue_drivers"),
+        ("months",), _revenue,
+    ),
+    PlanningNode("headcount", ("headcount_plan",), ("months",), _headcount),
+    PlanningNode("payroll", ("benefits_pct_of_salary", "payroll_tax_pct"), ("headcount",), _payroll),
+    PlanningNode(
+        "opex",
+        ("saas_cost_per_employee", "infra_pct_of_revenue", "marketing_pct_of_new_arr",
+         "office_cost_per_employee", "vendor_commitments"),
+        ("revenue", "headcount", "months"), _opex,
+    ),
+    PlanningNode("pnl", (), ("revenue", "payroll", "opex", "months"), _pnl),
+    PlanningNode("cashflow", ("dso_days", "dpo_days", "annual_prepay_pct", "starting_cash"), ("pnl",), _cashflow),
+    PlanningNode("runway", ("min_cash_buffer",), ("cashflow",), _runway),
+    PlanningNode(
+        "hiring",
+        ("min_cash_buffer", "avg_salaries_by_dept_json", "benefits_pct_of_salary", "payroll_tax_pct"),
+        ("cashflow", "headcount"), _hiring,
+    ),
+]
+
+NODES_BY_NAME = {node.name: node for node in PLANNING_NODES}
+
+
+def _downstream_of_inputs() -> Dict[str, Set[str]]:
+    """input key -> every node that must recompute when it changes"""
+    children: Dict[str, Set[str]] = {node.name: set() for node in PLANNING_NODES}
+    for node in PLANNING_NODES:
+        for parent in node.depends_on:
+            children[parent].add(node.name)
+
+    closure: Dict[str, Set[str]] = {}
+    for node in reversed(PLANNING_NODES):
+        closure[node.name] = {node.name}.union(*(closure[c] for c in children[node.name]))
+
+    affected: Dict[str, Set[str]] = {}
+    for node in PLANNING_NODES:
+        for key in node.inputs:
+            affected.setdefault(key, set()).update(closure[node.name])
+    return affected
+
+
+AFFECTED_NODES = _downstream_of_inputs()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# GRAPH
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class PlanningGraph:
+    """
+    Inputs plus memoized node results for one scenario.
+
+    set_inputs() diffs against the current inputs and dirties only the
+    affected nodes; evaluate() recomputes the dirty nodes in order.
+    """
+
+    def __init__(self, inputs: Dict[str, Any]):
+        self.inputs: Dict[str, Any] = dict(inputs)
+        self.results: Dict[str, Any] = {}
+        self._dirty: Set[str] = set(NODES_BY_NAME)
+        self._lock = threading.Lock()
+        self.last_recomputed: List[str] = []
+
+    def set_inputs(self, inputs: Dict[str, Any]) -> Set[str]:
+        """Apply new input values; returns the input keys that changed."""
+        with self._lock:
+            changed = {
+                key for key, value in inputs.items()
+                if key not in self.inputs or self.inputs[key] != value
+            }
+            for key in changed:
+                self.inputs[key] = inputs[key]
+                self._dirty |= AFFECTED_NODES.get(key, set())
+            return changed
+
+    def evaluate(self, service) -> Dict[str, Any]:
+        """Recompute dirty nodes (in topological order) and return all results."""
+        with self._lock:
+            recomputed = []
+            for node in PLANNING_NODES:
+                if node.name not in self._dirty:
+                    continue
+                view = SimpleNamespace(**{key: self.inputs[key] for key in node.inputs})
+                self.results[node.name] = node.compute(service, view, self.results)
+                recomputed.append(node.name)
+            self._dirty.clear()
+            self.last_recomputed = recomputed
+            return dict(self.results)
+
+    def branch(self) -> "PlanningGraph":
+        """Copy-on-write child: shares every input and result until they change."""
+        with self._lock:
+            child = PlanningGraph.__new__(PlanningGraph)
+            child.inputs = dict(self.inputs)
+            child.results = dict(self.results)
+            child._dirty = set(self._dirty)
+            child._lock = threading.Lock()
+            child.last_recomputed = []
+            return child
+
+
+class PlanningGraphRegistry:
+    """Per-scenario graphs kept across requests (bounded LRU)."""
+
+    def __init__(self, max_scenarios: int = 128):
+        self.max_scenarios = max_scenarios
+        self._graphs: "OrderedDict[int, PlanningGraph]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, scenario_id: int) -> Optional[PlanningGraph]:
+        with self._lock:
+            graph = self._graphs.get(scenario_id)
+            if graph is not None:
+                self._graphs.move_to_end(scenario_id)
+            return graph
+
+    def put(self, scenario_id: int, graph: PlanningGraph) -> None:
+        with self._lock:
+            self._graphs[scenario_id] = graph
+            self._graphs.move_to_end(scenario_id)
+            while len(self._graphs) > self.max_scenarios:
+                self._graphs.popitem(last=False)
+
+    def branch(self, parent_id: int, child_id: int) -> Optional[PlanningGraph]:
+        parent = self.get(parent_id)
+        if parent is None:
+            return None
+        child = parent.branch()
+        self.put(child_id, child)
+        return child
+
+    def discard(self, scenario_id: int) -> None:
+        with self._lock:
+            self._graphs.pop(scenario_id, None)
+
+
+planning_graphs = PlanningGraphRegistry()
@@ -19,6 +19,7 @@ from startup_planning_models import (
     SaaSRevenueDriver, VendorCommitment, PlanningOutput, ScenarioComparison,
     PlanningScenarioStatus, Department, RevenueType, ExpenseCategory
 )
+from startup_planning_graph import PlanningGraph, planning_graphs, planning_inputs
 
 
 class StartupPlanningService:
@@ -174,6 +175,9 @@ class StartupPlanningService:
             self.db.add(new_vc)
         
         self.db.commit()
+        
+        # Branch shares the parent's computed outputs until its inputs diverge
+        planning_graphs.branch(parent_scenario_id, branch.id)
         return branch
     
     def submit_for_approval(
@@ -232,6 +236,9 @@ class StartupPlanningService:
         - Cashflow Bridge
         - Runway
         - Hiring Capacity
+        
+        Steps run through the scenario's PlanningGraph, so only steps whose
+        inputs changed since the last generation are recomputed.
         """
         scenario = self.db.query(StartupPlanningScenario).filter(
             StartupPlanningScenario.id == scenario_id
@@ -244,34 +251,23 @@ class StartupPlanningService:
         if not assumptions:
             raise ValueError(f"Scenario {scenario_id} has no assumptions")
         
-        # Get month range
-        months = self._get_month_range(scenario.start_month, scenario.end_month)
-        
-        # Compute revenue projections
-        revenue_by_month = self._compute_revenue(scenario, assumptions, months)
-        
-        # Compute headcount and payroll
-        headcount_by_month = self._compute_headcount(scenario, months)
-        payroll_by_month = self._compute_payroll(scenario, assumptions, headcount_by_month)
-        
-        # Compute other expenses
-        opex_by_month = self._compute_opex(scenario, assumptions, revenue_by_month, headcount_by_month, months)
-        
-        # Generate P&L
-        monthly_pnl = self._generate_pnl(revenue_by_month, payroll_by_month, opex_by_month, months)
-        
-        # Generate Cashflow Bridge
-        monthly_cashflow = self._generate_cashflow_bridge(
-            monthly_pnl, assumptions, Decimal(str(assumptions.starting_cash or 0))
-        )
-        
-        # Compute Runway
-        runway_analysis = self._compute_runway(monthly_cashflow, assumptions)
-        
-        # Compute Hiring Capacity
-        hiring_analysis = self._compute_hiring_capacity(
-            monthly_cashflow, assumptions, headcount_by_month
-        )
+        # Recompute only the steps downstream of changed inputs
+        inputs = planning_inputs(scenario, assumptions)
+        graph = planning_graphs.get(scenario_id)
+        if graph is None:
+            graph = PlanningGraph(inputs)
+            planning_graphs.put(scenario_id, graph)
+        else:
+            graph.set_inputs(inputs)
+        results = graph.evaluate(self)
+        
+        months = results["months"]
+        revenue_by_month = results["revenue"]
+        headcount_by_month = results["headcount"]
+        monthly_pnl = results["pnl"]
+        monthly_cashflow = results["cashflow"]
+        runway_analysis = results["runway"]
+        hiring_analysis = results["hiring"]
         
         # Get summary metrics
         last_month_pnl = monthly_pnl[-1] if monthly_pnl else {}
@@ -292,7 +288,8 @@ class StartupPlanningService:
         
         # Summary metrics
         output.runway_months = runway_analysis.get("runway_months", 0)
-        output.cash_zero_date = runway_analysis.get("cash_zero_date")
+        cash_zero_date = runway_analysis.get("cash_zero_date")
+        output.cash_zero_date = date.fromisoformat(cash_zero_date) if cash_zero_date else None
         output.max_additional_hires = hiring_analysis.get("max_total_hires", 0)
         output.hiring_capacity_details_json = hiring_analysis
         
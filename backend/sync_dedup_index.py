@@ -0,0 +1,210 @@
+"""
+Sync Idempotency Index
+
+Per-connection dedup index maintained across SyncRuns:
+- A persisted bloom filter answers "never seen" without a DB round trip
+- An exact set of raw_hash → canonical_id entries confirms bloom positives
+- Lookups are batched so a re-sync of unchanged history costs one indexed
+  query per batch instead of a failed INSERT per row
+"""
+
+from typing import Dict, Iterable, List, Optional, Set
+import hashlib
+import math
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from lineage_models import SyncDedupIndex, SyncDedupEntry
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BLOOM FILTER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter over string keys.
+
+    Uses double hashing (h1 + i*h2) on a single blake2b digest, so adding or
+    probing a key costs one hash regardless of num_hashes.
+    """
+
+    def __init__(self, num_bits: int, num_hashes: int, bits: Optional[bytes] = None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        size = (num_bits + 7) // 8
+        self.bits = bytearray(bits) if bits is not None else bytearray(size)
+        if len(self.bits) != size:
+            raise ValueError(f"Bloom filter expects {size} bytes, got {len(self.bits)}")
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float = 0.001) -> "BloomFilter":
+        """Size a filter for `capacity` keys at the given false-positive rate."""
+        capacity = max(capacity, 1)
+        num_bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        num_hashes = max(1, int(round(num_bits / capacity * math.log(2))))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.bits)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONNECTION DEDUP INDEX
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class ConnectionDedupIndex:
+    """
+    Idempotency index for one connection.
+
+    Usage within a sync:
+        index = ConnectionDedupIndex.load(db, connection_id)
+        seen = index.filter_seen([row.raw_hash for row in batch])
+        ... normalize/load rows whose hash is not in `seen` ...
+        index.add(raw_hash, canonical_id, sync_run_id)
+        index.save()
+
+    Entries are added to the session alongside the canonical records they
+    describe, so they commit (or roll back) atomically with the load.
+    """
+
+    DEFAULT_CAPACITY = 10_000
+    ERROR_RATE = 0.001
+
+    def __init__(self, db: Session, connection_id: int, state: SyncDedupIndex, bloom: BloomFilter):
+        self.db = db
+        self.connection_id = connection_id
+        self._state = state
+        self._bloom = bloom
+        self._pending: Dict[str, Optional[str]] = {}
+
+        # Metrics for the current sync
+        self.probes = 0
+        self.bloom_negatives = 0
+        self.confirmed_hits = 0
+
+    @classmethod
+    def load(cls, db: Session, connection_id: int) -> "ConnectionDedupIndex":
+        """
+        Load (or create) the index for a connection.
+
+        If the persisted filter is behind the exact set (e.g. a crash after
+        entries committed but before the filter was saved), it is rebuilt.
+        """
+        state = db.query(SyncDedupIndex).filter(
+            SyncDedupIndex.connection_id == connection_id
+        ).first()
+
+        exact_count = db.query(func.count(SyncDedupEntry.id)).filter(
+            SyncDedupEntry.connection_id == connection_id
+        ).scalar() or 0
+
+        if state is not None and state.entry_count == exact_count and exact_count <= state.capacity:
+            bloom = BloomFilter(state.bloom_num_bits, state.bloom_num_hashes, state.bloom_bits)
+            return cls(db, connection_id, state, bloom)
+
+        is_new = state is None
+        if is_new:
+            state = SyncDedupIndex(connection_id=connection_id, entry_count=0)
+
+        index = cls(db, connection_id, state, BloomFilter(1, 1))
+        index._rebuild(max(cls.DEFAULT_CAPACITY, exact_count * 2))
+        if is_new:
+            db.add(state)
+        return index
+
+    def _rebuild(self, capacity: int) -> None:
+        """Re-size the bloom filter and refill it from the exact set."""
+        self.db.flush()
+        bloom = BloomFilter.for_capacity(capacity, self.ERROR_RATE)
+        count = 0
+        rows = self.db.query(SyncDedupEntry.raw_hash).filter(
+            SyncDedupEntry.connection_id == self.connection_id
+        ).yield_per(5000)
+        for (raw_hash,) in rows:
+            bloom.add(raw_hash)
+            count += 1
+
+        self._bloom = bloom
+        self._state.capacity = capacity
+        self._state.entry_count = count
+        self._sync_state()
+
+    def _sync_state(self) -> None:
+        self._state.bloom_bits = self._bloom.to_bytes()
+        self._state.bloom_num_bits = self._bloom.num_bits
+        self._state.bloom_num_hashes = self._bloom.num_hashes
+
+    def filter_seen(self, raw_hashes: List[str]) -> Set[str]:
+        """
+        Return the subset of raw_hashes already loaded for this connection.
+
+        Bloom negatives are answered in memory; positives are confirmed with
+        a single IN query against the exact set.
+        """
+        self.probes += len(raw_hashes)
+        seen = {h for h in raw_hashes if h in self._pending}
+        candidates = [h for h in raw_hashes if h not in seen and h in self._bloom]
+        self.bloom_negatives += len(raw_hashes) - len(seen) - len(candidates)
+
+        if candidates:
+            rows = self.db.query(SyncDedupEntry.raw_hash).filter(
+                SyncDedupEntry.connection_id == self.connection_id,
+                SyncDedupEntry.raw_hash.in_(set(candidates))
+            ).all()
+            seen.update(r.raw_hash for r in rows)
+
+        self.confirmed_hits += len(seen)
+        return seen
+
+    def add(self, raw_hash: str, canonical_id: Optional[str], sync_run_id: Optional[int] = None) -> None:
+        """Record a loaded row in the exact set and the bloom filter."""
+        if raw_hash in self._pending:
+            return
+        self._pending[raw_hash] = canonical_id
+        self.db.add(SyncDedupEntry(
+            connection_id=self.connection_id,
+            raw_hash=raw_hash,
+            canonical_id=canonical_id,
+            first_sync_run_id=sync_run_id
+        ))
+        self._bloom.add(raw_hash)
+
+    def save(self) -> None:
+        """
+        Persist the bloom filter, growing it if it has passed capacity.
+
+        entry_count only advances here, so a sync that commits entries but
+        dies before save() leaves the count behind and forces a rebuild.
+        """
+        entry_count = (self._state.entry_count or 0) + len(self._pending)
+        if entry_count > self._state.capacity:
+            self._rebuild(entry_count * 2)
+        else:
+            self._state.entry_count = entry_count
+            self._sync_state()
+        self._pending.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Probe metrics for the sync run summary."""
+        return {
+            "probes": self.probes,
+            "bloom_negatives": self.bloom_negatives,
+            "confirmed_hits": self.confirmed_hits,
+            "index_size": (self._state.entry_count or 0) + len(self._pending),
+        }
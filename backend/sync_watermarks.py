@@ -0,0 +1,107 @@
+"""
+Incremental Sync Watermarks
+
+Per-(connection, object type) high-water marks:
+- Connectors receive the committed watermarks before extract()
+- The loader observes each row's watermark and advances the store in the
+  same transaction as the batch it came from
+- A sync that crashes mid-way resumes from its last committed batch
+"""
+
+from typing import Dict, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from lineage_models import SyncWatermark
+
+
+class WatermarkStore:
+    """
+    Watermarks for one connection.
+
+    Usage within a sync:
+        store = WatermarkStore(db, connection_id)
+        connector.set_watermarks(store.load())
+        ... per loaded row: store.observe(object_type, value) ...
+        store.advance(sync_run_id)   # before each batch commit
+        db.commit()
+
+    Rows that fail to load block their object type: its watermark stops
+    advancing for the rest of the run so the failed rows are re-extracted
+    next time.
+    """
+
+    def __init__(self, db: Session, connection_id: int):
+        self.db = db
+        self.connection_id = connection_id
+        self._rows: Dict[str, SyncWatermark] = {}
+        self._pending: Dict[str, str] = {}
+        self._blocked: Set[str] = set()
+
+    def load(self) -> Dict[str, str]:
+        """Return committed watermarks as {object_type: watermark}."""
+        rows = self.db.query(SyncWatermark).filter(
+            SyncWatermark.connection_id == self.connection_id
+        ).all()
+        self._rows = {r.object_type: r for r in rows}
+        return {r.object_type: r.watermark for r in rows}
+
+    def current(self) -> Dict[str, str]:
+        """Watermarks as staged in this session (committed or not)."""
+        return {object_type: row.watermark for object_type, row in self._rows.items()}
+
+    def get(self, object_type: str) -> Optional[str]:
+        row = self._rows.get(object_type)
+        return row.watermark if row else None
+
+    def observe(self, object_type: str, watermark: Optional[str]) -> None:
+        """Record a successfully loaded row's watermark."""
+        if watermark is None or object_type in self._blocked:
+            return
+        current = self._pending.get(object_type)
+        if current is None or watermark > current:
+            self._pending[object_type] = watermark
+
+    def block(self, object_type: str) -> None:
+        """Stop advancing an object type for the rest of this run."""
+        self._blocked.add(object_type)
+        self._pending.pop(object_type, None)
+
+    def advance(self, sync_run_id: Optional[int] = None) -> Dict[str, str]:
+        """
+        Stage pending watermarks in the session (never moving backwards).
+
+        The caller commits, so the watermark lands atomically with the
+        batch that produced it. Returns the watermarks that moved.
+        """
+        moved = {}
+        for object_type, watermark in self._pending.items():
+            row = self._rows.get(object_type)
+            if row is None:
+                row = SyncWatermark(
+                    connection_id=self.connection_id,
+                    object_type=object_type,
+                    watermark=watermark,
+                    sync_run_id=sync_run_id
+                )
+                self.db.add(row)
+                self._rows[object_type] = row
+                moved[object_type] = watermark
+            elif watermark > row.watermark:
+                row.watermark = watermark
+                row.sync_run_id = sync_run_id
+                moved[object_type] = watermark
+        self._pending.clear()
+        return moved
+
+    def reset(self, object_type: Optional[str] = None) -> int:
+        """Delete watermarks (one type or all) to force a full re-extract."""
+        query = self.db.query(SyncWatermark).filter(
+            SyncWatermark.connection_id == self.connection_id
+        )
+        if object_type is not None:
+            query = query.filter(SyncWatermark.object_type == object_type)
+        deleted = query.delete(synchronize_session=False)
+        self.db.commit()
+        self._rows = {}
+        return deleted
@@ -0,0 +1,197 @@
+"""
+Tests for the FP&A agent audit log (agents/audit_log.py)
+
+Verifies:
+1. log() never writes synchronously; the sink batches on size and time
+2. Reads merge written and not-yet-written entries without duplicates
+3. Indexed filters and grouped stats match the in-memory equivalents
+4. The ring buffer is bounded and failed writes are retried
+"""
+
+import time
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from agents.audit_log import AuditAction, AuditLog, AuditSeverity, AuditSink, get_audit_sink
+
+
+@pytest.fixture
+def audit_sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}", connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _written(sessions):
+    db = sessions()
+    try:
+        return db.query(models.AgentAuditEntry).count()
+    finally:
+        db.close()
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def _log_workflow(audit, name="morning_briefing", tokens=0):
+    audit.log_workflow_start(name, triggered_by="schedule")
+    if tokens:
+        audit.log_llm_query("narrative", tokens, "gpt-4o")
+    audit.log(
+        action=AuditAction.ANOMALY_DETECTED, description="Spike", severity=AuditSeverity.WARNING,
+        workflow_name=name, amount_involved=Decimal("1234.56"), currency="EUR",
+    )
+    audit.log_workflow_failed(name, error="boom", duration_ms=12)
+
+
+class TestWriteBehind:
+
+    def test_log_does_not_write_until_batch_or_interval(self, audit_sessions):
+        sink = AuditSink(audit_sessions, batch_size=1000, flush_interval=60)
+        audit = AuditLog(None, entity_id=1, sink=sink)
+        _log_workflow(audit)
+
+        assert _written(audit_sessions) == 0
+        assert len(audit.get_entries()) == 3  # Served from the pending queue
+
+        assert sink.flush() == 3
+        assert _written(audit_sessions) == 3
+        assert len(audit.get_entries()) == 3
+        sink.close()
+
+    def test_batch_size_triggers_background_flush(self, audit_sessions):
+        sink = AuditSink(audit_sessions, batch_size=6, flush_interval=60)
+        audit = AuditLog(None, entity_id=1, sink=sink)
+        _log_workflow(audit)
+        _log_workflow(audit)
+
+        assert _wait_for(lambda: _written(audit_sessions) == 6)
+        assert sink.get_stats() == {"pending": 0, "written": 6, "dropped": 0, "failed_flushes": 0}
+        sink.close()
+
+    def test_interval_triggers_background_flush(self, audit_sessions):
+        sink = AuditSink(audit_sessions, batch_size=1000, flush_interval=0.05)
+        AuditLog(None, entity_id=1, sink=sink).log(AuditAction.ALERT_TRIGGERED, "Low cash")
+        assert _wait_for(lambda: _written(audit_sessions) == 1)
+        sink.close()
+
+    def test_failed_write_is_retried(self, audit_sessions):
+        calls = {"n": 0}
+
+        def flaky():
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise RuntimeError("database unavailable")
+            return audit_sessions()
+
+        sink = AuditSink(flaky, batch_size=1000, flush_interval=60)
+        audit = AuditLog(None, entity_id=1, sink=sink)
+        _log_workflow(audit)
+
+        assert sink.flush() == 0
+        assert sink.get_stats()["pending"] == 3
+        assert sink.flush() == 3
+        assert _written(audit_sessions) == 3
+        sink.close()
+
+    def test_close_flushes_remaining(self, audit_sessions):
+        sink = AuditSink(audit_sessions, batch_size=1000, flush_interval=60)
+        _log_workflow(AuditLog(None, entity_id=1, sink=sink))
+        sink.close()
+        assert _written(audit_sessions) == 3
+
+
+class TestReads:
+
+    def test_filters_and_round_trip(self, audit_sessions):
+        sink = AuditSink(audit_sessions, batch_size=1000, flush_interval=60)
+        audit = AuditLog(None, entity_id=1, sink=sink)
+        other = AuditLog(None, entity_id=2, sink=sink)
+        _log_workflow(audit, "morning_briefing")
+        _log_workflow(audit, "weekly_meeting_prep")
+        _log_workflow(other, "morning_briefing")
+        correlation = audit.get_recent(1)[0].correlation_id
+        sink.flush()
+        _log_workflow(audit, "morning_briefing")  # Still pending
+
+        assert len(audit.get_entries(limit=100)) == 9
+        assert len(audit.get_entries(workflow_name="morning_briefing")) == 6
+        assert len(audit.get_entries(action=AuditAction.WORKFLOW_FAILED)) == 3
+        assert len(audit.get_entries(severity=AuditSeverity.WARNING)) == 3
+        assert len(audit.get_entries(correlation_id=correlation)) == 3
+        assert len(audit.get_entries(since=datetime.utcnow() + timedelta(minutes=1))) == 0
+
+        anomaly = audit.get_entries(action=AuditAction.ANOMALY_DETECTED, limit=3)[-1]
+        assert anomaly.amount_involved == Decimal("1234.56") and anomaly.currency == "EUR"
+        timestamps = [e.timestamp for e in audit.get_entries()]
+        assert timestamps == sorted(timestamps, reverse=True)
+        sink.close()
+
+    def test_stats_match_in_memory_summary(self, audit_sessions):
+        sink = AuditSink(audit_sessions, batch_size=1000, flush_interval=60)
+        audit = AuditLog(None, entity_id=1, sink=sink, ring_size=100)
+        _log_workflow(audit, tokens=500)
+        sink.flush()
+        _log_workflow(audit, tokens=250)
+
+        stats = audit.get_stats()
+        expected = AuditLog._summarize(list(audit._entries))
+        assert stats == expected
+        assert stats["total_entries"] == 8
+        assert stats["errors"] == 2
+        assert stats["total_llm_tokens"] == 750
+        sink.close()
+
+    def test_ring_buffer_is_bounded(self, audit_sessions):
+        sink = AuditSink(audit_sessions, batch_size=1000, flush_interval=60)
+        audit = AuditLog(None, entity_id=1, sink=sink, ring_size=3)
+        for i in range(10):
+            audit.log(AuditAction.ALERT_TRIGGERED, f"Alert {i}")
+
+        assert [e.description for e in audit.get_recent()] == ["Alert 9", "Alert 8", "Alert 7"]
+        assert len(audit.get_entries(limit=100)) == 10
+        sink.close()
+
+    def test_in_memory_database_stays_in_memory(self, db_session):
+        assert get_audit_sink(db_session) is None
+        audit = AuditLog(db_session, entity_id=1)
+        _log_workflow(audit, tokens=100)
+        assert len(audit.get_entries()) == 4
+        assert audit.get_stats()["total_llm_tokens"] == 100
+
+    def test_shared_connection_database_stays_in_memory(self, tmp_path):
+        """A writer thread on a StaticPool engine would commit or roll back other sessions' work"""
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'shared.db'}", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        models.Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        db = Session()
+        try:
+            assert get_audit_sink(db) is None
+            db.add(models.Entity(name="Uncommitted", currency="EUR"))
+            db.flush()
+            _log_workflow(AuditLog(db, entity_id=1))
+            db.rollback()
+            assert db.query(models.Entity).count() == 0
+            assert db.query(models.AgentAuditEntry).count() == 0
+        finally:
+            db.close()
+            engine.dispose()
@@ -0,0 +1,254 @@
+"""
+Tests for the conversation context cache (agents/context_cache.py)
+
+Verifies:
+1. TTL expiry, LRU eviction and snapshot-scoped invalidation
+2. Concurrent loads of one key run once; failures are not cached
+3. A load that races an invalidation is not stored
+4. QuestionAnsweringWorkflow reuses contexts across follow-ups, reports hits,
+   prefetches what the suggested follow-ups need and drops everything when
+   the latest snapshot changes or a write event is published
+5. The /ask-insights endpoint shares the cache across a conversation's
+   follow-up questions
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from datetime import datetime
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models
+from agents import context_cache as context_cache_module
+from agents.context_cache import ContextCache
+from agents.orchestrator import FPAOrchestrator, publish_event
+from agents.workflows import register_all_workflows
+from agents.workflows import question_answering
+
+
+class Clock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CACHE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestContextCache:
+
+    def test_ttl_lru_and_sources(self):
+        clock = Clock()
+        cache = ContextCache(max_entries=2, ttl_seconds=10, clock=clock)
+        a, b, c = (ContextCache.make_key(1, 7, name) for name in "abc")
+
+        assert cache.get_or_load(a, lambda: "A") == ("A", "loaded")
+        assert cache.get_or_load(a, lambda: "other") == ("A", "cache")
+        cache.get_or_load(b, lambda: "B")
+        cache.get_or_load(a, lambda: "A")  # a is now most recently used
+        cache.get_or_load(c, lambda: "C")
+        assert cache.get(b) is None and cache.get(a) == "A"
+
+        clock.now = 10
+        assert cache.get(a) is None
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1 and stats["expirations"] == 1
+
+    def test_invalidation_by_snapshot_and_on_snapshot_change(self):
+        cache = ContextCache(ttl_seconds=60)
+        for entity_id, snapshot_id in [(1, 7), (1, 8), (2, 7)]:
+            cache.get_or_load(ContextCache.make_key(entity_id, snapshot_id, "fx"), lambda: "x")
+
+        assert cache.invalidate(1, snapshot_id=7) == 1
+        assert cache.contains(ContextCache.make_key(1, 8, "fx"))
+
+        assert not cache.observe_snapshot(1, 8)  # First sighting
+        assert not cache.observe_snapshot(1, 8)
+        assert cache.observe_snapshot(1, 9)
+        assert not cache.contains(ContextCache.make_key(1, 8, "fx"))
+        assert cache.contains(ContextCache.make_key(2, 7, "fx"))
+
+    def test_concurrent_loads_run_once(self):
+        cache = ContextCache(ttl_seconds=60)
+        key = ContextCache.make_key(1, 7, "variance_narrative")
+        calls, results = [], []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.05)
+            return {"variance": 10}
+
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_load(key, slow))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert sorted(source for _, source in results) == ["joined"] * 4 + ["loaded"]
+        assert cache.get_stats()["in_flight"] == 0
+
+    def test_failures_are_not_cached(self):
+        cache = ContextCache(ttl_seconds=60)
+        key = ContextCache.make_key(1, 7, "fx")
+
+        def failing():
+            raise RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_load(key, failing)
+        assert cache.get_or_load(key, lambda: "ok") == ("ok", "loaded")
+
+    def test_load_racing_an_invalidation_is_not_stored(self):
+        cache = ContextCache(ttl_seconds=60)
+        key = ContextCache.make_key(1, 7, "forecast")
+
+        def load():
+            cache.invalidate(1)  # A write lands while the old data is being read
+            return "old"
+
+        assert cache.get_or_load(key, load) == ("old", "loaded")
+        assert cache.get(key) is None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# QUESTION ANSWERING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ContextCache(ttl_seconds=600)
+    monkeypatch.setattr(context_cache_module, "_context_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'qa.db'}", connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(models.Entity(id=1, name="Test Entity", currency="EUR"))
+    db.add(models.BankAccount(id=1, entity_id=1, account_name="Main", currency="EUR"))
+    db.add(models.Snapshot(id=1, name="Week 1", entity_id=1, total_rows=0, created_at=datetime.utcnow()))
+    db.commit()
+    db.close()
+    yield Session
+    engine.dispose()
+
+
+@pytest.fixture
+def orchestrator(sessions):
+    orchestrator = FPAOrchestrator(sessions(), entity_id=1, autonomous_mode=False, session_factory=sessions)
+    register_all_workflows(orchestrator)
+    yield orchestrator
+    orchestrator.executor.shutdown()
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Counts calls to every context loader"""
+    counts = {}
+    for name, loader in list(question_answering.CONTEXT_LOADERS.items()):
+        def counted(db, entity_id, snapshot_id, name=name, loader=loader):
+            counts[name] = counts.get(name, 0) + 1
+            return loader(db, entity_id, snapshot_id)
+        monkeypatch.setitem(question_answering.CONTEXT_LOADERS, name, counted)
+    return counts
+
+
+def _ask(orchestrator, question, conversation_id="conv-1"):
+    return asyncio.run(orchestrator.ask_question(question, user_id="cfo", conversation_id=conversation_id))
+
+
+def _wait_for(cache, *names, entity_id=1, snapshot_id=1):
+    for _ in range(200):
+        if all(cache.get(ContextCache.make_key(entity_id, snapshot_id, name)) is not None for name in names):
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"{names} were not prefetched")
+
+
+class TestQuestionAnswering:
+
+    def test_follow_up_reuses_contexts(self, cache, orchestrator, loads):
+        first = _ask(orchestrator, "What's our runway?")
+        assert first["context_cache"]["misses"] == ["cash_position", "forecast", "runway"]
+        assert first["context_cache"]["hits"] == []
+
+        second = _ask(orchestrator, "How long will our cash last?")
+        assert second["context_cache"]["hits"] == ["cash_position", "forecast", "runway"]
+        assert second["context_cache"]["conversation"] == {"questions": 2, "hits": 3, "misses": 3}
+        assert second["answer"] == first["answer"]
+        assert loads["runway"] == 1 and loads["cash_position"] == 1
+
+    def test_follow_ups_are_prefetched(self, cache, orchestrator, loads):
+        first = _ask(orchestrator, "Why is cash down this week?")
+        assert "What's our forecast for next week?" in first["follow_up_questions"]
+        assert {"accuracy", "forecast"} <= set(first["context_cache"]["prefetching"])
+        assert "cash_position" not in first["context_cache"]["prefetching"]  # Already cached
+        _wait_for(cache, "accuracy", "forecast")
+
+        follow_up = _ask(orchestrator, "What's our forecast for next week?")
+        assert follow_up["context_cache"]["misses"] == []
+        assert follow_up["context_cache"]["sources"] == {
+            "cash_position": "cache", "accuracy": "prefetched", "forecast": "prefetched",
+        }
+        assert loads["accuracy"] == 1 and loads["forecast"] == 1
+
+    def test_new_snapshot_and_write_events_invalidate(self, cache, sessions, orchestrator, loads):
+        _ask(orchestrator, "What's our runway?")
+
+        publish_event(1, "reconciliation_updated", {})
+        assert _ask(orchestrator, "What's our runway?")["context_cache"]["hits"] == []
+
+        db = sessions()
+        db.add(models.Snapshot(id=2, name="Week 2", entity_id=1, total_rows=0, created_at=datetime.utcnow()))
+        db.commit()
+        db.close()
+
+        result = _ask(orchestrator, "What's our runway?")
+        assert result["context_cache"]["hits"] == []
+        assert loads["runway"] == 3
+        assert not cache.contains(ContextCache.make_key(1, 1, "runway"))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ASK-INSIGHTS ENDPOINT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestAskInsights:
+
+    def test_follow_ups_hit_the_cache(self, cache, sessions):
+        import main
+        db = sessions()
+        ask = lambda query: main.ask_insights(
+            snapshot_id=1, entity_id=1, query=query, conversation_id="conv-1", db=db,
+        )["context_cache"]
+
+        first = ask("What is our currency exposure?")
+        assert (first["misses"], first["hits"]) == (["fx_exposure"], [])
+        assert first["prefetching"] == ["dispute_risk"]
+        _wait_for(cache, "dispute_risk")
+
+        risk = ask("Which invoices carry dispute risk?")
+        assert risk["sources"] == {"dispute_risk": "prefetched"}
+        assert risk["prefetching"] == []  # FX exposure is already cached
+
+        again = ask("What is our currency exposure?")
+        assert again["hits"] == ["fx_exposure"]
+        assert again["conversation"] == {"questions": 3, "hits": 2, "misses": 1}
+
+        publish_event(1, "reconciliation_updated", {})
+        assert ask("What is our currency exposure?")["misses"] == ["fx_exposure"]
+        db.close()
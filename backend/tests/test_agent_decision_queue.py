@@ -0,0 +1,237 @@
+"""
+Tests for the FP&A agent Decision Queue (agents/decision_queue.py)
+
+Verifies:
+1. Decisions survive a new queue instance and round-trip through the database
+2. Pending decisions come back critical first, then oldest first
+3. Expiry and escalation pop the shared heaps and skip resolved decisions
+4. Two queues on the same entity cannot both resolve a decision
+5. Decisions and resolutions stay in step with FPADecisionQueue
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models
+import fpa_models
+from agents.decision_queue import DecisionQueue, create_reconciliation_escalation_decision, get_decision_index
+from agents.models.decisions import Decision, DecisionCategory, DecisionOption, DecisionPriority, DecisionStatus
+from fpa_decision_queue import FPADecisionQueue, DecisionOption as FPAOption
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'decisions.db'}", connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(engine)
+    fpa_models.create_fpa_tables(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(models.Entity(id=1, name="Test Entity", currency="EUR"))
+    db.commit()
+    db.close()
+    yield Session
+    engine.dispose()
+
+
+def _decision(priority=DecisionPriority.HIGH, created_at=None, expires_at=None, amount="25000.50"):
+    decision = Decision.create(
+        title=f"{priority.value} decision",
+        description="Needs a call",
+        category=DecisionCategory.PAYMENT_TIMING,
+        priority=priority,
+        entity_id=1,
+        amount_at_stake=Decimal(amount),
+        options=[
+            DecisionOption(
+                id="delay", label="A) Delay", description="Delay the payment", risk_level="low",
+                risk_explanation="Vendor is flexible", impact_amount=Decimal(amount),
+                impact_description="Keeps cash above minimum", recommended=True,
+            ),
+            DecisionOption(
+                id="pay", label="B) Pay", description="Pay on time", risk_level="medium",
+                risk_explanation="Cash dips", impact_amount=Decimal("0"), impact_description="No change",
+            ),
+        ],
+        recommended_option_ids=["delay"],
+        recommendation_reasoning="Cheapest option",
+        expires_at=expires_at,
+    )
+    if created_at:
+        decision.created_at = created_at
+    return decision
+
+
+class TestPersistence:
+
+    def test_decisions_survive_a_new_queue(self, sessions):
+        queue = DecisionQueue(sessions(), entity_id=1)
+        added = queue.add_decision(_decision(expires_at=datetime(2030, 1, 1)))
+
+        reloaded = DecisionQueue(sessions(), entity_id=1).get_decision(added.id)
+        assert reloaded.to_dict() == added.to_dict()
+        assert DecisionQueue(sessions(), entity_id=2).get_decision(added.id) is None
+
+    def test_pending_ordered_by_priority_then_age(self, sessions):
+        queue = DecisionQueue(sessions(), entity_id=1)
+        now = datetime.utcnow()
+        low = queue.add_decision(_decision(DecisionPriority.LOW, created_at=now - timedelta(hours=5)))
+        high_new = queue.add_decision(_decision(DecisionPriority.HIGH, created_at=now))
+        high_old = queue.add_decision(_decision(DecisionPriority.HIGH, created_at=now - timedelta(hours=1)))
+        critical = queue.add_decision(_decision(DecisionPriority.CRITICAL, created_at=now))
+
+        assert [d.id for d in queue.get_pending_decisions()] == [critical.id, high_old.id, high_new.id, low.id]
+        assert [d.id for d in queue.get_pending_decisions(priority=DecisionPriority.HIGH, limit=1)] == [high_old.id]
+
+    def test_approval_and_stats(self, sessions):
+        queue = DecisionQueue(sessions(), entity_id=1)
+        first = queue.add_decision(_decision(amount="100.25"))
+        queue.add_decision(_decision(DecisionPriority.LOW, amount="50"))
+        queue.approve_decision(first.id, "cfo", ["delay"], notes="ok")
+
+        stats = DecisionQueue(sessions(), entity_id=1).get_stats()
+        assert stats["total_decisions"] == 2
+        assert stats["pending"] == 1
+        assert stats["pending_by_priority"] == {"critical": 0, "high": 0, "medium": 0, "low": 1}
+        assert stats["approved_today"] == 1
+        assert stats["total_amount_pending"] == "50"
+
+        with pytest.raises(ValueError):
+            queue.approve_decision(first.id, "cfo", ["delay"])
+
+    def test_second_queue_cannot_resolve_twice(self, sessions):
+        added = DecisionQueue(sessions(), entity_id=1).add_decision(_decision())
+        first, second = DecisionQueue(sessions(), entity_id=1), DecisionQueue(sessions(), entity_id=1)
+        stale = second.get_decision(added.id)
+
+        first.dismiss_decision(added.id, "controller", "Handled offline")
+        second.get_decision = lambda decision_id: stale  # Read before the dismissal landed
+        with pytest.raises(ValueError):
+            second.approve_decision(added.id, "cfo", ["delay"])
+        assert first.get_decision(added.id).status == DecisionStatus.DISMISSED
+
+
+class TestIndex:
+
+    def test_expiry_pops_only_due_pending_decisions(self, sessions):
+        queue = DecisionQueue(sessions(), entity_id=1)
+        now = datetime.utcnow()
+        due = queue.add_decision(_decision(expires_at=now - timedelta(minutes=1)))
+        resolved = queue.add_decision(_decision(expires_at=now - timedelta(minutes=2)))
+        later = queue.add_decision(_decision(expires_at=now + timedelta(days=1)))
+        queue.dismiss_decision(resolved.id, "controller")
+
+        expired = queue.expire_old_decisions()
+        assert [d.id for d in expired] == [due.id]
+        assert queue.get_decision(due.id).status == DecisionStatus.EXPIRED
+        assert queue.get_decision(later.id).status == DecisionStatus.PENDING
+        assert queue._index.size()["expiry"] == 1
+        assert queue.expire_old_decisions() == []
+
+    def test_index_is_shared_and_picks_up_other_writers(self, sessions):
+        first = DecisionQueue(sessions(), entity_id=1)
+        second = DecisionQueue(sessions(), entity_id=1)
+        assert first._index is second._index is get_decision_index(sessions(), 1)
+
+        old = datetime.utcnow() - timedelta(hours=30)
+        first.get_decisions_needing_escalation()  # Index loaded while empty
+        overdue = second.add_decision(_decision(created_at=old))
+        second.add_decision(_decision())
+
+        assert [d.id for d in first.get_decisions_needing_escalation()] == [overdue.id]
+        assert [d.id for d in first.get_decisions_needing_escalation()] == [overdue.id]  # Still pending
+
+        second.approve_decision(overdue.id, "cfo", ["delay"])
+        assert first.get_decisions_needing_escalation() == []
+        assert first._index.size()["overdue"] == 0
+
+    def test_index_rebuilt_from_pending_rows(self, sessions):
+        queue = DecisionQueue(sessions(), entity_id=1)
+        old = datetime.utcnow() - timedelta(hours=30)
+        pending = queue.add_decision(_decision(created_at=old, expires_at=datetime.utcnow() - timedelta(seconds=1)))
+        done = queue.add_decision(_decision(created_at=old))
+        queue.dismiss_decision(done.id, "controller")
+
+        index = get_decision_index(sessions(), 1)
+        index.__init__(1)  # As after a restart
+        with index.lock:
+            queue._load_decisions()
+        assert index.size() == {"expiry": 1, "escalation": 1, "overdue": 0}
+        assert [d.id for d in queue.expire_old_decisions()] == [pending.id]
+
+
+class TestFPAReconciliation:
+
+    def test_agent_decisions_are_mirrored(self, sessions):
+        db = sessions()
+        queue = DecisionQueue(db, entity_id=1)
+        decision = queue.add_decision(_decision(DecisionPriority.CRITICAL))
+
+        fpa_queue = FPADecisionQueue(db)
+        [mirrored] = fpa_queue.get_pending_decisions(entity_id=1)
+        assert mirrored.severity == "critical"
+        assert [o["key"] for o in mirrored.options_json] == ["delay", "pay"]
+
+        queue.approve_decision(decision.id, "cfo", ["pay"])
+        db.refresh(mirrored)
+        assert mirrored.status == "approved"
+        assert [a.option_selected for a in mirrored.approvals] == ["pay"]
+        assert fpa_queue.get_pending_decisions(entity_id=1) == []
+
+    def test_fpa_resolution_reaches_the_agent_queue(self, sessions):
+        db = sessions()
+        decision = DecisionQueue(db, entity_id=1).add_decision(_decision())
+        fpa_queue = FPADecisionQueue(db)
+        [mirrored] = fpa_queue.get_pending_decisions(entity_id=1)
+
+        fpa_queue.process_approval(mirrored.id, "u1", "fp&a_manager", "delay", note="fine")
+
+        resolved = DecisionQueue(sessions(), entity_id=1).get_decision(decision.id)
+        assert resolved.status == DecisionStatus.APPROVED
+        assert resolved.approval.approved_by == "u1"
+        assert resolved.approval.selected_options == ["delay"]
+
+    def test_fpa_decisions_appear_in_the_agent_queue(self, sessions):
+        db = sessions()
+        fpa_queue = FPADecisionQueue(db)
+        fpa_decision = fpa_queue.create_decision(
+            entity_id=1,
+            decision_type="data_quality",
+            title="Duplicate invoices",
+            description="Three invoices share a number",
+            options=[FPAOption(key="merge", label="Merge", description="Merge duplicates", is_recommended=True),
+                     FPAOption(key="keep", label="Keep", description="Keep all")],
+            context={"severity": "low"},
+            recommended_option="merge",
+        )
+
+        queue = DecisionQueue(sessions(), entity_id=1)
+        [pending] = queue.get_pending_decisions()
+        assert pending.title == "Duplicate invoices"
+        assert pending.category == DecisionCategory.OTHER
+        assert pending.recommended_option_ids == ["merge"]
+        assert queue.get_stats()["pending"] == 1
+
+        fpa_queue.dismiss_decision(fpa_decision.id, "u2", "Not duplicates")
+        assert queue.get_pending_decisions() == []
+        assert queue.get_decision(pending.id).status == DecisionStatus.DISMISSED
+        assert len(fpa_queue.get_pending_decisions(entity_id=1)) == 0
+
+    def test_auto_approved_decisions_mirror_as_resolved(self, sessions):
+        db = sessions()
+        decision = create_reconciliation_escalation_decision(
+            entity_id=1, unmatched_items=[{"id": 7}], total_amount=Decimal("500"), days_aged=30,
+        )
+        DecisionQueue(db, entity_id=1).add_decision(decision)
+
+        [mirrored] = db.query(fpa_models.FPADecision).all()
+        assert mirrored.status == "auto_approved" and mirrored.resolved_at is not None
+        assert mirrored.decision_type == "reconciliation_escalation"
+        assert [(a.user_id, a.option_selected) for a in mirrored.approvals] == [("system", "escalate")]
@@ -0,0 +1,122 @@
+"""
+Tests for the FP&A Worker Executor (agents/executor.py)
+
+Verifies:
+1. Independent steps run concurrently on pool threads, each with its own session
+2. Single-connection SQLite engines fall back to one thread and the caller's session
+3. Workflow steps fanned out through the orchestrator are timed on the WorkflowRun
+4. Weekly meeting prep runs end to end when runway and accuracy are missing
+"""
+
+import asyncio
+import threading
+import pytest
+from datetime import datetime
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models
+from agents.executor import WorkerExecutor, current_run
+from agents.models.briefings import WeeklyPack
+from agents.orchestrator import FPAOrchestrator, WorkflowStatus
+from agents.workflows import register_all_workflows
+
+
+@pytest.fixture
+def file_db(tmp_path):
+    """File-backed SQLite so the executor can open a session per step"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'agents.db'}", connect_args={"check_same_thread": False}
+    )
+    models.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    session.add(models.Entity(id=1, name="Test Entity", currency="EUR"))
+    session.add(models.Snapshot(name="Week 1", entity_id=1, total_rows=0, created_at=datetime.utcnow()))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+class TestWorkerExecutor:
+
+    def test_steps_run_concurrently_with_own_sessions(self, file_db):
+        executor = WorkerExecutor(file_db, max_workers=3)
+        barrier = threading.Barrier(3, timeout=5)
+
+        def step(db):
+            barrier.wait()  # Only passes if all three steps are in flight at once
+            return threading.current_thread().name, id(db)
+
+        results = asyncio.run(executor.gather({"a": step, "b": step, "c": step}))
+        executor.shutdown()
+
+        assert list(results) == ["a", "b", "c"]
+        assert all(name.startswith("fpa-worker") for name, _ in results.values())
+        sessions = {session_id for _, session_id in results.values()}
+        assert len(sessions) == 3 and id(file_db) not in sessions
+
+    def test_single_connection_sqlite_shares_callers_session(self, db_session):
+        executor = WorkerExecutor(db_session)
+        results = asyncio.run(executor.gather({"a": lambda db: db, "b": lambda db: db}))
+        executor.shutdown()
+
+        assert executor.max_workers == 1
+        assert results == {"a": db_session, "b": db_session}
+
+    def test_failed_step_propagates_and_is_timed(self, file_db):
+        executor = WorkerExecutor(file_db, max_workers=2)
+
+        class Run:
+            step_timings = {}
+
+        async def go():
+            current_run.set(Run)
+            await executor.run("boom", lambda db: 1 / 0)
+
+        with pytest.raises(ZeroDivisionError):
+            asyncio.run(go())
+        executor.shutdown()
+        assert "boom" in Run.step_timings
+
+
+class TestOrchestratorIntegration:
+
+    def test_workflow_steps_are_timed_on_the_run(self, file_db):
+        orchestrator = FPAOrchestrator(file_db, entity_id=1, autonomous_mode=False, max_workers=2)
+
+        async def snapshot_counts(orchestrator, entity_id, **kwargs):
+            return await orchestrator.executor.gather({
+                "entities": lambda db: db.query(models.Entity).count(),
+                "snapshots": lambda db: db.query(models.Snapshot).filter_by(entity_id=entity_id).count(),
+            })
+
+        orchestrator.register_workflow("snapshot_counts", snapshot_counts)
+        result = asyncio.run(orchestrator.run_workflow("snapshot_counts"))
+        orchestrator.executor.shutdown()
+
+        assert result == {"entities": 1, "snapshots": 1}
+        run = orchestrator._workflow_runs[-1]
+        assert run.status == WorkflowStatus.COMPLETED
+        assert set(run.step_timings) == {"entities", "snapshots"}
+        assert orchestrator.get_status()["recent_runs"][-1]["step_timings_ms"] == run.step_timings
+        assert current_run.get() is None
+
+    def test_weekly_meeting_prep_with_one_snapshot(self, file_db):
+        orchestrator = FPAOrchestrator(file_db, entity_id=1, autonomous_mode=False, max_workers=2)
+        register_all_workflows(orchestrator)
+        pack = asyncio.run(orchestrator.run_workflow("weekly_meeting_prep"))
+        orchestrator.executor.shutdown()
+
+        assert isinstance(pack, WeeklyPack), pack
+        assert pack.forecast_accuracy_pct is None  # Needs two snapshots
+        assert "Forecast accuracy: not available" in [p.headline for p in pack.talking_points]
+        assert "Forecast accuracy: not available" in pack.executive_summary
+        assert orchestrator._workflow_runs[-1].status == WorkflowStatus.COMPLETED
+        assert set(orchestrator._workflow_runs[-1].step_timings) >= {"runway", "forecast_accuracy"}
@@ -0,0 +1,285 @@
+"""
+Tests for the LLM call layer (agents/reasoning/llm_cache.py, llm_client.py)
+
+Verifies:
+1. Cache keys, TTL expiry and LRU eviction
+2. Identical in-flight requests are coalesced; failures are not cached
+3. The limiter caps concurrency and holds calls back when the token budget is spent
+4. FPALLMClient against a local OpenAI-compatible stub server: caching,
+   coalescing and the batch API (skipped when the openai package is missing)
+"""
+
+import asyncio
+import json
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.reasoning.llm_cache import LLMLimiter, LLMResponseCache
+from agents.reasoning.llm_client import FPALLMClient, LLMConfig
+
+
+class Clock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CACHE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestResponseCache:
+
+    def test_key_covers_every_input(self):
+        base = ("gpt-4o", "system", "prompt", 0.3, 2000)
+        keys = {LLMResponseCache.make_key(*base)}
+        for i, changed in enumerate(["gpt-4o-mini", "other", "prompt 2", 0.0, 100]):
+            args = list(base)
+            args[i] = changed
+            keys.add(LLMResponseCache.make_key(*args))
+        assert len(keys) == 6
+        assert LLMResponseCache.make_key(*base) == LLMResponseCache.make_key(*base)
+
+    def test_ttl_and_lru_eviction(self):
+        clock = Clock()
+        cache = LLMResponseCache(max_entries=2, ttl_seconds=10, clock=clock)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        assert cache.get("a") == "A"  # a is now most recently used
+        cache.put("c", "C")
+        assert cache.get("b") is None and cache.get("a") == "A" and cache.get("c") == "C"
+
+        clock.now = 10
+        assert cache.get("a") is None
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1 and stats["expirations"] == 1
+
+    def test_in_flight_duplicates_coalesce(self):
+        cache = LLMResponseCache(ttl_seconds=60)
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        async def go():
+            results = await asyncio.gather(*(cache.get_or_call("k", call) for _ in range(5)))
+            results.append(await cache.get_or_call("k", call))
+            return results
+
+        results = asyncio.run(go())
+        assert len(calls) == 1
+        assert sorted(source for _, source in results) == ["cache"] + ["coalesced"] * 4 + ["network"]
+        assert all(response == "answer" for response, _ in results)
+        assert cache.get_stats()["in_flight"] == 0
+
+    def test_failures_propagate_and_are_not_cached(self):
+        cache = LLMResponseCache(ttl_seconds=60)
+        attempts = []
+
+        async def failing():
+            attempts.append(1)
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream 500")
+
+        async def go():
+            return await asyncio.gather(*(cache.get_or_call("k", failing) for _ in range(3)), return_exceptions=True)
+
+        results = asyncio.run(go())
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert len(attempts) == 1
+        assert cache.get("k") is None and cache.get_stats()["in_flight"] == 0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LIMITER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestLimiter:
+
+    def test_concurrency_cap(self):
+        limiter = LLMLimiter(max_concurrency=2, tokens_per_minute=0)
+        tracker = {"now": 0, "max": 0}
+
+        async def call():
+            async with limiter.slot(100):
+                tracker["now"] += 1
+                tracker["max"] = max(tracker["max"], tracker["now"])
+                await asyncio.sleep(0.01)
+                tracker["now"] -= 1
+
+        async def go():
+            await asyncio.gather(*(call() for _ in range(8)))
+
+        asyncio.run(go())
+        assert tracker["max"] == 2
+        assert limiter.get_stats()["calls"] == 8
+
+    def test_token_budget_holds_calls_until_window_frees(self):
+        clock = Clock(1000.0)
+        limiter = LLMLimiter(max_concurrency=10, tokens_per_minute=1000, clock=clock)
+        order = []
+
+        async def call(name, tokens, actual):
+            async with limiter.slot(tokens) as reservation:
+                order.append(name)
+                reservation.settle(actual)
+
+        async def go():
+            await call("first", 800, 700)
+            second = asyncio.ensure_future(call("second", 400, 400))
+            await asyncio.sleep(0.05)
+            assert order == ["first"]  # 700 + 400 > 1000
+            clock.now += 61  # First call leaves the window
+            await asyncio.wait_for(second, 3)
+
+        asyncio.run(go())
+        assert order == ["first", "second"]
+        stats = limiter.get_stats()
+        assert stats["budget_waits"] >= 1 and stats["tokens_in_window"] == 400
+
+    def test_oversized_call_runs_alone(self):
+        limiter = LLMLimiter(max_concurrency=1, tokens_per_minute=100)
+
+        async def go():
+            async with limiter.slot(5000):
+                return True
+
+        assert asyncio.run(go())
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CLIENT AGAINST A STUB SERVER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class StubOpenAI(ThreadingHTTPServer):
+    """Minimal OpenAI-compatible /v1/chat/completions endpoint"""
+
+    def __init__(self, delay=0.0):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.delay = delay
+        self.requests = []
+        self.fail_next = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests.append(body)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            fail = server.fail_next > 0
+            server.fail_next -= fail
+        time.sleep(server.delay)
+        with server.lock:
+            server.active -= 1
+
+        if fail:
+            payload, status = {"error": {"message": "overloaded", "type": "server_error"}}, 500
+        else:
+            prompt = body["messages"][-1]["content"]
+            payload, status = {
+                "id": f"chatcmpl-{len(server.requests)}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body["model"],
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": f"echo: {prompt}"},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+            }, 200
+
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def stub_server():
+    pytest.importorskip("openai")
+    server = StubOpenAI(delay=0.05)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(server, **limiter_kwargs):
+    config = LLMConfig(api_key="test-key", base_url=server.base_url, retry_delay=0.01)
+    return FPALLMClient(
+        config,
+        cache=LLMResponseCache(ttl_seconds=60),
+        limiter=LLMLimiter(**{"max_concurrency": 4, "tokens_per_minute": 0, **limiter_kwargs}),
+    )
+
+
+class TestClientAgainstStubServer:
+
+    def test_repeat_prompt_is_served_from_cache(self, stub_server):
+        client = _client(stub_server)
+
+        async def go():
+            first = await client.complete("Summarise week 12")
+            second = await client.complete("Summarise week 12")
+            other = await client.complete("Summarise week 12", temperature=0.0)
+            return first, second, other
+
+        first, second, other = asyncio.run(go())
+        assert first.text == second.text == "echo: Summarise week 12"
+        assert not first.cached and second.cached and second.tokens_used == 0
+        assert not other.cached
+        assert len(stub_server.requests) == 2
+        assert stub_server.requests[1]["temperature"] == 0.0
+        assert client.get_usage_stats()["total_tokens"] == 30
+
+    def test_batch_coalesces_and_respects_concurrency(self, stub_server):
+        client = _client(stub_server, max_concurrency=2)
+        prompts = [f"variance {i % 4}" for i in range(12)] + [{"prompt": "board narrative", "max_tokens": 300}]
+
+        responses = asyncio.run(client.complete_batch(prompts))
+
+        assert [r.text for r in responses[:12]] == [f"echo: variance {i % 4}" for i in range(12)]
+        assert len(stub_server.requests) == 5
+        assert stub_server.max_active <= 2
+        assert responses[12].text == "echo: board narrative"
+        assert sorted(r["max_tokens"] for r in stub_server.requests)[0] == 300
+        assert client.get_usage_stats()["cache"]["coalesced"] == 8
+
+    def test_server_errors_are_retried_then_cached(self, stub_server):
+        client = _client(stub_server)
+        stub_server.fail_next = 1
+
+        async def go():
+            return await client.complete("retry me"), await client.complete("retry me")
+
+        first, second = asyncio.run(go())
+        assert first.text == "echo: retry me" and second.cached
+        assert len(stub_server.requests) == 2  # One failure, one retry, then cache
@@ -0,0 +1,277 @@
+"""
+Tests for incremental continuous monitoring (agents/workflows/continuous_monitoring.py)
+
+Verifies:
+1. The first tick builds the rolling state; later ticks only probe the latest transaction id,
+   and apply transactions written without an event
+2. Ingestion events alert on the new transactions only
+3. Reconciliation events shrink the aging histogram; approving a wash on
+   transactions without a bank account still succeeds
+4. Items crossing an aging threshold alert and escalate once
+5. publish_event() delivers to the orchestrator from its loop and from other threads
+"""
+
+import asyncio
+import threading
+import pytest
+from datetime import datetime, timedelta
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models
+from agents import orchestrator as orchestrator_module
+from agents.orchestrator import FPAOrchestrator, publish_event
+from agents.workflows import register_all_workflows
+from agents.workflows.continuous_monitoring import (
+    ContinuousMonitoringWorkflow,
+    EVENT_RECONCILIATION_UPDATED,
+    EVENT_TRANSACTIONS_INGESTED,
+)
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'monitoring.db'}", connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(models.Entity(id=1, name="Test Entity", currency="EUR"))
+    db.add(models.BankAccount(id=1, entity_id=1, account_name="Main", currency="EUR"))
+    db.commit()
+    db.close()
+    yield Session
+    engine.dispose()
+
+
+@pytest.fixture
+def orchestrator(sessions):
+    orchestrator = FPAOrchestrator(sessions(), entity_id=1, autonomous_mode=False, session_factory=sessions)
+    register_all_workflows(orchestrator)
+    yield orchestrator
+    orchestrator.executor.shutdown()
+
+
+def _add_txn(sessions, days_ago, amount, counterparty="Acme GmbH", reconciled=0):
+    db = sessions()
+    txn = models.BankTransaction(
+        bank_account_id=1,
+        transaction_date=datetime.utcnow() - timedelta(days=days_ago),
+        amount=amount,
+        currency="EUR",
+        reference=f"REF {amount}",
+        counterparty=counterparty,
+        is_reconciled=reconciled,
+    )
+    db.add(txn)
+    db.commit()
+    txn_id = txn.id
+    db.close()
+    return txn_id
+
+
+def _reconcile(sessions, *txn_ids):
+    db = sessions()
+    db.query(models.BankTransaction).filter(models.BankTransaction.id.in_(txn_ids)).update(
+        {models.BankTransaction.is_reconciled: 1}, synchronize_session=False
+    )
+    db.commit()
+    db.close()
+
+
+FRESHNESS_ALERTS = {"bank_data_stale", "freshness_mismatch"}
+
+
+def _types(result):
+    """Alert types, leaving out freshness (the fixtures have no recent bank data)"""
+    return sorted(alert["type"] for alert in result["alerts"] if alert["type"] not in FRESHNESS_ALERTS)
+
+
+def _forbid_db(orchestrator):
+    """Allow only the tick's latest-transaction probe"""
+    run = orchestrator.executor.run
+
+    async def guarded(step, fn):
+        if step != "monitoring_latest_transaction":
+            raise AssertionError(f"tick queried the database ({step})")
+        return await run(step, fn)
+    orchestrator.executor.run = guarded
+
+
+class TestTick:
+
+    def test_first_tick_builds_then_ticks_are_in_memory(self, sessions, orchestrator):
+        old = _add_txn(sessions, days_ago=40, amount=-2500.0)
+        _add_txn(sessions, days_ago=10, amount=1200.0)
+        _add_txn(sessions, days_ago=45, amount=900.0, reconciled=1)
+
+        first = asyncio.run(orchestrator.run_continuous_monitoring())
+        assert first["rebuilt"]
+        assert _types(first) == ["reconciliation_aging_critical", "reconciliation_aging_warning"]
+        [critical] = [a for a in first["alerts"] if a["type"] == "reconciliation_aging_critical"]
+        assert [i["id"] for i in critical["details"]["items"]] == [old]
+        assert len(first["decisions_created"]) == 1
+        assert first["aging"]["unmatched"] == 2
+        assert first["aging"]["over_30_days"] == {"count": 1, "total_amount": "2500.0"}
+
+        _forbid_db(orchestrator)
+        second = asyncio.run(orchestrator.run_continuous_monitoring())
+        assert not second["rebuilt"]
+        assert second["alerts"] == [] and second["decisions_created"] == []
+        assert second["events_since_last_tick"] == 0
+
+    def test_tick_applies_transactions_written_without_an_event(self, sessions, orchestrator):
+        asyncio.run(orchestrator.run_continuous_monitoring())
+        large = _add_txn(sessions, days_ago=0, amount=-180000.0, counterparty="unknown")
+
+        tick = asyncio.run(orchestrator.run_continuous_monitoring())
+        assert not tick["rebuilt"]
+        assert "unusual_transactions" in tick["checks_run"]
+        assert _types(tick) == ["large_transaction", "unknown_counterparty"]
+        assert orchestrator.monitoring_state.last_txn_id == large
+
+    def test_stale_state_is_rebuilt(self, sessions, orchestrator):
+        asyncio.run(orchestrator.run_continuous_monitoring())
+        _add_txn(sessions, days_ago=40, amount=-700.0)  # Written without an event
+        orchestrator.monitoring_state.stale = True
+
+        result = asyncio.run(orchestrator.run_continuous_monitoring())
+        assert result["rebuilt"] and result["aging"]["unmatched"] == 1
+        assert _types(result) == ["reconciliation_aging_critical"]
+
+    def test_stale_bank_data_alerts_until_fresh_data_arrives(self, sessions, orchestrator):
+        _add_txn(sessions, days_ago=3, amount=100.0, reconciled=1)
+        first = asyncio.run(orchestrator.run_continuous_monitoring())
+        assert "bank_data_stale" in [a["type"] for a in first["alerts"]]
+        assert "bank_data_stale" not in [a["type"] for a in asyncio.run(orchestrator.run_continuous_monitoring())["alerts"]]
+
+        _add_txn(sessions, days_ago=0, amount=100.0, reconciled=1)
+        asyncio.run(orchestrator.emit_event(EVENT_TRANSACTIONS_INGESTED, {}))
+        assert "bank_data_stale" not in orchestrator.monitoring_state.active_freshness_alerts
+
+
+class TestEvents:
+
+    def test_ingestion_alerts_on_new_transactions_only(self, sessions, orchestrator):
+        _add_txn(sessions, days_ago=0, amount=250000.0)
+        asyncio.run(orchestrator.run_continuous_monitoring())
+
+        large = _add_txn(sessions, days_ago=0, amount=-150000.0, counterparty=None)
+        _add_txn(sessions, days_ago=0, amount=500.0)
+        asyncio.run(orchestrator.emit_event(EVENT_TRANSACTIONS_INGESTED, {}))
+
+        state = orchestrator.monitoring_state
+        assert state.last_txn_id == large + 1
+        assert state.flows.to_dict()["outflow"] == "150000.0"
+        assert len(state.aging) == 3
+
+        workflow = ContinuousMonitoringWorkflow(orchestrator)
+        again = asyncio.run(workflow.handle_event(EVENT_TRANSACTIONS_INGESTED, {}))
+        assert again["alerts"] == []  # Already seen
+
+        _add_txn(sessions, days_ago=0, amount=120000.0, counterparty="unknown")
+        result = asyncio.run(workflow.handle_event(EVENT_TRANSACTIONS_INGESTED, {}))
+        assert _types(result) == ["large_transaction", "unknown_counterparty"]
+
+        _forbid_db(orchestrator)
+        tick = asyncio.run(orchestrator.run_continuous_monitoring())
+        assert tick["events_since_last_tick"] == 3 and tick["alerts"] == []
+
+    def test_backdated_ingestion_escalates_immediately(self, sessions, orchestrator):
+        asyncio.run(orchestrator.run_continuous_monitoring())
+        backdated = _add_txn(sessions, days_ago=35, amount=-4000.0)
+
+        result = asyncio.run(ContinuousMonitoringWorkflow(orchestrator).handle_event(EVENT_TRANSACTIONS_INGESTED, {}))
+        assert _types(result) == ["reconciliation_aging_critical"]
+        assert result["alerts"][0]["details"]["items"][0]["id"] == backdated
+        assert len(result["decisions_created"]) == 1
+
+    def test_reconciliation_shrinks_histogram(self, sessions, orchestrator):
+        first = _add_txn(sessions, days_ago=40, amount=-100.0)
+        second = _add_txn(sessions, days_ago=12, amount=200.0)
+        third = _add_txn(sessions, days_ago=1, amount=300.0)
+        asyncio.run(orchestrator.run_continuous_monitoring())
+        state = orchestrator.monitoring_state
+
+        _reconcile(sessions, first)
+        asyncio.run(orchestrator.emit_event(EVENT_RECONCILIATION_UPDATED, {"transaction_ids": [first]}))
+        assert set(state.aging.items) == {second, third}
+        assert first not in state.escalated_ids
+
+        _reconcile(sessions, second, third)
+        asyncio.run(orchestrator.emit_event(EVENT_RECONCILIATION_UPDATED, {}))
+        assert len(state.aging) == 0 and state.aging.days == []
+        assert state.warned_ids == set()
+
+    def test_approved_wash_without_bank_account(self, sessions):
+        import main
+        db = sessions()
+        txns = [models.BankTransaction(transaction_date=datetime.utcnow(), amount=a, currency="EUR") for a in (-500.0, 500.0)]
+        db.add_all(txns)
+        db.commit()
+
+        assert main.approve_wash(txns[0].id, txns[1].id, db=db) == {"status": "success"}
+        db.expire_all()
+        assert [t.is_reconciled for t in txns] == [1, 1]
+        db.close()
+
+
+class TestAging:
+
+    def test_crossing_alerts_and_escalates_once(self, sessions, orchestrator):
+        crossing = _add_txn(sessions, days_ago=29, amount=-8000.0)
+        first = asyncio.run(orchestrator.run_continuous_monitoring())
+        assert _types(first) == ["reconciliation_aging_warning"]
+
+        workflow = ContinuousMonitoringWorkflow(orchestrator)
+        state = orchestrator.monitoring_state
+        tomorrow = datetime.utcnow().date() + timedelta(days=1)
+
+        alerts, decisions = [], []
+        workflow._check_reconciliation_aging(state, tomorrow, alerts, decisions)
+        assert [a["type"] for a in alerts] == ["reconciliation_aging_critical"]
+        assert alerts[0]["details"]["items"][0]["id"] == crossing
+        assert len(decisions) == 1
+
+        alerts, decisions = [], []
+        workflow._check_reconciliation_aging(state, tomorrow + timedelta(days=1), alerts, decisions)
+        assert alerts == [] and decisions == []
+
+
+class TestPublishEvent:
+
+    def test_no_orchestrator(self):
+        assert publish_event(987654, EVENT_TRANSACTIONS_INGESTED) is False
+
+    def test_delivered_on_loop_and_from_threads(self, sessions, orchestrator, monkeypatch):
+        monkeypatch.setitem(orchestrator_module._orchestrators, 1, orchestrator)
+        received = []
+
+        async def record(orchestrator, event_data):
+            received.append((threading.current_thread().name, event_data))
+
+        orchestrator.register_event_handler("ping", record)
+
+        async def go():
+            await orchestrator.start()
+            assert publish_event(1, "ping", {"n": 1})
+            thread = threading.Thread(target=publish_event, args=(1, "ping", {"n": 2}), name="endpoint")
+            thread.start()
+            thread.join()
+            for _ in range(100):
+                if len(received) == 2:
+                    break
+                await asyncio.sleep(0.01)
+
+        asyncio.run(go())
+        assert sorted(data["n"] for _, data in received) == [1, 2]
+        assert all(name == "MainThread" for name, _ in received)
+
+        # Loop gone: nothing to deliver to, so monitoring rebuilds on its next tick
+        asyncio.run(orchestrator.run_continuous_monitoring())
+        assert publish_event(1, "ping") is False
+        assert orchestrator.monitoring_state.stale
@@ -0,0 +1,230 @@
+"""
+Tests for the FP&A Scheduler (agents/scheduler.py)
+
+Verifies:
+1. Cron parsing: lists, ranges, steps, names, macros and the day OR rule
+2. next_after() finds the next fire time across hours, days and months
+3. One heap serves many entities and reports its queue depth
+4. Per-workflow concurrency caps and pause handling
+5. A tick missed while the process was down is caught up once
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models
+from agents.orchestrator import OrchestratorStatus, ScheduledTask
+from agents.scheduler import CronExpression, FPAScheduler
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CRON
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestCronExpression:
+
+    def test_fields_parse(self):
+        cron = CronExpression("5/20 9-17/4 1,15 jan-mar mon-fri")
+        assert cron.minutes == [5, 25, 45]
+        assert cron.hours == {9, 13, 17}
+        assert cron.days == {1, 15}
+        assert cron.months == {1, 2, 3}
+        assert cron.weekdays == {1, 2, 3, 4, 5}
+
+    def test_sunday_is_zero_or_seven(self):
+        assert CronExpression("0 0 * * 7").weekdays == CronExpression("0 0 * * sun").weekdays == {0}
+
+    @pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "* * * * 8", "5-1 * * * *", "*/0 * * * *", "x * * * *"])
+    def test_invalid_expressions_raise(self, expression):
+        with pytest.raises(ValueError):
+            CronExpression(expression)
+
+    @pytest.mark.parametrize("expression, after, expected", [
+        ("0 6 * * 1", datetime(2026, 3, 8, 12, 0), datetime(2026, 3, 9, 6, 0)),  # Sunday -> Monday 6am
+        ("*/15 * * * *", datetime(2026, 3, 9, 10, 14, 59), datetime(2026, 3, 9, 10, 15)),
+        ("*/15 * * * *", datetime(2026, 3, 9, 10, 15), datetime(2026, 3, 9, 10, 30)),
+        ("0 7 * * *", datetime(2026, 12, 31, 7, 0), datetime(2027, 1, 1, 7, 0)),
+        ("0 0 31 * *", datetime(2026, 4, 1), datetime(2026, 5, 31)),
+        ("0 0 29 2 *", datetime(2026, 3, 1), datetime(2028, 2, 29)),
+        ("@monthly", datetime(2026, 3, 9, 10, 0), datetime(2026, 4, 1)),
+        # Both day fields restricted: the 13th or any Friday
+        ("0 0 13 * 5", datetime(2026, 3, 9), datetime(2026, 3, 13)),
+        ("0 0 13 * 5", datetime(2026, 3, 13), datetime(2026, 3, 20)),
+    ])
+    def test_next_after(self, expression, after, expected):
+        cron = CronExpression(expression)
+        assert cron.next_after(after) == expected
+        assert cron.matches(expected)
+
+    def test_impossible_date_never_fires(self):
+        with pytest.raises(ValueError):
+            CronExpression("0 0 30 2 *").next_after(datetime(2026, 1, 1))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SCHEDULER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class FakeOrchestrator:
+    """Just the surface the scheduler uses"""
+
+    def __init__(self, entity_id, tasks, tracker=None, delay=0.0):
+        self.entity_id = entity_id
+        self.status = OrchestratorStatus.RUNNING
+        self._scheduled_tasks = {t.workflow_name: t for t in tasks}
+        self.runs = []
+        self.tracker = tracker
+        self.delay = delay
+
+    async def run_workflow(self, workflow_name, triggered_by="manual", **kwargs):
+        self.runs.append((workflow_name, triggered_by))
+        if self.tracker is not None:
+            self.tracker["now"] += 1
+            self.tracker["max"] = max(self.tracker["max"], self.tracker["now"])
+        await asyncio.sleep(self.delay)
+        if self.tracker is not None:
+            self.tracker["now"] -= 1
+        return {}
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def state_sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schedule.db'}")
+    models.Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _scheduler(state_sessions, clock, **kwargs):
+    return FPAScheduler(session_factory=state_sessions, default_jitter_seconds=0, jitter_seconds={"continuous_monitoring": 0},
+                        clock=clock, **kwargs)
+
+
+def _tasks():
+    return [
+        ScheduledTask(workflow_name="morning_briefing", cron_expression="0 7 * * *"),
+        ScheduledTask(workflow_name="continuous_monitoring", cron_expression="*/15 * * * *"),
+    ]
+
+
+class TestScheduler:
+
+    def test_one_heap_for_many_entities(self, state_sessions):
+        clock = Clock(datetime(2026, 3, 9, 6, 50))
+        scheduler = _scheduler(state_sessions, clock)
+        orchestrators = [FakeOrchestrator(i, _tasks()) for i in range(1, 301)]
+        for o in orchestrators:
+            scheduler.register(o)
+
+        stats = scheduler.get_stats()
+        assert stats["entities"] == 300
+        assert stats["queue_depth"] == 600
+        assert stats["next_fire_at"] == "2026-03-09T07:00:00"
+        assert orchestrators[0]._scheduled_tasks["continuous_monitoring"].next_run == datetime(2026, 3, 9, 7, 0)
+
+        async def fire():
+            clock.now = datetime(2026, 3, 9, 7, 0, 5)
+            await asyncio.gather(*await scheduler.run_pending())
+
+        asyncio.run(fire())
+        assert all(sorted(o.runs) == [("continuous_monitoring", "schedule"), ("morning_briefing", "schedule")]
+                   for o in orchestrators)
+        assert scheduler.get_stats()["queue_depth"] == 600
+        assert orchestrators[0]._scheduled_tasks["morning_briefing"].next_run == datetime(2026, 3, 10, 7, 0)
+        assert orchestrators[0]._scheduled_tasks["continuous_monitoring"].next_run == datetime(2026, 3, 9, 7, 15)
+
+    def test_concurrency_cap_per_workflow(self, state_sessions):
+        clock = Clock(datetime(2026, 3, 9, 6, 59))
+        scheduler = _scheduler(state_sessions, clock, concurrency={"morning_briefing": 3})
+        tracker = {"now": 0, "max": 0}
+        tasks = lambda: [ScheduledTask(workflow_name="morning_briefing", cron_expression="0 7 * * *")]
+        for i in range(1, 13):
+            scheduler.register(FakeOrchestrator(i, tasks(), tracker, delay=0.01))
+
+        async def fire():
+            clock.now = datetime(2026, 3, 9, 7, 0)
+            started = await scheduler.run_pending()
+            await asyncio.sleep(0)
+            waiting = scheduler.get_stats()["waiting"]
+            await asyncio.gather(*started)
+            return waiting
+
+        assert asyncio.run(fire()) == 9
+        assert tracker["max"] == 3
+        assert scheduler.get_stats()["by_workflow"]["morning_briefing"]["completed"] == 12
+
+    def test_paused_and_unregistered_entities_skip(self, state_sessions):
+        clock = Clock(datetime(2026, 3, 9, 6, 59))
+        scheduler = _scheduler(state_sessions, clock)
+        paused, stopped, running = (FakeOrchestrator(i, _tasks()[:1]) for i in (1, 2, 3))
+        paused.status = OrchestratorStatus.PAUSED
+        for o in (paused, stopped, running):
+            scheduler.register(o)
+        scheduler.unregister(2)
+
+        async def fire():
+            clock.now = datetime(2026, 3, 9, 7, 0)
+            await asyncio.gather(*await scheduler.run_pending())
+
+        asyncio.run(fire())
+        assert paused.runs == [] and stopped.runs == [] and running.runs == [("morning_briefing", "schedule")]
+        assert scheduler.get_stats()["queue_depth"] == 2
+
+    def test_missed_tick_caught_up_once_after_restart(self, state_sessions):
+        clock = Clock(datetime(2026, 3, 9, 6, 30))
+        first = _scheduler(state_sessions, clock)
+        first.register(FakeOrchestrator(1, _tasks()[:1]))
+
+        async def fire(scheduler):
+            await asyncio.gather(*await scheduler.run_pending())
+
+        clock.now = datetime(2026, 3, 9, 7, 0)
+        asyncio.run(fire(first))
+        state = state_sessions().query(models.WorkflowScheduleState).one()
+        assert state.last_tick_at == datetime(2026, 3, 9, 7, 0)
+
+        # Process down for two days: both 7am ticks are missed and run once
+        clock.now = datetime(2026, 3, 11, 9, 30)
+        orchestrator = FakeOrchestrator(1, _tasks()[:1])
+        restarted = _scheduler(state_sessions, clock)
+        restarted.register(orchestrator)
+        asyncio.run(fire(restarted))
+
+        assert orchestrator.runs == [("morning_briefing", "schedule_catch_up")]
+        assert orchestrator._scheduled_tasks["morning_briefing"].next_run == datetime(2026, 3, 12, 7, 0)
+
+    def test_no_catch_up_outside_window(self, state_sessions):
+        clock = Clock(datetime(2026, 3, 9, 9, 0))
+        scheduler = _scheduler(state_sessions, clock, catch_up_window=timedelta(hours=1))
+        scheduler._save_last_tick(1, "morning_briefing", datetime(2026, 3, 1, 7, 0))
+
+        orchestrator = FakeOrchestrator(1, _tasks()[:1])
+        scheduler.register(orchestrator)
+        assert asyncio.run(scheduler.run_pending()) == []
+        assert orchestrator._scheduled_tasks["morning_briefing"].next_run == datetime(2026, 3, 10, 7, 0)
+
+    def test_jitter_stays_within_bound(self, state_sessions):
+        clock = Clock(datetime(2026, 3, 9, 6, 0))
+        scheduler = FPAScheduler(session_factory=state_sessions, default_jitter_seconds=120, clock=clock)
+        orchestrators = [FakeOrchestrator(i, _tasks()[:1]) for i in range(50)]
+        for o in orchestrators:
+            scheduler.register(o)
+        fire_times = [o._scheduled_tasks["morning_briefing"].next_run for o in orchestrators]
+        assert all(datetime(2026, 3, 9, 7, 0) <= t <= datetime(2026, 3, 9, 7, 2) for t in fire_times)
+        assert len(set(fire_times)) > 1
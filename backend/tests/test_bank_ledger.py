@@ -0,0 +1,206 @@
+"""
+Tests for the Bank Balance Ledger (bank_ledger.py)
+
+Verifies:
+1. Daily closes follow ORM inserts, edits and deletes of bank transactions
+2. Point-in-time balances are anchored to the reported account balance
+3. Balance series and single lookups agree, and match a full transaction scan
+4. Consolidation uses snapshot FX rates and reports missing ones
+5. DataWorker.get_cash_position reads the ledger (opening, today's movements, FX)
+"""
+
+import pytest
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from bank_ledger import (
+    account_balances, balance_series, consolidated_balances, ensure_bank_ledger, rebuild_bank_ledger
+)
+from agents.workers.data_worker import DataWorker
+
+
+@pytest.fixture
+def accounts(db_session, sample_entity):
+    eur = models.BankAccount(id=1, entity_id=sample_entity.id, account_name="EUR Main", currency="EUR", balance=0.0)
+    usd = models.BankAccount(id=2, entity_id=sample_entity.id, account_name="USD Ops", currency="USD", balance=0.0)
+    db_session.add_all([eur, usd])
+    db_session.commit()
+    return eur, usd
+
+
+def _txn(account, when, amount):
+    return models.BankTransaction(
+        bank_account_id=account.id, transaction_date=when, amount=amount,
+        currency=account.currency, reference=f"T {amount}", counterparty="Acme",
+    )
+
+
+def _closes(db, account_id):
+    rows = db.query(models.BankBalanceDay).filter(
+        models.BankBalanceDay.bank_account_id == account_id
+    ).order_by(models.BankBalanceDay.day).all()
+    return [(r.day.date(), r.net_amount, r.cumulative_amount, r.transaction_count) for r in rows]
+
+
+def _scan_balance(db, account, as_of):
+    """Reference: reported balance + movements between its anchor and as_of, from raw transactions"""
+    txns = db.query(models.BankTransaction).filter(models.BankTransaction.bank_account_id == account.id).all()
+    anchor = account.balance_as_of.date() if account.balance_as_of else max(t.transaction_date.date() for t in txns)
+    through = lambda day: sum(Decimal(str(t.amount)) for t in txns if t.transaction_date.date() <= day)
+    return Decimal(str(account.balance)) + through(as_of) - through(anchor)
+
+
+class TestMaintenance:
+
+    def test_closes_follow_inserts_edits_and_deletes(self, db_session, accounts):
+        eur, _ = accounts
+        first = _txn(eur, datetime(2026, 3, 2, 9), 1000.0)
+        db_session.add_all([first, _txn(eur, datetime(2026, 3, 2, 15), -200.0), _txn(eur, datetime(2026, 3, 4), 50.0)])
+        db_session.commit()
+        assert _closes(db_session, eur.id) == [
+            (date(2026, 3, 2), 800.0, 800.0, 2),
+            (date(2026, 3, 4), 50.0, 850.0, 1),
+        ]
+
+        # Back-dated insert and a moved transaction rewrite the later closes
+        db_session.add(_txn(eur, datetime(2026, 3, 1), 10.0))
+        first.transaction_date = datetime(2026, 3, 3)
+        db_session.commit()
+        assert _closes(db_session, eur.id) == [
+            (date(2026, 3, 1), 10.0, 10.0, 1),
+            (date(2026, 3, 2), -200.0, -190.0, 1),
+            (date(2026, 3, 3), 1000.0, 810.0, 1),
+            (date(2026, 3, 4), 50.0, 860.0, 1),
+        ]
+
+        db_session.delete(first)
+        db_session.commit()
+        assert [c[2] for c in _closes(db_session, eur.id)] == [10.0, -190.0, -140.0]
+
+    def test_unrelated_edits_leave_closes_alone(self, db_session, accounts):
+        eur, _ = accounts
+        txn = _txn(eur, datetime(2026, 3, 2), 100.0)
+        db_session.add(txn)
+        db_session.commit()
+        close_id = db_session.query(models.BankBalanceDay.id).scalar()
+
+        txn.is_reconciled = 1
+        db_session.commit()
+        assert db_session.query(models.BankBalanceDay.id).scalar() == close_id
+
+    def test_bulk_loads_are_built_on_first_read(self, db_session, accounts):
+        eur, usd = accounts
+        db_session.bulk_save_objects([_txn(eur, datetime(2026, 3, d), 100.0 * d) for d in range(1, 4)])
+        db_session.commit()
+        assert _closes(db_session, eur.id) == []
+
+        assert ensure_bank_ledger(db_session, [eur.id, usd.id]) == [eur.id]
+        assert [c[2] for c in _closes(db_session, eur.id)] == [100.0, 300.0, 600.0]
+        assert ensure_bank_ledger(db_session, [eur.id, usd.id]) == []
+
+        db_session.bulk_save_objects([_txn(eur, datetime(2026, 3, 2, 12), 5.0)])
+        rebuild_bank_ledger(db_session, eur.id, from_day=date(2026, 3, 2))
+        db_session.commit()
+        assert [c[2] for c in _closes(db_session, eur.id)] == [100.0, 305.0, 605.0]
+
+
+    def test_first_orm_insert_builds_unbuilt_history(self, db_session, accounts):
+        eur, _ = accounts
+        db_session.bulk_save_objects([_txn(eur, datetime(2026, 1, d), 100.0) for d in range(1, 6)])
+        db_session.commit()
+
+        db_session.add(_txn(eur, datetime(2026, 1, 10), 50.0))
+        db_session.commit()
+        assert [c[2] for c in _closes(db_session, eur.id)] == [100.0, 200.0, 300.0, 400.0, 500.0, 550.0]
+        assert ensure_bank_ledger(db_session, [eur.id]) == []
+
+        eur.balance, eur.balance_as_of = 1000.0, datetime(2026, 1, 10)
+        db_session.commit()
+        assert account_balances(db_session, [eur], date(2026, 1, 3))[eur.id] == Decimal("750")
+
+
+class TestReads:
+
+    @pytest.fixture
+    def history(self, db_session, accounts):
+        eur, usd = accounts
+        rng = random.Random(7)
+        for account in accounts:
+            for _ in range(200):
+                when = datetime(2026, 1, 1) + timedelta(days=rng.randint(0, 89), hours=rng.randint(0, 23))
+                db_session.add(_txn(account, when, round(rng.uniform(-5000, 5000), 2)))
+        eur.balance, eur.balance_as_of = 100000.0, datetime(2026, 2, 15)
+        usd.balance, usd.balance_as_of = 20000.0, None
+        db_session.commit()
+        return eur, usd
+
+    def test_balances_match_a_transaction_scan(self, db_session, history):
+        days = [date(2025, 12, 31), date(2026, 1, 1), date(2026, 2, 15), date(2026, 3, 10), date(2026, 6, 1)]
+        series = balance_series(db_session, history, days)
+        for day in days:
+            single = account_balances(db_session, history, day)
+            for account in history:
+                expected = _scan_balance(db_session, account, day)
+                assert abs(single[account.id] - expected) < Decimal("0.01")
+                assert abs(series[day][account.id] - expected) < Decimal("0.01")
+
+        eur, usd = history
+        assert account_balances(db_session, [eur], date(2026, 2, 15))[eur.id] == Decimal("100000.0")
+        assert abs(account_balances(db_session, [usd], date(2026, 6, 1))[usd.id] - Decimal("20000")) < Decimal("0.01")
+
+    def test_consolidation_uses_snapshot_rates(self, db_session, sample_snapshot, history):
+        eur, usd = history
+        day = date(2026, 3, 1)
+        native = account_balances(db_session, history, day)
+
+        assert consolidated_balances(db_session, history, day, "EUR")["missing_fx_rates"] == ["USD"]
+
+        db_session.add(models.WeeklyFXRate(snapshot_id=sample_snapshot.id, from_currency="USD", to_currency="EUR", rate=0.9))
+        db_session.commit()
+        view = consolidated_balances(db_session, history, day, "EUR", snapshot_id=sample_snapshot.id)
+        assert view["missing_fx_rates"] == []
+        assert view["by_currency"] == {"EUR": native[eur.id], "USD": native[usd.id]}
+        assert view["total"] == native[eur.id] + native[usd.id] * Decimal("0.9")
+
+
+class TestCashPosition:
+
+    def test_position_from_ledger(self, db_session, sample_snapshot, accounts):
+        eur, usd = accounts
+        now = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+        db_session.add(models.WeeklyFXRate(snapshot_id=sample_snapshot.id, from_currency="USD", to_currency="EUR", rate=0.5))
+        db_session.add_all([
+            _txn(eur, now - timedelta(days=3), 5000.0),
+            _txn(usd, now - timedelta(days=2), 2000.0),
+            _txn(eur, now - timedelta(hours=2), 700.0),
+            _txn(usd, now - timedelta(hours=1), -400.0),
+            _txn(eur, now + timedelta(hours=3), 99999.0),  # After as_of
+        ])
+        eur.balance, eur.balance_as_of = 5000.0, now - timedelta(days=3)
+        usd.balance, usd.balance_as_of = 2000.0, now - timedelta(days=2)
+        db_session.commit()
+
+        position = DataWorker(db_session, entity_id=1).get_cash_position(as_of=now)
+        assert position.currency == "EUR"
+        assert position.opening_balance == Decimal("6000")  # 5000 + 2000 * 0.5
+        assert position.total_inflows == Decimal("700") and position.total_outflows == Decimal("200")
+        assert position.current_balance == Decimal("6500")
+        assert position.by_account == {"EUR Main": Decimal("5700"), "USD Ops": Decimal("800")}
+        assert position.by_currency == {"EUR": Decimal("5700"), "USD": Decimal("1600")}
+        assert [m.amount for m in position.inflows] == [Decimal("700.0")]
+
+    def test_balance_history(self, db_session, accounts):
+        eur, _ = accounts
+        db_session.add_all([_txn(eur, datetime(2026, 3, 1), 100.0), _txn(eur, datetime(2026, 3, 3), 50.0)])
+        db_session.commit()
+
+        history = DataWorker(db_session, entity_id=1).get_balance_history(days=4, as_of=date(2026, 3, 3))
+        assert [(h["date"], h["balance"]) for h in history] == [
+            ("2026-02-28", "-150.0"), ("2026-03-01", "-50.0"), ("2026-03-02", "-50.0"), ("2026-03-03", "0.0"),
+        ]
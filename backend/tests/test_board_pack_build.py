@@ -0,0 +1,214 @@
+"""
+Tests for the board pack build pipeline (board_pack_service.py)
+
+Verifies:
+1. The metric bundle is computed once from the entity's bank and AR data
+2. Every slide's declared inputs cover the metrics its builder reads
+3. Parallel rendering produces the same slides as rendering in order
+4. Regenerated packs reuse slides whose input hash is unchanged
+5. Async generation reports progress through the task API, and builds in the
+   caller's thread on engines where sessions share one connection
+"""
+
+import time
+import pytest
+from datetime import datetime
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+import async_operations
+import board_pack_service
+from async_operations import get_task_status, run_async_board_pack
+from board_pack_models import BoardPackAuditLog
+from board_pack_service import BoardPackService, SLIDE_SPECS, SLIDE_CONTENT_FIELDS
+
+
+NOW = datetime(2026, 3, 16, 9, 0)
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'board_pack.db'}", connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(sessions):
+    """File database, so async generation can open its own session"""
+    db = sessions()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def snapshot(db_session, sample_entity):
+    snapshot = models.Snapshot(name="March", entity_id=sample_entity.id, total_rows=0, created_at=NOW)
+    account = models.BankAccount(entity_id=sample_entity.id, account_name="Main", currency="EUR", balance=250000.0)
+    db_session.add_all([snapshot, account])
+    db_session.commit()
+    db_session.add_all([
+        models.Invoice(snapshot_id=snapshot.id, entity_id=sample_entity.id, document_number="INV-1", amount=4000.0),
+        models.Invoice(snapshot_id=snapshot.id, entity_id=sample_entity.id, document_number="INV-2", amount=1000.0,
+                       payment_date=NOW),
+        models.BankTransaction(bank_account_id=account.id, transaction_date=datetime(2026, 3, 2), amount=9000.0),
+        models.BankTransaction(bank_account_id=account.id, transaction_date=datetime(2026, 3, 9), amount=-3500.0),
+        models.BankTransaction(bank_account_id=account.id, transaction_date=datetime(2026, 2, 27), amount=-700.0),
+    ])
+    db_session.commit()
+    return snapshot
+
+
+def _content(slides):
+    return [(s.slide_number, s.slide_type, *(getattr(s, f) for f in SLIDE_CONTENT_FIELDS)) for s in slides]
+
+
+class TrackedMetrics(dict):
+    """Records which metrics a slide builder reads"""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.read = set()
+
+    def get(self, key, default=None):
+        self.read.add(key)
+        return super().get(key, default)
+
+    def __getitem__(self, key):
+        self.read.add(key)
+        return super().__getitem__(key)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# METRICS AND RENDERING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestBuild:
+
+    def test_metric_bundle_from_entity_data(self, db_session, snapshot):
+        metrics = BoardPackService(db_session)._compute_all_metrics(snapshot, None, None)
+        assert metrics["ending_cash"] == 250000.0
+        assert (metrics["total_ar"], metrics["open_ar"]) == (5000.0, 4000.0)
+        assert (metrics["period_inflows"], metrics["period_outflows"]) == (9000.0, 3500.0)  # February excluded
+        assert metrics["monthly_burn"] == -5500.0
+
+    def test_declared_inputs_cover_builder_reads(self, db_session, snapshot):
+        service = BoardPackService(db_session)
+        pack = service.generate_board_pack(entity_id=snapshot.entity_id, snapshot_id=snapshot.id)
+        metrics = service._compute_all_metrics(snapshot, None, pack)
+        for slide_num, slide_type, builder, metric_keys, _ in SLIDE_SPECS:
+            tracked = TrackedMetrics(metrics)
+            extra = {"_generate_forecast_comparison_slide": (pack,), "_generate_appendix_slide": (snapshot,)}
+            getattr(service, builder)(pack, tracked, *extra.get(builder, ()), slide_num)
+            assert tracked.read <= set(metric_keys), slide_type
+
+    def test_parallel_matches_serial(self, db_session, snapshot):
+        serial = BoardPackService(db_session, slide_workers=1).generate_board_pack(
+            entity_id=snapshot.entity_id, snapshot_id=snapshot.id
+        )
+        db_session.query(models.BankAccount).update({"balance": 1.0})  # Nothing to reuse from serial
+        db_session.commit()
+        parallel = BoardPackService(db_session, slide_workers=4).generate_board_pack(
+            entity_id=snapshot.entity_id, snapshot_id=snapshot.id
+        )
+        db_session.query(models.BankAccount).update({"balance": 250000.0})
+        db_session.commit()
+        again = BoardPackService(db_session, slide_workers=4).generate_board_pack(
+            entity_id=snapshot.entity_id, snapshot_id=snapshot.id
+        )
+        assert [s.slide_number for s in parallel.slides] == list(range(1, 11))
+        assert parallel.pack_data_json["build"]["rendered_slides"] == [2, 3, 4, 5]
+        assert _content(again.slides) == _content(serial.slides)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REUSE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestReuse:
+
+    def test_unchanged_slides_are_reused(self, db_session, snapshot, monkeypatch):
+        service = BoardPackService(db_session)
+        first = service.generate_board_pack(entity_id=snapshot.entity_id, snapshot_id=snapshot.id)
+        assert first.pack_data_json["build"]["reused_slides"] == []
+
+        second = service.generate_board_pack(entity_id=snapshot.entity_id, snapshot_id=snapshot.id)
+        build = second.pack_data_json["build"]
+        assert build["reused_slides"] == list(range(1, 11)) and build["rendered_slides"] == []
+        assert build["reused_from_pack_id"] == first.id
+        assert _content(service.get_slides(second.id)) == _content(service.get_slides(first.id))
+
+        db_session.query(models.BankAccount).update({"balance": 180000.0})
+        db_session.commit()
+        third = service.generate_board_pack(entity_id=snapshot.entity_id, snapshot_id=snapshot.id)
+        build = third.pack_data_json["build"]
+        assert build["rendered_slides"] == [2, 3, 4, 5]  # Slides that show cash
+        assert build["reused_slides"] == [1, 6, 7, 8, 9, 10]
+        runway = next(s for s in third.slides if s.slide_number == 4)
+        assert runway.metrics_json[0]["value"] == 180000.0
+
+        audit = db_session.query(BoardPackAuditLog).filter(BoardPackAuditLog.pack_id == third.id).one()
+        assert audit.details_json["reused_slides"] == [1, 6, 7, 8, 9, 10]
+
+        # A new render version invalidates every stored hash
+        monkeypatch.setattr(board_pack_service, "SLIDE_RENDER_VERSION", 2)
+        fourth = service.generate_board_pack(entity_id=snapshot.entity_id, snapshot_id=snapshot.id)
+        assert fourth.pack_data_json["build"]["rendered_slides"] == list(range(1, 11))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ASYNC TASK API
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestAsyncGeneration:
+
+    def test_progress_and_result(self, sessions, snapshot):
+        reports = []
+        BoardPackService(sessions()).generate_board_pack(
+            entity_id=snapshot.entity_id, snapshot_id=snapshot.id,
+            progress=lambda percent, message: reports.append(percent),
+        )
+        assert reports == sorted(reports) and reports[0] == 0 and reports[-1] == 100
+
+        task_id = run_async_board_pack(snapshot.entity_id, snapshot.id, session_factory=sessions)
+        for _ in range(200):
+            status = get_task_status(task_id)
+            if status["status"] in ("completed", "failed"):
+                break
+            time.sleep(0.01)
+        assert status["status"] == "completed", status["error"]
+        assert status["progress"] == 100 and status["message"] == "Board pack ready"
+        assert status["result"]["reused_slides"] == list(range(1, 11))
+
+    def test_failure_is_reported(self, sessions):
+        task_id = run_async_board_pack(1, 987654, session_factory=sessions)
+        for _ in range(200):
+            status = get_task_status(task_id)
+            if status["status"] in ("completed", "failed"):
+                break
+            time.sleep(0.01)
+        assert status["status"] == "failed" and "987654" in status["error"]
+
+    def test_shared_connection_builds_in_caller_thread(self, monkeypatch):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        models.Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        db = Session()
+        db.add(models.Entity(id=1, name="Test Entity", currency="EUR"))
+        db.add(models.Snapshot(id=1, name="March", entity_id=1, total_rows=0, created_at=NOW))
+        db.commit()
+        db.close()
+
+        monkeypatch.setattr(async_operations.executor, "submit", lambda fn: pytest.fail("built on a pool thread"))
+        status = get_task_status(run_async_board_pack(1, 1, session_factory=Session))
+        engine.dispose()
+        assert status["status"] == "completed", status["error"]
+        assert status["result"]["rendered_slides"] == list(range(1, 11))
@@ -0,0 +1,277 @@
+"""
+Tests for Concurrent Paginated Fetching (connectors/base.py)
+
+Verifies:
+1. Cursor pagination returns every record in source order
+2. Rate-limited pages are retried and shrink the page size
+3. Page size adapts to fast pages
+4. The next page is prefetched while the current page is consumed
+5. Date-range partitions cover the range and are fetched in parallel
+
+HTTP tests run against a local stub server replaying recorded fixtures.
+"""
+
+import pytest
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connectors.base import (
+    Page, PaginatedFetcher, PaginationConfig, RateLimitError, SyncContext,
+    create_http_session, fetch_partitioned, http_cursor_page_fetcher,
+    partition_date_range
+)
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "connectors"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# STUB HTTP SERVER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class StubListAPI:
+    """Stripe-style list endpoint replaying a recorded fixture."""
+
+    def __init__(self, fixture_name: str):
+        fixture = json.loads((FIXTURES_DIR / fixture_name).read_text())
+        self.endpoint = fixture["endpoint"]
+        self.records = fixture["data"]
+        self.requests = []
+        self.throttle_next = 0  # Number of upcoming requests to answer with 429
+
+    def handle(self, path: str, query: dict):
+        self.requests.append(query)
+        if self.throttle_next > 0:
+            self.throttle_next -= 1
+            return 429, {"Retry-After": "0.25"}, {"error": {"type": "rate_limit_error"}}
+        if path != self.endpoint:
+            return 404, {}, {"error": {"message": "not found"}}
+
+        limit = int(query.get("limit", ["10"])[0])
+        start = 0
+        if "starting_after" in query:
+            ids = [r["id"] for r in self.records]
+            start = ids.index(query["starting_after"][0]) + 1
+        page = self.records[start:start + limit]
+        return 200, {}, {"object": "list", "data": page, "has_more": start + limit < len(self.records)}
+
+
+@pytest.fixture
+def stub_api():
+    """Run a stub HTTP server for the Stripe charges fixture."""
+    api = StubListAPI("stripe_charges.json")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            status, headers, body = api.handle(parsed.path, parse_qs(parsed.query))
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    api.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield api
+    server.shutdown()
+    server.server_close()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# HTTP PAGINATION TESTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestHTTPCursorPagination:
+    """Test cursor pagination against the stub server."""
+
+    def test_fetches_all_records_in_order(self, stub_api):
+        session = create_http_session(pool_size=2)
+        fetch_page = http_cursor_page_fetcher(session, stub_api.base_url + stub_api.endpoint)
+        fetcher = PaginatedFetcher(fetch_page, PaginationConfig(page_size=2, adaptive=False))
+
+        ids = [r["id"] for r in fetcher]
+
+        assert ids == [r["id"] for r in stub_api.records]
+        assert fetcher.pages_fetched == 4
+        assert stub_api.requests[1]["starting_after"] == ["ch_0002"]
+
+    def test_rate_limit_retries_with_retry_after(self, stub_api):
+        stub_api.throttle_next = 2
+        sleeps = []
+        session = create_http_session()
+        fetch_page = http_cursor_page_fetcher(session, stub_api.base_url + stub_api.endpoint)
+        config = PaginationConfig(page_size=4, min_page_size=1, adaptive=False)
+        fetcher = PaginatedFetcher(fetch_page, config, sleep=sleeps.append)
+
+        records = list(fetcher)
+
+        assert len(records) == len(stub_api.records)
+        assert sleeps == [0.25, 0.25]
+        assert fetcher.retries == 2
+        assert fetcher.page_size == 1, "Each 429 should halve the page size"
+
+    def test_rate_limit_gives_up_after_max_retries(self, stub_api):
+        stub_api.throttle_next = 10
+        session = create_http_session()
+        fetch_page = http_cursor_page_fetcher(session, stub_api.base_url + stub_api.endpoint)
+        fetcher = PaginatedFetcher(fetch_page, PaginationConfig(max_retries=2), sleep=lambda s: None)
+
+        with pytest.raises(RateLimitError):
+            list(fetcher)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PAGINATED FETCHER TESTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _offset_fetcher(total: int, calls: list = None):
+    """In-memory offset-paginated source of `total` integers."""
+    def fetch_page(offset, page_size):
+        offset = offset or 0
+        if calls is not None:
+            calls.append((offset, page_size))
+        records = [{"id": i} for i in range(offset, min(offset + page_size, total))]
+        next_offset = offset + len(records)
+        return Page(records=records, next_cursor=next_offset if next_offset < total else None)
+    return fetch_page
+
+
+class TestPaginatedFetcher:
+    """Test prefetching and adaptive page size."""
+
+    def test_adaptive_page_size_grows_on_fast_pages(self):
+        calls = []
+        config = PaginationConfig(page_size=10, max_page_size=80, target_page_seconds=10.0)
+        records = list(PaginatedFetcher(_offset_fetcher(300, calls), config))
+
+        assert [r["id"] for r in records] == list(range(300))
+        assert [size for _, size in calls[:4]] == [10, 20, 40, 80]
+        assert max(size for _, size in calls) == 80
+
+    def test_next_page_prefetched_while_consuming(self):
+        second_page_requested = threading.Event()
+
+        def fetch_page(cursor, page_size):
+            if cursor is None:
+                return Page(records=[{"id": 1}, {"id": 2}], next_cursor="p2")
+            second_page_requested.set()
+            return Page(records=[{"id": 3}])
+
+        iterator = iter(PaginatedFetcher(fetch_page, PaginationConfig(adaptive=False)))
+        assert next(iterator)["id"] == 1
+        # Still consuming page 1, page 2 should already be in flight
+        assert second_page_requested.wait(timeout=2.0)
+        assert [r["id"] for r in iterator] == [2, 3]
+
+    def test_prefetch_disabled_is_sequential(self):
+        config = PaginationConfig(page_size=7, prefetch=False, adaptive=False)
+        records = list(PaginatedFetcher(_offset_fetcher(20), config))
+        assert [r["id"] for r in records] == list(range(20))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DATE PARTITION TESTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestDatePartitioning:
+    """Test parallel date-range backfills."""
+
+    def test_partitions_are_contiguous(self):
+        start = datetime(2025, 1, 1)
+        end = datetime(2025, 12, 31)
+        windows = partition_date_range(start, end, 4)
+
+        assert len(windows) == 4
+        assert windows[0][0] == start
+        assert windows[-1][1] == end
+        for (_, prev_end), (next_start, _) in zip(windows, windows[1:]):
+            assert prev_end == next_start
+
+    def test_single_partition_for_empty_range(self):
+        start = datetime(2025, 1, 1)
+        assert partition_date_range(start, start, 4) == [(start, start)]
+
+    def test_fetch_partitioned_returns_every_record(self):
+        start = datetime(2025, 1, 1)
+        days = [start + timedelta(days=i) for i in range(100)]
+
+        def fetcher_for_range(window_start, window_end):
+            in_window = [{"day": d.isoformat()} for d in days if window_start <= d < window_end]
+
+            def fetch_page(offset, page_size):
+                offset = offset or 0
+                page = in_window[offset:offset + page_size]
+                next_offset = offset + len(page)
+                return Page(records=page, next_cursor=next_offset if next_offset < len(in_window) else None)
+            return fetch_page
+
+        config = PaginationConfig(page_size=7, max_partitions=4)
+        records = list(fetch_partitioned(fetcher_for_range, start, start + timedelta(days=100), config))
+
+        assert sorted(r["day"] for r in records) == [d.isoformat() for d in days]
+
+    def test_fetch_partitioned_propagates_errors(self):
+        def fetcher_for_range(window_start, window_end):
+            def fetch_page(cursor, page_size):
+                raise ValueError("source down")
+            return fetch_page
+
+        start = datetime(2025, 1, 1)
+        with pytest.raises(ValueError, match="source down"):
+            list(fetch_partitioned(fetcher_for_range, start, start + timedelta(days=30)))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONNECTOR INTEGRATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestStripeConnectorPagination:
+    """Test StripeConnector list iteration through the shared paginator."""
+
+    def test_iter_list_uses_starting_after_cursors(self):
+        pytest.importorskip("stripe")
+        from connectors.payments_stripe import StripeConnector
+
+        fixture = json.loads((FIXTURES_DIR / "stripe_charges.json").read_text())["data"]
+        queries = []
+
+        class FakeList:
+            def __init__(self, data, has_more):
+                self.data = data
+                self.has_more = has_more
+
+        class FakeCharge:
+            @staticmethod
+            def list(**query):
+                queries.append(query)
+                start = 0
+                if "starting_after" in query:
+                    start = [c["id"] for c in fixture].index(query["starting_after"]) + 1
+                page = fixture[start:start + query["limit"]]
+                return FakeList(page, start + query["limit"] < len(fixture))
+
+        connector = StripeConnector({"api_key": "sk_test", "pagination": {"page_size": 3, "adaptive": False}})
+        context = SyncContext(connection_id=1, entity_id=1, sync_run_id=1)
+
+        charges = list(connector._iter_list(FakeCharge, context, 'charge'))
+
+        assert [c["id"] for c in charges] == [c["id"] for c in fixture]
+        assert queries[0] == {"limit": 3}
+        assert queries[1]["starting_after"] == "ch_0003"
@@ -0,0 +1,239 @@
+"""
+Tests for the Snapshot Evidence Index (evidence_index.py)
+
+Verifies:
+1. QuestionRouter keeps declaration-order priority and matches whole phrases
+2. BM25 search, citation lookup and facets over invoices, bank transactions,
+   exceptions and variance against the previous snapshot
+3. Facet probes agree with the equivalent table queries
+4. Indexes are reused, rebuilt after publish_event invalidation, and probed
+   by the agent Q&A workflow and the /ask-insights variance answer
+"""
+
+import asyncio
+import pytest
+import time
+from datetime import datetime, timedelta
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models
+import evidence_index
+from evidence_index import QuestionRouter, build_evidence_index, get_evidence_index, invalidate_evidence_index
+from agents.orchestrator import FPAOrchestrator, publish_event
+from agents.workflows import register_all_workflows
+
+
+NOW = datetime(2026, 3, 16, 9, 0)
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'evidence.db'}", connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(sessions):
+    """File database, so the agent executor can open its own sessions"""
+    db = sessions()
+    yield db
+    db.close()
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    invalidate_evidence_index()
+    yield
+    invalidate_evidence_index()
+
+
+def _invoice(snapshot, number, customer, amount, predicted_days, paid=False, currency="EUR", canonical=None, **kwargs):
+    return models.Invoice(
+        snapshot_id=snapshot.id, entity_id=snapshot.entity_id, canonical_id=canonical or number,
+        document_number=number, customer=customer, amount=amount, currency=currency,
+        expected_due_date=NOW + timedelta(days=predicted_days),
+        predicted_payment_date=NOW + timedelta(days=predicted_days),
+        payment_date=NOW if paid else None, **kwargs,
+    )
+
+
+@pytest.fixture
+def snapshots(db_session, sample_entity):
+    previous = models.Snapshot(name="Week 10", entity_id=sample_entity.id, total_rows=0, created_at=NOW - timedelta(days=7))
+    current = models.Snapshot(name="Week 11", entity_id=sample_entity.id, total_rows=0, created_at=NOW)
+    db_session.add_all([previous, current])
+    db_session.commit()
+
+    db_session.add_all([
+        _invoice(previous, "INV-100", "Acme GmbH", 5000.0, -20),
+        _invoice(previous, "INV-101", "Borealis Oy", 3000.0, 5),
+        _invoice(previous, "INV-102", "Cobalt SA", 1200.0, -3),
+        _invoice(previous, "INV-103", "Delta Ltd", 800.0, 10),
+    ])
+    db_session.add_all([
+        _invoice(current, "INV-100", "Acme GmbH", 5000.0, -20, project_desc="Turbine retrofit"),
+        _invoice(current, "INV-101", "Borealis Oy", 3000.0, 12),              # Timing shift +7 days
+        _invoice(current, "INV-102", "Cobalt SA", 1200.0, -3, paid=True),     # Cash recognition
+        _invoice(current, "INV-200", "Acme GmbH", 9000.0, -40, currency="USD"),  # New, late
+        _invoice(current, "INV-201", "Echo Inc", 400.0, -1, blocked_reason="PO missing"),  # New, late
+    ])
+    account = models.BankAccount(entity_id=sample_entity.id, account_name="Main", currency="EUR")
+    db_session.add(account)
+    db_session.commit()
+    unmatched = models.BankTransaction(
+        bank_account_id=account.id, transaction_date=NOW - timedelta(days=12), amount=-730.0,
+        currency="EUR", reference="SEPA 88231", counterparty="Foxtrot Logistics", is_reconciled=0,
+    )
+    old_matched = models.BankTransaction(
+        bank_account_id=account.id, transaction_date=NOW - timedelta(days=200), amount=50.0,
+        currency="EUR", reference="OLD 1", counterparty="Ghost", is_reconciled=1,
+    )
+    db_session.add_all([unmatched, old_matched])
+    db_session.commit()
+    db_session.add(models.ReconciliationException(
+        bank_transaction_id=unmatched.id, snapshot_id=current.id, status="escalated",
+        escalation_reason="Duplicate carrier charge", created_at=NOW - timedelta(days=4),
+    ))
+    db_session.commit()
+    return previous, current
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ROUTING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestQuestionRouter:
+
+    def test_priority_phrases_and_stems(self):
+        router = QuestionRouter({
+            "cash_down": ["why is cash", "cash down"],
+            "forecast_accuracy": ["forecast accuracy"],
+            "forecast": ["forecast", "predict"],
+            "fx": ["eur"],
+        })
+        assert router.route("Why is cash down and what is the forecast?") == "cash_down"
+        assert router.route("What's our forecast accuracy?") == "forecast_accuracy"
+        assert router.route("Show the forecasts") == "forecast"
+        assert router.route("How were predictions made?") == "forecast"
+        assert router.route("Exposure in Europe") is None  # No substring matches
+        assert router.route("Exposure in EUR") == "fx"
+        assert router.route("anything else", default="general") == "general"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# INDEX
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestEvidenceIndex:
+
+    def test_documents_and_search(self, db_session, snapshots):
+        _, current = snapshots
+        index = build_evidence_index(db_session, current.id, as_of=NOW)
+        assert index.get_stats()["documents"] == {"invoice": 5, "bank_transaction": 1, "exception": 1, "variance": 5}
+
+        hits = index.search("What is going on with Acme?", kinds=["invoice"])
+        assert [doc.citation for doc, _ in hits] == ["INV-200", "INV-100"]  # Equal scores, larger first
+        assert [doc.citation for doc, _ in index.search("turbine retrofit")] == ["INV-100"]
+        assert index.search("carrier charge")[0][0].kind == "exception"
+        assert index.search("invoice", ignore={"invoice"}) == []
+
+        assert [doc.kind for doc in index.lookup("sepa 88231")] == ["bank_transaction", "exception"]
+        assert index.lookup("INV-201")[0].customer == "Echo Inc"
+
+    def test_facets_match_table_queries(self, db_session, snapshots):
+        _, current = snapshots
+        index = build_evidence_index(db_session, current.id, as_of=NOW)
+
+        late = db_session.query(models.Invoice).filter(
+            models.Invoice.snapshot_id == current.id,
+            models.Invoice.payment_date == None,
+            models.Invoice.predicted_payment_date < NOW,
+        ).order_by(models.Invoice.amount.desc()).limit(5).all()
+        assert [doc.citation for doc in index.top("invoice", late_only=True)] == [inv.document_number for inv in late]
+        assert [doc.days_late for doc in index.top("invoice", late_only=True)] == [40, 20, 1]
+
+        assert index.currency_totals("invoice") == {
+            "EUR": {"count": 4, "total_amount": 9600.0},
+            "USD": {"count": 1, "total_amount": 9000.0},
+        }
+        assert [doc.citation for doc in index.top("invoice", currency="usd")] == ["INV-200"]
+        assert [b["count"] for b in index.lateness("invoice")] == [2, 1, 0, 0]
+        assert index.top("bank_transaction", late_only=True)[0].days_late == 12
+
+        assert index.variance_by_category() == {
+            "New Item": {"count": 2, "total_amount": 9400.0},
+            "Timing Shift": {"count": 1, "total_amount": 3000.0},
+            "Cash Recognition": {"count": 1, "total_amount": -1200.0},
+            "Removed Item": {"count": 1, "total_amount": -800.0},
+        }
+        assert index.net_variance() == 9400.0 - 1200.0 - 800.0  # The timing shift moves no money
+        [shift] = [doc for doc in index.top("variance") if doc.details["category"] == "Timing Shift"]
+        assert shift.details["shift_days"] == 7
+
+    def test_probes_are_fast(self, db_session, sample_entity):
+        snapshot = models.Snapshot(name="Big", entity_id=sample_entity.id, total_rows=0, created_at=NOW)
+        db_session.add(snapshot)
+        db_session.commit()
+        customers = [f"Customer {i:03d} Holdings" for i in range(200)]
+        db_session.bulk_save_objects([
+            _invoice(snapshot, f"INV-{i:05d}", customers[i % 200], float(i % 997) * 10, (i % 90) - 45)
+            for i in range(5000)
+        ])
+        db_session.commit()
+        index = build_evidence_index(db_session, snapshot.id, as_of=NOW)
+
+        started = time.perf_counter()
+        for i in range(100):
+            index.top("invoice", late_only=True)
+            index.lookup(f"INV-{i:05d}")
+            index.search(f"customer {i:03d}", kinds=["invoice"])
+        per_probe_ms = (time.perf_counter() - started) * 1000 / 100
+        assert per_probe_ms < 5
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REGISTRY AND CALLERS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestRegistry:
+
+    def test_reuse_and_invalidation(self, db_session, snapshots):
+        _, current = snapshots
+        first = get_evidence_index(db_session, current.id)
+        assert get_evidence_index(db_session, current.id) is first
+
+        publish_event(current.entity_id, "reconciliation_updated", {})
+        rebuilt = get_evidence_index(db_session, current.id)
+        assert rebuilt is not first
+
+        first_of_day = evidence_index._registry.get(current.id)
+        first_of_day.as_of -= timedelta(days=1)
+        assert get_evidence_index(db_session, current.id) is not first_of_day
+        assert get_evidence_index(db_session, 987654) is None
+
+    def test_question_answering_attaches_evidence(self, sessions, db_session, snapshots):
+        orchestrator = FPAOrchestrator(db_session, entity_id=1, autonomous_mode=False, session_factory=sessions)
+        register_all_workflows(orchestrator)
+        try:
+            result = asyncio.run(orchestrator.ask_question("Why is cash down? Is it Borealis?", user_id="cfo"))
+        finally:
+            orchestrator.executor.shutdown()
+        assert result["question_type"] == "cash_down"
+        assert [e["citation"] for e in result["evidence"]] == ["INV-101", "INV-101"]  # Invoice and its timing shift
+
+    def test_ask_insights_reports_net_variance(self, db_session, snapshots):
+        import main
+        _, current = snapshots
+        result = main.ask_insights(
+            snapshot_id=current.id, entity_id=current.entity_id, query="Why is there a shortfall?", db=db_session,
+        )
+        assert result["answer"].startswith("Since the previous snapshot open AR has a net €7,400 variance.")
+        assert "INV-200" in result["citations"]
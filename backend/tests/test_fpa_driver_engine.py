@@ -0,0 +1,179 @@
+"""
+Tests for the Vectorized FP&A Driver Engine (fpa_driver_engine.py)
+
+Verifies:
+1. Batch results match FPAComputeEngine's Decimal computation exactly
+2. Values on a half-cent boundary are resolved with Decimal
+3. run_forecast_variants evaluates driver overrides of a stored run
+4. Hundreds of variants evaluate in one fast call
+"""
+
+import pytest
+import random
+import time
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fpa_models
+from fpa_compute_engine import FPAComputeEngine
+from fpa_driver_engine import VectorizedDriverEngine
+
+
+PERIOD = (date(2026, 1, 1), date(2028, 12, 1))
+
+
+def _months():
+    return FPAComputeEngine(db=None)._get_months_in_range(*PERIOD)
+
+
+def _random_drivers(rng):
+    return {
+        "base_monthly_revenue": rng.choice([100000, 250000.5, 87654.32]),
+        "revenue_growth_pct": round(rng.uniform(-3, 12), 2),
+        "churn_rate_pct": round(rng.uniform(0, 4), 2),
+        "cogs_pct": rng.randint(10, 45),
+        "headcount_engineering": rng.randint(2, 40),
+        "headcount_sales": rng.randint(1, 20),
+        "headcount_growth_pct": rng.choice([0, 12, 33.3]),
+        "burden_rate_pct": rng.choice([20, 25, 31.5]),
+        "software_spend_monthly": rng.choice([0, 5000, 7250.25]),
+        "marketing_spend_monthly": rng.choice([0, 15000]),
+        "one_time_revenue_monthly": rng.choice([0, 2500]),
+        "capex_monthly": rng.choice([0, 4000]),
+        "starting_cash": rng.choice([500000, 2000000, 3500000.75]),
+        "dso_days": rng.choice([30, 45, 60]),
+        "dpo_days": rng.choice([15, 30]),
+        "min_cash_threshold": rng.choice([100000, 250000]),
+    }
+
+
+def _reference(drivers, actuals=None):
+    engine = FPAComputeEngine(db=None)
+    pl = engine.compute_pl(*PERIOD, drivers, actuals)
+    bridge = engine.compute_cash_bridge(*PERIOD, pl, drivers, actuals)
+    return pl, bridge, engine.compute_runway(bridge, drivers)
+
+
+# =============================================================================
+# EXACTNESS
+# =============================================================================
+
+class TestDecimalParity:
+
+    def test_batch_matches_decimal_engine(self):
+        rng = random.Random(42)
+        driver_sets = [_random_drivers(rng) for _ in range(60)]
+        result = VectorizedDriverEngine(_months()).compute(driver_sets)
+
+        for i, drivers in enumerate(driver_sets):
+            pl, bridge, runway = _reference(drivers)
+            assert result.monthly("revenue", i) == pl.revenue_by_month
+            assert result.monthly("cogs", i) == pl.cogs_by_month
+            assert result.monthly("opex", i) == pl.opex_by_month
+            assert result.monthly("ebitda", i) == pl.ebitda_by_month
+            assert result.monthly("ending_cash", i) == bridge.ending_cash_by_month
+            assert result.summary(i) == {
+                "total_revenue": pl.total_revenue,
+                "total_cogs": pl.total_cogs,
+                "total_opex": pl.total_opex,
+                "total_ebitda": pl.total_ebitda,
+                "ending_cash": bridge.ending_cash,
+                "runway_months": runway.runway_months,
+            }
+
+    def test_line_items_match(self):
+        drivers = _random_drivers(random.Random(3))
+        result = VectorizedDriverEngine(_months()).compute([drivers])
+        pl, _, _ = _reference(drivers)
+
+        expected = {li.label: li.monthly_values for li in pl.line_items}
+        for category, subcategory, label, values in result.line_items:
+            cents = {k: Decimal(int(v)).scaleb(-2) for k, v in zip(result.month_keys, values[0])}
+            assert cents == expected[label]
+
+    def test_half_cent_tie_resolved_with_decimal(self):
+        # 10% COGS of 1000.05 is exactly 100.005 -> half-even rounds to 100.00
+        drivers = {"base_monthly_revenue": 1000.05, "cogs_pct": 10}
+        result = VectorizedDriverEngine(_months()).compute([drivers, {}])
+        pl, _, _ = _reference(drivers)
+
+        assert result.exact_series_rows == 1
+        assert result.exact_fallbacks == []
+        assert result.monthly("cogs", 0) == pl.cogs_by_month
+        assert result.monthly("cogs", 0)["2026-01"] == Decimal("-100.00")
+
+    def test_sub_cent_base_revenue_keeps_exact_totals(self):
+        drivers = {"base_monthly_revenue": 1234.567, "revenue_growth_pct": 2}
+        result = VectorizedDriverEngine(_months()).compute([drivers])
+        pl, _, _ = _reference(drivers)
+
+        assert result.exact_fallbacks == [0]
+        assert result.summary(0)["total_revenue"] == pl.total_revenue
+
+
+# =============================================================================
+# FORECAST RUN VARIANTS
+# =============================================================================
+
+@pytest.fixture
+def forecast_db():
+    """Mock session serving one forecast run with its plan and assumptions."""
+    plan = fpa_models.Plan(id=1, entity_id=1, name="FY26", period_start=PERIOD[0], period_end=PERIOD[1])
+    assumptions = fpa_models.AssumptionSet(id=1, plan_id=1, version=1)
+    assumptions.drivers = [
+        fpa_models.Driver(key=key, value=Decimal(str(value)), unit="number")
+        for key, value in {"base_monthly_revenue": 200000, "revenue_growth_pct": 4, "churn_rate_pct": 1}.items()
+    ]
+    run = fpa_models.ForecastRun(id=1, plan_id=1, assumption_set_id=1)
+    rows = {fpa_models.ForecastRun: run, fpa_models.Plan: plan, fpa_models.AssumptionSet: assumptions}
+
+    db = MagicMock()
+    db.query.side_effect = lambda model: MagicMock(**{"filter.return_value.first.return_value": rows.get(model)})
+    return db, run
+
+
+class TestForecastVariants:
+
+    def test_variants_match_full_forecast(self, forecast_db):
+        db, forecast_run = forecast_db
+        variants = [{}, {"revenue_growth_pct": 8}, {"churn_rate_pct": 3, "headcount_sales": 12}]
+        engine = FPAComputeEngine(db)
+
+        summaries = engine.run_forecast_variants(forecast_run.id, variants)
+        baseline = engine.run_forecast(forecast_run.id)
+
+        assert [s["variant"] for s in summaries] == variants
+        assert summaries[0]["total_revenue"] == baseline.pl.total_revenue
+        assert summaries[0]["ending_cash"] == baseline.cash_bridge.ending_cash
+        assert summaries[0]["runway_months"] == baseline.runway.runway_months
+        assert summaries[1]["total_revenue"] > summaries[0]["total_revenue"]
+
+    def test_variants_do_not_store_results(self, forecast_db):
+        db, forecast_run = forecast_db
+        FPAComputeEngine(db).run_forecast_variants(forecast_run.id, [{"cogs_pct": 30}])
+        assert forecast_run.outputs_json is None
+        db.commit.assert_not_called()
+
+
+# =============================================================================
+# PERFORMANCE
+# =============================================================================
+
+class TestDriverEnginePerformance:
+
+    def test_hundreds_of_variants_are_fast(self):
+        rng = random.Random(9)
+        driver_sets = [_random_drivers(rng) for _ in range(500)]
+        engine = VectorizedDriverEngine(_months())
+
+        start = time.perf_counter()
+        result = engine.compute(driver_sets)
+        elapsed = time.perf_counter() - start
+
+        assert result.scenario_count == 500
+        assert elapsed < 1.0, f"500 variants took {elapsed:.3f}s"
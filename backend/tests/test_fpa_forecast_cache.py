@@ -0,0 +1,186 @@
+"""
+Tests for the Content-Addressed Forecast Cache (fpa_forecast_cache.py)
+
+Verifies:
+1. Identical inputs are served from cache without recomputation
+2. Any input change (driver, period, actuals, simulation) changes the key
+3. Stored ForecastRun outputs are reused across processes (DB tier), but
+   not once ENGINE_VERSION has changed
+4. Hit/miss metrics are counted globally and per tracking scope
+5. Cached outputs rebuild into an identical ForecastOutput
+"""
+
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fpa_models
+from fpa_compute_engine import FPAComputeEngine, ForecastOutput
+from fpa_forecast_cache import ForecastCache, compute_inputs_hash
+
+
+DRIVERS = {"base_monthly_revenue": 200000, "revenue_growth_pct": 4, "churn_rate_pct": 1}
+
+
+def _plan(end=date(2026, 12, 1)):
+    return fpa_models.Plan(id=1, entity_id=1, name="FY26", period_start=date(2026, 1, 1), period_end=end)
+
+
+def _db(run, plan=None, stored=None, drivers=DRIVERS):
+    """Mock session serving one forecast run; `stored` answers inputs-hash lookups."""
+    assumptions = fpa_models.AssumptionSet(id=1, plan_id=1, version=1)
+    assumptions.drivers = [
+        fpa_models.Driver(key=key, value=Decimal(str(value)), unit="number")
+        for key, value in drivers.items()
+    ]
+
+    def query(model):
+        q = MagicMock()
+        if model is fpa_models.ForecastRun:
+            q.filter.side_effect = lambda *criteria: MagicMock(**{
+                "first.return_value": run if len(criteria) != 2 else (
+                    stored if stored is not None and criteria[0].right.value == stored.inputs_hash else None
+                )
+            })
+        else:
+            row = {fpa_models.Plan: plan or _plan(), fpa_models.AssumptionSet: assumptions}.get(model)
+            q.filter.return_value.first.return_value = row
+        return q
+
+    db = MagicMock()
+    db.query.side_effect = query
+    return db
+
+
+def _run(run_id=1):
+    return fpa_models.ForecastRun(id=run_id, plan_id=1, assumption_set_id=1)
+
+
+# =============================================================================
+# CACHE KEY
+# =============================================================================
+
+class TestInputsHash:
+
+    def test_stable_for_equal_inputs(self):
+        assert compute_inputs_hash(_plan(), dict(DRIVERS)) == compute_inputs_hash(_plan(), dict(reversed(DRIVERS.items())))
+
+    def test_changes_with_any_input(self):
+        base = compute_inputs_hash(_plan(), DRIVERS)
+        actuals = fpa_models.ActualsSnapshot(id=3, revenue_total=Decimal("1000"), cash_ending=Decimal("5000"))
+        edited = fpa_models.ActualsSnapshot(id=3, revenue_total=Decimal("1200"), cash_ending=Decimal("5000"))
+
+        variants = {
+            compute_inputs_hash(_plan(), {**DRIVERS, "churn_rate_pct": 2}),
+            compute_inputs_hash(_plan(end=date(2027, 6, 1)), DRIVERS),
+            compute_inputs_hash(_plan(), DRIVERS, actuals),
+            compute_inputs_hash(_plan(), DRIVERS, edited),
+            compute_inputs_hash(_plan(), DRIVERS, simulation={"paths": 100}),
+        }
+        assert base not in variants
+        assert len(variants) == 5
+
+
+# =============================================================================
+# MEMOIZED RUN_FORECAST
+# =============================================================================
+
+class TestMemoizedForecast:
+
+    def test_second_run_served_without_compute(self):
+        cache = ForecastCache()
+        first_run, second_run = _run(1), _run(2)
+        first = FPAComputeEngine(_db(first_run), cache=cache).run_forecast(1)
+
+        engine = FPAComputeEngine(_db(second_run), cache=cache)
+        with patch.object(FPAComputeEngine, "compute_pl", side_effect=AssertionError("recomputed")):
+            second = engine.run_forecast(2)
+
+        assert second.to_dict() == first.to_dict()
+        assert second_run.outputs_json == first_run.outputs_json
+        assert second_run.inputs_hash == first_run.inputs_hash
+        assert second_run.runway_months == first_run.runway_months
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    def test_changed_drivers_recompute(self):
+        cache = ForecastCache()
+        FPAComputeEngine(_db(_run(1)), cache=cache).run_forecast(1)
+        changed = _run(2)
+        FPAComputeEngine(_db(changed, drivers={**DRIVERS, "revenue_growth_pct": 6}), cache=cache).run_forecast(2)
+
+        assert cache.stats.misses == 2
+        assert changed.total_revenue > Decimal("0")
+
+    def test_stored_run_reused_by_fresh_process(self):
+        stored = _run(1)
+        FPAComputeEngine(_db(stored), cache=ForecastCache()).run_forecast(1)
+
+        fresh_cache = ForecastCache()
+        rerun = _run(2)
+        with patch.object(FPAComputeEngine, "compute_pl", side_effect=AssertionError("recomputed")):
+            FPAComputeEngine(_db(rerun, stored=stored), cache=fresh_cache).run_forecast(2)
+
+        assert rerun.outputs_hash == stored.outputs_hash
+        assert fresh_cache.stats.hits == 1
+        assert len(fresh_cache) == 1
+
+    def test_outputs_of_an_older_engine_are_not_reused(self):
+        stored = _run(1)
+        with patch("fpa_forecast_cache.ENGINE_VERSION", "1"):
+            FPAComputeEngine(_db(stored), cache=ForecastCache()).run_forecast(1)
+
+        fresh_cache = ForecastCache()
+        rerun = _run(2)
+        FPAComputeEngine(_db(rerun, stored=stored), cache=fresh_cache).run_forecast(2)
+
+        assert rerun.inputs_hash != stored.inputs_hash
+        assert (fresh_cache.stats.hits, fresh_cache.stats.misses) == (0, 1)
+
+    def test_use_cache_false_recomputes(self):
+        cache = ForecastCache()
+        engine = FPAComputeEngine(_db(_run(1)), cache=cache)
+        engine.run_forecast(1)
+        engine.run_forecast(1, use_cache=False)
+        assert (cache.stats.hits, cache.stats.misses) == (0, 1)
+
+    def test_cached_output_rebuilds_identically(self):
+        cache = ForecastCache()
+        output = FPAComputeEngine(_db(_run(1)), cache=cache).run_forecast(1)
+        assert ForecastOutput.from_dict(output.to_dict()) == output
+
+
+# =============================================================================
+# METRICS AND EVICTION
+# =============================================================================
+
+class TestCacheMetrics:
+
+    def test_track_scopes_count_only_their_block(self):
+        cache = ForecastCache()
+        cache.put("a", {"x": 1})
+        cache.get(None, "a")
+
+        with cache.track() as outer:
+            cache.get(None, "a")
+            with cache.track() as inner:
+                cache.get(None, "missing")
+
+        assert outer.to_dict() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+        assert inner.to_dict() == {"hits": 0, "misses": 1, "hit_rate": 0.0}
+        assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+
+    def test_lru_eviction(self):
+        cache = ForecastCache(max_entries=2)
+        cache.put("a", {})
+        cache.put("b", {})
+        cache.get(None, "a")
+        cache.put("c", {})
+
+        assert cache.get(None, "b") is None
+        assert cache.get(None, "a") == {}
+        assert len(cache) == 2
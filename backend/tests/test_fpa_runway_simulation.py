@@ -0,0 +1,177 @@
+"""
+Tests for Monte Carlo Runway Simulation (fpa_runway_simulation.py)
+
+Verifies:
+1. The same seed gives the same distribution
+2. With zero variance every path reproduces the deterministic runway
+3. Breach probability never decreases over the horizon
+4. Costs reduce cash: opex above revenue breaches without capex
+5. compute_runway/run_forecast attach the simulation only when requested
+6. 10,000 paths x 36 months run in well under a second
+"""
+
+import pytest
+import time
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import numpy as np
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fpa_models
+from fpa_compute_engine import FPAComputeEngine
+from fpa_runway_simulation import RunwaySimulationConfig, sample_drivers, simulate_runway
+
+
+PERIOD = (date(2026, 1, 1), date(2028, 12, 1))
+
+DRIVERS = {
+    "base_monthly_revenue": 120000,
+    "revenue_growth_pct": 3,
+    "churn_rate_pct": 1.5,
+    "cogs_pct": 30,
+    "headcount_engineering": 12,
+    "headcount_sales": 6,
+    "headcount_growth_pct": 10,
+    "marketing_spend_monthly": 20000,
+    "capex_monthly": 0,
+    "starting_cash": 1500000,
+    "dso_days": 45,
+    "dpo_days": 30,
+    "min_cash_threshold": 250000,
+}
+
+ZERO_VARIANCE = {
+    "revenue_growth_pct": {"dist": "normal", "std": 0},
+    "churn_rate_pct": {"dist": "normal", "std": 0},
+    "dso_days": {"dist": "normal", "std": 0},
+    "dpo_days": {"dist": "normal", "std": 0},
+}
+
+
+def _months():
+    return FPAComputeEngine(db=None)._get_months_in_range(*PERIOD)
+
+
+def _deterministic(drivers, simulation=None):
+    engine = FPAComputeEngine(db=None)
+    pl = engine.compute_pl(*PERIOD, drivers, None)
+    bridge = engine.compute_cash_bridge(*PERIOD, pl, drivers, None)
+    return bridge, engine.compute_runway(bridge, drivers, simulation=simulation)
+
+
+# =============================================================================
+# DISTRIBUTION
+# =============================================================================
+
+class TestSimulation:
+
+    def test_same_seed_same_distribution(self):
+        config = RunwaySimulationConfig(paths=2000, seed=11)
+        first = simulate_runway(_months(), DRIVERS, config)
+        second = simulate_runway(_months(), DRIVERS, config)
+        other = simulate_runway(_months(), DRIVERS, RunwaySimulationConfig(paths=2000, seed=12))
+
+        assert first == second
+        assert first["breach_probability_by_month"] != other["breach_probability_by_month"]
+
+    def test_zero_variance_matches_deterministic_runway(self):
+        bridge, runway = _deterministic(DRIVERS)
+        config = RunwaySimulationConfig(paths=50, distributions=ZERO_VARIANCE)
+        result = simulate_runway(_months(), DRIVERS, config, starting_cash=bridge.starting_cash)
+
+        assert runway.runway_months < len(_months()), "fixture should breach inside the horizon"
+        assert set(result["runway_percentiles"].values()) == {runway.runway_months}
+        assert result["probability_of_breach"] == 1.0
+
+    def test_breach_curve_is_monotonic(self):
+        result = simulate_runway(_months(), DRIVERS, RunwaySimulationConfig(paths=3000, seed=5))
+        curve = [point["probability"] for point in result["breach_probability_by_month"]]
+
+        assert len(curve) == len(_months())
+        assert all(a <= b for a, b in zip(curve, curve[1:]))
+        assert 0 < result["probability_of_breach"] <= 1
+
+    def test_opex_above_revenue_breaches_without_capex(self):
+        drivers = {"base_monthly_revenue": 50000, "starting_cash": 500000, "capex_monthly": 0}
+        bridge, runway = _deterministic(drivers)
+        result = simulate_runway(_months(), drivers, RunwaySimulationConfig(paths=500, seed=2))
+
+        assert bridge.ebitda_by_month["2026-01"] < 0
+        assert runway.runway_months < 12
+        assert result["probability_of_breach"] == 1.0
+        assert result["runway_percentiles"]["p90"] < 12
+
+    def test_percentiles_are_ordered(self):
+        result = simulate_runway(_months(), DRIVERS, RunwaySimulationConfig(paths=3000, seed=5))
+        values = [result["runway_percentiles"][f"p{p}"] for p in (10, 25, 50, 75, 90)]
+        assert values == sorted(values)
+
+    def test_samples_respect_bounds_and_integers(self):
+        config = RunwaySimulationConfig(paths=1000, seed=3)
+        samples = sample_drivers(DRIVERS, config, np.random.default_rng(3))
+
+        assert samples["churn_rate_pct"].min() >= 0
+        assert samples["dso_days"].min() >= 0
+        assert np.array_equal(samples["hiring_slippage_months"], np.rint(samples["hiring_slippage_months"]))
+
+    def test_unknown_distribution_rejected(self):
+        config = RunwaySimulationConfig(paths=10, distributions={"dso_days": {"dist": "cauchy"}})
+        with pytest.raises(ValueError):
+            simulate_runway(_months(), DRIVERS, config)
+
+
+# =============================================================================
+# COMPUTE ENGINE INTEGRATION
+# =============================================================================
+
+class TestComputeEngineIntegration:
+
+    def test_runway_output_unchanged_without_simulation(self):
+        _, runway = _deterministic(DRIVERS)
+        assert runway.simulation is None
+        assert "simulation" not in runway.to_dict()
+
+    def test_runway_output_includes_simulation(self):
+        _, runway = _deterministic(DRIVERS, RunwaySimulationConfig(paths=500, seed=1))
+        assert runway.to_dict()["simulation"]["paths"] == 500
+        assert "p50" in runway.simulation["runway_percentiles"]
+
+    def test_run_forecast_stores_percentiles(self):
+        plan = fpa_models.Plan(id=1, entity_id=1, name="FY26", period_start=PERIOD[0], period_end=PERIOD[1])
+        assumptions = fpa_models.AssumptionSet(id=1, plan_id=1, version=1)
+        assumptions.drivers = [
+            fpa_models.Driver(key=key, value=Decimal(str(value)), unit="number")
+            for key, value in DRIVERS.items()
+        ]
+        run = fpa_models.ForecastRun(id=1, plan_id=1, assumption_set_id=1)
+        rows = {fpa_models.ForecastRun: run, fpa_models.Plan: plan, fpa_models.AssumptionSet: assumptions}
+        db = MagicMock()
+        db.query.side_effect = lambda model: MagicMock(**{"filter.return_value.first.return_value": rows.get(model)})
+
+        FPAComputeEngine(db).run_forecast(run.id, simulation=RunwaySimulationConfig(paths=500))
+
+        assert set(run.metrics_json["runway_percentiles"]) == {"p10", "p25", "p50", "p75", "p90"}
+        assert 0 <= run.metrics_json["probability_of_breach"] <= 1
+
+
+# =============================================================================
+# PERFORMANCE
+# =============================================================================
+
+class TestSimulationPerformance:
+
+    def test_ten_thousand_paths_under_a_second(self):
+        months = _months()
+        assert len(months) == 36
+
+        start = time.perf_counter()
+        result = simulate_runway(months, DRIVERS, RunwaySimulationConfig(paths=10000, seed=0))
+        elapsed = time.perf_counter() - start
+
+        assert result["paths"] == 10000
+        assert elapsed < 1.0, f"10k paths took {elapsed:.3f}s"
@@ -5,6 +5,7 @@ Verifies that:
 1. Re-loading the same dataset cannot create duplicate canonical rows
 2. The UNIQUE(dataset_id, canonical_id) constraint is enforced
 3. Idempotent syncs skip duplicates gracefully
+4. A failing row is rolled back without aborting the rest of its batch
 """
 
 import pytest
@@ -26,6 +27,8 @@ from connector_interface import (
     ConnectorRegistry, StubBankConnector, StubERPConnector, ExtractedRow
 )
 from lineage_service import LineageService
+from sync_dedup_index import BloomFilter, ConnectionDedupIndex
+from sync_watermarks import WatermarkStore
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -415,6 +418,105 @@ class TestDatasetIdGeneration:
         assert len(ids) == len(set(ids)), "Dataset IDs should be unique"
 
 
+class TestSyncDedupIndex:
+    """Test the per-connection idempotency index (bloom filter + exact set)."""
+    
+    def _new_run(self, db_session, connection):
+        sync_run = SyncRun(connection_id=connection.id, status=SyncStatus.RUNNING.value)
+        db_session.add(sync_run)
+        db_session.commit()
+        dataset = LineageDataset(entity_id=1, sync_run_id=sync_run.id, source_type="bank_txn")
+        db_session.add(dataset)
+        db_session.commit()
+        return sync_run, dataset
+    
+    def test_bloom_filter_no_false_negatives(self):
+        """Every added key must be reported as present."""
+        bloom = BloomFilter.for_capacity(1000, 0.01)
+        keys = [f"key_{i}" for i in range(1000)]
+        for k in keys:
+            bloom.add(k)
+        assert all(k in bloom for k in keys)
+        
+        false_positives = sum(1 for i in range(1000) if f"other_{i}" in bloom)
+        assert false_positives < 50, "False positive rate should be near the configured 1%"
+    
+    def test_bloom_filter_roundtrip(self):
+        """Filter state survives serialization."""
+        bloom = BloomFilter.for_capacity(100)
+        bloom.add("abc")
+        restored = BloomFilter(bloom.num_bits, bloom.num_hashes, bloom.to_bytes())
+        assert "abc" in restored
+    
+    def test_resync_skips_rows_before_normalization(self, db_session, lineage_service, test_connection):
+        """A second sync of unchanged data loads nothing and normalizes nothing."""
+        connector = StubBankConnector({})
+        
+        sync_run1, dataset1 = self._new_run(db_session, test_connection)
+        result1 = lineage_service._extract_and_load(db_session, connector, dataset1, sync_run1, None, None)
+        assert result1.rows_loaded == 3
+        assert result1.rows_deduplicated == 0
+        
+        # Force a full re-extract rather than an incremental one
+        WatermarkStore(db_session, test_connection.id).reset()
+        sync_run2, dataset2 = self._new_run(db_session, test_connection)
+        result2 = lineage_service._extract_and_load(db_session, connector, dataset2, sync_run2, None, None)
+        assert result2.rows_extracted == 3
+        assert result2.rows_normalized == 0
+        assert result2.rows_loaded == 0
+        assert result2.rows_deduplicated == 3
+        assert result2.rows_skipped == 3
+        assert db_session.query(RawRecord).filter(RawRecord.dataset_id == dataset2.id).count() == 0
+    
+    def test_failed_row_does_not_poison_batch(self, db_session, lineage_service, test_connection):
+        """A row that violates a constraint is rolled back alone; the rest of the batch loads."""
+        class OneBadRowConnector(StubBankConnector):
+            def normalize(self, raw_row):
+                normalized = super().normalize(raw_row)
+                if raw_row.source_row_id == self.bad_row_id:
+                    normalized["canonical_id"] = None  # NOT NULL violation on flush
+                return normalized
+        
+        connector = OneBadRowConnector({})
+        connector.bad_row_id = list(connector.extract())[1].source_row_id
+        
+        sync_run, dataset = self._new_run(db_session, test_connection)
+        result = lineage_service._extract_and_load(db_session, connector, dataset, sync_run, None, None)
+        assert result.rows_error == 1
+        assert result.errors[0]["error_type"] == "IntegrityError"
+        assert result.rows_loaded == 2
+        assert db_session.query(CanonicalRecord).filter(CanonicalRecord.dataset_id == dataset.id).count() == 2
+        assert db_session.query(RawRecord).filter(RawRecord.dataset_id == dataset.id).count() == 2
+    
+    def test_index_is_per_connection(self, db_session, lineage_service, test_connection):
+        """The same rows synced through a different connection are loaded."""
+        other = lineage_service.create_connection(
+            entity_id=1, connection_type="bank_stub", name="Other Bank", config={}
+        )
+        connector = StubBankConnector({})
+        
+        sync_run1, dataset1 = self._new_run(db_session, test_connection)
+        lineage_service._extract_and_load(db_session, connector, dataset1, sync_run1, None, None)
+        
+        sync_run2, dataset2 = self._new_run(db_session, other)
+        result = lineage_service._extract_and_load(db_session, connector, dataset2, sync_run2, None, None)
+        assert result.rows_loaded == 3
+    
+    def test_index_rebuilds_when_filter_is_stale(self, db_session, lineage_service, test_connection):
+        """Entries committed without a saved filter are still recognized."""
+        index = ConnectionDedupIndex.load(db_session, test_connection.id)
+        index.add("a" * 64, "canon_a")
+        db_session.commit()  # Entry committed, crash before save()
+        
+        reloaded = ConnectionDedupIndex.load(db_session, test_connection.id)
+        assert reloaded.filter_seen(["a" * 64, "b" * 64]) == {"a" * 64}
+    
+    def test_skip_rate(self):
+        """Skip rate is skipped / extracted and safe for empty runs."""
+        assert SyncRun(rows_extracted=0, rows_skipped=0).skip_rate == 0.0
+        assert SyncRun(rows_extracted=4, rows_skipped=3).skip_rate == 0.75
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # RUN TESTS
 # ═══════════════════════════════════════════════════════════════════════════════
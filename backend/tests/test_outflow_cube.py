@@ -0,0 +1,214 @@
+"""
+Tests for the Weekly Outflow Cube (outflow_cube.py)
+
+Verifies:
+1. Cube reads match the per-row outflow aggregation it replaces
+2. A single bill edit updates the cube incrementally
+3. Missing and stale cubes are rebuilt on read
+4. The 13-week workspace and red-week drilldown read week totals from the cube
+"""
+
+import ast
+import pytest
+import random
+from datetime import date, datetime, timedelta
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from outflow_cube import (
+    apply_bill_change, bill_cash_out_date, bill_cell, build_outflow_cube,
+    invalidate_outflow_cube, read_outflow_cube, week_start_of
+)
+
+
+TODAY = date(2026, 3, 11)
+CATEGORIES = ["Rent", "Payroll", "Vendor", "General Vendor", None]
+
+
+@pytest.fixture
+def outflow_snapshot(db_session, sample_snapshot):
+    rng = random.Random(5)
+    db_session.add(models.WeeklyFXRate(
+        snapshot_id=sample_snapshot.id, from_currency="USD", to_currency="EUR", rate=0.9
+    ))
+    for i in range(120):
+        due = datetime(2026, 3, 1) + timedelta(days=rng.randint(-20, 80))
+        db_session.add(models.VendorBill(
+            snapshot_id=sample_snapshot.id, vendor_name=f"V{i}", amount=round(rng.uniform(100, 9000), 2),
+            currency=rng.choice(["EUR", "EUR", "USD"]), due_date=due,
+            approval_date=due - timedelta(days=rng.randint(0, 20)) if rng.random() < 0.5 else None,
+            scheduled_payment_date=due + timedelta(days=3) if rng.random() < 0.2 else None,
+            hold_status=1 if rng.random() < 0.1 else 0,
+            is_discretionary=1 if rng.random() < 0.3 else 0,
+            category=rng.choice(CATEGORIES)
+        ))
+    for i in range(60):
+        db_session.add(models.OutflowItem(
+            snapshot_id=sample_snapshot.id, category=rng.choice(CATEGORIES), description=f"T{i}",
+            amount=round(rng.uniform(500, 20000), 2), currency=rng.choice(["EUR", "USD"]),
+            expected_date=datetime(2026, 3, 2) + timedelta(days=rng.randint(0, 90)),
+            is_discretionary=1 if rng.random() < 0.3 else 0
+        ))
+    db_session.commit()
+    return sample_snapshot
+
+
+def _per_row_summary(db, snapshot_id, today=TODAY):
+    """The bill/template aggregation get_outflow_summary ran before the cube"""
+    rate = {"EUR": 1.0, "USD": 0.9}
+    snapshot = db.query(models.Snapshot).get(snapshot_id)
+    run_day = snapshot.entity.payment_run_day if snapshot.entity else 3
+
+    rows, mask = [], set()
+    for bill in db.query(models.VendorBill).filter_by(snapshot_id=snapshot_id):
+        if bill.hold_status:
+            continue
+        week = week_start_of(bill_cash_out_date(bill, run_day, today))
+        rows.append((week, bill.category or "General Vendor", bill.amount * rate[bill.currency], bill.is_discretionary == 1))
+        mask.add((week, bill.category))
+    for item in db.query(models.OutflowItem).filter_by(snapshot_id=snapshot_id):
+        week = week_start_of(item.expected_date.date())
+        if (week, item.category) not in mask and item.category is not None:
+            rows.append((week, item.category, item.amount * rate[item.currency], item.is_discretionary == 1))
+
+    summary = {}
+    for week, category, amount, discretionary in rows:
+        slot = summary.setdefault(week, {}).setdefault(category, {"total": 0.0, "committed": 0.0, "discretionary": 0.0})
+        slot["discretionary" if discretionary else "committed"] += amount
+        slot["total"] += amount
+    return summary
+
+
+def _assert_summaries_equal(actual, expected):
+    assert actual.keys() == expected.keys()
+    for week, categories in expected.items():
+        assert actual[week].keys() == categories.keys(), week
+        for category, values in categories.items():
+            assert actual[week][category] == pytest.approx(values), (week, category)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BUILD AND READ
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestCubeParity:
+
+    def test_read_matches_per_row_aggregation(self, db_session, outflow_snapshot):
+        build_outflow_cube(db_session, outflow_snapshot.id, today=TODAY)
+        summary = read_outflow_cube(db_session, outflow_snapshot.id, today=TODAY)
+        _assert_summaries_equal(summary, _per_row_summary(db_session, outflow_snapshot.id))
+
+    def test_bills_mask_templates_per_week_and_category(self, db_session, sample_snapshot):
+        week = datetime(2026, 3, 16)
+        db_session.add_all([
+            models.VendorBill(snapshot_id=sample_snapshot.id, amount=100.0, currency="EUR",
+                              scheduled_payment_date=week, category="Rent", is_discretionary=0),
+            models.OutflowItem(snapshot_id=sample_snapshot.id, amount=900.0, currency="EUR",
+                               expected_date=week, category="Rent", is_discretionary=1),
+            models.OutflowItem(snapshot_id=sample_snapshot.id, amount=50.0, currency="EUR",
+                               expected_date=week, category="Tax", is_discretionary=0),
+        ])
+        db_session.commit()
+
+        summary = read_outflow_cube(db_session, sample_snapshot.id, today=TODAY)
+        assert summary == {week.date(): {
+            "Rent": {"total": 100.0, "committed": 100.0, "discretionary": 0.0},
+            "Tax": {"total": 50.0, "committed": 50.0, "discretionary": 0.0},
+        }}
+
+    def test_week_filter_reads_only_requested_weeks(self, db_session, outflow_snapshot):
+        weeks = [date(2026, 3, 9) + timedelta(weeks=i) for i in range(3)]
+        summary = read_outflow_cube(db_session, outflow_snapshot.id, weeks=weeks, today=TODAY)
+        full = _per_row_summary(db_session, outflow_snapshot.id)
+        _assert_summaries_equal(summary, {w: full[w] for w in weeks if w in full})
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# INCREMENTAL UPDATES AND FRESHNESS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestIncrementalUpdates:
+
+    def _active_bill(self, db, snapshot_id):
+        return db.query(models.VendorBill).filter_by(snapshot_id=snapshot_id, hold_status=0).first()
+
+    def test_hold_and_release(self, db_session, outflow_snapshot):
+        build_outflow_cube(db_session, outflow_snapshot.id, today=TODAY)
+        bill = self._active_bill(db_session, outflow_snapshot.id)
+
+        before = bill_cell(db_session, bill, today=TODAY)
+        bill.hold_status = 1
+        assert apply_bill_change(db_session, bill, before, today=TODAY) is None
+        _assert_summaries_equal(read_outflow_cube(db_session, outflow_snapshot.id, today=TODAY),
+                                _per_row_summary(db_session, outflow_snapshot.id))
+
+        bill.hold_status = 0
+        apply_bill_change(db_session, bill, None, today=TODAY)
+        _assert_summaries_equal(read_outflow_cube(db_session, outflow_snapshot.id, today=TODAY),
+                                _per_row_summary(db_session, outflow_snapshot.id))
+
+    def test_reschedule_moves_amount_between_weeks(self, db_session, outflow_snapshot):
+        build_outflow_cube(db_session, outflow_snapshot.id, today=TODAY)
+        bill = self._active_bill(db_session, outflow_snapshot.id)
+
+        before = bill_cell(db_session, bill, today=TODAY)
+        bill.scheduled_payment_date = datetime(2026, 8, 5)
+        bill.is_discretionary = 1 - (bill.is_discretionary or 0)
+        after = apply_bill_change(db_session, bill, before, today=TODAY)
+
+        assert after.week_start == date(2026, 8, 3) and after.week_start != before.week_start
+        _assert_summaries_equal(read_outflow_cube(db_session, outflow_snapshot.id, today=TODAY),
+                                _per_row_summary(db_session, outflow_snapshot.id))
+
+    def test_missing_cube_is_backfilled_on_read(self, db_session, outflow_snapshot):
+        assert db_session.query(models.WeeklyOutflowCube).count() == 0
+        summary = read_outflow_cube(db_session, outflow_snapshot.id, today=TODAY)
+        assert db_session.query(models.WeeklyOutflowCube).count() > 0
+        _assert_summaries_equal(summary, _per_row_summary(db_session, outflow_snapshot.id))
+
+    def test_stale_cube_rebuilt_for_new_day(self, db_session, outflow_snapshot):
+        build_outflow_cube(db_session, outflow_snapshot.id, today=TODAY)
+        later = TODAY + timedelta(days=30)
+        summary = read_outflow_cube(db_session, outflow_snapshot.id, today=later)
+        _assert_summaries_equal(summary, _per_row_summary(db_session, outflow_snapshot.id, today=later))
+
+    def test_fx_change_invalidates(self, db_session, outflow_snapshot):
+        build_outflow_cube(db_session, outflow_snapshot.id, today=TODAY)
+        invalidate_outflow_cube(db_session, outflow_snapshot.id)
+        assert db_session.query(models.WeeklyOutflowCube).count() == 0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CALLERS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestCalendarIntegration:
+
+    def test_calendar_module_defines_each_function_once(self):
+        path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cash_calendar_service.py")
+        with open(path) as f:
+            names = [n.name for n in ast.parse(f.read()).body if isinstance(n, ast.FunctionDef)]
+        assert len(names) == len(set(names))
+
+    def test_workspace_and_red_week_drilldown_use_cube_totals(self, db_session, outflow_snapshot):
+        from cash_calendar_service import get_13_week_workspace
+        from red_weeks_service import get_red_weeks_drilldown
+
+        outflow_snapshot.opening_bank_balance = 100000.0
+        outflow_snapshot.min_cash_threshold = 50000.0
+        db_session.commit()
+
+        today = datetime.now().date()
+        workspace = get_13_week_workspace(db_session, outflow_snapshot.id)
+        expected = _per_row_summary(db_session, outflow_snapshot.id, today=today)
+        for week in workspace["grid"]:
+            categories = expected.get(date.fromisoformat(week["start_date"]), {})
+            assert week["outflow_total"] == pytest.approx(sum(c["total"] for c in categories.values()))
+
+        drilldown = get_red_weeks_drilldown(db_session, outflow_snapshot.id, 0)
+        assert drilldown["threshold"] == 50000.0
+        assert drilldown["total_outflow"] == workspace["grid"][0]["outflow_total"]
+        assert isinstance(drilldown["outflow_items"], list)
@@ -0,0 +1,170 @@
+"""
+Tests for the Red-Week Contribution Engine (red_week_contributions.py)
+
+Verifies:
+1. Weekly inflows, outflows and closing cash match the 13-week workspace
+2. Row contributions add up to each week's cumulative flows
+3. Top-K drivers are ranked per customer, invoice, vendor and bill
+4. Threshold changes are served from the cached balances
+5. Edited amounts, dates and categories rebuild the cache
+"""
+
+import pytest
+import random
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+import red_week_contributions
+from red_week_contributions import SnapshotContributions, get_contributions, invalidate_contributions
+from red_weeks_service import flag_red_weeks
+
+
+@pytest.fixture
+def cash_snapshot(db_session, sample_snapshot):
+    rng = random.Random(11)
+    now = datetime.now()
+    sample_snapshot.opening_bank_balance = 400000.0
+    sample_snapshot.min_cash_threshold = 250000.0
+    db_session.add(models.WeeklyFXRate(
+        snapshot_id=sample_snapshot.id, from_currency="USD", to_currency="EUR", rate=0.9
+    ))
+    for i in range(80):
+        p50 = now + timedelta(days=rng.randint(-5, 110), hours=rng.randint(0, 23))
+        db_session.add(models.Invoice(
+            snapshot_id=sample_snapshot.id, customer=f"Customer {i % 9}", document_number=f"INV-{i}",
+            amount=round(rng.uniform(1000, 40000), 2), currency=rng.choice(["EUR", "USD", "GBP"]),
+            predicted_payment_date=p50,
+            confidence_p25=p50 - timedelta(days=rng.randint(0, 10)),
+            confidence_p75=p50 + timedelta(days=rng.randint(0, 25)) if rng.random() > 0.1 else None,
+            payment_date=now - timedelta(days=3) if rng.random() < 0.1 else None
+        ))
+    for i in range(50):
+        due = now + timedelta(days=rng.randint(-10, 80))
+        db_session.add(models.VendorBill(
+            snapshot_id=sample_snapshot.id, vendor_name=f"Vendor {i % 7}", document_number=f"BILL-{i}",
+            amount=round(rng.uniform(2000, 60000), 2), currency=rng.choice(["EUR", "USD"]), due_date=due,
+            hold_status=1 if rng.random() < 0.1 else 0, is_discretionary=1 if rng.random() < 0.3 else 0,
+            category=rng.choice(["Vendor", "Rent", None])
+        ))
+    for i in range(20):
+        db_session.add(models.OutflowItem(
+            snapshot_id=sample_snapshot.id, category=rng.choice(["Payroll", "Rent", "Tax"]),
+            description=f"Recurring {i % 4}", amount=round(rng.uniform(10000, 50000), 2), currency="EUR",
+            expected_date=now + timedelta(days=rng.randint(0, 90)), is_discretionary=0
+        ))
+    db_session.commit()
+    invalidate_contributions()
+    yield sample_snapshot
+    invalidate_contributions()
+
+
+class TestWorkspaceParity:
+
+    def test_weekly_flows_match_workspace(self, db_session, cash_snapshot):
+        from cash_calendar_service import get_13_week_workspace
+
+        grid = get_13_week_workspace(db_session, cash_snapshot.id)["grid"]
+        contributions = get_contributions(db_session, cash_snapshot)
+
+        assert [w.date().isoformat() for w in contributions.week_starts] == [g["start_date"] for g in grid]
+        assert contributions.inflows == pytest.approx([g["inflow_p50"] for g in grid])
+        assert contributions.outflows == pytest.approx([g["outflow_total"] for g in grid])
+        assert contributions.committed_outflows == pytest.approx([g["outflow_committed"] for g in grid])
+        assert contributions.closing_cash == pytest.approx([g["closing_cash"] for g in grid])
+
+
+class TestContributions:
+
+    def test_contributions_sum_to_cumulative_flows(self, db_session, cash_snapshot):
+        c = get_contributions(db_session, cash_snapshot)
+        for week in range(13):
+            paid = c.outflows[:week + 1].sum()
+            late = c.inflows[week + 1:].sum()
+            assert c.scores["vendor"][:, week].sum() == pytest.approx(paid)
+            assert c.scores["bill"][:, week].sum() + _recurring_paid(c, week) == pytest.approx(paid)
+            assert c.scores["customer"][:, week].sum() == pytest.approx(late)
+            assert c.scores["invoice"][:, week].sum() == pytest.approx(late)
+
+    def test_top_k_ranked_per_level(self, db_session, cash_snapshot):
+        c = get_contributions(db_session, cash_snapshot)
+        drivers = c.top_drivers(6, shortfall=100000.0, top_k=3)
+
+        assert set(drivers) == {"customer", "invoice", "vendor", "bill"}
+        for level, entries in drivers.items():
+            assert len(entries) <= 3
+            amounts = [e["contribution"] for e in entries]
+            assert amounts == sorted(amounts, reverse=True)
+            assert amounts[0] == pytest.approx(c.scores[level][:, 6].max())
+        assert drivers["bill"][0]["bill_id"] and drivers["invoice"][0]["invoice_id"]
+        assert drivers["vendor"][0]["share_of_shortfall_pct"] == pytest.approx(
+            drivers["vendor"][0]["contribution"] / 1000, abs=0.05
+        )
+
+    def test_flag_red_weeks_lists_contributors(self, db_session, cash_snapshot):
+        c = get_contributions(db_session, cash_snapshot)
+        threshold = float(c.closing_cash.max()) + 1
+        result = flag_red_weeks(db_session, cash_snapshot.id, threshold, top_k=2)
+
+        assert result["total_red_weeks"] == 13
+        week = result["red_weeks"][4]
+        assert week["week_index"] == 4 and week["week_label"] == "W5"
+        assert week["shortfall"] == pytest.approx(threshold - c.closing_cash[4])
+        assert len(week["top_contributors"]["vendor"]) <= 2
+
+
+class TestThresholdCache:
+
+    def test_threshold_change_reuses_cached_balances(self, db_session, cash_snapshot):
+        first = flag_red_weeks(db_session, cash_snapshot.id, 1e12)
+        with patch.object(SnapshotContributions, "build", side_effect=AssertionError("rebuilt")):
+            none = flag_red_weeks(db_session, cash_snapshot.id, -1e12)
+            default = flag_red_weeks(db_session, cash_snapshot.id)
+
+        assert first["total_red_weeks"] == 13
+        assert none["total_red_weeks"] == 0
+        c = get_contributions(db_session, cash_snapshot)
+        assert default["total_red_weeks"] == int((c.closing_cash < 250000.0).sum())
+
+    def test_edited_bill_rebuilds(self, db_session, cash_snapshot):
+        before = get_contributions(db_session, cash_snapshot)
+        bill = db_session.query(models.VendorBill).filter_by(snapshot_id=cash_snapshot.id, hold_status=0).first()
+        bill.hold_status = 1
+        db_session.commit()
+
+        after = get_contributions(db_session, cash_snapshot)
+        assert after is not before
+        assert after.outflows.sum() < before.outflows.sum()
+
+    @pytest.mark.parametrize("model, column, shift", [
+        (models.VendorBill, "scheduled_payment_date", timedelta(days=21)),
+        (models.VendorBill, "due_date", timedelta(days=21)),
+        (models.VendorBill, "category", "Payroll"),
+        (models.Invoice, "confidence_p25", timedelta(days=14)),
+        (models.Invoice, "confidence_p75", timedelta(days=14)),
+        (models.OutflowItem, "expected_date", timedelta(days=21)),
+    ])
+    def test_edited_date_or_category_rebuilds(self, db_session, cash_snapshot, model, column, shift):
+        before = get_contributions(db_session, cash_snapshot)
+        row = db_session.query(model).filter(
+            model.snapshot_id == cash_snapshot.id, getattr(model, column).isnot(None)
+        ).order_by(model.id).first()
+        if row is None:  # No bill is scheduled in the fixture
+            row = db_session.query(model).filter_by(snapshot_id=cash_snapshot.id).order_by(model.id).first()
+            setattr(row, column, datetime.now())
+        else:
+            setattr(row, column, shift if isinstance(shift, str) else getattr(row, column) + shift)
+        db_session.commit()
+
+        after = get_contributions(db_session, cash_snapshot)
+        assert after is not before
+        assert after.closing_cash == pytest.approx(SnapshotContributions.build(db_session, cash_snapshot).closing_cash)
+
+
+def _recurring_paid(c, week):
+    recurring = [i for i, g in enumerate(c.groups["vendor"]) if g["recurring"]]
+    return c.scores["vendor"][recurring, week].sum()
@@ -0,0 +1,191 @@
+"""
+Tests for the Delta-Shift Scenario Engine (scenario_engine.py)
+
+Verifies:
+1. Weekly totals match a direct per-invoice shift-and-bucket computation
+2. Batch evaluation equals one-by-one evaluation
+3. The per-snapshot index is rebuilt when invoices change
+4. A scenario evaluates fast enough for meeting-mode sweeps
+"""
+
+import pytest
+import random
+import time
+from datetime import datetime, timedelta
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from scenario_engine import (
+    SnapshotScenarioIndex, get_scenario_index, invalidate_scenario_index,
+    run_scenarios, current_week_start, WEEKS
+)
+from utils import apply_scenario_to_forecast, apply_scenarios_to_forecast
+
+
+NOW = datetime(2026, 3, 11, 15, 30)  # Wednesday afternoon
+CUSTOMERS = ["Acme", "Globex", "Initech", "Umbrella", None]
+
+
+def _reference(invoices, scenario, now=NOW):
+    """Direct computation: shift every invoice, then bucket by week."""
+    week_start = current_week_start(now)
+    bounds = [week_start + timedelta(weeks=i) for i in range(WEEKS + 1)]
+    global_shock = scenario.get("global_shock", 0)
+    customer_shocks = scenario.get("customer_shocks", {})
+    improvement = scenario.get("collections_improvement", 0)
+
+    out = {"base": [0.0] * WEEKS, "downside": [0.0] * WEEKS, "upside": [0.0] * WEEKS}
+    for inv in invoices:
+        shock = timedelta(days=global_shock + customer_shocks.get(inv["customer"], 0) - improvement)
+        for key, field in (("base", "p50"), ("downside", "p75"), ("upside", "p25")):
+            if inv[field] is None:
+                continue
+            when = inv[field] + shock
+            for i in range(WEEKS):
+                if bounds[i] <= when < bounds[i + 1]:
+                    out[key][i] += inv["amount"]
+    return out
+
+
+def _random_invoices(n, seed=7):
+    rng = random.Random(seed)
+    invoices = []
+    for _ in range(n):
+        p50 = datetime(2026, 3, 9) + timedelta(days=rng.randint(-20, 100))
+        invoices.append({
+            "customer": rng.choice(CUSTOMERS),
+            "amount": round(rng.uniform(100, 50000), 2),
+            "p25": p50 - timedelta(days=rng.randint(0, 10)) if rng.random() > 0.1 else None,
+            "p50": p50,
+            "p75": p50 + timedelta(days=rng.randint(0, 20)),
+        })
+    return invoices
+
+
+def _index(invoices):
+    customers = sorted({i["customer"] for i in invoices}, key=lambda c: (c is None, c or ""))
+    rows = [(i["customer"], i["amount"], i["p25"], i["p50"], i["p75"]) for i in invoices]
+    return SnapshotScenarioIndex(customers, rows)
+
+
+SCENARIOS = [
+    {},
+    {"global_shock": 10},
+    {"global_shock": -5, "collections_improvement": 3},
+    {"customer_shocks": {"Acme": 30, "Initech": -14}},
+    {"global_shock": 7, "customer_shocks": {"Globex": 21, "Unknown Co": 99}, "collections_improvement": 2},
+]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CORRECTNESS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestDeltaShiftCorrectness:
+
+    @pytest.mark.parametrize("scenario", SCENARIOS)
+    def test_matches_direct_computation(self, scenario):
+        invoices = _random_invoices(400)
+        index = _index(invoices)
+        week_start = current_week_start(NOW)
+
+        totals = index.evaluate(scenario, week_start.toordinal())
+        expected = _reference(invoices, scenario)
+
+        assert totals[1] == pytest.approx(expected["base"])
+        assert totals[2] == pytest.approx(expected["downside"])
+        assert totals[0] == pytest.approx(expected["upside"])
+
+    def test_batch_equals_single_evaluations(self):
+        index = _index(_random_invoices(300, seed=11))
+        anchor = current_week_start(NOW).toordinal()
+
+        grid = [{"global_shock": g, "customer_shocks": {"Acme": c}} for g in range(-14, 15, 7) for c in (0, 15, 30)]
+        batch = index.evaluate_batch(grid, anchor)
+
+        for scenario, totals in zip(grid, batch):
+            assert totals == pytest.approx(index.evaluate(scenario, anchor))
+
+    def test_weeks_start_monday_midnight(self):
+        assert current_week_start(NOW) == datetime(2026, 3, 9, 0, 0)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SNAPSHOT INTEGRATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@pytest.fixture
+def forecast_snapshot(db_session, sample_snapshot):
+    invoices = _random_invoices(60, seed=3)
+    for i, inv in enumerate(invoices):
+        db_session.add(models.Invoice(
+            snapshot_id=sample_snapshot.id, entity_id=1, document_number=f"INV-{i}",
+            customer=inv["customer"], amount=inv["amount"], currency="EUR",
+            confidence_p25=inv["p25"], predicted_payment_date=inv["p50"], confidence_p75=inv["p75"],
+            predicted_delay=0
+        ))
+    db_session.commit()
+    invalidate_scenario_index()
+    yield sample_snapshot, invoices
+    invalidate_scenario_index()
+
+
+class TestSnapshotScenarios:
+
+    def test_run_scenarios_matches_reference(self, db_session, forecast_snapshot):
+        snapshot, invoices = forecast_snapshot
+        results = run_scenarios(db_session, snapshot.id, SCENARIOS, now=NOW)
+
+        for scenario, weeks in zip(SCENARIOS, results):
+            expected = _reference(invoices, scenario)
+            assert [w["base"] for w in weeks] == pytest.approx(expected["base"])
+            assert weeks[0]["label"] == "W1 (03/09)"
+
+    def test_utils_entry_points_share_the_engine(self, db_session, forecast_snapshot):
+        snapshot, _ = forecast_snapshot
+        single = apply_scenario_to_forecast(db_session, snapshot.id, {"global_shock": 14})
+        batch = apply_scenarios_to_forecast(db_session, snapshot.id, [{"global_shock": 14}])
+        assert len(single) == WEEKS
+        assert batch == [single]
+
+    def test_index_rebuilt_when_invoice_paid(self, db_session, forecast_snapshot):
+        snapshot, _ = forecast_snapshot
+        first = get_scenario_index(db_session, snapshot.id)
+        assert get_scenario_index(db_session, snapshot.id) is first
+
+        invoice = db_session.query(models.Invoice).filter(models.Invoice.snapshot_id == snapshot.id).first()
+        invoice.payment_date = datetime(2026, 3, 1)
+        db_session.commit()
+
+        rebuilt = get_scenario_index(db_session, snapshot.id)
+        assert rebuilt is not first
+        assert rebuilt.row_count == first.row_count - 1
+
+    def test_empty_snapshot_returns_empty_forecast(self, db_session, sample_snapshot):
+        invalidate_scenario_index()
+        assert apply_scenario_to_forecast(db_session, sample_snapshot.id, {"global_shock": 5}) == []
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PERFORMANCE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestScenarioPerformance:
+
+    def test_grid_sweep_is_fast(self):
+        index = _index(_random_invoices(20000, seed=5))
+        anchor = current_week_start(NOW).toordinal()
+        grid = [
+            {"global_shock": g, "customer_shocks": {"Acme": a, "Globex": b}}
+            for g in range(-14, 15) for a in (0, 7, 14, 30) for b in (0, 21)
+        ]
+
+        start = time.perf_counter()
+        index.evaluate_batch(grid, anchor)
+        elapsed = time.perf_counter() - start
+
+        assert len(grid) == 232
+        assert elapsed < 0.25, f"{len(grid)} scenarios took {elapsed:.3f}s"
@@ -0,0 +1,181 @@
+"""
+Tests for N-Way Scenario Comparison (scenario_matrix.py)
+
+Verifies:
+1. Scenarios with different horizons align on the union of months
+2. Pairwise deltas match the existing two-scenario comparison
+3. Drivers are ranked and talking points generated in one pass
+4. Streamed events cover every pair
+5. FP&A forecast runs load into the same matrix shape
+"""
+
+import json
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import numpy as np
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import fpa_models
+import models
+from startup_planning_models import Department, HeadcountPlan
+from startup_planning_service import StartupPlanningService
+from startup_planning_graph import planning_graphs
+from scenario_matrix import (
+    build_matrix, base_index_for, compare_matrix, iter_comparison_events,
+    load_forecast_matrix, load_planning_matrix, ndjson_lines
+)
+
+
+LINES = ["revenue", "payroll", "ending_cash"]
+
+
+def _matrix():
+    series = [
+        {"revenue": {"2026-01": 100, "2026-02": 110}, "payroll": {"2026-01": 50, "2026-02": 50},
+         "ending_cash": {"2026-01": 1000, "2026-02": 1060}},
+        {"revenue": {"2026-01": 100, "2026-02": 150}, "payroll": {"2026-01": 80, "2026-02": 90},
+         "ending_cash": {"2026-01": 970, "2026-02": 1030}},
+        {"revenue": {"2026-01": 90}, "payroll": {"2026-01": 40}, "ending_cash": {"2026-01": 1050}},
+    ]
+    return build_matrix(
+        [1, 2, 3], ["Base", "Hire", "Short"], series, LINES,
+        driver_lines=("revenue", "payroll"),
+        favorable={"revenue": 1, "payroll": -1, "ending_cash": 1},
+    )
+
+
+class TestMatrixEngine:
+
+    def test_alignment_and_balances(self):
+        matrix = _matrix()
+        assert matrix.values.shape == (3, 2, 3)
+        assert matrix.months == ["2026-01", "2026-02"]
+        assert matrix.present[2].tolist() == [True, False]
+
+        totals = matrix.totals()
+        # Flows sum; ending cash is each scenario's last covered month
+        assert totals[:, 0].tolist() == [210, 250, 90]
+        assert totals[:, 2].tolist() == [1060, 1030, 1050]
+
+    def test_pairwise_deltas(self):
+        comparison = compare_matrix(_matrix(), materiality=10)
+        assert comparison.deltas.shape == (3, 3, 3)
+        assert np.allclose(comparison.deltas, -comparison.deltas.transpose(1, 0, 2))
+        assert comparison.pair(0, 1)["deltas"] == {"revenue": 40.0, "payroll": 70.0, "ending_cash": -30.0}
+        assert len(list(comparison.iter_pairs())) == 3
+
+    def test_drivers_and_talking_points(self):
+        comparison = compare_matrix(_matrix(), materiality=10)
+
+        assert [d["line"] for d in comparison.driver_ranking] == ["revenue", "payroll"]
+        assert comparison.driver_ranking[0]["max_scenario_id"] == 2
+
+        hire = comparison.pair(0, 1)["top_drivers"]
+        assert hire[0] == {"line": "payroll", "delta": 70.0, "is_favorable": False}
+        assert hire[1]["is_favorable"] is True
+
+        headlines = [tp["headline"] for tp in comparison.talking_points]
+        assert headlines[0].startswith("Hire: ending cash $30 lower than Base")
+        assert "varies most" in headlines[-1]
+
+    def test_materiality_filters_talking_points(self):
+        comparison = compare_matrix(_matrix(), materiality=1000)
+        assert comparison.talking_points == []
+
+    def test_stream_events(self):
+        comparison = compare_matrix(_matrix(), base_index=base_index_for(_matrix(), 2), materiality=10)
+        events = [json.loads(line) for line in ndjson_lines(comparison)]
+
+        kinds = [e["event"] for e in events]
+        assert kinds[0] == "matrix" and kinds[-1] == "done"
+        assert kinds.count("scenario") == 3
+        assert kinds.count("pair") == events[-1]["pairs"] == 3
+        assert events[0]["base_scenario_id"] == 2
+        assert events == list(json.loads(json.dumps(e)) for e in iter_comparison_events(comparison))
+
+    def test_unknown_base_rejected(self):
+        with pytest.raises(ValueError):
+            base_index_for(_matrix(), 99)
+
+
+# =============================================================================
+# LOADERS
+# =============================================================================
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'matrix.db'}")
+    models.Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+class TestLoaders:
+
+    def test_planning_matrix_matches_pairwise_compare(self, db):
+        entity = models.Entity(name="Acme", currency="USD")
+        db.add(entity)
+        db.commit()
+        service = StartupPlanningService(db)
+
+        base = service.create_scenario(entity.id, "Base", date(2026, 1, 1), date(2027, 12, 1), is_base=True)
+        base.assumptions.starting_mrr = Decimal("50000")
+        base.assumptions.starting_cash = Decimal("3000000")
+        db.add(HeadcountPlan(scenario_id=base.id, department=Department.ENGINEERING, role_title="Engineer",
+                             annual_salary=Decimal("150000"), start_month=date(2026, 1, 1), headcount=6))
+        db.commit()
+        ids = [base.id]
+        for growth in [8, 12, 2]:
+            branch = service.branch_scenario(base.id, f"Growth {growth}%", "what-if")
+            branch.assumptions.mrr_growth_rate_pct = Decimal(growth)
+            db.commit()
+            ids.append(branch.id)
+
+        comparison = compare_matrix(load_planning_matrix(db, ids))
+        pairwise = service.compare_scenarios(ids[0], ids[2]).comparison_json
+
+        deltas = comparison.pair(0, 2)["deltas"]
+        assert deltas["revenue"] == pytest.approx(pairwise["revenue_delta"], abs=0.01)
+        assert deltas["ending_cash"] == pytest.approx(pairwise["cash_delta"], abs=0.01)
+        assert comparison.driver_ranking[0]["line"] == "revenue"
+        assert comparison.driver_ranking[0]["max_scenario_id"] == ids[2]
+        for sid in ids:
+            planning_graphs.discard(sid)
+
+    def test_missing_scenario_rejected(self, db):
+        with pytest.raises(ValueError):
+            load_planning_matrix(db, [404, 405])
+
+    def test_forecast_matrix(self):
+        runs = []
+        for run_id, growth in [(1, 2), (2, 5)]:
+            run = fpa_models.ForecastRun(id=run_id, plan_id=1, assumption_set_id=1, run_label=f"g{growth}")
+            run.outputs_json = {
+                "pl": {
+                    "revenue_by_month": {"2026-01": str(100 + growth), "2026-02": str(110 + growth)},
+                    "cogs_by_month": {"2026-01": "-30", "2026-02": "-33"},
+                    "opex_by_month": {"2026-01": "-50", "2026-02": "-50"},
+                    "ebitda_by_month": {"2026-01": str(20 + growth), "2026-02": str(27 + growth)},
+                },
+                "cash_bridge": {"ending_cash_by_month": {"2026-01": "1000", "2026-02": str(1020 + growth)}},
+            }
+            runs.append(run)
+        db = MagicMock()
+        db.query.return_value.filter.return_value.all.return_value = runs
+
+        comparison = compare_matrix(load_forecast_matrix(db, [1, 2]), materiality=1)
+        assert comparison.matrix.labels == ["g2", "g5"]
+        assert comparison.pair(0, 1)["deltas"]["revenue"] == 6.0
+        assert comparison.pair(0, 1)["deltas"]["ending_cash"] == 3.0
+        assert comparison.talking_points[0]["is_favorable"] is True
@@ -0,0 +1,168 @@
+"""
+Tests for Snapshot Dashboard Aggregates (snapshot_aggregates.py)
+
+Verifies:
+1. SQL KPIs, yearly cash and aging buckets match a per-invoice computation
+2. Filter values come from the dimension table and cascade correctly
+3. Snapshots without dimension rows are backfilled on first use
+4. Endpoint cost headers are set
+"""
+
+import pytest
+import random
+from datetime import datetime, timedelta
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Response
+
+import models
+import snapshot_aggregates
+from snapshot_aggregates import (
+    AGING_BUCKETS, build_snapshot_dimensions, get_snapshot_filters,
+    get_snapshot_kpis, get_snapshot_stats, set_query_headers
+)
+
+
+NOW = datetime(2026, 3, 11, 15, 30)
+COUNTRIES = ["DE", "FR", "US", None, ""]
+CUSTOMERS = ["Acme", "Globex", "Initech", None]
+PROJECTS = ["Alpha", "Beta", None, ""]
+
+
+@pytest.fixture
+def dashboard_snapshot(db_session, sample_snapshot):
+    rng = random.Random(17)
+    sample_snapshot.created_at = NOW - timedelta(days=2)
+    for i in range(250):
+        due = NOW + timedelta(days=rng.randint(-200, 400), hours=rng.randint(0, 23)) if rng.random() > 0.05 else None
+        paid = due + timedelta(days=rng.randint(0, 30)) if due and rng.random() < 0.3 else None
+        predicted = NOW + timedelta(days=rng.randint(-10, 60)) if rng.random() > 0.1 else None
+        db_session.add(models.Invoice(
+            snapshot_id=sample_snapshot.id, entity_id=1, document_number=f"INV-{i}",
+            country=rng.choice(COUNTRIES), customer=rng.choice(CUSTOMERS), project=rng.choice(PROJECTS),
+            amount=round(rng.uniform(100, 20000), 2), currency="EUR",
+            expected_due_date=due, payment_date=paid, predicted_payment_date=predicted
+        ))
+    db_session.commit()
+    return sample_snapshot
+
+
+def _invoices(db, snapshot_id, **filters):
+    query = db.query(models.Invoice).filter(models.Invoice.snapshot_id == snapshot_id)
+    for field, value in filters.items():
+        query = query.filter(getattr(models.Invoice, field) == value)
+    return query.all()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# KPIS AND STATS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestAggregateParity:
+
+    def test_kpis_match_per_invoice_sums(self, db_session, dashboard_snapshot):
+        invoices = _invoices(db_session, dashboard_snapshot.id)
+        open_invoices = [inv for inv in invoices if inv.payment_date is None]
+        horizon = NOW + timedelta(weeks=4)
+
+        kpis, rows_scanned = get_snapshot_kpis(db_session, dashboard_snapshot, now=NOW)
+
+        assert rows_scanned == len(invoices)
+        assert kpis["total_portfolio_value"] == pytest.approx(sum(inv.amount for inv in invoices))
+        assert kpis["open_receivables"] == pytest.approx(sum(inv.amount for inv in open_invoices))
+        assert kpis["next_4w_expected_inflow"] == pytest.approx(sum(
+            inv.amount for inv in open_invoices
+            if inv.predicted_payment_date and inv.predicted_payment_date <= horizon
+        ))
+
+    @pytest.mark.parametrize("filters", [{}, {"country": "DE"}, {"country": "US", "customer": "Acme"}])
+    def test_stats_match_per_invoice_buckets(self, db_session, dashboard_snapshot, filters):
+        invoices = _invoices(db_session, dashboard_snapshot.id, **filters)
+
+        by_year = {}
+        for inv in invoices:
+            if inv.expected_due_date:
+                by_year[inv.expected_due_date.year] = by_year.get(inv.expected_due_date.year, 0.0) + inv.amount
+        aging = [0.0] * len(AGING_BUCKETS)
+        for inv in invoices:
+            if inv.payment_date is None and inv.expected_due_date:
+                days_overdue = (NOW - inv.expected_due_date).days
+                for i, b in enumerate(AGING_BUCKETS):
+                    if b["min"] <= days_overdue <= b["max"]:
+                        aging[i] += inv.amount
+
+        stats, _ = get_snapshot_stats(db_session, dashboard_snapshot.id, now=NOW, **filters)
+
+        assert [r["year"] for r in stats["cash_flow_by_year"]] == sorted(by_year)
+        assert [r["cash"] for r in stats["cash_flow_by_year"]] == pytest.approx([by_year[y] for y in sorted(by_year)])
+        assert [r["amount"] for r in stats["overdue_chart_data"]] == pytest.approx(aging)
+
+    def test_stats_empty_selection(self, db_session, dashboard_snapshot):
+        stats, rows_scanned = get_snapshot_stats(db_session, dashboard_snapshot.id, country="ZZ", now=NOW)
+        assert stats == {"cash_flow_by_year": [], "overdue_chart_data": []}
+        assert rows_scanned == 0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DIMENSION TABLE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestSnapshotFilters:
+
+    @pytest.mark.parametrize("country,customer", [(None, None), ("FR", None), ("DE", "Globex")])
+    def test_filters_match_distinct_queries(self, db_session, dashboard_snapshot, country, customer):
+        build_snapshot_dimensions(db_session, dashboard_snapshot.id)
+        invoices = _invoices(db_session, dashboard_snapshot.id)
+
+        def distinct(field, rows):
+            return sorted({getattr(inv, field) for inv in rows if getattr(inv, field)})
+
+        by_country = [inv for inv in invoices if not country or inv.country == country]
+        by_customer = [inv for inv in by_country if not customer or inv.customer == customer]
+
+        filters, rows_scanned = get_snapshot_filters(db_session, dashboard_snapshot.id, country, customer)
+
+        assert filters["countries"] == distinct("country", invoices)
+        assert filters["customers"] == distinct("customer", by_country)
+        assert filters["projects"] == distinct("project", by_customer)
+        assert rows_scanned < len(invoices)
+
+    def test_dimension_rows_preserve_totals(self, db_session, dashboard_snapshot):
+        build_snapshot_dimensions(db_session, dashboard_snapshot.id)
+        dims = db_session.query(models.SnapshotDimension).filter(
+            models.SnapshotDimension.snapshot_id == dashboard_snapshot.id
+        ).all()
+        invoices = _invoices(db_session, dashboard_snapshot.id)
+
+        assert sum(d.invoice_count for d in dims) == len(invoices)
+        assert sum(d.amount_total for d in dims) == pytest.approx(sum(inv.amount for inv in invoices))
+        assert len({(d.country, d.customer, d.project) for d in dims}) == len(dims)
+
+    def test_rebuild_replaces_rows(self, db_session, dashboard_snapshot):
+        first = build_snapshot_dimensions(db_session, dashboard_snapshot.id)
+        assert build_snapshot_dimensions(db_session, dashboard_snapshot.id) == first
+        assert db_session.query(models.SnapshotDimension).count() == first
+
+    def test_missing_dimensions_backfilled(self, db_session, dashboard_snapshot, monkeypatch):
+        calls = []
+        original = snapshot_aggregates.build_snapshot_dimensions
+        monkeypatch.setattr(snapshot_aggregates, "build_snapshot_dimensions",
+                            lambda db, sid: calls.append(sid) or original(db, sid))
+
+        filters, _ = get_snapshot_filters(db_session, dashboard_snapshot.id)
+        get_snapshot_filters(db_session, dashboard_snapshot.id)
+
+        assert calls == [dashboard_snapshot.id]
+        assert filters["countries"] == ["DE", "FR", "US"]
+
+
+class TestQueryHeaders:
+
+    def test_headers_report_time_and_rows(self):
+        response = Response()
+        set_query_headers(response, started=0.0, rows_scanned=42)
+        assert response.headers["X-DB-Rows-Scanned"] == "42"
+        assert float(response.headers["X-Response-Time-Ms"]) > 0
@@ -0,0 +1,125 @@
+"""
+Tests for Snowflake Bulk Write-back (snowflake_service.py)
+
+Verifies:
+1. Forecast and match decisions are staged as compressed Parquet, one load per table
+2. Re-pushing a snapshot replaces its rows (idempotent per snapshot ID)
+3. Pushing a subset of match IDs re-exports the whole snapshot
+
+Loads go to the local file-based warehouse stand-in.
+"""
+
+import pytest
+from datetime import datetime
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+import models
+import cash_calendar_service
+from snowflake_service import (
+    SnowflakeSyncEngine, LocalFileWarehouse, MATCHES_TABLE, FORECAST_TABLE, stage_parquet
+)
+
+
+def _fake_workspace(db, snapshot_id):
+    return {"grid": [
+        {
+            "week_label": f"W{i + 1}",
+            "start_date": f"2026-01-{5 + 7 * (i % 4):02d}",
+            "closing_cash": 100000.0 + snapshot_id * 1000 + i,
+            "inflow_p50": 5000.0,
+            "outflow_committed": 3000.0,
+        }
+        for i in range(13)
+    ]}
+
+
+@pytest.fixture
+def warehouse(tmp_path):
+    return LocalFileWarehouse(str(tmp_path / "warehouse"))
+
+
+@pytest.fixture
+def engine(warehouse, tmp_path):
+    config = models.SnowflakeConfig(id=1, database="ANALYTICS", schema_name="GITTO")
+    return SnowflakeSyncEngine(config, target=warehouse, stage_dir=str(tmp_path / "stage"))
+
+
+@pytest.fixture
+def matched_snapshot(db_session, sample_snapshot, sample_bank_account):
+    """Snapshot with three invoices, each matched to a bank transaction."""
+    match_ids = []
+    for i in range(3):
+        invoice = models.Invoice(
+            snapshot_id=sample_snapshot.id, entity_id=1, canonical_id=f"INV-{i}",
+            document_number=f"INV-{i}", amount=1000.0 * (i + 1), currency="EUR"
+        )
+        txn = models.BankTransaction(
+            bank_account_id=sample_bank_account.id, transaction_date=datetime(2026, 1, 10),
+            amount=1000.0 * (i + 1), currency="EUR", reconciliation_type="Deterministic"
+        )
+        db_session.add_all([invoice, txn])
+        db_session.flush()
+        match = models.ReconciliationTable(
+            bank_transaction_id=txn.id, invoice_id=invoice.id,
+            amount_allocated=1000.0 * (i + 1), match_type="Rule" if i == 2 else None
+        )
+        db_session.add(match)
+        db_session.flush()
+        match_ids.append(match.id)
+    db_session.commit()
+    return sample_snapshot, match_ids
+
+
+class TestForecastWriteback:
+
+    def test_push_is_idempotent_per_snapshot(self, db_session, engine, warehouse, monkeypatch):
+        monkeypatch.setattr(cash_calendar_service, "get_13_week_workspace", _fake_workspace)
+
+        assert engine.push_forecast_snapshot(db_session, 7)
+        assert engine.push_forecast_snapshot(db_session, 7)
+        assert engine.push_forecast_snapshot(db_session, 8)
+
+        rows = warehouse.read_table(FORECAST_TABLE)
+        assert len(rows) == 26
+        assert sum(1 for r in rows if r["snapshot_id"] == 7) == 13
+        assert rows[0]["projected_cash"] == 107000.0
+
+    def test_staged_file_is_compressed_parquet(self, tmp_path):
+        rows = [{"snapshot_id": 1, "week_label": "W1", "start_date": "2026-01-05",
+                 "projected_cash": 1.0, "p50_inflow": 2.0, "committed_outflow": 3.0,
+                 "gitto_sync_at": "2026-01-01T00:00:00"}]
+        path = stage_parquet(str(tmp_path), FORECAST_TABLE, 1, rows)
+
+        metadata = pq.read_metadata(path)
+        assert metadata.num_rows == 1
+        assert metadata.row_group(0).column(0).compression == "ZSTD"
+
+
+class TestMatchDecisionWriteback:
+
+    def test_snapshot_exported_in_one_load(self, db_session, engine, warehouse, matched_snapshot):
+        snapshot, match_ids = matched_snapshot
+
+        assert engine.push_snapshot_match_decisions(db_session, snapshot.id) == 3
+
+        rows = warehouse.read_table(MATCHES_TABLE)
+        assert [r["canonical_id"] for r in rows] == ["INV-0", "INV-1", "INV-2"]
+        # Match type falls back to the bank transaction's reconciliation type
+        assert [r["match_type"] for r in rows] == ["Deterministic", "Deterministic", "Rule"]
+
+    def test_subset_of_match_ids_reexports_whole_snapshot(self, db_session, engine, warehouse, matched_snapshot):
+        snapshot, match_ids = matched_snapshot
+
+        assert engine.push_match_decisions(db_session, match_ids[:1]) == {snapshot.id: 3}
+        assert engine.push_match_decisions(db_session, match_ids) == {snapshot.id: 3}
+
+        assert len(warehouse.read_table(MATCHES_TABLE)) == 3
+
+    def test_no_match_ids_loads_nothing(self, db_session, engine, warehouse):
+        assert engine.push_match_decisions(db_session, []) == {}
+        assert warehouse.read_table(MATCHES_TABLE) == []
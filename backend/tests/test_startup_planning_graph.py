@@ -0,0 +1,169 @@
+"""
+Tests for the Dependency-Graph Planning Engine (startup_planning_graph.py)
+
+Verifies:
+1. Graph outputs equal a full from-scratch computation
+2. Editing one driver recomputes only its downstream nodes
+3. Branches share the parent's results copy-on-write
+"""
+
+import pytest
+from datetime import date
+from decimal import Decimal
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models
+from startup_planning_models import Department, HeadcountPlan, VendorCommitment
+from startup_planning_service import StartupPlanningService
+from startup_planning_graph import AFFECTED_NODES, planning_graphs
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'planning.db'}")
+    models.Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def scenario(db):
+    entity = models.Entity(name="Acme", currency="USD")
+    db.add(entity)
+    db.commit()
+
+    service = StartupPlanningService(db)
+    scenario = service.create_scenario(entity.id, "Base", date(2026, 1, 1), date(2028, 12, 1), is_base=True)
+    scenario.assumptions.starting_mrr = Decimal("80000")
+    scenario.assumptions.average_contract_value = Decimal("24000")
+    scenario.assumptions.customer_acquisition_cost = Decimal("5000")
+    scenario.assumptions.starting_cash = Decimal("4000000")
+    db.add_all([
+        HeadcountPlan(scenario_id=scenario.id, department=Department.ENGINEERING, role_title="Engineer",
+                      annual_salary=Decimal("150000"), start_month=date(2026, 1, 1), headcount=8),
+        HeadcountPlan(scenario_id=scenario.id, department=Department.SALES, role_title="AE",
+                      annual_salary=Decimal("120000"), start_month=date(2026, 6, 1), headcount=3),
+        VendorCommitment(scenario_id=scenario.id, vendor_name="Cloud", monthly_amount=Decimal("12000"),
+                         start_date=date(2026, 1, 1)),
+    ])
+    db.commit()
+    planning_graphs.discard(scenario.id)
+    yield scenario
+    planning_graphs.discard(scenario.id)
+
+
+def _from_scratch(service, scenario):
+    """The step chain generate_outputs ran before the graph existed"""
+    a = scenario.assumptions
+    months = service._get_month_range(scenario.start_month, scenario.end_month)
+    revenue = service._compute_revenue(scenario, a, months)
+    headcount = service._compute_headcount(scenario, months)
+    payroll = service._compute_payroll(scenario, a, headcount)
+    opex = service._compute_opex(scenario, a, revenue, headcount, months)
+    pnl = service._generate_pnl(revenue, payroll, opex, months)
+    cashflow = service._generate_cashflow_bridge(pnl, a, Decimal(str(a.starting_cash or 0)))
+    return {
+        "pnl": pnl,
+        "cashflow": cashflow,
+        "runway": service._compute_runway(cashflow, a),
+        "hiring": service._compute_hiring_capacity(cashflow, a, headcount),
+    }
+
+
+def _assert_matches_scratch(service, scenario, output):
+    expected = _from_scratch(service, scenario)
+    assert output.monthly_pnl_json == expected["pnl"]
+    assert output.monthly_cashflow_json == expected["cashflow"]
+    assert output.runway_analysis_json == expected["runway"]
+    assert output.hiring_analysis_json == expected["hiring"]
+
+
+class TestIncrementalRecompute:
+
+    def test_first_generation_matches_full_compute(self, db, scenario):
+        service = StartupPlanningService(db)
+        output = service.generate_outputs(scenario.id)
+
+        assert planning_graphs.get(scenario.id).last_recomputed == [
+            "months", "revenue", "headcount", "payroll", "opex", "pnl", "cashflow", "runway", "hiring"
+        ]
+        _assert_matches_scratch(service, scenario, output)
+
+    def test_unchanged_inputs_recompute_nothing(self, db, scenario):
+        service = StartupPlanningService(db)
+        service.generate_outputs(scenario.id)
+        service.generate_outputs(scenario.id)
+        assert planning_graphs.get(scenario.id).last_recomputed == []
+
+    def test_dso_edit_recomputes_only_cash_nodes(self, db, scenario):
+        service = StartupPlanningService(db)
+        before = service.generate_outputs(scenario.id).ending_cash
+
+        scenario.assumptions.dso_days = 75
+        db.commit()
+        output = service.generate_outputs(scenario.id)
+
+        assert planning_graphs.get(scenario.id).last_recomputed == ["cashflow", "runway", "hiring"]
+        assert output.ending_cash != before
+        _assert_matches_scratch(service, scenario, output)
+
+    def test_headcount_edit_skips_revenue(self, db, scenario):
+        service = StartupPlanningService(db)
+        service.generate_outputs(scenario.id)
+
+        scenario.headcount_plan[0].headcount = 12
+        db.commit()
+        output = service.generate_outputs(scenario.id)
+
+        recomputed = planning_graphs.get(scenario.id).last_recomputed
+        assert "revenue" not in recomputed and "months" not in recomputed
+        assert {"headcount", "payroll", "opex", "pnl", "hiring"} <= set(recomputed)
+        _assert_matches_scratch(service, scenario, output)
+
+    def test_every_input_reaches_an_output(self):
+        for key, nodes in AFFECTED_NODES.items():
+            assert nodes & {"runway", "hiring"}, key
+
+
+class TestCopyOnWriteBranches:
+
+    def test_branch_shares_parent_results(self, db, scenario):
+        service = StartupPlanningService(db)
+        service.generate_outputs(scenario.id)
+        parent_graph = planning_graphs.get(scenario.id)
+
+        branch = service.branch_scenario(scenario.id, "Slow collections", "what-if")
+        branch_graph = planning_graphs.get(branch.id)
+        assert all(branch_graph.results[n] is parent_graph.results[n] for n in parent_graph.results)
+
+        service.generate_outputs(branch.id)
+        assert branch_graph.last_recomputed == []
+        planning_graphs.discard(branch.id)
+
+    def test_branch_edit_leaves_parent_untouched(self, db, scenario):
+        service = StartupPlanningService(db)
+        parent_output = service.generate_outputs(scenario.id)
+        parent_cash = parent_output.ending_cash
+        parent_graph = planning_graphs.get(scenario.id)
+
+        branch = service.branch_scenario(scenario.id, "Slow collections", "what-if")
+        branch.assumptions.dso_days = 90
+        db.commit()
+        branch_output = service.generate_outputs(branch.id)
+        branch_graph = planning_graphs.get(branch.id)
+
+        assert branch_graph.last_recomputed == ["cashflow", "runway", "hiring"]
+        assert branch_graph.results["pnl"] is parent_graph.results["pnl"]
+        assert branch_graph.results["cashflow"] is not parent_graph.results["cashflow"]
+        assert branch_output.ending_cash != parent_cash
+        assert service.generate_outputs(scenario.id).ending_cash == parent_cash
+        _assert_matches_scratch(service, branch, branch_output)
+        planning_graphs.discard(branch.id)
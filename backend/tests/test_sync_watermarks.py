@@ -0,0 +1,354 @@
+"""
+Tests for Incremental Sync Watermarks
+
+Verifies that:
+1. Watermarks are stored per (connection, object type) and only move forward
+2. Incremental syncs extract only from the committed watermark
+3. Ordered connectors checkpoint per committed batch, so a crash mid-sync
+   resumes from the last batch
+4. Failed rows and unordered connectors never advance past unloaded data
+5. Real connectors (Stripe, warehouse SQL) sync incrementally end to end
+"""
+
+import json
+import pytest
+from datetime import date, datetime
+from pathlib import Path
+from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from lineage_models import (
+    Base, SyncRun, LineageDataset, CanonicalRecord, SyncWatermark, SyncStatus
+)
+from connector_interface import ConnectorRegistry, StubBankConnector, ExtractedRow
+from lineage_service import LineageService
+from sync_watermarks import WatermarkStore
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TEST CONNECTORS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class DailyBankConnector(StubBankConnector):
+    """Bank stub with one transaction per day in January, oldest first."""
+
+    DAYS = 20
+    fail_after = None  # Raise after yielding this many rows (simulated crash)
+
+    @property
+    def connector_type(self) -> str:
+        return "bank_daily_stub"
+
+    def extract(self, since=None, until=None, batch_size=1000):
+        watermark = self.watermarks.get("transactions")
+        yielded = 0
+        for day in range(1, self.DAYS + 1):
+            txn = {
+                "transaction_id": f"txn_{day:03d}",
+                "account_id": "acc_123",
+                "date": f"2026-01-{day:02d}",
+                "amount": 100.0 * day,
+                "currency": "EUR",
+                "name": f"Payment {day}",
+                "merchant_name": None,
+                "category": "customer_receipt",
+                "pending": False,
+            }
+            if watermark and txn["date"] < watermark:
+                continue
+            if self.fail_after is not None and yielded >= self.fail_after:
+                raise ConnectionError("connection reset mid-sync")
+            yielded += 1
+            yield ExtractedRow(source_table="transactions", source_row_id=txn["transaction_id"], raw_payload=txn)
+
+
+class UnorderedDailyBankConnector(DailyBankConnector):
+    """Same rows, but the connector does not promise watermark order."""
+    watermarks_ordered = False
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FIXTURES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@pytest.fixture
+def db_session(monkeypatch):
+    """In-memory database shared by the service and background sync sessions."""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(database, "SessionLocal", Session)
+    session = Session()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def service(db_session):
+    return LineageService(db_session)
+
+
+@pytest.fixture
+def connection(service):
+    return service.create_connection(
+        entity_id=1, connection_type="bank_stub", name="Daily Bank", config={}
+    )
+
+
+def _run(db_session, service, connection, connector, since=None):
+    sync_run = SyncRun(connection_id=connection.id, status=SyncStatus.RUNNING.value)
+    db_session.add(sync_run)
+    db_session.commit()
+    dataset = LineageDataset(entity_id=1, sync_run_id=sync_run.id, source_type="bank_txn")
+    db_session.add(dataset)
+    db_session.commit()
+    return service._extract_and_load(db_session, connector, dataset, sync_run, since, None)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# WATERMARK STORE TESTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestWatermarkStore:
+    """Test the store in isolation."""
+
+    def test_advance_is_monotonic(self, db_session, connection):
+        store = WatermarkStore(db_session, connection.id)
+        store.load()
+        store.observe("charges", "2026-01-05T00:00:00")
+        store.advance()
+        db_session.commit()
+
+        store.observe("charges", "2026-01-03T00:00:00")
+        assert store.advance() == {}
+        db_session.commit()
+
+        assert WatermarkStore(db_session, connection.id).load() == {"charges": "2026-01-05T00:00:00"}
+
+    def test_keyed_by_object_type(self, db_session, connection):
+        store = WatermarkStore(db_session, connection.id)
+        store.load()
+        store.observe("Invoice", "2026-02-01")
+        store.observe("Bill", "2026-01-15")
+        store.advance()
+        db_session.commit()
+
+        assert WatermarkStore(db_session, connection.id).load() == {
+            "Invoice": "2026-02-01", "Bill": "2026-01-15"
+        }
+
+    def test_blocked_type_does_not_advance(self, db_session, connection):
+        store = WatermarkStore(db_session, connection.id)
+        store.load()
+        store.observe("transactions", "2026-01-02")
+        store.block("transactions")
+        store.observe("transactions", "2026-01-09")
+        assert store.advance() == {}
+
+    def test_reset(self, db_session, connection):
+        store = WatermarkStore(db_session, connection.id)
+        store.load()
+        store.observe("transactions", "2026-01-02")
+        store.advance()
+        db_session.commit()
+
+        assert store.reset() == 1
+        assert WatermarkStore(db_session, connection.id).load() == {}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# INCREMENTAL SYNC TESTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestIncrementalSync:
+    """Test watermark-driven extraction in LineageService."""
+
+    def test_second_sync_moves_only_the_delta(self, db_session, service, connection):
+        first = _run(db_session, service, connection, DailyBankConnector({}))
+        assert first.rows_loaded == 20
+        assert first.watermarks["end"] == {"transactions": "2026-01-20"}
+
+        second = _run(db_session, service, connection, DailyBankConnector({}))
+        # Only the row at the watermark is re-extracted, and the dedup index skips it
+        assert second.rows_extracted == 1
+        assert second.rows_loaded == 0
+        assert second.rows_deduplicated == 1
+
+    def test_explicit_since_ignores_watermarks(self, db_session, service, connection):
+        _run(db_session, service, connection, DailyBankConnector({}))
+        result = _run(db_session, service, connection, DailyBankConnector({}), since=datetime(2026, 1, 1))
+        assert result.rows_extracted == 20
+
+    def test_crash_resumes_from_last_committed_batch(self, db_session, service, connection, monkeypatch):
+        monkeypatch.setattr(LineageService, "DEDUP_BATCH_SIZE", 5)
+        crashing = DailyBankConnector({})
+        crashing.fail_after = 12
+
+        crashed = _run(db_session, service, connection, crashing)
+        assert crashed.errors and crashed.errors[0]["error_type"] == "extraction_error"
+        # Batches 1-2 (days 1-10) committed with their watermark
+        assert WatermarkStore(db_session, connection.id).load() == {"transactions": "2026-01-10"}
+
+        resumed = _run(db_session, service, connection, DailyBankConnector({}))
+        assert resumed.rows_extracted == 11  # Day 10 (dedup) through day 20
+        assert resumed.rows_loaded == 10
+        assert db_session.query(CanonicalRecord).count() == 20
+
+    def test_unordered_connector_only_advances_on_completion(self, db_session, service, connection, monkeypatch):
+        monkeypatch.setattr(LineageService, "DEDUP_BATCH_SIZE", 5)
+        crashing = UnorderedDailyBankConnector({})
+        crashing.fail_after = 12
+
+        _run(db_session, service, connection, crashing)
+        assert WatermarkStore(db_session, connection.id).load() == {}
+
+        _run(db_session, service, connection, UnorderedDailyBankConnector({}))
+        assert WatermarkStore(db_session, connection.id).load() == {"transactions": "2026-01-20"}
+
+    def test_failed_rows_hold_back_the_watermark(self, db_session, service, connection, monkeypatch):
+        monkeypatch.setattr(LineageService, "DEDUP_BATCH_SIZE", 5)
+
+        class FlakyConnector(DailyBankConnector):
+            def normalize(self, raw_row):
+                if raw_row.source_row_id == "txn_015":
+                    raise ValueError("bad row")
+                return super().normalize(raw_row)
+
+        result = _run(db_session, service, connection, FlakyConnector({}))
+        assert result.rows_error == 1
+        # Advanced through the last batch before the failing one only
+        assert WatermarkStore(db_session, connection.id).load() == {"transactions": "2026-01-10"}
+
+    def test_resume_sync_marks_interrupted_runs_failed(self, db_session, service, connection, monkeypatch):
+        monkeypatch.setitem(ConnectorRegistry._connectors, "bank_stub", DailyBankConnector)
+        stale = SyncRun(connection_id=connection.id, status=SyncStatus.RUNNING.value)
+        db_session.add(stale)
+        db_session.commit()
+
+        sync_run_id, error = service.resume_sync(connection.id, background=False)
+
+        assert error is None
+        db_session.expire_all()
+        assert db_session.get(SyncRun, stale.id).status == SyncStatus.FAILED.value
+        new_run = db_session.get(SyncRun, sync_run_id)
+        assert new_run.triggered_by == f"resume:{stale.id}"
+        assert new_run.status == SyncStatus.SUCCESS.value
+        assert db_session.query(SyncWatermark).count() == 1
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONNECTOR INTEGRATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+CHARGES = json.loads(
+    (Path(__file__).parent / "fixtures" / "connectors" / "stripe_charges.json").read_text()
+)["data"]
+
+
+class FakeStripeList:
+    """Stripe list endpoint honouring created[gte/lt] and starting_after."""
+
+    def __init__(self, records=()):
+        self.records = list(records)
+        self.queries = []
+
+    def list(self, **query):
+        self.queries.append(query)
+        created = query.get("created", {})
+        rows = [
+            r for r in self.records
+            if created.get("gte", 0) <= r["created"] < created.get("lt", float("inf"))
+        ]
+        start = 0
+        if "starting_after" in query:
+            start = [r["id"] for r in rows].index(query["starting_after"]) + 1
+        return SimpleNamespace(data=rows[start:start + query["limit"]], has_more=start + query["limit"] < len(rows))
+
+
+@pytest.fixture
+def stripe_charges(monkeypatch):
+    stripe = pytest.importorskip("stripe")
+    charges = FakeStripeList(CHARGES)
+    monkeypatch.setattr(stripe, "api_key", None)
+    monkeypatch.setattr(stripe, "Charge", charges)
+    monkeypatch.setattr(stripe, "Payout", FakeStripeList())
+    monkeypatch.setattr(stripe, "BalanceTransaction", FakeStripeList())
+    monkeypatch.setattr(stripe, "Balance", SimpleNamespace(retrieve=lambda: {"available": [], "pending": []}))
+    return charges
+
+
+def _sync(db_session, service, connection_id):
+    sync_run_id, error = service.start_sync(connection_id, background=False)
+    assert error is None
+    db_session.expire_all()
+    sync_run = db_session.get(SyncRun, sync_run_id)
+    assert sync_run.status == SyncStatus.SUCCESS.value, sync_run.errors_json
+    return sync_run
+
+
+class TestConnectorSync:
+    """Run real connectors through LineageService.start_sync."""
+
+    def test_stripe_charges_resume_from_created(self, db_session, service, stripe_charges):
+        connection = service.create_connection(
+            entity_id=1, connection_type="payments_stripe", name="Stripe",
+            config={"api_key": "sk_test", "pagination": {"page_size": 3, "adaptive": False}}
+        )
+
+        first = _sync(db_session, service, connection.id)
+        assert first.rows_loaded == len(CHARGES)
+        last_created = CHARGES[-1]["created"]
+        assert WatermarkStore(db_session, connection.id).load() == {
+            "charge": datetime.fromtimestamp(last_created).isoformat()
+        }
+
+        stripe_charges.records.append({**CHARGES[-1], "id": "ch_0008", "created": last_created + 3600})
+        stripe_charges.queries.clear()
+        second = _sync(db_session, service, connection.id)
+
+        # Listed from the watermark: the last known charge (deduplicated) and the new one
+        assert min(q["created"]["gte"] for q in stripe_charges.queries) == last_created
+        assert (second.rows_extracted, second.rows_loaded) == (2, 1)
+        assert db_session.query(CanonicalRecord).filter(CanonicalRecord.record_type == "BankTxn").count() == 8
+
+    def test_warehouse_query_resumes_from_watermark_column(self, db_session, service, tmp_path):
+        pytest.importorskip("duckdb")
+        from connectors.warehouse_arrow import DuckDBWarehouse
+
+        path = str(tmp_path / "warehouse.duckdb")
+        rows = [
+            {"id": f"INV-{day}", "amount": 100.0 * day, "currency": "EUR", "date": date(2026, 1, day),
+             "counterparty": "Acme", "updated_at": datetime(2026, 1, day, 12)}
+            for day in range(1, 6)
+        ]
+        warehouse = DuckDBWarehouse(path)
+        warehouse.load_table("invoices", rows)
+        warehouse.close()
+
+        connection = service.create_connection(
+            entity_id=1, connection_type="warehouse_sql", name="Warehouse",
+            config={"local_duckdb": path, "query": "SELECT * FROM invoices", "watermark_column": "updated_at"}
+        )
+        first = _sync(db_session, service, connection.id)
+        assert first.rows_loaded == 5
+        assert WatermarkStore(db_session, connection.id).load() == {"invoices": "2026-01-05T12:00:00"}
+
+        rows.append({**rows[-1], "id": "INV-6", "date": date(2026, 1, 6), "updated_at": datetime(2026, 1, 6, 12)})
+        warehouse = DuckDBWarehouse(path)
+        warehouse.load_table("invoices", rows)
+        warehouse.close()
+
+        second = _sync(db_session, service, connection.id)
+        assert (second.rows_extracted, second.rows_loaded) == (2, 1)
+        assert db_session.query(CanonicalRecord).filter(CanonicalRecord.record_type == "Invoice").count() == 6
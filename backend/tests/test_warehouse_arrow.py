@@ -0,0 +1,234 @@
+"""
+Tests for Arrow Bulk Warehouse Extraction
+
+Verifies:
+1. The Arrow path produces exactly the records of the dict path
+   (canonical IDs, checksums, data) for Snowflake and BigQuery connectors
+2. Field mappings and BigQuery temporal conversion are applied per column
+3. The dict path is used when Arrow is disabled
+4. WarehouseSQLConnector normalizes Arrow tables like row batches
+5. Column parsers accept unhashable cells (list/struct values) like the per-row path
+
+All warehouse queries run against the local DuckDB stand-in.
+"""
+
+import pytest
+from datetime import date, datetime, timedelta
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pa = pytest.importorskip("pyarrow")
+pytest.importorskip("duckdb")
+
+from connectors.base import SyncContext, ExtractedRecord
+from connectors.warehouse_arrow import DuckDBWarehouse
+from connectors.warehouse_snowflake import SnowflakeConnector
+from connectors.warehouse_bigquery import BigQueryConnector
+from connector_sdk import NormalizationLayer
+from connectors_impl import WarehouseSQLConnector
+
+
+def _invoice_rows(n: int):
+    start = datetime(2026, 1, 1, 9, 30)
+    return [
+        {
+            "id": f"INV-{i:05d}",
+            "amount": round(100 + i * 1.25, 2),
+            "currency": ["EUR", "usd", "GBP"][i % 3],
+            "date": (start + timedelta(days=i % 60)).date(),
+            "updated_at": start + timedelta(hours=i),
+            "counterparty": f"Customer {i % 17}",
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def warehouse_path(tmp_path):
+    path = str(tmp_path / "warehouse.duckdb")
+    warehouse = DuckDBWarehouse(path)
+    warehouse.load_table("invoices", _invoice_rows(250))
+    warehouse.close()
+    return path
+
+
+@pytest.fixture
+def context():
+    return SyncContext(connection_id=1, entity_id=1, sync_run_id=1)
+
+
+def _dict_path_records(connector, context):
+    """Records as the row-by-row path produces them."""
+    assert connector.authenticate()
+    return [
+        connector.normalize(
+            ExtractedRecord(source_id=str(raw.get('id', '')), record_type='warehouse_record', data=raw),
+            context
+        )
+        for raw in connector.fetch_records(context)
+    ]
+
+
+def _arrow_path_records(connector, context):
+    assert connector.authenticate()
+    records = []
+    for record_type, batch in connector.fetch_record_batches(context):
+        records.extend(connector.normalize_batch(batch, record_type, context))
+    return records
+
+
+def _fingerprint(records):
+    return [(r.canonical_id, r.source_id, r.source_checksum, r.source_system, r.data) for r in records]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# API CONNECTOR PARITY
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestArrowParity:
+    """Arrow and dict paths must be interchangeable."""
+
+    QUERIES = [{"sql": "SELECT * FROM invoices ORDER BY id", "record_type": "invoice"}]
+
+    def test_snowflake_arrow_matches_dict_path(self, warehouse_path, context):
+        config = {"local_duckdb": warehouse_path, "database": "LOCAL", "queries": self.QUERIES,
+                  "arrow_batch_rows": 64}
+        arrow = _arrow_path_records(SnowflakeConnector(config), context)
+        rows = _dict_path_records(SnowflakeConnector(config), context)
+
+        assert len(arrow) == 250
+        assert _fingerprint(arrow) == _fingerprint(rows)
+
+    def test_bigquery_arrow_matches_dict_path(self, warehouse_path, context):
+        config = {"local_duckdb": warehouse_path, "project_id": "local", "queries": self.QUERIES,
+                  "primary_key_columns": ["id"]}
+        arrow = _arrow_path_records(BigQueryConnector(config), context)
+        rows = _dict_path_records(BigQueryConnector(config), context)
+
+        assert _fingerprint(arrow) == _fingerprint(rows)
+        # Temporal columns become ISO strings, as in the dict path
+        assert arrow[0].data["updated_at"] == "2026-01-01T09:30:00"
+        assert arrow[0].data["date"] == "2026-01-01"
+
+    def test_field_mappings_applied_per_column(self, warehouse_path):
+        context = SyncContext(
+            connection_id=1, entity_id=1, sync_run_id=1,
+            field_mappings={"amount": "total", "updated_at": "modified"}
+        )
+        config = {"local_duckdb": warehouse_path, "project_id": "local", "queries": self.QUERIES}
+        arrow = _arrow_path_records(BigQueryConnector(config), context)
+        rows = _dict_path_records(BigQueryConnector(config), context)
+
+        assert _fingerprint(arrow) == _fingerprint(rows)
+        assert "total" in arrow[0].data and "amount" not in arrow[0].data
+        # Mapped fields keep their source value
+        assert arrow[0].data["modified"] == datetime(2026, 1, 1, 9, 30)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SYNC PATH SELECTION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestSyncPath:
+    """sync() uses Arrow when available and falls back to dicts."""
+
+    QUERIES = [{"sql": "SELECT * FROM invoices", "record_type": "invoice"}]
+
+    def test_sync_uses_arrow_batches(self, warehouse_path, context):
+        connector = SnowflakeConnector({
+            "local_duckdb": warehouse_path, "database": "LOCAL",
+            "queries": self.QUERIES, "arrow_batch_rows": 100
+        })
+        result = connector.sync(context)
+
+        assert result.success
+        assert result.records_extracted == 250
+        assert result.records_normalized == 250
+        assert "(arrow)" in result.message
+
+    def test_arrow_disabled_falls_back_to_dicts(self, warehouse_path, context):
+        connector = SnowflakeConnector({
+            "local_duckdb": warehouse_path, "database": "LOCAL",
+            "queries": self.QUERIES, "arrow": False
+        })
+        result = connector.sync(context)
+
+        assert result.success
+        assert result.records_normalized == 250
+        assert "(arrow)" not in result.message
+
+    def test_incremental_filter_applies_to_arrow_path(self, warehouse_path):
+        context = SyncContext(
+            connection_id=1, entity_id=1, sync_run_id=1,
+            since_timestamp=datetime(2026, 1, 10, 0, 0)
+        )
+        connector = SnowflakeConnector({
+            "local_duckdb": warehouse_path, "database": "LOCAL",
+            "queries": [{"sql": "SELECT * FROM invoices", "timestamp_column": "updated_at"}]
+        })
+        records = _arrow_path_records(connector, context)
+
+        assert records
+        assert all(r.data["updated_at"] > datetime(2026, 1, 10) for r in records)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SDK WAREHOUSE CONNECTOR
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestWarehouseSQLConnectorArrow:
+    """RawBatch.arrow_table is normalized like row batches."""
+
+    def _normalize(self, warehouse_path, arrow, data="SELECT * FROM invoices ORDER BY id", **kwargs):
+        connector = WarehouseSQLConnector(
+            {"local_duckdb": warehouse_path, "arrow": arrow, "output_table": "invoices"},
+            entity_id=1
+        )
+        raw_batch = connector.extract(data, **kwargs)
+        return raw_batch, connector.normalize(raw_batch)
+
+    def test_arrow_table_matches_row_batch(self, warehouse_path):
+        arrow_batch, arrow = self._normalize(warehouse_path, arrow=True)
+        row_batch, rows = self._normalize(warehouse_path, arrow=False)
+
+        assert arrow_batch.arrow_table is not None and arrow_batch.records == []
+        assert arrow_batch.row_count == row_batch.row_count == 250
+
+        key = lambda r: (r.canonical_id, r.source_raw_hash, r.amount, r.currency, r.record_date, r.data)
+        assert [key(r) for r in arrow.invoices] == [key(r) for r in rows.invoices]
+        assert arrow.health_report.total_rows == 250
+        assert arrow.invoices[1].currency == "USD"
+
+    def test_iter_records_materializes_arrow_rows(self, warehouse_path):
+        arrow_batch, _ = self._normalize(warehouse_path, arrow=True)
+        row_batch, _ = self._normalize(warehouse_path, arrow=False)
+
+        assert [r.raw_hash for r in arrow_batch.iter_records()] == [r.raw_hash for r in row_batch.records]
+
+    def test_date_window_pushed_into_query(self, warehouse_path):
+        raw_batch, _ = self._normalize(
+            warehouse_path, arrow=True,
+            data={"query": "SELECT * FROM invoices", "date_column": "date"},
+            since=datetime(2026, 1, 1), until=datetime(2026, 1, 11)
+        )
+        dates = raw_batch.arrow_table.column("date").to_pylist()
+        assert dates and all(date(2026, 1, 1) <= d < date(2026, 1, 11) for d in dates)
+
+    def test_column_parsers_accept_unhashable_cells(self):
+        dates = ["2026-01-05", {"date": "2026-01-05"}, ["2026-01-05"], "2026-01-05"]
+        currencies = ["eur", ["EUR"], {"code": "usd"}, "eur"]
+        amounts = ["1,200.50", ["12"], "1,200.50"]
+
+        assert NormalizationLayer.parse_date_column(dates) == [NormalizationLayer.parse_date(v) for v in dates]
+        assert NormalizationLayer.normalize_currency_column(currencies) == [
+            NormalizationLayer.normalize_currency(v) for v in currencies
+        ]
+        assert NormalizationLayer.parse_amount_column(amounts) == [NormalizationLayer.parse_amount(v) for v in amounts]
+
+    def test_without_local_warehouse_remains_stub(self):
+        connector = WarehouseSQLConnector({"warehouse_type": "snowflake"}, entity_id=1)
+        raw_batch = connector.extract("SELECT 1")
+        assert raw_batch.metadata["stub"] is True
+        assert raw_batch.row_count == 0
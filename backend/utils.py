@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import models
+from sqlalchemy.orm import Session
 import io
 import hashlib
 import json
@@ -405,6 +406,21 @@ def run_forecast_model(db, snapshot_id):
             inv.confidence_p75 = None
             
     db.commit()
+    
+    from scenario_engine import invalidate_scenario_index
+    invalidate_scenario_index(snapshot_id)
+    from red_week_contributions import invalidate_contributions
+    invalidate_contributions(snapshot_id)
+
+def forecast_window_start(first_date, today=None):
+    """
+    Start of the 13-week inflow window. Anchored on the earliest forecast date
+    when that is more than 4 weeks back (historical snapshots), else on today.
+    """
+    today = today or datetime.now()
+    if pd.notna(first_date) and (today - first_date).days > 28:
+        return first_date - timedelta(days=first_date.weekday())
+    return today - timedelta(days=today.weekday())
 
 def get_forecast_aggregation(db, snapshot_id, group_by="week"):
     invoices = db.query(models.Invoice).filter(models.Invoice.snapshot_id == snapshot_id).all()
@@ -454,13 +470,8 @@ def get_forecast_aggregation(db, snapshot_id, group_by="week"):
                 })
             return result
         
-        today = datetime.now()
         first_date = forecast_df[['target_date', 'p25_date', 'p75_date']].min().min()
-        
-        if pd.notna(first_date) and (today - first_date).days > 28:
-            start_date = first_date - timedelta(days=first_date.weekday())
-        else:
-            start_date = today - timedelta(days=today.weekday())
+        start_date = forecast_window_start(first_date)
             
         weeks = [start_date + timedelta(weeks=i) for i in range(14)]
         
@@ -514,56 +525,14 @@ def get_forecast_aggregation(db, snapshot_id, group_by="week"):
 
 def apply_scenario_to_forecast(db, snapshot_id, scenario_config):
     # scenario_config: {"global_shock": int, "customer_shocks": {name: int}, "collections_improvement": int}
-    invoices = db.query(models.Invoice).filter(models.Invoice.snapshot_id == snapshot_id).all()
-    
-    forecast_data = []
-    global_shock = scenario_config.get("global_shock", 0)
-    customer_shocks = scenario_config.get("customer_shocks", {})
-    improvement = scenario_config.get("collections_improvement", 0)
-    
-    today = datetime.now()
-    start_of_week = today - timedelta(days=today.weekday())
-    weeks = [start_of_week + timedelta(weeks=i) for i in range(14)]
-    
-    temp_forecast = []
-    for inv in invoices:
-        if inv.payment_date is not None: continue
-        
-        base_date = pd.to_datetime(inv.predicted_payment_date)
-        if pd.isna(base_date): continue
-        
-        shock = global_shock + customer_shocks.get(inv.customer, 0) - improvement
-        shifted_date = base_date + timedelta(days=shock)
-        
-        p25_shifted = pd.to_datetime(inv.confidence_p25) + timedelta(days=shock)
-        p75_shifted = pd.to_datetime(inv.confidence_p75) + timedelta(days=shock)
-        
-        temp_forecast.append({
-            "amount": inv.amount,
-            "target_date": shifted_date,
-            "p25_date": p25_shifted,
-            "p75_date": p75_shifted
-        })
-        
-    df = pd.DataFrame(temp_forecast)
-    if df.empty: return []
-    
-    result = []
-    for i in range(13):
-        w_start = weeks[i]
-        w_end = weeks[i+1]
-        
-        mask = (df['target_date'] >= w_start) & (df['target_date'] < w_end)
-        mask_p25 = (df['p25_date'] >= w_start) & (df['p25_date'] < w_end)
-        mask_p75 = (df['p75_date'] >= w_start) & (df['p75_date'] < w_end)
-        
-        result.append({
-            "label": f"W{i+1} ({w_start.strftime('%m/%d')})",
-            "base": float(df.loc[mask, 'amount'].sum()),
-            "downside": float(df.loc[mask_p75, 'amount'].sum()),
-            "upside": float(df.loc[mask_p25, 'amount'].sum())
-        })
-    return result
+    # Evaluated against the snapshot's cached delta-shift index (see scenario_engine)
+    from scenario_engine import run_scenarios
+    return run_scenarios(db, snapshot_id, [scenario_config])[0]
+
+def apply_scenarios_to_forecast(db, snapshot_id, scenario_configs):
+    """Batch variant: evaluates a grid of scenario configs in one call."""
+    from scenario_engine import run_scenarios
+    return run_scenarios(db, snapshot_id, scenario_configs)
 
 def get_top_movers_logic(db, current_id, previous_id):
     curr_invoices = db.query(models.Invoice).filter(models.Invoice.snapshot_id == current_id).all()
@@ -710,7 +679,7 @@ def get_fx_exposure(db, snapshot_id):
         
     return result
 
-def record_audit_log(db: models.Session, user: str, action: str, resource_type: str, resource_id: int = None, changes: dict = None):
+def record_audit_log(db: Session, user: str, action: str, resource_type: str, resource_id: int = None, changes: dict = None):
     """
     Records a high-level audit trail for CFO sign-offs and overrides.
     """